@@ -5,6 +5,9 @@ Initializes and configures server, publishes the REST API.
 """
 
 import configparser
+import logging
+import os
+import time
 
 from flask import Flask
 
@@ -13,6 +16,7 @@ from app.loggingconfigurator import LoggingConfigurator
 from app.webapiconfigurator import WebApiConfigurator
 from bll.userdatamanager import UserDataManager
 from dal.configuration.configmanager import ConfigManager
+from dal.context.dbsettings import DbSettings
 from dal.media import MediaDataHandler, MediaDataHandlerFactory
 from multimedia.playerhandler import PlayerHandler
 from multimedia.playerhandlers.omxplayerhandler import OmxPlayerHandler
@@ -37,6 +41,10 @@ def initialize():
     # Load configuration.
     load_configuration(argument_parser.config_file_path)
 
+    # Configure logging.
+    logging_configurator = LoggingConfigurator(argument_parser.is_debugging_enabled, argument_parser.log_file_path)
+    logging_configurator.configure_logging()
+
     # Initialize internal modules.
     initialize_internal_modules()
 
@@ -44,10 +52,6 @@ def initialize():
     app = Flask(__name__)
     initialize_flask(app)
 
-    # Configure logging.
-    logging_configurator = LoggingConfigurator(argument_parser.is_debugging_enabled, argument_parser.log_file_path)
-    logging_configurator.configure_logging()
-
     # Go.
     app.run(host='0.0.0.0', port=ConfigManager.settings.web.port, debug=argument_parser.is_debugging_enabled)
 
@@ -78,11 +82,71 @@ def initialize_internal_modules():
     Initializes internal modules: Data Access Layer, Image Viewer, Player Handler and the Indexer.
     """
 
-    media_dal = MediaDataHandlerFactory.create(ConfigManager.settings.database.path_media)
-    initialize_web_api(media_dal)
+    start_time = time.perf_counter()
+
+    db_settings = create_db_settings()
+    media_dal = MediaDataHandlerFactory.create(ConfigManager.settings.database.path_media, db_settings)
+    entry_count = preload_caches(media_dal)
+    initialize_web_api(media_dal, db_settings)
     initialize_user_data_manager()
 
-def initialize_web_api(media_dal: MediaDataHandler):
+    logging.info(
+        'Internal modules initialized in %.3f s, %d cache entries preloaded.',
+        time.perf_counter() - start_time,
+        entry_count)
+
+def create_db_settings() -> DbSettings:
+    """
+    Creates the settings of the database connections.
+
+    Returns
+    -------
+    The new DbSettings instance.
+    """
+
+    tuning_config = ConfigManager.settings.database.tuning
+
+    db_settings = DbSettings()
+    db_settings.busy_timeout = tuning_config.busy_timeout
+    db_settings.cache_size = tuning_config.cache_size
+    db_settings.journal_mode = tuning_config.journal_mode
+    db_settings.mmap_size = tuning_config.mmap_size
+    db_settings.pool_idle_timeout = tuning_config.pool_idle_timeout
+    db_settings.pool_timeout = tuning_config.pool_timeout
+    db_settings.read_pool_size = tuning_config.read_pool_size
+    db_settings.synchronous = tuning_config.synchronous
+    db_settings.temp_store = tuning_config.temp_store
+    db_settings.write_pool_size = tuning_config.write_pool_size
+
+    return db_settings
+
+def preload_caches(media_dal: MediaDataHandler) -> int:
+    """
+    Loads the frequently looked up IDs into the caches of the Data Access Layer if it is enabled and the database
+    exists already.
+
+    Parameters
+    ----------
+    media_dal : MediaDataHandler
+        The Media Data Access Layer.
+
+    Returns
+    -------
+    The number of loaded entries.
+    """
+
+    database_config = ConfigManager.settings.database
+    if not database_config.preload_caches or not os.path.isfile(database_config.path_media):
+        return 0
+
+    try:
+        return media_dal.preload_caches()
+    except Exception as exception:
+        logging.error('Failed to preload caches. %s', exception)
+
+    return 0
+
+def initialize_web_api(media_dal: MediaDataHandler, db_settings: DbSettings):
     """
     Initializes web API.
     """
@@ -91,7 +155,7 @@ def initialize_web_api(media_dal: MediaDataHandler):
     video_player = create_player()
     playlist_handler = create_playlist_handler(audio_player, video_player)
 
-    wic = WebApiConfigurator(media_dal, audio_player, video_player, playlist_handler)
+    wic = WebApiConfigurator(media_dal, audio_player, video_player, playlist_handler, db_settings)
     wic.configure_interfaces()
 
 def create_player() -> PlayerHandler:
@@ -2,16 +2,23 @@
 Implements web interface configurator logic.
 """
 
+from functools import partial
 import datetime
+import logging
 
 from bll.mediacatalog.catalogizer import Catalogizer
 from bll.mediacatalog.catalogizercontext import CatalogizerContext
+from bll.mediacatalog.catalogjob import CatalogJob
+from bll.mediacatalog.catalogjobscheduler import CatalogJobScheduler
+from bll.mediacatalog.catalogwatcher import CatalogWatcher
+from bll.mediacatalog.inotifyeventsource import InotifyEventSource
 from bll.player.audioplayeradapter import AudioPlayerAdapter
 from bll.player.videoplayeradapter import VideoPlayerAdapter
 from bll.playlist.playlistmanager import PlaylistManager
 from dal.configuration.config import IndexingConfig
 from dal.configuration.configmanager import ConfigManager
 from dal.context.dbcontext import DbContext
+from dal.context.dbsettings import DbSettings
 from dal.media import MediaDataHandler
 from multimedia.imageviewerhandler import ImageViewerHandler
 from multimedia.imageviewerhandlers.fbiimageviewerhandler import FbiImageViewerHandler
@@ -40,12 +47,14 @@ class WebApiConfigurator:
             media_dal: MediaDataHandler,
             audio_player: PlayerHandler,
             video_player: PlayerHandler,
-            playlist_handler: PlaylistHandler):
+            playlist_handler: PlaylistHandler,
+            db_settings: DbSettings = None):
 
         self._media_dal = media_dal
         self._audio_player = audio_player
         self._video_player = video_player
         self._playlist_handler = playlist_handler
+        self._db_settings = db_settings
 
     ####################################################################################################################
     # Public methods.
@@ -108,14 +117,27 @@ class WebApiConfigurator:
 
         catalogizer_context = self._create_catalogizer_context()
 
-        web.routing.maintenance.catalogizer = Catalogizer(catalogizer_context)
+        catalogizer = Catalogizer(catalogizer_context)
+        catalog_job_scheduler = CatalogJobScheduler(
+            catalogizer,
+            ConfigManager.settings.database.lifetime,
+            web.routing.maintenance.on_job_finished)
+
+        web.routing.maintenance.audio_dal_retriever = self._media_dal.audio_data_handler.retriever
+        web.routing.maintenance.catalog_job_scheduler = catalog_job_scheduler
+        web.routing.maintenance.catalogizer = catalogizer
         web.routing.maintenance.status_info = StatusInfo(
             datetime.datetime.now(),
             self._media_dal.audio_data_handler,
             self._media_dal.image_data_handler,
             self._media_dal.video_data_handler)
+        web.routing.maintenance.image_dal_retriever = self._media_dal.image_data_handler.retriever
         web.routing.maintenance.video_dal_retriever = self._media_dal.video_data_handler.retriever
 
+        catalog_job_scheduler.submit(CatalogJob.KIND_UPGRADE)
+        catalog_job_scheduler.start()
+        self._start_catalog_watcher(catalogizer, catalog_job_scheduler)
+
     def _create_catalogizer_context(self) -> CatalogizerContext:
 
         catalogizer_context = CatalogizerContext()
@@ -125,6 +147,37 @@ class WebApiConfigurator:
 
         return catalogizer_context
 
+    def _start_catalog_watcher(self, catalogizer: Catalogizer, catalog_job_scheduler: CatalogJobScheduler):
+        """
+        Creates and starts a CatalogWatcher if watching is enabled. The watcher runs until the process exits.
+
+        Parameters
+        ----------
+        catalogizer : Catalogizer
+            The Catalogizer the directories of which are watched.
+        catalog_job_scheduler : CatalogJobScheduler
+            The scheduler the synchronizations are queued in.
+        """
+
+        watcher_config = ConfigManager.settings.indexing.watcher
+        if not watcher_config.enabled:
+            return
+
+        event_source = None
+        try:
+            event_source = InotifyEventSource()
+        except Exception as exception:
+            logging.error('Failed to initialize file system events. %s', exception)
+
+        # The synchronizations requested by the watcher are queued, so they are coalesced with the other jobs.
+        catalog_watcher = CatalogWatcher(
+            partial(catalog_job_scheduler.submit, CatalogJob.KIND_SYNC),
+            event_source,
+            catalogizer.directories,
+            watcher_config.debounce_delay,
+            watcher_config.fallback_interval)
+        catalog_watcher.start()
+
     def _create_indexer_configuration(self) -> IndexingConfig:
         """
         Creates runtime Indexer configuration based on persisted settings.
@@ -135,6 +188,9 @@ class WebApiConfigurator:
         """
 
         indexing_config = IndexingConfig()
+        indexing_config.pool_size = ConfigManager.settings.indexing.pool_size
+        indexing_config.relative_matching = ConfigManager.settings.indexing.relative_matching
+        indexing_config.timing = ConfigManager.settings.indexing.timing
 
         indexing_config.audio = None
         if 'audio' in ConfigManager.categories:
@@ -156,7 +212,7 @@ class WebApiConfigurator:
 
     def _configure_playlist(self):
 
-        playlist_db_context = DbContext(ConfigManager.settings.database.path_playlist)
+        playlist_db_context = DbContext(ConfigManager.settings.database.path_playlist, self._db_settings)
 
         playlist_manager = PlaylistManager(playlist_db_context, self._playlist_handler)
         playlist_manager.audio_retriever = self._media_dal.audio_data_handler.retriever
@@ -10,7 +10,7 @@ class AudioFilterFactory(PathFilterFactory):
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, audio_dal, sync_only=False):
+    def __init__(self, audio_dal, sync_only=False, change_journal=None):
         """
         Initializes attributes.
 
@@ -20,6 +20,8 @@ class AudioFilterFactory(PathFilterFactory):
             A reference to the audio DAL.
         sync_only : boolean
             Indicates whether only synchronization is needed.
+        change_journal : ChangeJournal
+            The change journal used during indexing. Optional.
         """
 
         ### Validate parameters.
@@ -29,6 +31,12 @@ class AudioFilterFactory(PathFilterFactory):
         # Attributes from outside.
         self._audio_dal = audio_dal
         self._sync_only = sync_only
+        self._change_journal = change_journal
+
+        ### Private attributes.
+        # The synchronization filter. A single instance is shared by all the policies, because it has to see the files
+        # of all the directories before it can decide which files have been removed.
+        self._sync_filter = None
 
     ####################################################################################################################
     # PathFilterFactory implementation.
@@ -38,6 +46,17 @@ class AudioFilterFactory(PathFilterFactory):
 
         filters = []
         if self._sync_only:
-            filters.append(AudioSyncFilter(self._audio_dal))
+            filters.append(self._get_sync_filter())
 
         return filters
+
+    ####################################################################################################################
+    # Private methods.
+    ####################################################################################################################
+
+    def _get_sync_filter(self):
+
+        if self._sync_filter is None:
+            self._sync_filter = AudioSyncFilter(self._audio_dal, self._change_journal)
+
+        return self._sync_filter
@@ -1,3 +1,6 @@
+import threading
+
+from bll.mediacatalog.functions import build_path_index, find_removed_ids
 from indexing.filters.pathfilter import PathFilter
 
 class AudioSyncFilter(PathFilter):
@@ -5,13 +8,27 @@ class AudioSyncFilter(PathFilter):
     This filter makes it possible to do an incremental synchronization instead of a full rebuild. It ignores already
     exisiting paths from the analyzation process and gathers removed files, then invokes the appropriate DAL operations
     to apply the changes.
+
+    The stored paths are loaded only when they are needed first. If a change journal is used, the files found unchanged
+    by the journal are not considered removed (they are not analyzed at all), and nothing is loaded if every directory
+    has been found unchanged.
     """
 
     ####################################################################################################################
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, audio_dal):
+    def __init__(self, audio_dal, change_journal=None):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        audio_dal : AudioDataHandler
+            A reference to the audio DAL.
+        change_journal : ChangeJournal
+            The change journal used during indexing. Optional.
+        """
 
         ### Validate parameters.
         if audio_dal is None:
@@ -19,10 +36,15 @@ class AudioSyncFilter(PathFilter):
 
         ### Attributes from outside.
         self._audio_dal = audio_dal
+        self._change_journal = change_journal
 
         ### Private attributes.
-        # A list of dictionaries storing file paths as id (int) => path (string) pairs.
-        self._stored_paths = []
+        # Indicates whether the filter is initialized.
+        self._is_initialized = False
+        # This lock is used to load the stored paths only once, even if the filter is applied by multiple threads.
+        self._lock = threading.Lock()
+        # Stores file paths as path (string) => id (int) pairs. None if they have not been loaded yet.
+        self._stored_paths = None
 
     ####################################################################################################################
     # PathFilter implementation.
@@ -30,22 +52,45 @@ class AudioSyncFilter(PathFilter):
 
     def apply_filter(self, path):
 
-        for i in range(0, len(self._stored_paths)):
-            if path == self._stored_paths[i]['path']:
-                del self._stored_paths[i]
-                return True
-
-        return False
+        return self._get_stored_paths().pop(path, None) is not None
 
     def clean_filter(self):
 
-        for id_and_path in self._stored_paths:
-            self._audio_dal.deleter.delete_path(id_and_path['id'])
+        # The filter is shared by multiple analyzers, clean it only once.
+        if not self._is_initialized:
+            return
+        self._is_initialized = False
+
+        # Nothing has been removed if every directory has been found unchanged.
+        if self._stored_paths is None and self._change_journal is not None and not self._change_journal.has_changes:
+            return
+
+        self._audio_dal.deleter.delete_paths(find_removed_ids(self._get_stored_paths(), self._change_journal))
+
+        self._stored_paths = None
 
     def init_filter(self):
 
-        self._stored_paths = self._audio_dal.retriever.retrieve_paths()
+        # The filter is shared by multiple analyzers, initialize it only once.
+        if self._is_initialized:
+            return
+        self._is_initialized = True
+
+        # The stored paths are loaded when they are needed first.
+        self._stored_paths = None
 
     def leave_scope(self):
 
         pass
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _get_stored_paths(self):
+
+        with self._lock:
+            if self._stored_paths is None:
+                self._stored_paths = build_path_index(self._audio_dal.retriever.iterate_paths())
+
+            return self._stored_paths
@@ -1,5 +1,6 @@
 from collections import defaultdict
 from datetime import datetime
+from functools import partial
 from os import path, unlink
 import logging
 import threading
@@ -10,13 +11,20 @@ from bll.mediacatalog.audiocollector import AudioCollector
 from bll.mediacatalog.audiofilterfactory import AudioFilterFactory
 from bll.mediacatalog.imagecollector import ImageCollector
 from bll.mediacatalog.imagefilterfactory import ImageFilterFactory
+from bll.mediacatalog.mediajournalstore import MediaJournalStore
 from bll.mediacatalog.videocollector import VideoCollector
 from bll.mediacatalog.videofilterfactory import VideoFilterFactory
+from dal.context.dbconnection import DbConnection
+from dal.media import MediaDataHandlerFactory
 from indexing.collectible import Collectible
 from indexing.indexer import Indexer
 from indexing.indexerpolicy import IndexerPolicy
+from indexing.journal.changejournal import ChangeJournal
 from indexing.pathpatternanalyzer import PathPatternAnalyzer
+from indexing.stagetimer import StageTimer
 from indexing.tagconfig import TagConfig
+from indexing.traversal.journalingtraversalengine import JournalingTraversalEngine
+from indexing.traversal.scandirtraversalengine import ScandirTraversalEngine
 
 class Catalogizer:
     """
@@ -30,7 +38,11 @@ class Catalogizer:
     STATUS_COMPLETED = 0
     STATUS_IN_PROGRESS = 1
     STATUS_NOT_RUNNING = 2
-    STATUS_STARTED = 3
+    STATUS_CANCELLED = 3
+    STATUS_FAILED = 4
+
+    # The suffix of the path of the database a rebuild indexes into, before it replaces the media database.
+    SHADOW_DATABASE_SUFFIX = '.rebuild'
 
     ####################################################################################################################
     # Constructor.
@@ -51,6 +63,8 @@ class Catalogizer:
             raise Exception('audio_data_handler cannot be None.')
         if context.media_dal.image_data_handler is None:
             raise Exception('image_data_handler cannot be None.')
+        if context.media_dal.journal_data_handler is None:
+            raise Exception('journal_data_handler cannot be None.')
         if context.media_dal.video_data_handler is None:
             raise Exception('video_data_handler cannot be None.')
 
@@ -59,11 +73,17 @@ class Catalogizer:
         self._indexing_config = context.indexing_config
         self._audio_dal = context.media_dal.audio_data_handler
         self._image_dal = context.media_dal.image_data_handler
+        self._journal_dal = context.media_dal.journal_data_handler
+        self._media_dal = context.media_dal
         self._video_dal = context.media_dal.video_data_handler
 
         ### Private attributes.
+        # Remembers the state of the directories, so unchanged directories are not enumerated again.
+        self._change_journal = ChangeJournal(MediaJournalStore(self._journal_dal))
         # A boolean value that indicates whether a synchronization process is running currently.
         self._is_process_running = False
+        # Records the time spent in the stages of the last indexing process if timing is enabled.
+        self._stage_timer = None
         # This lock is used to synchronize the database synchronization processes.
         self._synchronization_lock_object = threading.Lock()
 
@@ -71,6 +91,46 @@ class Catalogizer:
     # Properties.
     ####################################################################################################################
 
+    @property
+    def database_age(self):
+        """
+        Gets the number of seconds since the media database was last modified, or None if it does not exist.
+        """
+
+        if not path.exists(self._database_config.path_media):
+            return None
+
+        database_time = datetime.fromtimestamp(path.getmtime(self._database_config.path_media))
+
+        return (datetime.now() - database_time).total_seconds()
+
+    @property
+    def directories(self):
+        """
+        Gets the distinct directories of the indexing rules.
+        """
+
+        rules = []
+        if self._indexing_config.audio is not None:
+            rules.extend(self._indexing_config.audio.rules)
+        if self._indexing_config.image is not None:
+            rules.extend(self._indexing_config.image.rules)
+        if self._indexing_config.video is not None:
+            rules.extend(self._indexing_config.video.video_rules)
+            rules.extend(self._indexing_config.video.subtitle_rules)
+
+        return list(self._group_rules_by_directory(rules).keys())
+
+    @property
+    def stage_timings(self):
+        """
+        Gets the time spent in the stages of the last (or the running) indexing process as category (str) => stage (str)
+        => timing (StageTiming) dictionaries, or None if timing is disabled or nothing has been indexed yet.
+        """
+        if self._stage_timer is None:
+            return None
+        return self._stage_timer.timings
+
     @property
     def status(self):
         if self._is_process_running:
@@ -81,131 +141,201 @@ class Catalogizer:
     # Public methods.
     ####################################################################################################################
 
-    def rebuild_database(self):
+    def rebuild_database(self, progress=None):
+        """
+        Rebuilds the media database from scratch.
+
+        Parameters
+        ----------
+        progress : IndexingProgress
+            Counts the progress of indexing and tells whether the rebuild has been cancelled. Optional.
+
+        Returns
+        -------
+        One of the STATUS_* constants.
+        """
 
         with self._synchronization_lock_object:
             try:
-                return self._rebuild_database()
+                return self._rebuild_database(progress)
             except Exception as exception:
-                logging.error('Failed to rebuild media database. %s', exception)
+                return self._get_failure_status('Failed to rebuild media database. %s', exception, progress)
 
-    def rebuild_database_async(self, callback=None):
+    def synchronize_database(self, progress=None):
+        """
+        Stores the changes of the media directories in the media database.
 
-        return self._start_async_process(self.rebuild_database, callback)
+        Parameters
+        ----------
+        progress : IndexingProgress
+            Counts the progress of indexing and tells whether the synchronization has been cancelled. Optional.
 
-    def renew_database(self):
+        Returns
+        -------
+        One of the STATUS_* constants.
+        """
 
         with self._synchronization_lock_object:
+            try:
+                return self._synchronize_database(progress)
+            except Exception as exception:
+                return self._get_failure_status('Failed to synchronize media database. %s', exception, progress)
 
-            # Check if database exists and check whether it is recent ...
-            is_rebuild_needed = False
-
-            if not path.exists(self._database_config.path_media):
-                is_rebuild_needed = True
-            else:
-                database_age = datetime.fromtimestamp(path.getmtime(self._database_config.path_media))
-                time_since_last_update = datetime.now() - database_age
-                seconds_since_last_update = int(time_since_last_update.total_seconds())
-                if seconds_since_last_update > self._database_config.lifetime:
-                    is_rebuild_needed = True
-
-            # ... and if not, recreate it.
-            if is_rebuild_needed is True:
-                self.rebuild_database()
-
-        return True
-
-    def synchronize_database(self):
+    def upgrade_database(self):
 
         with self._synchronization_lock_object:
             try:
-                return self._synchronize_database()
+                return self._upgrade_database()
             except Exception as exception:
-                logging.error('Failed to synchronize media database. %s', exception)
-
-    def synchronize_database_async(self, callback=None):
-
-        return self._start_async_process(self.synchronize_database, callback)
+                return self._get_failure_status('Failed to upgrade media database. %s', exception)
 
     ####################################################################################################################
     # Private methods -- Indexing.
     ####################################################################################################################
 
-    def _configure_indexer(self, indexer, collector, filter_factory, tag_config, rules, collectible_tag=None):
+    def _configure_indexer(
+            self,
+            indexer,
+            category,
+            collector,
+            filter_factory,
+            tag_config,
+            rules,
+            collectible_tag=None,
+            is_deferred=False):
 
-        collectibles = []
         path_pattern_analyzer = PathPatternAnalyzer()
 
         for directory, rules_for_dir in self._group_rules_by_directory(rules).items():
+            collectibles = []
             for rule in rules_for_dir:
                 pattern = path_pattern_analyzer.parse(tag_config, rule.pattern)
                 collectible = Collectible(rule.extensions, pattern, collectible_tag)
                 collectibles.append(collectible)
 
-            indexer_policy = IndexerPolicy(collector, collectibles, filter_factory)
+            indexer_policy = IndexerPolicy(collector, collectibles, filter_factory, category, is_deferred)
             indexer_policy.tag_any = TAG_ANY
             indexer.add_rule(directory, indexer_policy)
 
-    def _index_all_files(self):
-
-        with self._audio_dal.db_context.get_connection_provider():
-            self._index_audio_files()
-        with self._image_dal.db_context.get_connection_provider():
-            self._index_image_files()
-        with self._video_dal.db_context.get_connection_provider():
-            self._index_video_files()
-
-    def _index_audio_files(self, sync_only=False):
+    def _configure_audio_indexer(self, indexer, audio_dal, change_journal, sync_only):
 
         config = self._indexing_config.audio
         if config is None:
             return
 
-        audio_collector = AudioCollector(self._audio_dal)
-        audio_filter_factory = AudioFilterFactory(self._audio_dal, sync_only)
+        audio_collector = AudioCollector(audio_dal)
+        audio_filter_factory = AudioFilterFactory(audio_dal, sync_only, change_journal)
         tag_config = TagConfig(TAG_START_SEPARATOR, TAG_END_SEPARATOR, (TAG_ANY, TAG_ANY_PATTERN), AUDIO_TAG_PATTERNS)
 
-        indexer = Indexer()
-        self._configure_indexer(indexer, audio_collector, audio_filter_factory, tag_config, config.rules)
-        indexer.index()
+        self._configure_indexer(indexer, 'audio', audio_collector, audio_filter_factory, tag_config, config.rules)
 
-    def _index_image_files(self, sync_only=False):
+    def _configure_image_indexer(self, indexer, image_dal, change_journal, sync_only):
 
         config = self._indexing_config.image
         if config is None:
             return
 
-        image_collector = ImageCollector(self._image_dal)
-        image_filter_factory = ImageFilterFactory(self._image_dal, sync_only)
+        image_collector = ImageCollector(image_dal)
+        image_filter_factory = ImageFilterFactory(image_dal, sync_only, change_journal)
         tag_config = TagConfig(TAG_START_SEPARATOR, TAG_END_SEPARATOR, (TAG_ANY, TAG_ANY_PATTERN), IMAGE_TAG_PATTERNS)
 
-        indexer = Indexer()
-        self._configure_indexer(indexer, image_collector, image_filter_factory, tag_config, config.rules)
-        indexer.index()
+        self._configure_indexer(indexer, 'image', image_collector, image_filter_factory, tag_config, config.rules)
 
-    def _index_video_files(self, sync_only=False):
+    def _configure_video_indexer(self, indexer, video_dal, change_journal, sync_only):
 
         config = self._indexing_config.video
         if config is None:
             return
 
-        video_collector = VideoCollector(self._video_dal)
-        video_filter_factory = VideoFilterFactory(self._video_dal, config.ignore_revisions, sync_only)
+        video_collector = VideoCollector(video_dal)
+        video_filter_factory = VideoFilterFactory(video_dal, config.ignore_revisions, sync_only, change_journal)
         video_tag_config = TagConfig(
             TAG_START_SEPARATOR, TAG_END_SEPARATOR, (TAG_ANY, TAG_ANY_PATTERN), VIDEO_TAG_PATTERNS)
         subtitle_tag_config = TagConfig(
             TAG_START_SEPARATOR, TAG_END_SEPARATOR, (TAG_ANY, TAG_ANY_PATTERN), SUBTITLE_TAG_PATTERNS)
 
-        indexer = Indexer()
         self._configure_indexer(
             indexer,
-            video_collector, video_filter_factory, video_tag_config,
+            'video', video_collector, video_filter_factory, video_tag_config,
             config.video_rules, 'video')
+        # Subtitles are stored only for the videos already stored, so they are collected after the videos.
         self._configure_indexer(
             indexer,
-            video_collector, video_filter_factory, subtitle_tag_config,
-            config.subtitle_rules, 'subtitle')
+            'video', video_collector, video_filter_factory, subtitle_tag_config,
+            config.subtitle_rules, 'subtitle', True)
+
+    def _index_all_files(self, media_dal, change_journal, progress=None):
+
+        creators = [
+            media_dal.audio_data_handler.creator,
+            media_dal.image_data_handler.creator,
+            media_dal.video_data_handler.creator]
+
+        with media_dal.audio_data_handler.db_context.get_connection_provider(), \
+             media_dal.image_data_handler.db_context.get_connection_provider(), \
+             media_dal.video_data_handler.db_context.get_connection_provider():
+            on_flush = progress.add_rows if progress is not None else None
+            for creator in creators:
+                creator.begin_bulk_insert(self._database_config.batch_size, on_flush)
+            try:
+                self._index_files(media_dal, change_journal, progress=progress)
+            finally:
+                for creator in creators:
+                    creator.end_bulk_insert()
+
+    def _index_changed_files(self, media_dal, change_journal, progress=None):
+
+        creators = [
+            media_dal.audio_data_handler.creator,
+            media_dal.image_data_handler.creator,
+            media_dal.video_data_handler.creator]
+
+        # The changes are inserted one by one, so the inserted rows are counted by the creators themselves.
+        on_insert = progress.add_rows if progress is not None else None
+        for creator in creators:
+            creator.set_insert_callback(on_insert)
+        try:
+            self._index_files(media_dal, change_journal, True, progress)
+        finally:
+            for creator in creators:
+                creator.set_insert_callback(None)
+
+    def _index_files(self, media_dal, change_journal, sync_only=False, progress=None):
+        """
+        Indexes the files of all categories. All the directories are traversed by a single Indexer, so directories of
+        different categories can be traversed concurrently if the pool size is greater than one. The entries of the
+        directories that have not changed since the last indexing process are taken from the change journal, and only
+        the new and the changed files are analyzed.
+
+        Since the files of unchanged directories are not analyzed again, changes of the rules and subtitles whose video
+        has been added since in another directory are picked up only by a rebuild.
+
+        Parameters
+        ----------
+        media_dal : MediaDataHandler
+            The data handlers of the database to store the files in.
+        change_journal : ChangeJournal
+            The change journal stored in the same database.
+        sync_only : bool
+            Indicates whether only the changes should be stored in the database.
+        progress : IndexingProgress
+            Counts the progress of indexing and tells whether indexing has been cancelled. Optional.
+        """
+
+        traversal_engine = JournalingTraversalEngine(ScandirTraversalEngine(), change_journal)
+        indexer = Indexer(
+            traversal_engine=traversal_engine,
+            pool_size=self._indexing_config.pool_size,
+            relative_matching=self._indexing_config.relative_matching,
+            progress=progress,
+            stage_timer=self._stage_timer)
+        self._configure_audio_indexer(indexer, media_dal.audio_data_handler, change_journal, sync_only)
+        self._configure_image_indexer(indexer, media_dal.image_data_handler, change_journal, sync_only)
+        self._configure_video_indexer(indexer, media_dal.video_data_handler, change_journal, sync_only)
+
+        change_journal.load()
         indexer.index()
+        change_journal.save()
 
     def _group_rules_by_directory(self, rules):
 
@@ -225,69 +355,129 @@ class Catalogizer:
         self._image_dal.clear_cache()
         self._video_dal.clear_cache()
 
-    def _create_database(self):
+    def _create_database(self, media_dal):
 
-        self._audio_dal.creator.create_db()
-        self._image_dal.creator.create_db()
-        self._video_dal.creator.create_db()
+        media_dal.audio_data_handler.creator.create_db()
+        media_dal.image_data_handler.creator.create_db()
+        media_dal.video_data_handler.creator.create_db()
+        media_dal.journal_data_handler.creator.create_db()
 
-    def _delete_database(self):
+    def _delete_database(self, database_path):
 
-        if path.exists(self._database_config.path_media) is True:
-            unlink(self._database_config.path_media)
+        # Delete the write-ahead log as well, so that it is not applied to a new database.
+        for suffix in ['', '-shm', '-wal']:
+            if path.exists(database_path + suffix) is True:
+                unlink(database_path + suffix)
 
-    def _rebuild_database(self):
+    def _rebuild_database(self, progress):
+        """
+        Indexes every file into a new (shadow) database while the media database keeps serving the readers, then
+        replaces the media database with it. If the rebuild fails, the media database is left intact. If only the
+        replacement fails, the finished shadow database is kept until the next rebuild.
+        """
 
         if self._is_process_running:
             return Catalogizer.STATUS_IN_PROGRESS
 
         self._is_process_running = True
+        shadow_path = self._database_config.path_media + Catalogizer.SHADOW_DATABASE_SUFFIX
+        is_shadow_finished = False
+        self._start_stage_timer()
 
         try:
-            self._delete_database()
+            # Remove the remainders of an interrupted rebuild.
+            self._delete_database(shadow_path)
+
+            # Readers get an empty catalog instead of errors until the first rebuild finishes.
+            if not path.exists(self._database_config.path_media):
+                self._create_database(self._media_dal)
+
+            shadow_media_dal = MediaDataHandlerFactory.create(shadow_path, self._video_dal.db_context.settings)
+            shadow_db_context = shadow_media_dal.video_data_handler.db_context
+            try:
+                self._create_database(shadow_media_dal)
+                self._index_all_files(
+                    shadow_media_dal,
+                    ChangeJournal(MediaJournalStore(shadow_media_dal.journal_data_handler)),
+                    progress)
+            finally:
+                # Closing the last connection checkpoints the write-ahead log into the database file.
+                shadow_db_context.close_connections()
+
+            is_shadow_finished = True
+            self._video_dal.db_context.replace_database(shadow_path)
             self._clear_caches()
-            self._create_database()
-            self._index_all_files()
         finally:
+            if not is_shadow_finished:
+                self._delete_database(shadow_path)
+            self._stop_stage_timer('rebuilding the media database')
             self._is_process_running = False
 
         return Catalogizer.STATUS_COMPLETED
 
-    def _synchronize_database(self):
+    def _synchronize_database(self, progress):
 
         if self._is_process_running:
             return Catalogizer.STATUS_IN_PROGRESS
 
         self._is_process_running = True
+        self._start_stage_timer()
 
         try:
-            self._index_audio_files(True)
-            self._index_image_files(True)
-            self._index_video_files(True)
+            self._upgrade_database()
+            self._index_changed_files(self._media_dal, self._change_journal, progress)
         finally:
+            self._stop_stage_timer('synchronizing the media database')
             self._is_process_running = False
 
         return Catalogizer.STATUS_COMPLETED
 
+    def _upgrade_database(self):
+
+        if not path.exists(self._database_config.path_media):
+            return Catalogizer.STATUS_NOT_RUNNING
+
+        # Databases created by earlier versions lack some indices and do not have a journal yet.
+        self._audio_dal.creator.upgrade_db()
+        self._image_dal.creator.upgrade_db()
+        self._video_dal.creator.upgrade_db()
+        self._journal_dal.creator.create_db()
+
+        return Catalogizer.STATUS_COMPLETED
+
     ####################################################################################################################
-    # Private methods -- Asynchronous operations.
+    # Auxiliary methods.
     ####################################################################################################################
 
-    def _execute_function(self, func, callback):
+    def _get_failure_status(self, message, exception, progress=None):
 
-        result = func()
-        if callback is not None:
-            callback(result)
+        if progress is not None and progress.is_cancelled:
+            logging.info('Media database process has been cancelled.')
+            return Catalogizer.STATUS_CANCELLED
 
-    def _start_async_process(self, func, callback=None):
+        logging.error(message, exception)
 
-        if self._is_process_running:
-            return Catalogizer.STATUS_IN_PROGRESS
+        return Catalogizer.STATUS_FAILED
 
-        try:
-            thread = threading.Thread(target=self._execute_function, args=(func, callback))
-            thread.start()
-        except Exception as exception:
-            logging.error('Failed to execute asynchronous operation. %s', exception)
+    def _start_stage_timer(self):
+        """
+        Creates a new StageTimer if timing is enabled and activates it on the current thread. The timer also receives
+        the commit times of the database connections used by the thread.
+        """
+
+        if not self._indexing_config.timing:
+            return
+
+        self._stage_timer = StageTimer()
+        self._stage_timer.activate()
+        DbConnection.set_commit_callback(
+            partial(self._stage_timer.add_to_current_category, StageTimer.STAGE_COMMITTING))
+
+    def _stop_stage_timer(self, title):
+
+        if self._stage_timer is None:
+            return
 
-        return Catalogizer.STATUS_STARTED
+        DbConnection.set_commit_callback(None)
+        self._stage_timer.deactivate()
+        self._stage_timer.log(title)
@@ -0,0 +1,226 @@
+from datetime import datetime
+
+from indexing.indexingprogress import IndexingProgress
+
+class CatalogJob:
+    """
+    A rebuild, synchronization or upgrade of the media database scheduled by the CatalogJobScheduler. Tracks the state
+    and the progress of the job, and estimates the remaining time based on the number of files the previous job of the
+    same kind has analyzed.
+    """
+
+    ####################################################################################################################
+    # Public constants.
+    ####################################################################################################################
+
+    KIND_REBUILD = 0
+    KIND_SYNC = 1
+    KIND_UPGRADE = 2
+
+    STATE_QUEUED = 0
+    STATE_RUNNING = 1
+    STATE_COMPLETED = 2
+    STATE_FAILED = 3
+    STATE_CANCELLED = 4
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, job_id, kind, expected_file_count=None, is_periodic=False):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        job_id : int
+            The identifier of the job.
+        kind : int
+            The kind of the job, one of the KIND_* constants.
+        expected_file_count : int
+            The number of files the job is expected to analyze, None if unknown.
+        is_periodic : bool
+            Indicates whether the job has been scheduled because the database has expired.
+        """
+
+        ### Validate parameters.
+        if job_id is None:
+            raise Exception('job_id cannot be None.')
+        if kind not in [CatalogJob.KIND_REBUILD, CatalogJob.KIND_SYNC, CatalogJob.KIND_UPGRADE]:
+            raise Exception('kind is invalid.')
+
+        ### Attributes from outside.
+        self._job_id = job_id
+        self._kind = kind
+        self._expected_file_count = expected_file_count
+        self._is_periodic = is_periodic
+
+        ### Private attributes.
+        # The time the job has finished.
+        self._finish_time = None
+        # Counts the progress of indexing and tells whether the job has been cancelled.
+        self._progress = IndexingProgress()
+        # The time the job has started.
+        self._start_time = None
+        # The state of the job, one of the STATE_* constants.
+        self._state = CatalogJob.STATE_QUEUED
+        # The time the job has been submitted.
+        self._submit_time = datetime.now()
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def elapsed_time(self):
+        """
+        Gets the number of seconds the job has been running for (or had run for), or None if it has not started.
+        """
+
+        if self._start_time is None:
+            return None
+
+        end_time = self._finish_time if self._finish_time is not None else datetime.now()
+
+        return (end_time - self._start_time).total_seconds()
+
+    @property
+    def eta(self):
+        """
+        Gets the estimated number of seconds until the job finishes, or None if it cannot be estimated.
+        """
+
+        if self._state != CatalogJob.STATE_RUNNING or not self._expected_file_count:
+            return None
+
+        throughput = self.throughput
+        remaining_file_count = self._expected_file_count - self._progress.file_count
+        if not throughput or remaining_file_count < 0:
+            return None
+
+        return remaining_file_count / throughput
+
+    @property
+    def expected_file_count(self):
+        """
+        Gets the number of files the job is expected to analyze, or None if unknown.
+        """
+        return self._expected_file_count
+
+    @property
+    def finish_time(self):
+        """
+        Gets the time the job has finished, or None.
+        """
+        return self._finish_time
+
+    @property
+    def is_finished(self):
+        """
+        Gets a value indicating whether the job has completed, failed or been cancelled.
+        """
+        return self._state in [CatalogJob.STATE_COMPLETED, CatalogJob.STATE_FAILED, CatalogJob.STATE_CANCELLED]
+
+    @property
+    def is_periodic(self):
+        """
+        Gets a value indicating whether the job has been scheduled because the database has expired.
+        """
+        return self._is_periodic
+
+    @property
+    def job_id(self):
+        """
+        Gets the identifier of the job.
+        """
+        return self._job_id
+
+    @property
+    def kind(self):
+        """
+        Gets the kind of the job, one of the KIND_* constants.
+        """
+        return self._kind
+
+    @property
+    def progress(self):
+        """
+        Gets the progress of indexing.
+        """
+        return self._progress
+
+    @property
+    def start_time(self):
+        """
+        Gets the time the job has started, or None.
+        """
+        return self._start_time
+
+    @property
+    def state(self):
+        """
+        Gets the state of the job, one of the STATE_* constants.
+        """
+        return self._state
+
+    @property
+    def submit_time(self):
+        """
+        Gets the time the job has been submitted.
+        """
+        return self._submit_time
+
+    @property
+    def throughput(self):
+        """
+        Gets the number of files analyzed per second, or None if the job has not started.
+        """
+
+        elapsed_time = self.elapsed_time
+        if not elapsed_time:
+            return None
+
+        return self._progress.file_count / elapsed_time
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def cancel(self):
+        """
+        Requests the job to stop. A queued job is cancelled by the scheduler, a running one stops at the next directory.
+        """
+
+        self._progress.cancel()
+
+    def covers(self, kind):
+        """
+        Tells whether the job makes a job of the given kind unnecessary if it is still queued: a rebuild covers every
+        kind, a synchronization covers an upgrade as well, since it upgrades the database first.
+
+        Parameters
+        ----------
+        kind : int
+            The kind of the other job.
+
+        Returns
+        -------
+        True if a job of the given kind is not needed besides this job.
+        """
+
+        if self._kind == CatalogJob.KIND_REBUILD:
+            return True
+        if self._kind == CatalogJob.KIND_SYNC:
+            return kind in [CatalogJob.KIND_SYNC, CatalogJob.KIND_UPGRADE]
+
+        return kind == self._kind
+
+    def finish(self, state):
+
+        self._state = state
+        self._finish_time = datetime.now()
+
+    def start(self):
+
+        self._state = CatalogJob.STATE_RUNNING
+        self._start_time = datetime.now()
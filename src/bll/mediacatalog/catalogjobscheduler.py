@@ -0,0 +1,332 @@
+from collections import deque
+import logging
+import threading
+import time
+
+from bll.mediacatalog.catalogizer import Catalogizer
+from bll.mediacatalog.catalogjob import CatalogJob
+
+class CatalogJobScheduler:
+    """
+    Runs the rebuilds, synchronizations and upgrades of the media database one after the other on a background thread.
+    The jobs wait in a queue, and a request is coalesced into a queued job that covers it (for example, a second
+    synchronization requested while one is still queued is not queued again). Jobs can be cancelled; a running job
+    stops at the next directory it would scan.
+
+    If a lifetime is given, the database is rebuilt periodically: the scheduler queues a rebuild when the given number
+    of seconds has passed since the last rebuild (or, at startup, since the database was last modified).
+    """
+
+    ####################################################################################################################
+    # Private constants.
+    ####################################################################################################################
+
+    # The number of finished jobs that are remembered.
+    _MAX_FINISHED_JOB_COUNT = 20
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, catalogizer, lifetime=None, on_job_finished=None):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        catalogizer : Catalogizer
+            The Catalogizer that executes the jobs.
+        lifetime : int
+            The number of seconds after which the database is rebuilt. The database is not rebuilt periodically if it
+            is None.
+        on_job_finished : callable
+            Called with the job on the background thread when a job has finished. Optional.
+        """
+
+        ### Validate parameters.
+        if catalogizer is None:
+            raise Exception('catalogizer cannot be None.')
+        if lifetime is not None and lifetime <= 0:
+            raise Exception('lifetime must be greater than 0.')
+
+        ### Attributes from outside.
+        self._catalogizer = catalogizer
+        self._lifetime = lifetime
+        self._on_job_finished = on_job_finished
+
+        ### Private attributes.
+        # This condition is used for synchronizing the queue and the jobs, and for waking up the background thread.
+        self._condition = threading.Condition()
+        # The job being executed.
+        self._current_job = None
+        # The number of files analyzed by the last completed job of each kind as kind (int) => count (int) pairs.
+        self._file_counts = {}
+        # The most recently finished jobs, the oldest first.
+        self._finished_jobs = deque(maxlen=CatalogJobScheduler._MAX_FINISHED_JOB_COUNT)
+        # Indicates that the background thread should stop.
+        self._is_stopped = False
+        # The monotonic time of the last completed rebuild, None if the database has not been rebuilt since startup.
+        self._last_rebuild_time = None
+        # The identifier of the next job.
+        self._next_job_id = 1
+        # The jobs waiting to be executed, the first one is executed next.
+        self._queue = []
+        # The monotonic time before which a failed periodic rebuild is not retried.
+        self._retry_time = None
+        # The thread that executes the jobs.
+        self._thread = None
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def current_job(self):
+        """
+        Gets the job being executed, or None.
+        """
+        return self._current_job
+
+    @property
+    def is_busy(self):
+        """
+        Gets whether a job is being executed or queued.
+        """
+        with self._condition:
+            return self._current_job is not None or bool(self._queue)
+
+    @property
+    def jobs(self):
+        """
+        Gets the recently finished, the running and the queued jobs in this order.
+        """
+        with self._condition:
+            result = list(self._finished_jobs)
+            if self._current_job is not None:
+                result.append(self._current_job)
+            result.extend(self._queue)
+            return result
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def cancel(self, job_id):
+        """
+        Cancels the given job. A queued job is removed from the queue, a running job is requested to stop.
+
+        Parameters
+        ----------
+        job_id : int
+            The identifier of the job.
+
+        Returns
+        -------
+        True if the job is queued or running, else False.
+        """
+
+        with self._condition:
+            for job in self._queue:
+                if job.job_id == job_id:
+                    self._queue.remove(job)
+                    job.cancel()
+                    job.finish(CatalogJob.STATE_CANCELLED)
+                    self._finished_jobs.append(job)
+                    return True
+
+            if self._current_job is not None and self._current_job.job_id == job_id:
+                self._current_job.cancel()
+                return True
+
+        return False
+
+    def get_job(self, job_id):
+        """
+        Retrieves a recently finished, a running or a queued job.
+
+        Parameters
+        ----------
+        job_id : int
+            The identifier of the job.
+
+        Returns
+        -------
+        The CatalogJob or None if it is not found.
+        """
+
+        for job in self.jobs:
+            if job.job_id == job_id:
+                return job
+
+        return None
+
+    def start(self):
+        """
+        Starts executing the jobs on a background thread. Does nothing if the scheduler is already running.
+        """
+
+        if self._thread is not None:
+            return
+
+        with self._condition:
+            self._is_stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Cancels the running job and waits for the background thread to finish. The queued jobs are kept.
+        """
+
+        if self._thread is None:
+            return
+
+        with self._condition:
+            self._is_stopped = True
+            if self._current_job is not None:
+                self._current_job.cancel()
+            self._condition.notify_all()
+
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, kind):
+        """
+        Queues a job unless a queued job covers it already.
+
+        Parameters
+        ----------
+        kind : int
+            The kind of the job, one of the CatalogJob.KIND_* constants.
+
+        Returns
+        -------
+        The new CatalogJob or the queued one the request has been coalesced into.
+        """
+
+        with self._condition:
+            for job in self._queue:
+                if job.covers(kind):
+                    return job
+
+            job = self._create_job(kind)
+            self._queue.append(job)
+            self._condition.notify_all()
+
+            return job
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _create_job(self, kind, is_periodic=False):
+
+        job = CatalogJob(self._next_job_id, kind, self._file_counts.get(kind), is_periodic)
+        self._next_job_id += 1
+
+        return job
+
+    def _execute_job(self, job):
+
+        status = Catalogizer.STATUS_FAILED
+        try:
+            if job.kind == CatalogJob.KIND_REBUILD:
+                status = self._catalogizer.rebuild_database(job.progress)
+            elif job.kind == CatalogJob.KIND_SYNC:
+                status = self._catalogizer.synchronize_database(job.progress)
+            else:
+                status = self._catalogizer.upgrade_database()
+        except Exception as exception:
+            logging.error('Failed to execute media database job. %s', exception)
+
+        with self._condition:
+            self._finish_job(job, status)
+
+        if self._on_job_finished is not None:
+            try:
+                self._on_job_finished(job)
+            except Exception as exception:
+                logging.error('Failed to process finished media database job. %s', exception)
+
+    def _finish_job(self, job, status):
+
+        state = CatalogJob.STATE_FAILED
+        if status in [Catalogizer.STATUS_COMPLETED, Catalogizer.STATUS_NOT_RUNNING]:
+            state = CatalogJob.STATE_COMPLETED
+        elif status == Catalogizer.STATUS_CANCELLED:
+            state = CatalogJob.STATE_CANCELLED
+
+        job.finish(state)
+        self._current_job = None
+        self._finished_jobs.append(job)
+
+        if state == CatalogJob.STATE_COMPLETED:
+            self._file_counts[job.kind] = job.progress.file_count
+
+        if job.kind == CatalogJob.KIND_REBUILD:
+            if state == CatalogJob.STATE_COMPLETED:
+                self._last_rebuild_time = time.monotonic()
+                self._retry_time = None
+            elif job.is_periodic and self._lifetime is not None:
+                self._retry_time = time.monotonic() + self._lifetime
+
+    def _get_rebuild_delay(self):
+        """
+        Computes the number of seconds until the next periodic rebuild.
+
+        Returns
+        -------
+        The number of seconds (zero or less if the rebuild is due), or None if the database is not rebuilt
+        periodically.
+        """
+
+        if self._lifetime is None:
+            return None
+
+        now = time.monotonic()
+        if self._last_rebuild_time is not None:
+            delay = self._last_rebuild_time + self._lifetime - now
+        else:
+            database_age = self._catalogizer.database_age
+            delay = 0 if database_age is None else self._lifetime - database_age
+
+        if self._retry_time is not None:
+            delay = max(delay, self._retry_time - now)
+
+        return delay
+
+    def _run(self):
+
+        while True:
+            job = self._take_job()
+            if job is None:
+                return
+            self._execute_job(job)
+
+    def _take_job(self):
+        """
+        Waits for the next job and marks it as running. Queues a rebuild if the database has expired.
+
+        Returns
+        -------
+        The job to execute, or None if the scheduler has been stopped.
+        """
+
+        with self._condition:
+            while not self._is_stopped:
+                job = None
+                if self._queue:
+                    job = self._queue.pop(0)
+                else:
+                    delay = self._get_rebuild_delay()
+                    if delay is not None and delay <= 0:
+                        job = self._create_job(CatalogJob.KIND_REBUILD, True)
+                    else:
+                        self._condition.wait(delay)
+
+                if job is not None:
+                    job.start()
+                    self._current_job = job
+                    return job
+
+        return None
@@ -0,0 +1,196 @@
+import logging
+import os
+import threading
+import time
+
+class CatalogWatcher:
+    """
+    Keeps the media database up to date by watching the media directories. The file system events are debounced and
+    coalesced: the database is synchronized once the events stop arriving for a while (or they have been arriving for
+    too long). The synchronization itself is requested through a callback (typically queued in the CatalogJobScheduler
+    and done by the Catalogizer), so only the changed directories are enumerated again and the changes are stored by
+    the usual Collectors and Deleters.
+
+    If the directories cannot be watched (there is no event source or the limit of watches is exhausted), the watcher
+    falls back to synchronizing the database periodically.
+    """
+
+    ####################################################################################################################
+    # Private constants.
+    ####################################################################################################################
+
+    # The database is synchronized at the latest this many times the debounce delay after the first pending event.
+    _MAX_DELAY_FACTOR = 10
+    # The maximum number of seconds to wait for events at once, so stopping the watcher is noticed in time.
+    _POLL_INTERVAL = 1.0
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, synchronize, event_source, directories, debounce_delay=5, fallback_interval=3600):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        synchronize : callable
+            Called without arguments to request a synchronization of the database.
+        event_source : FileEventSource
+            The source of the file system events. The database is synchronized periodically if it is None.
+        directories : list of str
+            The directories to watch (including their subdirectories).
+        debounce_delay : float
+            The number of seconds without events to wait before synchronizing the database.
+        fallback_interval : float
+            The number of seconds between two synchronizations if the directories cannot be watched.
+        """
+
+        ### Validate parameters.
+        if synchronize is None:
+            raise Exception('synchronize cannot be None.')
+        if directories is None:
+            raise Exception('directories cannot be None.')
+        if debounce_delay <= 0:
+            raise Exception('debounce_delay must be greater than 0.')
+        if fallback_interval <= 0:
+            raise Exception('fallback_interval must be greater than 0.')
+
+        ### Attributes from outside.
+        self._synchronize = synchronize
+        self._event_source = event_source
+        self._directories = directories
+        self._debounce_delay = debounce_delay
+        self._fallback_interval = fallback_interval
+
+        ### Private attributes.
+        # Indicates whether the watcher synchronizes the database periodically instead of watching the directories.
+        self._is_fallback_active = False
+        # Indicates that the watcher should stop.
+        self._stop_event = threading.Event()
+        # The thread that watches the directories.
+        self._thread = None
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def is_fallback_active(self):
+        return self._is_fallback_active
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def start(self):
+        """
+        Starts watching the directories on a background thread. Does nothing if the watcher is already running.
+        """
+
+        if self._thread is not None:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops watching the directories and waits for the background thread to finish.
+        """
+
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _process_events(self, events):
+        """
+        Starts watching the new directories found among the events.
+
+        Returns
+        -------
+        False if a new directory cannot be watched, else True.
+        """
+
+        for path, is_directory in events:
+            if is_directory and path is not None and os.path.isdir(path):
+                if not self._watch_tree(path):
+                    return False
+
+        return True
+
+    def _run(self):
+
+        try:
+            if self._event_source is None or not self._watch_directories():
+                self._run_periodically()
+            else:
+                self._run_watching()
+        except Exception as exception:
+            logging.error('Failed to watch media directories. %s', exception)
+        finally:
+            if self._event_source is not None:
+                self._event_source.close()
+
+    def _run_periodically(self):
+
+        logging.warning('Media directories are not watched, the database is synchronized periodically.')
+        self._is_fallback_active = True
+
+        # Changes may have been missed while the watches were being set up, so synchronize immediately.
+        self._synchronize()
+        while not self._stop_event.wait(self._fallback_interval):
+            self._synchronize()
+
+    def _run_watching(self):
+
+        first_event_time = None
+        last_event_time = None
+        max_delay = self._debounce_delay * CatalogWatcher._MAX_DELAY_FACTOR
+
+        while not self._stop_event.is_set():
+
+            timeout = CatalogWatcher._POLL_INTERVAL
+            if last_event_time is not None:
+                timeout = min(timeout, max(0, last_event_time + self._debounce_delay - time.monotonic()))
+
+            events = self._event_source.read_events(timeout)
+            now = time.monotonic()
+
+            if events:
+                if not self._process_events(events):
+                    self._run_periodically()
+                    return
+                if first_event_time is None:
+                    first_event_time = now
+                last_event_time = now
+
+            if first_event_time is not None and \
+               (now - last_event_time >= self._debounce_delay or now - first_event_time >= max_delay):
+                first_event_time = None
+                last_event_time = None
+                self._synchronize()
+
+    def _watch_directories(self):
+
+        for directory in self._directories:
+            if os.path.isdir(directory) and not self._watch_tree(directory):
+                return False
+
+        return True
+
+    def _watch_tree(self, directory):
+
+        for current_directory, _, _ in os.walk(directory):
+            if not self._event_source.watch(current_directory):
+                return False
+
+        return True
@@ -0,0 +1,44 @@
+class FileEventSource:
+    """
+    Interface that describes a source of file system events. Used by the CatalogWatcher to find out when the media
+    directories change.
+    """
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def close(self):
+        """
+        Stops watching and releases the resources of the event source.
+        """
+
+    def read_events(self, timeout):
+        """
+        Waits for events and returns them.
+
+        Parameters
+        ----------
+        timeout : float
+            The maximum number of seconds to wait for events.
+
+        Returns
+        -------
+        A list of (path, is_directory) tuples, one for each entry that has been created, deleted or moved in a watched
+        directory. The path is None if events have been lost, so anything could have changed. An empty list if no
+        event has arrived before the timeout expired.
+        """
+
+    def watch(self, path):
+        """
+        Starts watching the given directory (but not its subdirectories).
+
+        Parameters
+        ----------
+        path : str
+            The directory to watch.
+
+        Returns
+        -------
+        False if the directory cannot be watched because the limit of watches is exhausted, else True.
+        """
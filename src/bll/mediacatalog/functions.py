@@ -0,0 +1,42 @@
+"""
+Common functions and utilities to be used by the media catalog.
+"""
+
+def build_path_index(id_and_path_list):
+    """
+    Builds a dictionary from the given list of files that can be used to look up the IDs by paths.
+
+    Parameters
+    ----------
+    id_and_path_list : iterable of dict
+        The files, each item is a dictionary that stores the ID and the path of the file.
+
+    Returns
+    -------
+    A dictionary that stores path (string) => id (int) pairs.
+    """
+
+    return {item['path'] : item['id'] for item in id_and_path_list}
+
+def find_removed_ids(path_index, change_journal=None):
+    """
+    Finds the files of the given index that have been removed. The index should contain only the stored files that
+    have not been seen during indexing. The unchanged files are not analyzed if a change journal is used, so they are
+    not seen either.
+
+    Parameters
+    ----------
+    path_index : dict
+        The stored files that have not been seen as path (string) => id (int) pairs.
+    change_journal : ChangeJournal
+        The change journal used during indexing. Optional.
+
+    Returns
+    -------
+    The IDs of the removed files.
+    """
+
+    if change_journal is None:
+        return list(path_index.values())
+
+    return [file_id for path, file_id in path_index.items() if not change_journal.is_file_unchanged(path)]
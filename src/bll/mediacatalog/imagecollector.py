@@ -1,6 +1,5 @@
 from dal.configuration.tags import TAG_ALBUM
 from indexing.collector import Collector
-from indexing.functions import get_filename_without_extension
 
 class ImageCollector(Collector):
     """
@@ -53,11 +52,7 @@ class ImageCollector(Collector):
 
     def _store_uncategorized(self, node):
 
-        self._image_dal.creator.insert_file(
-            self._image_dal.uncategorized_album_id,
-            0,
-            get_filename_without_extension(node.path),
-            node.path)
+        self._image_dal.creator.insert_file(self._image_dal.uncategorized_album_id, node.path)
 
     ####################################################################################################################
     # Auxiliary methods.
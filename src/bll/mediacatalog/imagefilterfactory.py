@@ -10,7 +10,7 @@ class ImageFilterFactory(PathFilterFactory):
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, image_dal, sync_only=False):
+    def __init__(self, image_dal, sync_only=False, change_journal=None):
         """
         Initializes attributes.
 
@@ -20,11 +20,19 @@ class ImageFilterFactory(PathFilterFactory):
             A reference to the image DAL.
         sync_only : boolean
             Indicates whether only synchronization is needed.
+        change_journal : ChangeJournal
+            The change journal used during indexing. Optional.
         """
 
         # Attributes from outside.
         self._image_dal = image_dal
         self._sync_only = sync_only
+        self._change_journal = change_journal
+
+        ### Private attributes.
+        # The synchronization filter. A single instance is shared by all the policies, because it has to see the files
+        # of all the directories before it can decide which files have been removed.
+        self._sync_filter = None
 
     ####################################################################################################################
     # PathFilterFactory implementation.
@@ -34,6 +42,17 @@ class ImageFilterFactory(PathFilterFactory):
 
         filters = []
         if self._sync_only:
-            filters.append(ImageSyncFilter(self._image_dal))
+            filters.append(self._get_sync_filter())
 
         return filters
+
+    ####################################################################################################################
+    # Private methods.
+    ####################################################################################################################
+
+    def _get_sync_filter(self):
+
+        if self._sync_filter is None:
+            self._sync_filter = ImageSyncFilter(self._image_dal, self._change_journal)
+
+        return self._sync_filter
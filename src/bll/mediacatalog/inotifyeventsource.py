@@ -0,0 +1,139 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+
+from bll.mediacatalog.fileeventsource import FileEventSource
+
+class InotifyEventSource(FileEventSource):
+    """
+    Reads file system events using the inotify API of Linux.
+    """
+
+    ####################################################################################################################
+    # Private constants.
+    ####################################################################################################################
+
+    # Flags of inotify_init1.
+    _IN_CLOEXEC = 0o2000000
+    # Event masks.
+    _IN_MOVED_FROM = 0x00000040
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _IN_DELETE_SELF = 0x00000400
+    _IN_MOVE_SELF = 0x00000800
+    _IN_Q_OVERFLOW = 0x00004000
+    _IN_IGNORED = 0x00008000
+    _IN_ONLYDIR = 0x01000000
+    _IN_ISDIR = 0x40000000
+    # The events to subscribe to.
+    _WATCH_MASK = \
+        _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR
+    # The format and the size of the fixed part of struct inotify_event.
+    _EVENT_FORMAT = 'iIII'
+    _EVENT_SIZE = struct.calcsize(_EVENT_FORMAT)
+    # The size of the buffer to read the events into.
+    _BUFFER_SIZE = 64 * 1024
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self):
+
+        ### Private attributes.
+        # The C library that provides the inotify functions.
+        self._libc = self._load_libc()
+        # The inotify file descriptor.
+        self._fd = self._libc.inotify_init1(InotifyEventSource._IN_CLOEXEC)
+        if self._fd < 0:
+            raise Exception('Failed to initialize inotify: {}.'.format(os.strerror(ctypes.get_errno())))
+        # Stores watched directories as watch descriptor (int) => path (string) pairs.
+        self._paths = {}
+
+    ####################################################################################################################
+    # FileEventSource implementation.
+    ####################################################################################################################
+
+    def close(self):
+
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._paths = {}
+
+    def read_events(self, timeout):
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+
+        return self._parse_events(os.read(self._fd, InotifyEventSource._BUFFER_SIZE))
+
+    def watch(self, path):
+
+        watch_descriptor = self._libc.inotify_add_watch(
+            self._fd,
+            os.fsencode(path),
+            InotifyEventSource._WATCH_MASK)
+
+        if watch_descriptor < 0:
+            error_number = ctypes.get_errno()
+            if error_number == errno.ENOSPC:
+                return False
+            # The directory has been removed (or replaced) in the meantime, there is nothing to watch.
+            if error_number in (errno.ENOENT, errno.ENOTDIR):
+                return True
+            raise Exception('Failed to watch {}: {}.'.format(path, os.strerror(error_number)))
+
+        self._paths[watch_descriptor] = path
+
+        return True
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _load_libc(self):
+
+        library_name = ctypes.util.find_library('c')
+        if library_name is None:
+            raise Exception('The C library cannot be found.')
+
+        libc = ctypes.CDLL(library_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1') or not hasattr(libc, 'inotify_add_watch'):
+            raise Exception('inotify is not supported on this platform.')
+
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        return libc
+
+    def _parse_events(self, buffer):
+
+        events = []
+        offset = 0
+
+        while offset + InotifyEventSource._EVENT_SIZE <= len(buffer):
+            watch_descriptor, mask, _, name_length = struct.unpack_from(
+                InotifyEventSource._EVENT_FORMAT,
+                buffer,
+                offset)
+            name_offset = offset + InotifyEventSource._EVENT_SIZE
+            name = buffer[name_offset : name_offset + name_length].rstrip(b'\0')
+            offset = name_offset + name_length
+
+            if mask & InotifyEventSource._IN_Q_OVERFLOW:
+                events.append((None, False))
+            elif mask & InotifyEventSource._IN_IGNORED:
+                self._paths.pop(watch_descriptor, None)
+            elif watch_descriptor in self._paths:
+                path = self._paths[watch_descriptor]
+                if name:
+                    path = os.path.join(path, os.fsdecode(name))
+                events.append((path, bool(mask & InotifyEventSource._IN_ISDIR)))
+
+        return events
@@ -0,0 +1,39 @@
+from indexing.journal.changejournalstore import ChangeJournalStore
+
+class MediaJournalStore(ChangeJournalStore):
+    """
+    Stores the change journal in the media database.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, journal_dal):
+
+        ### Validate parameters.
+        if journal_dal is None:
+            raise Exception('journal_dal cannot be None.')
+
+        ### Attributes from outside.
+        self._journal_dal = journal_dal
+
+    ####################################################################################################################
+    # ChangeJournalStore implementation.
+    ####################################################################################################################
+
+    def load(self):
+
+        return self._journal_dal.retriever.retrieve_directories()
+
+    def load_files(self, path):
+
+        return self._journal_dal.retriever.retrieve_files(path)
+
+    def save(self, changed_records, removed_paths):
+
+        # Write all the changes in a single transaction.
+        with self._journal_dal.db_context.get_connection_provider():
+            self._journal_dal.deleter.delete_directories(list(changed_records.keys()) + removed_paths)
+            self._journal_dal.creator.insert_directories(
+                [(path, record.mtime, record.files) for path, record in changed_records.items()])
@@ -37,9 +37,14 @@ class VideoCollector(Collector):
             if node.token == 'video':
                 self._store_categorized_video(node)
 
-        for node in categorized_nodes:
-            if node.token == 'subtitle':
-                self._store_categorized_subtitle(node)
+        subtitle_nodes = [node for node in categorized_nodes if node.token == 'subtitle']
+        if not subtitle_nodes:
+            return
+
+        # Subtitles are looked up by their video files, so those must be written into the database first.
+        self._video_dal.creator.flush()
+        for node in subtitle_nodes:
+            self._store_categorized_subtitle(node)
 
     def collect_uncategorized(self, uncategorized_nodes):
 
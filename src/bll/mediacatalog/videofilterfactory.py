@@ -11,7 +11,7 @@ class VideoFilterFactory(PathFilterFactory):
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, video_dal, ignore_revisions=False, sync_only=False):
+    def __init__(self, video_dal, ignore_revisions=False, sync_only=False, change_journal=None):
         """
         Initializes attributes.
 
@@ -23,6 +23,8 @@ class VideoFilterFactory(PathFilterFactory):
             Sets whether to ignore revisions.
         sync_only : boolean
             Indicates whether only synchronization is needed.
+        change_journal : ChangeJournal
+            The change journal used during indexing. Optional.
         """
 
         ### Validate parameters.
@@ -33,6 +35,12 @@ class VideoFilterFactory(PathFilterFactory):
         self._video_dal = video_dal
         self._ignore_revisions = ignore_revisions
         self._sync_only = sync_only
+        self._change_journal = change_journal
+
+        ### Private attributes.
+        # The synchronization filter. A single instance is shared by all the policies, because it has to see the files
+        # of all the directories before it can decide which files have been removed.
+        self._sync_filter = None
 
     ####################################################################################################################
     # PathFilterFactory implementation.
@@ -44,6 +52,17 @@ class VideoFilterFactory(PathFilterFactory):
         if self._ignore_revisions:
             filters.append(RevisionFilter())
         if self._sync_only:
-            filters.append(VideoSyncFilter(self._video_dal))
+            filters.append(self._get_sync_filter())
 
         return filters
+
+    ####################################################################################################################
+    # Private methods.
+    ####################################################################################################################
+
+    def _get_sync_filter(self):
+
+        if self._sync_filter is None:
+            self._sync_filter = VideoSyncFilter(self._video_dal, self._change_journal)
+
+        return self._sync_filter
@@ -1,3 +1,6 @@
+import threading
+
+from bll.mediacatalog.functions import build_path_index, find_removed_ids
 from indexing.filters.pathfilter import PathFilter
 
 class VideoSyncFilter(PathFilter):
@@ -5,13 +8,27 @@ class VideoSyncFilter(PathFilter):
     This filter makes it possible to do an incremental synchronization instead of a full rebuild. It ignores already
     exisiting paths from the analyzation process and gathers removed files, then invokes the appropriate DAL operations
     to apply the changes.
+
+    The stored paths are loaded only when they are needed first. If a change journal is used, the files found unchanged
+    by the journal are not considered removed (they are not analyzed at all), and nothing is loaded if every directory
+    has been found unchanged.
     """
 
     ####################################################################################################################
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, video_dal):
+    def __init__(self, video_dal, change_journal=None):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        video_dal : VideoDataHandler
+            A reference to the video DAL.
+        change_journal : ChangeJournal
+            The change journal used during indexing. Optional.
+        """
 
         ### Validate parameters.
         if video_dal is None:
@@ -19,12 +36,17 @@ class VideoSyncFilter(PathFilter):
 
         ### Attributes from outside.
         self._video_dal = video_dal
+        self._change_journal = change_journal
 
         ### Private attributes.
-        # A list of dictionaries storing subtitle file paths as id (int) => path (string) pairs.
-        self._stored_subtitle_paths = []
-        # A list of dictionaries storing video file paths as id (int) => path (string) pairs.
-        self._stored_video_paths = []
+        # Indicates whether the filter is initialized.
+        self._is_initialized = False
+        # This lock is used to load the stored paths only once, even if the filter is applied by multiple threads.
+        self._lock = threading.Lock()
+        # Stores subtitle file paths as path (string) => id (int) pairs. None if they have not been loaded yet.
+        self._stored_subtitle_paths = None
+        # Stores video file paths as path (string) => id (int) pairs. None if they have not been loaded yet.
+        self._stored_video_paths = None
 
     ####################################################################################################################
     # PathFilter implementation.
@@ -32,39 +54,65 @@ class VideoSyncFilter(PathFilter):
 
     def apply_filter(self, path):
 
-        if self._remove_path_from_dictionary(self._stored_subtitle_paths, path):
+        stored_video_paths, stored_subtitle_paths = self._get_stored_paths()
+
+        if stored_subtitle_paths.pop(path, None) is not None:
             return True
-        if self._remove_path_from_dictionary(self._stored_video_paths, path):
+        if stored_video_paths.pop(path, None) is not None:
             return True
 
         return False
 
     def clean_filter(self):
 
-        for id_and_path in self._stored_video_paths:
-            self._video_dal.deleter.delete_video_path(id_and_path['id'])
-        for id_and_path in self._stored_subtitle_paths:
-            self._video_dal.deleter.delete_subtitle_path(id_and_path['id'])
+        # The filter is shared by multiple analyzers, clean it only once.
+        if not self._is_initialized:
+            return
+        self._is_initialized = False
+
+        # Nothing has been removed if every directory has been found unchanged.
+        if self._stored_video_paths is None and self._change_journal is not None \
+           and not self._change_journal.has_changes:
+            return
+
+        stored_video_paths, stored_subtitle_paths = self._get_stored_paths()
+        self._video_dal.deleter.delete_video_paths(find_removed_ids(stored_video_paths, self._change_journal))
+        self._video_dal.deleter.delete_subtitle_paths(find_removed_ids(stored_subtitle_paths, self._change_journal))
+
+        self._stored_subtitle_paths = None
+        self._stored_video_paths = None
 
     def init_filter(self):
 
-        self._stored_video_paths = self._video_dal.retriever.retrieve_video_paths()
-        self._stored_subtitle_paths = self._video_dal.retriever.retrieve_subtitle_paths()
+        # The filter is shared by multiple analyzers, initialize it only once.
+        if self._is_initialized:
+            return
+        self._is_initialized = True
+
+        # The stored paths are loaded when they are needed first.
+        self._stored_subtitle_paths = None
+        self._stored_video_paths = None
 
     def leave_scope(self):
 
         pass
 
     ####################################################################################################################
-    # Private methods.
+    # Auxiliary methods.
     ####################################################################################################################
 
-    def _remove_path_from_dictionary(self, path_list, path):
+    def _get_stored_paths(self):
+        """
+        Loads the stored paths if they have not been loaded yet.
 
-        # pylint: disable=consider-using-enumerate
-        for i in range(0, len(path_list)):
-            if path == path_list[i]['path']:
-                del path_list[i]
-                return True
+        Returns
+        -------
+        A (video paths, subtitle paths) tuple.
+        """
 
-        return False
+        with self._lock:
+            if self._stored_video_paths is None:
+                self._stored_video_paths = build_path_index(self._video_dal.retriever.iterate_video_paths())
+                self._stored_subtitle_paths = build_path_index(self._video_dal.retriever.iterate_subtitle_paths())
+
+            return self._stored_video_paths, self._stored_subtitle_paths
@@ -1,5 +1,3 @@
-import threading
-
 from dal.cache import Cache
 
 class AudioDataCache(Cache):
@@ -8,41 +6,33 @@ class AudioDataCache(Cache):
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self):
+    def __init__(self, max_size=None):
+
+        ### Call base class constructor.
+        super(AudioDataCache, self).__init__(max_size)
 
         ### Private attributes.
         # A cache that contains albums as album (string) => id (int) pairs.
-        self._album_cache = {}
-        # This lock is used for album cache synchronization.
-        self._album_cache_lock = threading.Lock()
+        self._album_cache = self._create_cache('audio albums')
         # A cache that contains artist IDs as artist (string) => id (int) pairs.
-        self._artist_cache = {}
-        # This lock is used for artist cache synchronization.
-        self._artist_cache_lock = threading.Lock()
+        self._artist_cache = self._create_cache('audio artists')
 
     ####################################################################################################################
     # Public methods.
     ####################################################################################################################
 
-    def clear(self):
-
-        with self._artist_cache_lock:
-            self._artist_cache = {}
-        with self._album_cache_lock:
-            self._album_cache = {}
-
     def get_album_id(self, album):
 
-        return self._get_value_from_simple_cache(self._album_cache, self._album_cache_lock, album)
+        return self._album_cache.get(album)
 
     def get_artist_id(self, artist):
 
-        return self._get_value_from_simple_cache(self._artist_cache, self._artist_cache_lock, artist)
+        return self._artist_cache.get(artist)
 
     def set_album_id(self, album, album_id):
 
-        self._store_item_in_simple_cache(self._album_cache, self._album_cache_lock, album, album_id)
+        self._album_cache.set(album, album_id)
 
     def set_artist_id(self, artist, artist_id):
 
-        self._store_item_in_simple_cache(self._artist_cache, self._artist_cache_lock, artist, artist_id)
+        self._artist_cache.set(artist, artist_id)
@@ -1,8 +1,25 @@
 from dal.constants import DAL_UNCATEGORIZED
 from dal.creator import Creator
+from dal.functions import build_search_index_statements
 
 class AudioDataCreator(Creator):
 
+    ####################################################################################################################
+    # Static attributes.
+    ####################################################################################################################
+
+    SCHEMA_MIGRATIONS = [
+        # Version 1: indices for the lookups, listings and deletions.
+        [
+            'CREATE INDEX IF NOT EXISTS audio_artist_artist ON audio_artist(artist)',
+            'CREATE INDEX IF NOT EXISTS audio_album_artist_album ON audio_album(id_artist, album)',
+            'CREATE INDEX IF NOT EXISTS audio_album_album ON audio_album(album)',
+            'CREATE INDEX IF NOT EXISTS audio_file_album_number ON audio_file(id_album, number)']]
+    SCHEMA_NAME = 'audio'
+    SEARCH_SCHEMA_MIGRATIONS = [
+        # Version 1: full-text indices of the albums and the tracks.
+        build_search_index_statements('audio_album', 'album') + build_search_index_statements('audio_file', 'title')]
+
     ####################################################################################################################
     # Public methods -- create.
     ####################################################################################################################
@@ -35,6 +52,9 @@ class AudioDataCreator(Creator):
                 'path VARCHAR(1024),'
                 'FOREIGN KEY(id_album) REFERENCES audio_album(id))')
 
+        # Create indices.
+        self.upgrade_db()
+
         # Fill DB with initial data.
         self._inflate_db()
 
@@ -136,6 +156,13 @@ class AudioDataCreator(Creator):
         The ID of the inserted file.
         """
 
+        # Buffer the file if bulk insert is in progress.
+        if self._bulk_insert_buffer is not None:
+            return self._bulk_insert_buffer.add(
+                'audio_file',
+                ('id_album', 'number', 'title', 'path'),
+                (album_id, number, title, path))
+
         # Connect to the database.
         with self._db_context.get_connection_provider() as connection:
             cursor = connection.cursor
@@ -145,6 +172,7 @@ class AudioDataCreator(Creator):
                 'INSERT INTO audio_file (id_album, number, title, path) VALUES (?, ?, ?, ?)',
                 (album_id, number, title, path))
             path_id = cursor.lastrowid
+            self._count_inserted_rows(cursor.rowcount)
 
             # Commit.
             connection.commit()
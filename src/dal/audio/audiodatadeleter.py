@@ -51,3 +51,54 @@ class AudioDataDeleter(Deleter):
 
             # Commit.
             connection.commit()
+
+    def delete_paths(self, file_ids):
+        """
+        Deletes the given tracks and the albums and artists that are left without tracks in a single transaction.
+
+        Parameters
+        ----------
+        file_ids : list of int
+            The IDs of the tracks.
+        """
+
+        if not file_ids:
+            return
+
+        # Connect to the database.
+        with self._db_context.get_connection_provider() as connection:
+            cursor = connection.cursor
+            self._begin_bulk_delete(cursor)
+
+            # Collect the tracks and their albums, then delete the tracks.
+            self._insert_deleted_ids(cursor, 'file', file_ids)
+            self._insert_deleted_ids(
+                cursor,
+                'album',
+                query='SELECT id_album AS id FROM audio_file '
+                'WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'file\')')
+            cursor.execute('DELETE FROM audio_file WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'file\')')
+
+            # Delete the albums that are left without tracks, then the artists that are left without albums.
+            self._insert_deleted_ids(
+                cursor,
+                'empty_album',
+                query='SELECT a.id '
+                'FROM audio_album AS a '
+                'WHERE a.id IN (SELECT id FROM temp.deleted_id WHERE kind=\'album\') '
+                'AND NOT EXISTS (SELECT 1 FROM audio_file AS f WHERE f.id_album=a.id)')
+            self._insert_deleted_ids(
+                cursor,
+                'artist',
+                query='SELECT id_artist AS id FROM audio_album '
+                'WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'empty_album\')')
+            cursor.execute(
+                'DELETE FROM audio_album WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'empty_album\')')
+            cursor.execute(
+                'DELETE FROM audio_artist '
+                'WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'artist\') '
+                'AND NOT EXISTS (SELECT 1 FROM audio_album AS a WHERE a.id_artist=audio_artist.id)')
+
+            # Commit.
+            self._clear_deleted_ids(cursor)
+            connection.commit()
@@ -7,6 +7,23 @@ class AudioDataRetriever(Retriever):
     # Public methods.
     ####################################################################################################################
 
+    def preload_cache(self):
+        """
+        Loads the IDs of the artists and the albums into the cache.
+
+        Returns
+        -------
+        The number of loaded entries.
+        """
+
+        return self._preload_cache([
+            (
+                'SELECT artist, MIN(id) FROM audio_artist GROUP BY artist LIMIT ?',
+                self._cache.set_artist_id),
+            (
+                'SELECT album, MIN(id) FROM audio_album GROUP BY album LIMIT ?',
+                self._cache.set_album_id)])
+
     def retrieve_album_id(self, album):
 
         album_id = self._cache.get_album_id(album)
@@ -16,21 +33,16 @@ class AudioDataRetriever(Retriever):
 
         return album_id
 
-    def retrieve_albums(self, artist_id=None):
+    def retrieve_albums(self, artist_id=None, page_request=None):
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Get table contents.
-            where_clause = ''
             query_parameters = {}
-            if artist_id is not None:
-                where_clause = 'WHERE id_artist=:id_artist '
-                query_parameters = {'id_artist' : artist_id}
-            cursor.execute('SELECT id, album FROM audio_album ' + where_clause + 'ORDER BY album', query_parameters)
-
-            result = build_result_dictionary(cursor, ['id', 'album'])
+            query_parts = self._build_album_query_parts(artist_id, query_parameters)
+            result = self._execute_page_query(cursor, query_parts, query_parameters, page_request)
 
             return result
 
@@ -48,7 +60,7 @@ class AudioDataRetriever(Retriever):
     def retrieve_artists(self):
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Get table contents.
@@ -71,32 +83,77 @@ class AudioDataRetriever(Retriever):
 
     def retrieve_paths(self):
 
+        return list(self.iterate_paths())
+
+    def retrieve_tracks(self, album_id=None, page_request=None):
+
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
-            # Build and execute the query.
-            cursor.execute('SELECT id, path FROM audio_file')
-            result = build_result_dictionary(cursor, ['id', 'path'])
+            # Get table contents.
+            query_parameters = {}
+            query_parts = self._build_track_query_parts(album_id, query_parameters)
+            result = self._execute_page_query(cursor, query_parts, query_parameters, page_request)
 
             return result
 
-    def retrieve_tracks(self, album_id=None):
+    def search_albums(self, text):
 
-        # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
-            cursor = connection.cursor
+        return self._search('audio_album', ['id', 'album'], 'album', text)
 
-            # Get table contents.
-            where_clause = ''
-            query_parameters = {}
-            if album_id is not None:
-                where_clause = 'WHERE id_album=:id_album '
-                query_parameters = {'id_album' : album_id}
-            cursor.execute(
-                'SELECT id, number, title FROM audio_file ' + where_clause + 'ORDER BY id_album, number',
-                query_parameters)
+    def search_tracks(self, text):
 
-            result = build_result_dictionary(cursor, ['id', 'number', 'title'])
+        return self._search('audio_file', ['id', 'number', 'title'], 'title', text)
 
-            return result
+    ####################################################################################################################
+    # Public methods -- iteration.
+    ####################################################################################################################
+
+    def iterate_albums(self, artist_id=None, page_request=None):
+
+        query_parameters = {}
+        query_parts = self._build_album_query_parts(artist_id, query_parameters)
+
+        return self._iterate_listing(query_parts, query_parameters, page_request)
+
+    def iterate_paths(self):
+
+        return self._iterate_paths('audio_file')
+
+    def iterate_tracks(self, album_id=None, page_request=None):
+
+        query_parameters = {}
+        query_parts = self._build_track_query_parts(album_id, query_parameters)
+
+        return self._iterate_listing(query_parts, query_parameters, page_request)
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _build_album_query_parts(self, artist_id, query_parameters):
+
+        where_clause = ''
+        if artist_id is not None:
+            where_clause = 'WHERE id_artist=:id_artist '
+            query_parameters['id_artist'] = artist_id
+
+        return {
+            'columns' : [('id', 'id'), ('album', 'album')],
+            'sort_columns' : ['album', 'id'],
+            'from' : 'FROM audio_album ',
+            'where' : where_clause}
+
+    def _build_track_query_parts(self, album_id, query_parameters):
+
+        where_clause = ''
+        if album_id is not None:
+            where_clause = 'WHERE id_album=:id_album '
+            query_parameters['id_album'] = album_id
+
+        return {
+            'columns' : [('id', 'id'), ('number', 'number'), ('title', 'title')],
+            'sort_columns' : ['id_album', 'number', 'id'],
+            'from' : 'FROM audio_file ',
+            'where' : where_clause}
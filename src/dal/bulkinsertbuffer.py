@@ -0,0 +1,151 @@
+class BulkInsertBuffer:
+    """
+    Collects rows to insert and writes them into the database in batches using executemany, each batch in a single
+    transaction. IDs are assigned to the rows in advance (continuing from the largest ID in the table), so callers can
+    use the ID of a buffered row before it is written.
+
+    Rows of tables with a unique key (like mappings) can be deduplicated: such a row is buffered only the first time it
+    is added, and it is not written if it is already stored.
+
+    The buffer assumes that nobody else inserts into the affected tables while it is in use.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, db_context, batch_size, on_flush=None):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        db_context : DbContext
+            The database context to work with.
+        batch_size : int
+            The number of rows to collect before writing them into the database.
+        on_flush : callable
+            Called with the number of written rows after each batch. Optional.
+        """
+
+        ### Validate parameters.
+        if db_context is None:
+            raise Exception('db_context cannot be None.')
+        if batch_size < 1:
+            raise Exception('batch_size must be greater than or equal to 1.')
+
+        ### Attributes from outside.
+        self._db_context = db_context
+        self._batch_size = batch_size
+        self._on_flush = on_flush
+
+        ### Private attributes.
+        # The next free ID for each table.
+        self._next_ids = {}
+        # The number of rows waiting to be written.
+        self._row_count = 0
+        # The rows waiting to be written grouped by (table, columns).
+        self._rows = {}
+        # The values of the deduplicated rows added so far for each table.
+        self._seen_values = {}
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def row_count(self):
+        return self._row_count
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def add(self, table, columns, values, ignore_duplicates=False):
+        """
+        Adds a row to the buffer and writes the buffer into the database if it is full.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table.
+        columns : tuple of str
+            The names of the columns (without the ID).
+        values : tuple of object
+            The values of the columns.
+        ignore_duplicates : bool
+            Indicates whether the row should be skipped if the same values have already been added to or stored in the
+            table. The values have to form a unique key of the table.
+
+        Returns
+        -------
+        The ID of the new row, or None if it is a duplicate that has already been added.
+        """
+
+        if ignore_duplicates:
+            if table not in self._seen_values:
+                self._seen_values[table] = set()
+            if values in self._seen_values[table]:
+                return None
+            self._seen_values[table].add(values)
+
+        row_id = self._allocate_id(table)
+
+        key = (table, columns)
+        if key not in self._rows:
+            self._rows[key] = []
+        self._rows[key].append((row_id,) + values)
+        self._row_count = self._row_count + 1
+
+        if self._row_count >= self._batch_size:
+            self.flush()
+
+        return row_id
+
+    def flush(self):
+        """
+        Writes the buffered rows into the database and commits the transaction.
+        """
+
+        if self._row_count == 0:
+            return
+
+        # Connect to the database.
+        with self._db_context.get_connection_provider() as connection:
+            cursor = connection.cursor
+
+            # Insert rows.
+            for (table, columns), rows in self._rows.items():
+                query = 'INSERT {}INTO {} (id, {}) VALUES ({})'.format(
+                    'OR IGNORE ' if table in self._seen_values else '',
+                    table,
+                    ', '.join(columns),
+                    ', '.join('?' * (len(columns) + 1)))
+                cursor.executemany(query, rows)
+
+            # Commit.
+            connection.commit(True)
+
+        if self._on_flush is not None:
+            self._on_flush(self._row_count)
+
+        self._rows = {}
+        self._row_count = 0
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _allocate_id(self, table):
+
+        if table not in self._next_ids:
+            with self._db_context.get_connection_provider() as connection:
+                cursor = connection.cursor
+                cursor.execute('SELECT MAX(id) FROM {}'.format(table))
+                max_id = cursor.fetchone()[0]
+                self._next_ids[table] = 1 if max_id is None else max_id + 1
+
+        row_id = self._next_ids[table]
+        self._next_ids[table] = row_id + 1
+
+        return row_id
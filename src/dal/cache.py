@@ -1,15 +1,73 @@
+from dal.lrucache import LruCache
+
 class Cache:
+    """
+    Base class of the caches of the data handlers. It consists of named bounded caches the usage statistics of which
+    can be queried together.
+    """
+
+    ####################################################################################################################
+    # Static attributes.
+    ####################################################################################################################
+
+    # The default maximum number of items stored in each cache.
+    DEFAULT_MAX_SIZE = 10000
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, max_size=None):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        max_size : int
+            The maximum number of items stored in each cache. DEFAULT_MAX_SIZE if None.
+        """
+
+        ### Attributes from outside.
+        self._max_size = max_size if max_size is not None else Cache.DEFAULT_MAX_SIZE
+
+        ### Private attributes.
+        # The bounded caches as name (string) => cache (LruCache) pairs.
+        self._caches = {}
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def max_size(self):
+        """
+        Gets the maximum number of items stored in each cache.
+        """
+        return self._max_size
+
+    @property
+    def metrics(self):
+        """
+        Gets the usage statistics of the caches as name (string) => metrics (CacheMetrics) pairs.
+        """
+        return {name: cache.metrics for name, cache in self._caches.items()}
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def clear(self):
 
-    def _get_value_from_simple_cache(self, cache, lock, key):
+        for cache in self._caches.values():
+            cache.clear()
 
-        with lock:
-            if key in cache:
-                return cache[key]
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
 
-        return None
+    def _create_cache(self, name, on_evict=None):
 
-    def _store_item_in_simple_cache(self, cache, lock, key, value):
+        cache = LruCache(self._max_size, on_evict)
+        self._caches[name] = cache
 
-        if key is not None:
-            with lock:
-                cache[key] = value
+        return cache
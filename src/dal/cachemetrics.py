@@ -0,0 +1,66 @@
+class CacheMetrics:
+    """
+    Stores a snapshot of the usage statistics of a cache.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, size, max_size, hit_count, miss_count, eviction_count):
+
+        ### Attributes from outside.
+        self._size = size
+        self._max_size = max_size
+        self._hit_count = hit_count
+        self._miss_count = miss_count
+        self._eviction_count = eviction_count
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def eviction_count(self):
+        """
+        Gets the number of items evicted because the cache was full.
+        """
+        return self._eviction_count
+
+    @property
+    def hit_count(self):
+        """
+        Gets the number of lookups that have found an item.
+        """
+        return self._hit_count
+
+    @property
+    def hit_rate(self):
+        """
+        Gets the ratio of the lookups that have found an item, or None if there has not been any lookup.
+        """
+        lookup_count = self._hit_count + self._miss_count
+        if lookup_count == 0:
+            return None
+        return self._hit_count / lookup_count
+
+    @property
+    def max_size(self):
+        """
+        Gets the maximum number of items stored.
+        """
+        return self._max_size
+
+    @property
+    def miss_count(self):
+        """
+        Gets the number of lookups that have not found an item.
+        """
+        return self._miss_count
+
+    @property
+    def size(self):
+        """
+        Gets the number of items stored.
+        """
+        return self._size
@@ -34,9 +34,21 @@ class Config:
         Generates a sample configuration.
         """
 
+        self.database.batch_size = 1000
         self.database.lifetime = 604800
         self.database.path_media = '../data/media.db'
         self.database.path_playlist = '../data/playlist.db'
+        self.database.preload_caches = True
+        self.database.tuning.busy_timeout = 5000
+        self.database.tuning.cache_size = -16384
+        self.database.tuning.journal_mode = 'WAL'
+        self.database.tuning.mmap_size = 268435456
+        self.database.tuning.pool_idle_timeout = 300
+        self.database.tuning.pool_timeout = 30
+        self.database.tuning.read_pool_size = 4
+        self.database.tuning.synchronous = 'NORMAL'
+        self.database.tuning.temp_store = 'MEMORY'
+        self.database.tuning.write_pool_size = 4
         self.indexing.audio.rules = [IndexerRuleConfig()]
         self.indexing.audio.rules[0].directory = '/mnt/hdd/Audio'
         self.indexing.audio.rules[0].extensions = ['.flac', '.mp3', '.ogg', '.wav']
@@ -51,6 +63,9 @@ class Config:
         self.indexing.image.rules[0].pattern = '{}/{}'.format(
             get_complete_tag(TAG_ALBUM),
             get_complete_tag(TAG_TITLE))
+        self.indexing.pool_size = 1
+        self.indexing.relative_matching = False
+        self.indexing.timing = False
         self.indexing.video.ignore_revisions = False
         self.indexing.video.subtitle_rules = [IndexerRuleConfig()]
         self.indexing.video.subtitle_rules[0].directory = '/mnt/hdd/Video'
@@ -71,6 +86,9 @@ class Config:
             get_complete_tag(TAG_LANGUAGES),
             get_complete_tag(TAG_ANY),
             get_complete_tag(TAG_EPISODE_TITLE))
+        self.indexing.watcher.debounce_delay = 5
+        self.indexing.watcher.enabled = False
+        self.indexing.watcher.fallback_interval = 3600
         self.logging.enabled = True
         self.logging.level = 'error'
         self.logging.max_size_bytes = 524288
@@ -93,9 +111,35 @@ class DatabaseConfig:
     def __init__(self):
 
         ### Public attributes.
+        self.batch_size = 1000
         self.lifetime = 604800
         self.path_media = None
         self.path_playlist = None
+        self.preload_caches = True
+        self.tuning = DatabaseTuningConfig()
+
+class DatabaseTuningConfig:
+    """
+    Stores the settings of the database connections.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self):
+
+        ### Public attributes.
+        self.busy_timeout = 5000
+        self.cache_size = -16384
+        self.journal_mode = 'WAL'
+        self.mmap_size = 268435456
+        self.pool_idle_timeout = 300
+        self.pool_timeout = 30
+        self.read_pool_size = 4
+        self.synchronous = 'NORMAL'
+        self.temp_store = 'MEMORY'
+        self.write_pool_size = 4
 
 class IndexerRuleConfig:
     """
@@ -141,7 +185,13 @@ class IndexingConfig:
         ### Public attributes.
         self.audio = IndexingAudioConfig()
         self.image = IndexingImageConfig()
+        self.pool_size = 1
+        # Matching the patterns against the paths relative to the directories of the rules is faster in deep
+        # directories, but the patterns cannot match the components of the directories of the rules then.
+        self.relative_matching = False
+        self.timing = False
         self.video = IndexingVideoConfig()
+        self.watcher = IndexingWatcherConfig()
 
 class IndexingImageConfig:
     """
@@ -173,6 +223,22 @@ class IndexingVideoConfig:
         self.subtitle_rules = []
         self.video_rules = []
 
+class IndexingWatcherConfig:
+    """
+    Stores settings related to watching the media directories.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self):
+
+        ### Public attributes.
+        self.debounce_delay = 5
+        self.enabled = False
+        self.fallback_interval = 3600
+
 class LoggingConfig:
     """
     Stores logging configuration.
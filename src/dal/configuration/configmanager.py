@@ -99,9 +99,22 @@ class ConfigManager:
 
         # Database.
         json_config['database'] = {}
+        json_config['database']['batch_size'] = config.database.batch_size
         json_config['database']['lifetime'] = config.database.lifetime
         json_config['database']['path_media'] = config.database.path_media
         json_config['database']['path_playlist'] = config.database.path_playlist
+        json_config['database']['preload_caches'] = config.database.preload_caches
+        json_config['database']['tuning'] = {}
+        json_config['database']['tuning']['busy_timeout'] = config.database.tuning.busy_timeout
+        json_config['database']['tuning']['cache_size'] = config.database.tuning.cache_size
+        json_config['database']['tuning']['journal_mode'] = config.database.tuning.journal_mode
+        json_config['database']['tuning']['mmap_size'] = config.database.tuning.mmap_size
+        json_config['database']['tuning']['pool_idle_timeout'] = config.database.tuning.pool_idle_timeout
+        json_config['database']['tuning']['pool_timeout'] = config.database.tuning.pool_timeout
+        json_config['database']['tuning']['read_pool_size'] = config.database.tuning.read_pool_size
+        json_config['database']['tuning']['synchronous'] = config.database.tuning.synchronous
+        json_config['database']['tuning']['temp_store'] = config.database.tuning.temp_store
+        json_config['database']['tuning']['write_pool_size'] = config.database.tuning.write_pool_size
 
         # Indexing.
         json_config['indexing'] = {}
@@ -112,6 +125,10 @@ class ConfigManager:
         json_config['indexing']['image'] = {}
         json_config['indexing']['image']['rules'] = ConfigManager._create_json_rules(config.indexing.image.rules)
 
+        json_config['indexing']['pool_size'] = config.indexing.pool_size
+        json_config['indexing']['relative_matching'] = config.indexing.relative_matching
+        json_config['indexing']['timing'] = config.indexing.timing
+
         json_config['indexing']['video'] = {}
         json_config['indexing']['video']['ignore_revisions'] = config.indexing.video.ignore_revisions
         json_config['indexing']['video']['subtitle_rules'] = ConfigManager._create_json_rules(
@@ -119,6 +136,11 @@ class ConfigManager:
         json_config['indexing']['video']['video_rules'] = ConfigManager._create_json_rules(
             config.indexing.video.video_rules)
 
+        json_config['indexing']['watcher'] = {}
+        json_config['indexing']['watcher']['debounce_delay'] = config.indexing.watcher.debounce_delay
+        json_config['indexing']['watcher']['enabled'] = config.indexing.watcher.enabled
+        json_config['indexing']['watcher']['fallback_interval'] = config.indexing.watcher.fallback_interval
+
         # Logging.
         json_config['logging'] = {}
         json_config['logging']['enabled'] = config.logging.enabled
@@ -186,10 +208,37 @@ class ConfigManager:
         config.database.lifetime = json_config['database']['lifetime']
         config.database.path_media = json_config['database']['path_media']
         config.database.path_playlist = json_config['database']['path_playlist']
+        if 'batch_size' in json_config['database']:
+            config.database.batch_size = json_config['database']['batch_size']
+        if 'preload_caches' in json_config['database']:
+            config.database.preload_caches = json_config['database']['preload_caches']
+        if 'tuning' in json_config['database']:
+            config.database.tuning.busy_timeout = json_config['database']['tuning']['busy_timeout']
+            config.database.tuning.cache_size = json_config['database']['tuning']['cache_size']
+            config.database.tuning.journal_mode = json_config['database']['tuning']['journal_mode']
+            config.database.tuning.mmap_size = json_config['database']['tuning']['mmap_size']
+            config.database.tuning.pool_idle_timeout = json_config['database']['tuning']['pool_idle_timeout']
+            config.database.tuning.pool_timeout = json_config['database']['tuning']['pool_timeout']
+            config.database.tuning.read_pool_size = json_config['database']['tuning']['read_pool_size']
+            config.database.tuning.synchronous = json_config['database']['tuning']['synchronous']
+            config.database.tuning.temp_store = json_config['database']['tuning']['temp_store']
+            config.database.tuning.write_pool_size = json_config['database']['tuning']['write_pool_size']
 
         # Indexing.
         if 'indexing' in json_config:
 
+            if 'pool_size' in json_config['indexing']:
+
+                config.indexing.pool_size = json_config['indexing']['pool_size']
+
+            if 'relative_matching' in json_config['indexing']:
+
+                config.indexing.relative_matching = json_config['indexing']['relative_matching']
+
+            if 'timing' in json_config['indexing']:
+
+                config.indexing.timing = json_config['indexing']['timing']
+
             if 'audio' in json_config['indexing']:
 
                 config.indexing.audio.rules = ConfigManager._parse_json_rules(json_config['indexing']['audio']['rules'])
@@ -212,6 +261,12 @@ class ConfigManager:
 
                 ConfigManager.categories.append('video')
 
+            if 'watcher' in json_config['indexing']:
+
+                config.indexing.watcher.debounce_delay = json_config['indexing']['watcher']['debounce_delay']
+                config.indexing.watcher.enabled = json_config['indexing']['watcher']['enabled']
+                config.indexing.watcher.fallback_interval = json_config['indexing']['watcher']['fallback_interval']
+
         # Logging.
         if 'logging' in json_config:
 
@@ -1,13 +1,24 @@
 import os
 import sqlite3
+import threading
+import time
+
+from dal.context.dbsettings import DbSettings
 
 class DbConnection:
 
+    ####################################################################################################################
+    # Private constants.
+    ####################################################################################################################
+
+    # Stores the commit callback of each thread.
+    _THREAD_STATE = threading.local()
+
     ####################################################################################################################
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, database_path):
+    def __init__(self, database_path, settings=None, read_only=False):
 
         ### Validate parameters.
         if database_path is None:
@@ -15,9 +26,13 @@ class DbConnection:
 
         ### Attributes from outside.
         self._database_path = database_path
+        self._settings = settings if settings is not None else DbSettings()
+        self._read_only = read_only
 
         ### Private attributes.
         self._connection = None
+        # The device and inode of the database file the connection has been opened to.
+        self._file_id = None
         self._is_commit_needed = False
         self._transaction_depth = 0
 
@@ -31,36 +46,101 @@ class DbConnection:
             return None
         return self._connection.cursor()
 
+    @property
+    def is_connected(self):
+        return self._transaction_depth > 0
+
+    @property
+    def read_only(self):
+        return self._read_only
+
     ####################################################################################################################
     # Public methods.
     ####################################################################################################################
 
-    def close(self):
+    def check_health(self):
+        """
+        Checks whether the open connection is usable and still refers to the file at the database path (it does not if
+        the file has been deleted or replaced since the connection has been opened).
+
+        Returns
+        -------
+        True if the connection is closed or can be used, otherwise False.
+        """
+
+        if self._connection is None:
+            return True
+
+        try:
+            self._connection.execute('SELECT 1').fetchone()
+        except sqlite3.Error:
+            return False
+
+        return self._get_file_id() == self._file_id
+
+    def close(self, keep_open=False, roll_back=False):
+        """
+        Ends a level of the transaction. At the outermost level, the requested commit is executed, unless the
+        transaction has to be rolled back; otherwise the uncommitted changes are discarded, so a pooled connection kept
+        open does not carry them over to the next thread that borrows it.
+
+        Parameters
+        ----------
+        keep_open : bool
+            Indicates whether the connection is kept open for reuse.
+        roll_back : bool
+            Indicates whether the changes have to be discarded even if a commit has been requested (e.g. because of an
+            exception).
+
+        Returns
+        -------
+        True if the outermost level has been ended, otherwise False.
+        """
 
         if (self._transaction_depth <= 1) and (self._connection is not None):
-            if self._is_commit_needed:
-                self._connection.commit()
-            self._connection.close()
-            self._connection = None
+            if self._is_commit_needed and not roll_back:
+                self._commit()
+            elif self._connection.in_transaction:
+                self._connection.rollback()
+            if not keep_open:
+                self._connection.close()
+                self._connection = None
             self._is_commit_needed = False
 
-        self._transaction_depth = self._transaction_depth - 1
+        self._transaction_depth = max(self._transaction_depth - 1, 0)
 
-        return self._connection is None
+        return self._transaction_depth == 0
 
     def commit(self, do_immediately=False):
 
         if do_immediately:
-            self._connection.commit()
+            self._commit()
         else:
             self._is_commit_needed = True
 
+    @staticmethod
+    def set_commit_callback(callback):
+        """
+        Sets the function that is called after each commit executed on the current thread, e.g. for timing the commits
+        of an indexing process.
+
+        Parameters
+        ----------
+        callback : callable
+            Receives the number of seconds the commit took. None removes the callback of the current thread.
+        """
+
+        DbConnection._THREAD_STATE.commit_callback = callback
+
     def connect(self, check_path):
 
         if self._connection is None:
             if check_path:
                 self._assert_db_exists()
-            self._connection = sqlite3.connect(self._database_path)
+            # Pooled connections are handed over between threads, but only one thread uses them at a time.
+            self._connection = sqlite3.connect(self._database_path, check_same_thread=False)
+            self._apply_pragmas()
+            self._file_id = self._get_file_id()
 
         self._transaction_depth = self._transaction_depth + 1
 
@@ -68,7 +148,37 @@ class DbConnection:
     # Private methods.
     ####################################################################################################################
 
+    def _apply_pragmas(self):
+
+        cursor = self._connection.cursor()
+        for pragma in self._settings.create_pragmas(self._read_only):
+            cursor.execute(pragma)
+        cursor.close()
+
     def _assert_db_exists(self):
 
         if self._database_path is None or not os.path.isfile(self._database_path):
             raise Exception('Invalid database path: ' + self._database_path + '.')
+
+    def _commit(self):
+        """
+        Commits the transaction. The commit is timed if a commit callback is set on the current thread.
+        """
+
+        commit_callback = getattr(DbConnection._THREAD_STATE, 'commit_callback', None)
+        if commit_callback is None:
+            self._connection.commit()
+            return
+
+        start_time = time.perf_counter()
+        self._connection.commit()
+        commit_callback(time.perf_counter() - start_time)
+
+    def _get_file_id(self):
+
+        try:
+            file_stat = os.stat(self._database_path)
+        except OSError:
+            return None
+
+        return file_stat.st_dev, file_stat.st_ino
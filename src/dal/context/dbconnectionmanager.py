@@ -1,6 +1,7 @@
+import os
 import threading
 
-from dal.context.dbconnection import DbConnection
+from dal.context.dbconnectionpool import DbConnectionPool
 
 class DbConnectionManager:
 
@@ -8,40 +9,127 @@ class DbConnectionManager:
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, database_path):
+    def __init__(self, database_path, settings):
 
         ### Validate parameters.
         if database_path is None:
             raise Exception('database_path cannot be None.')
+        if settings is None:
+            raise Exception('settings cannot be None.')
 
         ### Attributes from outside.
         self._database_path = database_path
+        self._settings = settings
 
         ### Private attributes.
-        self._connections = {}
+        # The read-only connections used by the retrievers, separate from the writer connections.
+        self._read_pool = DbConnectionPool(database_path, settings, settings.read_pool_size, True)
+        # The connections lent to the current thread. Unlike thread identifiers, it is never shared with a new thread.
+        self._thread_data = threading.local()
+        # The connections used for modifying the database.
+        self._write_pool = DbConnectionPool(database_path, settings, settings.write_pool_size)
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def read_pool_metrics(self):
+        return self._read_pool.metrics
+
+    @property
+    def settings(self):
+        return self._settings
+
+    @property
+    def write_pool_metrics(self):
+        return self._write_pool.metrics
 
     ####################################################################################################################
     # Public methods.
     ####################################################################################################################
 
-    def close(self):
+    def close(self, roll_back=False):
+
+        connection = getattr(self._thread_data, 'writer', None)
+        if connection is not None and connection.close(True, roll_back):
+            self._thread_data.writer = None
+            self._write_pool.release(connection)
+
+    def close_pools(self):
+
+        self._read_pool.close()
+        self._write_pool.close()
 
-        thread_id = threading.current_thread().ident
-        if thread_id in self._connections:
-            if self._connections[thread_id].close():
-                del self._connections[thread_id]
+    def close_reader(self, connection, roll_back=False):
+
+        if not connection.read_only:
+            self.close(roll_back)
+        elif connection.close(True, roll_back):
+            self._thread_data.reader = None
+            self._read_pool.release(connection)
 
     def connect(self, check_path=True):
 
-        connection = None
-        thread_id = threading.current_thread().ident
+        connection = getattr(self._thread_data, 'writer', None)
+        if connection is None:
+            connection = self._write_pool.acquire()
+            self._thread_data.writer = connection
+
+        try:
+            connection.connect(check_path)
+        except Exception:
+            if not connection.is_connected:
+                self._thread_data.writer = None
+                self._write_pool.release(connection)
+            raise
+
+        return connection
+
+    def connect_reader(self):
 
-        if thread_id in self._connections:
-            connection = self._connections[thread_id]
-        else:
-            connection = DbConnection(self._database_path)
-            self._connections[thread_id] = connection
+        # Reads within a write transaction have to see its uncommitted changes.
+        writer_connection = getattr(self._thread_data, 'writer', None)
+        if writer_connection is not None and writer_connection.is_connected:
+            return self.connect()
 
-        connection.connect(check_path)
+        connection = getattr(self._thread_data, 'reader', None)
+        if connection is None:
+            connection = self._read_pool.acquire()
+            self._thread_data.reader = connection
+
+        try:
+            connection.connect(True)
+        except Exception:
+            if not connection.is_connected:
+                self._thread_data.reader = None
+                self._read_pool.release(connection)
+            raise
 
         return connection
+
+    def replace_database(self, source_path):
+        """
+        Replaces the database file with the given one atomically. The pools are suspended meanwhile: the lent
+        connections are waited for, and every connection is closed before the file is replaced, because a connection to
+        the old file could otherwise checkpoint its write-ahead log into the new one, or delete the log of the new one.
+        """
+
+        # The write-ahead log of the new database has to be checkpointed into its file before it is moved.
+        for suffix in ['-shm', '-wal']:
+            if os.path.exists(source_path + suffix):
+                raise Exception('The database to move is still in use: ' + source_path + '.')
+
+        # Writers are suspended first, because a thread holding a writer connection does not acquire readers.
+        self._write_pool.suspend()
+        try:
+            self._read_pool.suspend()
+            try:
+                for suffix in ['-shm', '-wal']:
+                    if os.path.exists(self._database_path + suffix):
+                        os.unlink(self._database_path + suffix)
+                os.replace(source_path, self._database_path)
+            finally:
+                self._read_pool.resume()
+        finally:
+            self._write_pool.resume()
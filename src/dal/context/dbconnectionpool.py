@@ -0,0 +1,193 @@
+import threading
+import time
+
+from dal.context.dbconnection import DbConnection
+from dal.context.dbconnectionpoolmetrics import DbConnectionPoolMetrics
+
+class DbConnectionPool:
+    """
+    Keeps a bounded number of open connections to a database and lends them to threads one at a time. Connections idle
+    for longer than the idle timeout are closed whenever a connection is acquired or released, and the ones idle for
+    longer than the check interval are checked before they are lent again.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, database_path, settings, max_size, read_only=False):
+
+        ### Validate parameters.
+        if database_path is None:
+            raise Exception('database_path cannot be None.')
+        if settings is None:
+            raise Exception('settings cannot be None.')
+        if max_size < 1:
+            raise Exception('max_size must be positive.')
+
+        ### Attributes from outside.
+        self._database_path = database_path
+        self._settings = settings
+        self._max_size = max_size
+        self._read_only = read_only
+
+        ### Private attributes.
+        # Signals that a connection has been returned to the pool.
+        self._condition = threading.Condition()
+        # The connections not lent to any thread along with the time they have been released.
+        self._idle_connections = []
+        # The connections lent to threads.
+        self._lent_connections = set()
+        # The longest time a thread has waited for a connection.
+        self._max_wait_time = 0.0
+        # Indicates whether lending connections is suspended, for example while the database file is being replaced.
+        self._is_suspended = False
+        # The number of connections that have been created and not yet closed.
+        self._size = 0
+        # The lent connections that have to be closed instead of being taken back.
+        self._stale_connections = set()
+        # The total time threads have waited for a connection.
+        self._total_wait_time = 0.0
+        # The number of times a thread has waited for a connection.
+        self._wait_count = 0
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def metrics(self):
+        with self._condition:
+            self._reap_idle_connections()
+            return DbConnectionPoolMetrics(
+                self._size,
+                len(self._lent_connections),
+                self._wait_count,
+                self._total_wait_time,
+                self._max_wait_time)
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def acquire(self):
+        """
+        Lends a connection. Waits for one to be released if all of them are in use.
+
+        Returns
+        -------
+        A DbConnection object.
+        """
+
+        with self._condition:
+            self._reap_idle_connections()
+            if self._is_suspended or (not self._idle_connections and self._size >= self._max_size):
+                self._wait_for_connection()
+            is_check_needed = False
+            if self._idle_connections:
+                connection, release_time = self._idle_connections.pop()
+                is_check_needed = time.monotonic() - release_time >= self._settings.pool_check_interval
+            else:
+                connection = DbConnection(self._database_path, self._settings, self._read_only)
+                self._size = self._size + 1
+            self._lent_connections.add(connection)
+
+        # Reopen the connection on the next use if it is broken or refers to a deleted database file. Connections used
+        # recently are not checked: the ones opened to a replaced file are closed by close and suspend anyway.
+        if is_check_needed and not connection.check_health():
+            connection.close()
+
+        return connection
+
+    def close(self):
+        """
+        Closes the idle connections. The lent ones are closed when they are released, so no connection opened before
+        calling this method (for example, to a database file that has been replaced since) is lent again.
+        """
+
+        with self._condition:
+            for connection, _ in self._idle_connections:
+                connection.close()
+            self._size = self._size - len(self._idle_connections)
+            self._idle_connections = []
+            self._stale_connections.update(self._lent_connections)
+
+    def release(self, connection):
+        """
+        Takes back a lent connection.
+
+        Parameters
+        ----------
+        connection : DbConnection
+            The connection to take back.
+        """
+
+        with self._condition:
+            self._lent_connections.discard(connection)
+            if connection in self._stale_connections:
+                self._stale_connections.discard(connection)
+                connection.close()
+                self._size = self._size - 1
+            else:
+                self._idle_connections.append((connection, time.monotonic()))
+            self._reap_idle_connections()
+            self._condition.notify_all()
+
+    def resume(self):
+        """
+        Lets the pool lend connections again after suspend has been called.
+        """
+
+        with self._condition:
+            self._is_suspended = False
+            self._condition.notify_all()
+
+    def suspend(self):
+        """
+        Stops lending connections, waits for the lent ones to be released and closes all of them, so that no connection
+        is open to the database file. Threads acquiring a connection meanwhile wait until resume is called (or until
+        they time out). The lent connections are waited for without a deadline, so the calling thread must not hold any
+        of them.
+        """
+
+        with self._condition:
+            self._is_suspended = True
+            while self._lent_connections:
+                self._condition.wait()
+            for connection, _ in self._idle_connections:
+                connection.close()
+            self._size = self._size - len(self._idle_connections)
+            self._idle_connections = []
+
+    ####################################################################################################################
+    # Private methods.
+    ####################################################################################################################
+
+    def _reap_idle_connections(self):
+
+        # The connections are released in chronological order, so the ones idle for the longest time come first.
+        expiration_time = time.monotonic() - self._settings.pool_idle_timeout
+        reaped_count = 0
+        while reaped_count < len(self._idle_connections) and self._idle_connections[reaped_count][1] < expiration_time:
+            self._idle_connections[reaped_count][0].close()
+            reaped_count = reaped_count + 1
+
+        if reaped_count > 0:
+            del self._idle_connections[:reaped_count]
+            self._size = self._size - reaped_count
+
+    def _wait_for_connection(self):
+
+        start_time = time.monotonic()
+        deadline = start_time + self._settings.pool_timeout
+
+        while self._is_suspended or (not self._idle_connections and self._size >= self._max_size):
+            remaining_time = deadline - time.monotonic()
+            if remaining_time <= 0:
+                raise Exception('Timed out waiting for a database connection.')
+            self._condition.wait(remaining_time)
+
+        wait_time = time.monotonic() - start_time
+        self._wait_count = self._wait_count + 1
+        self._total_wait_time = self._total_wait_time + wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
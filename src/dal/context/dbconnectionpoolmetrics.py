@@ -0,0 +1,56 @@
+class DbConnectionPoolMetrics:
+    """
+    Stores a snapshot of the usage statistics of a connection pool.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, open_count, in_use_count, wait_count, total_wait_time, max_wait_time):
+
+        ### Attributes from outside.
+        self._open_count = open_count
+        self._in_use_count = in_use_count
+        self._wait_count = wait_count
+        self._total_wait_time = total_wait_time
+        self._max_wait_time = max_wait_time
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def in_use_count(self):
+        """
+        Gets the number of connections lent to threads.
+        """
+        return self._in_use_count
+
+    @property
+    def max_wait_time(self):
+        """
+        Gets the longest time in seconds a thread has waited for a connection.
+        """
+        return self._max_wait_time
+
+    @property
+    def open_count(self):
+        """
+        Gets the number of connections created and not closed yet.
+        """
+        return self._open_count
+
+    @property
+    def total_wait_time(self):
+        """
+        Gets the total time in seconds threads have waited for a connection.
+        """
+        return self._total_wait_time
+
+    @property
+    def wait_count(self):
+        """
+        Gets the number of times a thread has had to wait for a connection.
+        """
+        return self._wait_count
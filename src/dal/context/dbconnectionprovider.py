@@ -6,7 +6,7 @@ class DbConnectionProvider:
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, connection_manager, check_connection=True):
+    def __init__(self, connection_manager, check_connection=True, read_only=False):
 
         ### Validate parameters.
         if connection_manager is None:
@@ -15,6 +15,10 @@ class DbConnectionProvider:
         ### Attributes from outside.
         self._connection_manager = connection_manager
         self._check_connection = check_connection
+        self._read_only = read_only
+
+        ### Private attributes.
+        self._connection = None
 
     ####################################################################################################################
     # Context management protocol.
@@ -22,10 +26,19 @@ class DbConnectionProvider:
 
     def __enter__(self):
 
-        connection = self._connection_manager.connect(self._check_connection)
+        if self._read_only:
+            self._connection = self._connection_manager.connect_reader()
+        else:
+            self._connection = self._connection_manager.connect(self._check_connection)
 
-        return DbConnectionAdapter(connection)
+        return DbConnectionAdapter(self._connection)
 
     def __exit__(self, exec_type, value, traceback):
 
-        self._connection_manager.close()
+        # The changes of a failed transaction must not be committed by the next user of the pooled connection.
+        roll_back = exec_type is not None
+
+        if self._read_only:
+            self._connection_manager.close_reader(self._connection, roll_back)
+        else:
+            self._connection_manager.close(roll_back)
@@ -1,5 +1,6 @@
 from dal.context.dbconnectionmanager import DbConnectionManager
 from dal.context.dbconnectionprovider import DbConnectionProvider
+from dal.context.dbsettings import DbSettings
 
 class DbContext:
 
@@ -7,19 +8,67 @@ class DbContext:
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, database_path):
+    def __init__(self, database_path, settings=None):
 
         ### Validate parameters.
         if database_path is None:
             raise Exception('database_path cannot be None.')
 
         ### Attributes from outside.
-        self._connection_manager = DbConnectionManager(database_path)
+        self._connection_manager = DbConnectionManager(
+            database_path,
+            settings if settings is not None else DbSettings())
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def read_pool_metrics(self):
+        return self._connection_manager.read_pool_metrics
+
+    @property
+    def settings(self):
+        return self._connection_manager.settings
+
+    @property
+    def write_pool_metrics(self):
+        return self._connection_manager.write_pool_metrics
 
     ####################################################################################################################
     # Public methods.
     ####################################################################################################################
 
+    def close_connections(self):
+        """
+        Closes the pooled connections. Has to be called before the database file is deleted or replaced.
+        """
+
+        self._connection_manager.close_pools()
+
     def get_connection_provider(self, check_path=True):
 
         return DbConnectionProvider(self._connection_manager, check_path)
+
+    def get_read_connection_provider(self):
+        """
+        Returns a connection provider for retrieving data. It lends a pooled read-only connection, so reads are not
+        blocked by a running write transaction, except when the current thread is writing: then its own connection is
+        used to let it see its uncommitted changes.
+        """
+
+        return DbConnectionProvider(self._connection_manager, True, True)
+
+    def replace_database(self, source_path):
+        """
+        Replaces the database file with the given database file atomically, and reopens the connections. Connections
+        are not lent until the file is replaced, the ones in use are waited for (without a deadline, so the calling
+        thread must not hold any).
+
+        Parameters
+        ----------
+        source_path : str
+            The path of the new database file. It must be in the same file system, and no connection can be open to it.
+        """
+
+        self._connection_manager.replace_database(source_path)
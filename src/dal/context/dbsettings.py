@@ -0,0 +1,81 @@
+class DbSettings:
+    """
+    Stores the tunable parameters of the connections of a database context.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self):
+
+        ### Public attributes.
+        # The number of milliseconds a connection waits for a lock held by another connection.
+        self.busy_timeout = 5000
+        # The suggested number of database pages (or KiB if negative) cached by a connection.
+        self.cache_size = -16384
+        # The journal mode of the database. WAL lets readers run next to a writer.
+        self.journal_mode = 'WAL'
+        # The maximum number of bytes of the database file mapped into memory.
+        self.mmap_size = 268435456
+        # The number of seconds a pooled connection has to be unused before it is checked again when it is lent (whether
+        # it still works and refers to the database file, which might have been deleted by someone else meanwhile).
+        self.pool_check_interval = 5
+        # The number of seconds after which an unused pooled connection is closed.
+        self.pool_idle_timeout = 300
+        # The maximum number of seconds a thread waits for a pooled connection.
+        self.pool_timeout = 30
+        # The maximum number of read-only connections kept for retrieving data.
+        self.read_pool_size = 4
+        # The synchronous flag of the database. NORMAL is safe in WAL mode.
+        self.synchronous = 'NORMAL'
+        # Where temporary tables and indices are stored.
+        self.temp_store = 'MEMORY'
+        # The maximum number of connections kept for modifying data.
+        self.write_pool_size = 4
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def create_pragmas(self, read_only=False):
+        """
+        Creates the PRAGMA statements that have to be executed on a newly opened connection.
+
+        Parameters
+        ----------
+        read_only : bool
+            Indicates whether the connection is used only for reading.
+
+        Returns
+        -------
+        A list of SQL statements.
+        """
+
+        pragmas = [
+            'PRAGMA busy_timeout = {}'.format(int(self.busy_timeout)),
+            'PRAGMA cache_size = {}'.format(int(self.cache_size)),
+            'PRAGMA mmap_size = {}'.format(int(self.mmap_size)),
+            'PRAGMA synchronous = ' + self._assert_keyword(self.synchronous, ['EXTRA', 'FULL', 'NORMAL', 'OFF']),
+            'PRAGMA temp_store = ' + self._assert_keyword(self.temp_store, ['DEFAULT', 'FILE', 'MEMORY'])]
+
+        # The journal mode is persistent, only the writer sets it.
+        if read_only:
+            pragmas.append('PRAGMA query_only = ON')
+        else:
+            pragmas.insert(0, 'PRAGMA journal_mode = ' + self._assert_keyword(
+                self.journal_mode,
+                ['DELETE', 'MEMORY', 'OFF', 'PERSIST', 'TRUNCATE', 'WAL']))
+
+        return pragmas
+
+    ####################################################################################################################
+    # Private methods.
+    ####################################################################################################################
+
+    def _assert_keyword(self, value, allowed_values):
+
+        if value is None or value.upper() not in allowed_values:
+            raise Exception('Invalid PRAGMA value: ' + str(value) + '.')
+
+        return value.upper()
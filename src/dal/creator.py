@@ -1,5 +1,21 @@
+from dal.bulkinsertbuffer import BulkInsertBuffer
+from dal.functions import is_full_text_search_available
+from dal.schemamigrator import SchemaMigrator
+
 class Creator:
 
+    ####################################################################################################################
+    # Static attributes.
+    ####################################################################################################################
+
+    # The statements that upgrade the schema of the category, the ith list upgrades version i to version i + 1.
+    SCHEMA_MIGRATIONS = []
+    # The name of the category in the schema_version table.
+    SCHEMA_NAME = None
+    # The statements that create the full-text search indices of the category, versioned separately, because they are
+    # applied only if SQLite supports FTS5.
+    SEARCH_SCHEMA_MIGRATIONS = []
+
     ####################################################################################################################
     # Constructor.
     ####################################################################################################################
@@ -30,3 +46,95 @@ class Creator:
         self._db_context = db_context
         self._cache = cache
         self._retriever = retriever
+
+        ### Private attributes.
+        # Collects the rows to insert while bulk insert is in progress.
+        self._bulk_insert_buffer = None
+        # Called with the number of rows inserted immediately (outside of bulk insert mode).
+        self._on_insert = None
+
+    ####################################################################################################################
+    # Public methods -- bulk insert.
+    ####################################################################################################################
+
+    def begin_bulk_insert(self, batch_size, on_flush=None):
+        """
+        Starts bulk insert mode: file and mapping rows are not written immediately, but collected and written in
+        batches. Rows that other rows refer to by value (languages, titles and so on) are still inserted immediately.
+
+        Parameters
+        ----------
+        batch_size : int
+            The number of rows to write in a single transaction.
+        on_flush : callable
+            Called with the number of written rows after each transaction. Optional.
+        """
+
+        self.end_bulk_insert()
+        self._bulk_insert_buffer = BulkInsertBuffer(self._db_context, batch_size, on_flush)
+
+    def end_bulk_insert(self):
+        """
+        Writes the remaining buffered rows into the database and stops bulk insert mode.
+        """
+
+        if self._bulk_insert_buffer is not None:
+            self._bulk_insert_buffer.flush()
+            self._bulk_insert_buffer = None
+
+    def flush(self):
+        """
+        Writes the buffered rows into the database. Does nothing if bulk insert is not in progress.
+        """
+
+        if self._bulk_insert_buffer is not None:
+            self._bulk_insert_buffer.flush()
+
+    def set_insert_callback(self, on_insert):
+        """
+        Sets the function that counts the file and mapping rows inserted outside of bulk insert mode (the rows written
+        in bulk insert mode are counted by the on_flush callback of begin_bulk_insert).
+
+        Parameters
+        ----------
+        on_insert : callable
+            Called with the number of inserted rows after each insert. None removes the callback.
+        """
+
+        self._on_insert = on_insert
+
+    ####################################################################################################################
+    # Public methods -- upgrade.
+    ####################################################################################################################
+
+    def upgrade_db(self):
+        """
+        Upgrades the schema of an existing database to the latest version in place (for example, creates the indices
+        that databases created by earlier versions lack). Does nothing if the schema is up to date.
+
+        Returns
+        -------
+        The number of executed migrations.
+        """
+
+        migration_count = SchemaMigrator(self._db_context, self.SCHEMA_NAME, self.SCHEMA_MIGRATIONS).migrate()
+
+        if self.SEARCH_SCHEMA_MIGRATIONS:
+            with self._db_context.get_connection_provider() as connection:
+                is_search_available = is_full_text_search_available(connection.cursor)
+            if is_search_available:
+                migration_count = migration_count + SchemaMigrator(
+                    self._db_context,
+                    self.SCHEMA_NAME + '_search',
+                    self.SEARCH_SCHEMA_MIGRATIONS).migrate()
+
+        return migration_count
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _count_inserted_rows(self, row_count):
+
+        if self._on_insert is not None and row_count > 0:
+            self._on_insert(row_count)
@@ -23,6 +23,15 @@ class DataHandler:
     # Properties.
     ####################################################################################################################
 
+    @property
+    def cache_metrics(self):
+        """
+        Gets the usage statistics of the caches as name (string) => metrics (CacheMetrics) pairs.
+        """
+        if self._cache is None:
+            return {}
+        return self._cache.metrics
+
     @property
     def creator(self):
         return self._creator
@@ -46,3 +55,17 @@ class DataHandler:
     def clear_cache(self):
 
         self._cache.clear()
+
+    def preload_cache(self):
+        """
+        Loads the frequently looked up IDs into the cache, so that they do not have to be queried one by one.
+
+        Returns
+        -------
+        The number of loaded entries.
+        """
+
+        if self._cache is None:
+            return 0
+
+        return self._retriever.preload_cache()
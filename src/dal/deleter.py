@@ -20,3 +20,43 @@ class Deleter:
 
         ### Attributes from outside.
         self._db_context = db_context
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _begin_bulk_delete(self, cursor):
+        """
+        Prepares the temporary table of the IDs collected for a bulk delete. The table belongs to the pooled connection,
+        so it is emptied first, in case a previous bulk delete on the same connection has not finished.
+        """
+
+        cursor.execute(
+            'CREATE TEMP TABLE IF NOT EXISTS deleted_id ('
+            'kind VARCHAR(32),'
+            'id INTEGER,'
+            'PRIMARY KEY(kind, id)) WITHOUT ROWID')
+        cursor.execute('DELETE FROM temp.deleted_id')
+
+    def _clear_deleted_ids(self, cursor):
+        """
+        Empties the temporary table of the IDs collected for a bulk delete.
+        """
+
+        cursor.execute('DELETE FROM temp.deleted_id')
+
+    def _insert_deleted_ids(self, cursor, kind, ids=None, query=None, query_parameters=()):
+        """
+        Stores IDs of the given kind (e.g. 'file' or 'title') in the temporary table prepared by _begin_bulk_delete, so
+        that bulk deletes can refer to them with set operations instead of one statement per ID. The IDs are either
+        given as a list, or selected by a query.
+        """
+
+        if ids is not None:
+            cursor.executemany(
+                'INSERT OR IGNORE INTO temp.deleted_id (kind, id) VALUES (?, ?)',
+                [(kind, i) for i in ids])
+        if query is not None:
+            cursor.execute(
+                'INSERT OR IGNORE INTO temp.deleted_id (kind, id) SELECT ?, id FROM (' + query + ')',
+                (kind,) + tuple(query_parameters))
@@ -2,6 +2,11 @@
 Common functions and utilities to be used by other modules.
 """
 
+import base64
+import binascii
+import json
+import re
+
 def build_result_dictionary(cursor, keys):
     """
     Builds a list from the given 'cursor' object where every item is a dictionary. The result looks like the
@@ -40,3 +45,119 @@ def build_result_dictionary(cursor, keys):
         result.append(item)
 
     return result
+
+def build_full_text_query(text):
+    """
+    Builds an FTS5 query from the given search text that matches the rows containing each word of the text, either as
+    a word or as the prefix of a word. Other characters are ignored, so the text cannot form an FTS5 query expression.
+
+    Parameters
+    ----------
+    text : str
+        The search text typed by the user.
+
+    Returns
+    -------
+    The FTS5 query or None if the text contains no words.
+    """
+
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+
+    return ' '.join('"' + word + '"*' for word in words)
+
+def build_search_index_statements(table_name, column_name):
+    """
+    Builds the statements that create an FTS5 index of the given column (an external content table named like the
+    table with a '_search' suffix) and the triggers that keep it in sync with the table. The statements are idempotent.
+
+    Parameters
+    ----------
+    table_name : str
+        The name of the indexed table. Its rowid is used as the rowid of the index.
+    column_name : str
+        The name of the indexed text column.
+
+    Returns
+    -------
+    A list of SQL statements.
+    """
+
+    search_table_name = table_name + '_search'
+    format_values = {'column' : column_name, 'search' : search_table_name, 'table' : table_name}
+
+    return [statement.format(**format_values) for statement in [
+        'CREATE VIRTUAL TABLE IF NOT EXISTS {search} '
+        'USING fts5({column}, content=\'{table}\', content_rowid=\'id\', prefix=\'2 3\')',
+        'CREATE TRIGGER IF NOT EXISTS {search}_insert AFTER INSERT ON {table} BEGIN '
+        'INSERT INTO {search} (rowid, {column}) VALUES (new.id, new.{column}); '
+        'END',
+        'CREATE TRIGGER IF NOT EXISTS {search}_delete AFTER DELETE ON {table} BEGIN '
+        'INSERT INTO {search} ({search}, rowid, {column}) VALUES (\'delete\', old.id, old.{column}); '
+        'END',
+        'CREATE TRIGGER IF NOT EXISTS {search}_update AFTER UPDATE OF {column} ON {table} BEGIN '
+        'INSERT INTO {search} ({search}, rowid, {column}) VALUES (\'delete\', old.id, old.{column}); '
+        'INSERT INTO {search} (rowid, {column}) VALUES (new.id, new.{column}); '
+        'END',
+        # Indexes the rows stored before the index was created.
+        'INSERT INTO {search} ({search}) VALUES (\'rebuild\')']]
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor created by encode_cursor.
+
+    Parameters
+    ----------
+    cursor : str
+        The cursor received from a client.
+
+    Returns
+    -------
+    The list of the sort key values.
+    """
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise Exception('Invalid cursor.')
+
+    if not isinstance(values, list):
+        raise Exception('Invalid cursor.')
+
+    return values
+
+def encode_cursor(values):
+    """
+    Encodes the sort key values of the last item of a page into an opaque string that can be passed back by clients
+    to retrieve the next page.
+
+    Parameters
+    ----------
+    values : list of object
+        The sort key values.
+
+    Returns
+    -------
+    The cursor.
+    """
+
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+def is_full_text_search_available(cursor):
+    """
+    Tells whether the SQLite library supports FTS5 full-text search.
+
+    Parameters
+    ----------
+    cursor : Cursor
+        A database cursor.
+
+    Returns
+    -------
+    True if FTS5 is available.
+    """
+
+    cursor.execute('SELECT sqlite_compileoption_used(\'ENABLE_FTS5\')')
+
+    return cursor.fetchone()[0] == 1
@@ -1,5 +1,3 @@
-import threading
-
 from dal.cache import Cache
 
 class ImageDataCache(Cache):
@@ -8,27 +6,23 @@ class ImageDataCache(Cache):
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self):
+    def __init__(self, max_size=None):
+
+        ### Call base class constructor.
+        super(ImageDataCache, self).__init__(max_size)
 
         ### Private attributes.
         # A cache that contains albums as album (string) => id (int) pairs.
-        self._album_cache = {}
-        # This lock is used for album cache synchronization.
-        self._album_cache_lock = threading.Lock()
+        self._album_cache = self._create_cache('image albums')
 
     ####################################################################################################################
     # Public methods.
     ####################################################################################################################
 
-    def clear(self):
-
-        with self._album_cache_lock:
-            self._album_cache = {}
-
     def get_album_id(self, album):
 
-        return self._get_value_from_simple_cache(self._album_cache, self._album_cache_lock, album)
+        return self._album_cache.get(album)
 
     def set_album_id(self, album, album_id):
 
-        self._store_item_in_simple_cache(self._album_cache, self._album_cache_lock, album, album_id)
+        self._album_cache.set(album, album_id)
@@ -1,8 +1,23 @@
 from dal.constants import DAL_UNCATEGORIZED
 from dal.creator import Creator
+from dal.functions import build_search_index_statements
 
 class ImageDataCreator(Creator):
 
+    ####################################################################################################################
+    # Static attributes.
+    ####################################################################################################################
+
+    SCHEMA_MIGRATIONS = [
+        # Version 1: indices for the lookups, listings and deletions.
+        [
+            'CREATE INDEX IF NOT EXISTS image_album_album ON image_album(album)',
+            'CREATE INDEX IF NOT EXISTS image_file_album ON image_file(id_album)']]
+    SCHEMA_NAME = 'image'
+    SEARCH_SCHEMA_MIGRATIONS = [
+        # Version 1: full-text index of the albums.
+        build_search_index_statements('image_album', 'album')]
+
     ####################################################################################################################
     # Public methods -- create.
     ####################################################################################################################
@@ -27,6 +42,9 @@ class ImageDataCreator(Creator):
                 'path VARCHAR(1024),'
                 'FOREIGN KEY(id_album) REFERENCES image_album(id))')
 
+        # Create indices.
+        self.upgrade_db()
+
         # Fill DB with initial data.
         self._inflate_db()
 
@@ -86,6 +104,10 @@ class ImageDataCreator(Creator):
         The ID of the inserted file.
         """
 
+        # Buffer the file if bulk insert is in progress.
+        if self._bulk_insert_buffer is not None:
+            return self._bulk_insert_buffer.add('image_file', ('id_album', 'path'), (album_id, path))
+
         # Connect to the database.
         with self._db_context.get_connection_provider() as connection:
             cursor = connection.cursor
@@ -93,6 +115,7 @@ class ImageDataCreator(Creator):
             # Insert the file into the database.
             cursor.execute('INSERT INTO image_file (id_album, path) VALUES (?, ?)', (album_id, path))
             path_id = cursor.lastrowid
+            self._count_inserted_rows(cursor.rowcount)
 
             # Commit.
             connection.commit()
@@ -33,3 +33,40 @@ class ImageDataDeleter(Deleter):
 
             # Commit.
             connection.commit()
+
+    def delete_paths(self, file_ids):
+        """
+        Deletes the given images and the albums that are left without images in a single transaction.
+
+        Parameters
+        ----------
+        file_ids : list of int
+            The IDs of the images.
+        """
+
+        if not file_ids:
+            return
+
+        # Connect to the database.
+        with self._db_context.get_connection_provider() as connection:
+            cursor = connection.cursor
+            self._begin_bulk_delete(cursor)
+
+            # Collect the images and their albums, then delete the images.
+            self._insert_deleted_ids(cursor, 'file', file_ids)
+            self._insert_deleted_ids(
+                cursor,
+                'album',
+                query='SELECT id_album AS id FROM image_file '
+                'WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'file\')')
+            cursor.execute('DELETE FROM image_file WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'file\')')
+
+            # Delete the albums that are left without images.
+            cursor.execute(
+                'DELETE FROM image_album '
+                'WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'album\') '
+                'AND NOT EXISTS (SELECT 1 FROM image_file AS f WHERE f.id_album=image_album.id)')
+
+            # Commit.
+            self._clear_deleted_ids(cursor)
+            connection.commit()
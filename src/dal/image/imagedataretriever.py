@@ -1,4 +1,3 @@
-from dal.functions import build_result_dictionary
 from dal.retriever import Retriever
 
 class ImageDataRetriever(Retriever):
@@ -7,6 +6,20 @@ class ImageDataRetriever(Retriever):
     # Public methods.
     ####################################################################################################################
 
+    def preload_cache(self):
+        """
+        Loads the IDs of the albums into the cache.
+
+        Returns
+        -------
+        The number of loaded entries.
+        """
+
+        return self._preload_cache([
+            (
+                'SELECT album, MIN(id) FROM image_album GROUP BY album LIMIT ?',
+                self._cache.set_album_id)])
+
     def retrieve_album_id(self, album):
 
         album_id = self._cache.get_album_id(album)
@@ -16,15 +29,14 @@ class ImageDataRetriever(Retriever):
 
         return album_id
 
-    def retrieve_albums(self):
+    def retrieve_albums(self, page_request=None):
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Get table contents.
-            cursor.execute('SELECT id, album FROM image_album ORDER BY album')
-            result = build_result_dictionary(cursor, ['id', 'album'])
+            result = self._execute_page_query(cursor, self._build_album_query_parts(), {}, page_request)
 
             return result
 
@@ -34,17 +46,39 @@ class ImageDataRetriever(Retriever):
 
     def retrieve_paths(self, album_id=None):
 
-        # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
-            cursor = connection.cursor
+        return list(self.iterate_paths(album_id))
 
-            # Build and execute the query.
-            query_parameters = {}
-            where_clause = ''
-            if album_id is not None:
-                where_clause = ' WHERE id_album=:id_album'
-                query_parameters['id_album'] = album_id
-            cursor.execute('SELECT id, path FROM image_file' + where_clause, query_parameters)
-            result = build_result_dictionary(cursor, ['id', 'path'])
+    def search_albums(self, text):
 
-            return result
+        return self._search('image_album', ['id', 'album'], 'album', text)
+
+    ####################################################################################################################
+    # Public methods -- iteration.
+    ####################################################################################################################
+
+    def iterate_albums(self, page_request=None):
+
+        return self._iterate_listing(self._build_album_query_parts(), {}, page_request)
+
+    def iterate_paths(self, album_id=None):
+
+        # Build the query.
+        query_parameters = {}
+        where_clause = ''
+        if album_id is not None:
+            where_clause = 'WHERE id_album=:id_album '
+            query_parameters['id_album'] = album_id
+
+        return self._iterate_paths('image_file', where_clause, query_parameters)
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _build_album_query_parts(self):
+
+        return {
+            'columns' : [('id', 'id'), ('album', 'album')],
+            'sort_columns' : ['album', 'id'],
+            'from' : 'FROM image_album ',
+            'where' : ''}
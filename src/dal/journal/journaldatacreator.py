@@ -0,0 +1,80 @@
+import json
+
+class JournalDataCreator:
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, db_context):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        db_context : DbContext
+            The database context to work with.
+        """
+
+        ### Validate parameters.
+        if db_context is None:
+            raise Exception('db_context cannot be None.')
+
+        ### Attributes from outside.
+        self._db_context = db_context
+
+    ####################################################################################################################
+    # Public methods -- create.
+    ####################################################################################################################
+
+    def create_db(self):
+        """
+        Creates the table of the journal. Does nothing if it already exists, so it can be used to add the journal to
+        databases created by earlier versions. A table with an outdated layout is dropped first, the journal is rebuilt
+        by the next indexing process.
+        """
+
+        # Connect to the database.
+        with self._db_context.get_connection_provider(False) as connection:
+            cursor = connection.cursor
+
+            # Drop outdated table.
+            cursor.execute('PRAGMA table_info(journal_directory)')
+            columns = [row[1] for row in cursor.fetchall()]
+            if len(columns) > 0 and 'files' not in columns:
+                cursor.execute('DROP TABLE journal_directory')
+
+            # Create table. The files of a directory are stored together, because they are always read and written
+            # together (and only for the directories that have changed).
+            cursor.execute(
+                'CREATE TABLE IF NOT EXISTS journal_directory ('
+                'id INTEGER PRIMARY KEY,'
+                'path VARCHAR(1024) UNIQUE,'
+                'mtime INTEGER,'
+                'files TEXT)')
+
+    ####################################################################################################################
+    # Public methods -- insert.
+    ####################################################################################################################
+
+    def insert_directories(self, directories):
+        """
+        Inserts the given directories and their entries into the database.
+
+        Parameters
+        ----------
+        directories : list of tuple
+            The directories as (path, mtime, files) tuples, where files is a list of (name, size, mtime, inode) tuples.
+        """
+
+        # Connect to the database.
+        with self._db_context.get_connection_provider() as connection:
+            cursor = connection.cursor
+
+            # Insert the directories.
+            cursor.executemany(
+                'INSERT INTO journal_directory (path, mtime, files) VALUES (?, ?, ?)',
+                [(path, mtime, json.dumps(files)) for path, mtime, files in directories])
+
+            # Commit.
+            connection.commit()
@@ -0,0 +1,27 @@
+from dal.deleter import Deleter
+
+class JournalDataDeleter(Deleter):
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def delete_directories(self, paths):
+        """
+        Deletes the given directories and their entries from the journal.
+
+        Parameters
+        ----------
+        paths : list of str
+            The paths of the directories to delete.
+        """
+
+        # Connect to the database.
+        with self._db_context.get_connection_provider() as connection:
+            cursor = connection.cursor
+
+            # Delete the directories.
+            cursor.executemany('DELETE FROM journal_directory WHERE path=?', [(path,) for path in paths])
+
+            # Commit.
+            connection.commit()
@@ -0,0 +1,33 @@
+from dal.datahandler import DataHandler
+from dal.journal.journaldatacreator import JournalDataCreator
+from dal.journal.journaldatadeleter import JournalDataDeleter
+from dal.journal.journaldataretriever import JournalDataRetriever
+
+class JournalDataHandler(DataHandler):
+    """
+    Accesses the change journal stored in the media database. The journal records the state of the enumerated
+    directories, so synchronization can skip the directories that have not changed.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, db_context):
+
+        ### Call base class constructor.
+        super(JournalDataHandler, self).__init__(db_context)
+
+        ### Private attributes.
+        self._retriever = JournalDataRetriever(self._db_context, None)
+        self._creator = JournalDataCreator(self._db_context)
+        self._deleter = JournalDataDeleter(self._db_context)
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def clear_cache(self):
+
+        # Nothing is cached.
+        pass
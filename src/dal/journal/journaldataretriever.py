@@ -0,0 +1,56 @@
+import json
+
+from dal.retriever import Retriever
+
+class JournalDataRetriever(Retriever):
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def retrieve_directories(self):
+        """
+        Retrieves the modification time of all the directories of the journal. The files of the directories are not
+        retrieved, because they are needed only for the directories that have changed.
+
+        Returns
+        -------
+        A dictionary that stores path (string) => mtime (int) pairs.
+        """
+
+        # Connect to the database.
+        with self._db_context.get_read_connection_provider() as connection:
+            cursor = connection.cursor
+
+            # Get table contents.
+            cursor.execute('SELECT path, mtime FROM journal_directory')
+            result = dict(cursor.fetchall())
+
+            return result
+
+    def retrieve_files(self, path):
+        """
+        Retrieves the files of the given directory of the journal.
+
+        Parameters
+        ----------
+        path : str
+            The path of the directory.
+
+        Returns
+        -------
+        The files as [name, size, mtime, inode] lists, or an empty list if the directory is not in the journal.
+        """
+
+        # Connect to the database.
+        with self._db_context.get_read_connection_provider() as connection:
+            cursor = connection.cursor
+
+            # Get the files.
+            cursor.execute('SELECT files FROM journal_directory WHERE path=? LIMIT 1', (path,))
+            row = cursor.fetchone()
+
+            if row is None:
+                return []
+
+            return json.loads(row[0])
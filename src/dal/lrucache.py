@@ -0,0 +1,121 @@
+import threading
+
+from collections import OrderedDict
+
+from dal.cachemetrics import CacheMetrics
+
+class LruCache:
+    """
+    A thread-safe key-value cache of bounded size. When it is full, the least recently used item is evicted. The number
+    of hits, misses and evictions is counted.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, max_size, on_evict=None):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        max_size : int
+            The maximum number of items stored.
+        on_evict : callable
+            Called with the key and the value of each evicted item while the cache is locked. Optional.
+        """
+
+        ### Validate parameters.
+        if max_size is None or max_size < 1:
+            raise Exception('max_size has to be a positive number.')
+
+        ### Attributes from outside.
+        self._max_size = max_size
+        self._on_evict = on_evict
+
+        ### Private attributes.
+        # The number of items evicted because the cache was full.
+        self._eviction_count = 0
+        # The number of lookups that have found an item.
+        self._hit_count = 0
+        # The stored items in the order of their last use, the least recently used first.
+        self._items = OrderedDict()
+        # This lock is used for synchronizing the items and the counters.
+        self._lock = threading.Lock()
+        # The number of lookups that have not found an item.
+        self._miss_count = 0
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def metrics(self):
+        """
+        Gets a snapshot of the usage statistics.
+        """
+        with self._lock:
+            return CacheMetrics(
+                len(self._items),
+                self._max_size,
+                self._hit_count,
+                self._miss_count,
+                self._eviction_count)
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def clear(self):
+
+        with self._lock:
+            self._items.clear()
+
+    def get(self, key):
+        """
+        Retrieves the value stored for the given key and marks it as recently used.
+
+        Returns
+        -------
+        The value or None if the key is not stored.
+        """
+
+        return self.get_first([key])
+
+    def get_first(self, keys):
+        """
+        Retrieves the value stored for the first stored key of the given keys. Counts as a single lookup.
+
+        Returns
+        -------
+        The value or None if none of the keys is stored.
+        """
+
+        with self._lock:
+            for key in keys:
+                if key in self._items:
+                    self._items.move_to_end(key)
+                    self._hit_count += 1
+                    return self._items[key]
+            self._miss_count += 1
+
+        return None
+
+    def set(self, key, value):
+        """
+        Stores the given value, and evicts the least recently used item if the cache is full. None values are not
+        stored, because they cannot be told from misses.
+        """
+
+        if key is None or value is None:
+            return
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_size:
+                evicted_key, evicted_value = self._items.popitem(last=False)
+                self._eviction_count += 1
+                if self._on_evict is not None:
+                    self._on_evict(evicted_key, evicted_value)
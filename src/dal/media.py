@@ -4,7 +4,9 @@ Media DAL accessor.
 
 from dal.audio.audiodatahandler import AudioDataHandler
 from dal.context.dbcontext import DbContext
+from dal.context.dbsettings import DbSettings
 from dal.image.imagedatahandler import ImageDataHandler
+from dal.journal.journaldatahandler import JournalDataHandler
 from dal.video.videodatahandler import VideoDataHandler
 
 class MediaDataHandler:
@@ -20,11 +22,13 @@ class MediaDataHandler:
             self,
             audio_data_handler: AudioDataHandler,
             image_data_handler: ImageDataHandler,
-            video_data_handler: VideoDataHandler):
+            video_data_handler: VideoDataHandler,
+            journal_data_handler: JournalDataHandler):
 
         self._audio_data_handler = audio_data_handler
         self._image_data_handler = image_data_handler
         self._video_data_handler = video_data_handler
+        self._journal_data_handler = journal_data_handler
 
     ####################################################################################################################
     # Properties.
@@ -38,21 +42,45 @@ class MediaDataHandler:
     def image_data_handler(self) -> ImageDataHandler:
         return self._image_data_handler
 
+    @property
+    def journal_data_handler(self) -> JournalDataHandler:
+        return self._journal_data_handler
+
     @property
     def video_data_handler(self) -> VideoDataHandler:
         return self._video_data_handler
 
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def preload_caches(self) -> int:
+        """
+        Loads the frequently looked up IDs of each media category into the caches.
+
+        Returns
+        -------
+        The number of loaded entries.
+        """
+
+        entry_count = 0
+        for data_handler in [self._audio_data_handler, self._image_data_handler, self._video_data_handler]:
+            entry_count += data_handler.preload_cache()
+
+        return entry_count
+
 class MediaDataHandlerFactory:
 
     @staticmethod
-    def create(database_path: str) -> MediaDataHandler:
+    def create(database_path: str, db_settings: DbSettings = None) -> MediaDataHandler:
 
-        media_db_context = DbContext(database_path)
+        media_db_context = DbContext(database_path, db_settings)
 
         audio_dal = AudioDataHandler(media_db_context)
         image_dal = ImageDataHandler(media_db_context)
         video_dal = VideoDataHandler(media_db_context)
+        journal_dal = JournalDataHandler(media_db_context)
 
-        media_dal = MediaDataHandler(audio_dal, image_dal, video_dal)
+        media_dal = MediaDataHandler(audio_dal, image_dal, video_dal, journal_dal)
 
         return media_dal
@@ -0,0 +1,36 @@
+class Page:
+    """
+    Stores a page of a listing.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, items, next_cursor):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        items : list of dict
+            The items on the page.
+        next_cursor : str
+            The cursor of the next page, None if this is the last page.
+        """
+
+        ### Attributes from outside.
+        self._items = items
+        self._next_cursor = next_cursor
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def items(self):
+        return self._items
+
+    @property
+    def next_cursor(self):
+        return self._next_cursor
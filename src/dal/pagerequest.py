@@ -0,0 +1,19 @@
+class PageRequest:
+    """
+    Describes the part of a listing to retrieve. Listings are paged by their sort keys (keyset pagination), so
+    retrieving a page costs the same regardless of how far it is from the beginning.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self):
+
+        ### Public attributes.
+        # The sort key values of the last item of the previous page, None for the first page.
+        self.after = None
+        # The keys of the items to return, None for all of them.
+        self.fields = None
+        # The maximum number of items on the page, None for all of them.
+        self.limit = None
@@ -1,3 +1,7 @@
+from dal.functions import build_full_text_query, build_result_dictionary, encode_cursor
+from dal.page import Page
+from dal.pagerequest import PageRequest
+
 class Retriever:
 
     ####################################################################################################################
@@ -24,10 +28,80 @@ class Retriever:
     # Auxiliary methods.
     ####################################################################################################################
 
+    def _build_keyset_condition(self, sort_columns, values, query_parameters):
+        """
+        Builds the condition of the items following the given sort key values. Row values are not used, so that older
+        SQLite versions are supported as well. NULL values are sorted first by SQLite, IS compares them as equal.
+        """
+
+        conditions = []
+
+        for index, sort_column in enumerate(sort_columns):
+            query_parameters['after_' + str(index)] = values[index]
+            comparisons = ['{} IS :after_{}'.format(sort_columns[i], i) for i in range(0, index)]
+            if values[index] is None:
+                comparisons.append(sort_column + ' IS NOT NULL')
+            else:
+                comparisons.append('{}>:after_{}'.format(sort_column, index))
+            conditions.append('(' + ' AND '.join(comparisons) + ')')
+
+        return '(' + ' OR '.join(conditions) + ')'
+
+    def _build_listing_query(self, query_parts, query_parameters, page_request):
+        """
+        Builds a listing query, restricted to the requested page and fields if a page request is given.
+
+        Parameters
+        ----------
+        query_parts : dict
+            The parts of the query: 'columns' is the list of the (key, expression) pairs of the available fields,
+            'sort_columns' is the list of the expressions the items are ordered by (the last one has to be unique),
+            'from' is the FROM clause and 'where' is the (possibly empty) WHERE clause.
+        query_parameters : dict
+            The named parameters of the query, extended with the parameters of the page.
+        page_request : PageRequest
+            The page to retrieve, None for the whole listing.
+
+        Returns
+        -------
+        The query and the keys of the selected fields. The sort columns are selected after the fields.
+        """
+
+        columns = query_parts['columns']
+        sort_columns = query_parts['sort_columns']
+        where_clause = query_parts['where']
+
+        if page_request is not None and page_request.fields is not None:
+            available_keys = [key for key, _ in columns]
+            for key in page_request.fields:
+                if key not in available_keys:
+                    raise Exception('Unknown field: ' + key + '.')
+            columns = [(key, expression) for key, expression in columns if key in page_request.fields]
+
+        # The sort columns are selected as well for building the cursor of the next page.
+        selected_expressions = [expression for _, expression in columns] + sort_columns
+        limit_clause = ''
+
+        if page_request is not None and page_request.after is not None:
+            if len(page_request.after) != len(sort_columns):
+                raise Exception('The cursor does not belong to this listing.')
+            keyset_condition = self._build_keyset_condition(sort_columns, page_request.after, query_parameters)
+            where_clause = (where_clause + 'AND ' if where_clause else 'WHERE ') + keyset_condition + ' '
+
+        # One more row is queried for telling whether there is a next page.
+        if page_request is not None and page_request.limit is not None:
+            limit_clause = 'LIMIT :page_limit'
+            query_parameters['page_limit'] = page_request.limit + 1
+
+        query = 'SELECT ' + ', '.join(selected_expressions) + ' ' + query_parts['from'] + where_clause \
+            + 'ORDER BY ' + ', '.join(sort_columns) + ' ' + limit_clause
+
+        return query, [key for key, _ in columns]
+
     def _execute_file_data_query(self, file_id, query):
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Get table contents.
@@ -41,11 +115,125 @@ class Retriever:
 
             return title, path
 
+    def _execute_page_query(self, cursor, query_parts, query_parameters, page_request):
+        """
+        Executes a listing query built by _build_listing_query.
+
+        Returns
+        -------
+        A list of dictionaries containing values by the keys of the fields if page_request is None, otherwise a Page.
+        """
+
+        query, keys = self._build_listing_query(query_parts, query_parameters, page_request)
+        cursor.execute(query, query_parameters)
+        rows = cursor.fetchall()
+
+        next_cursor = None
+        if page_request is not None and page_request.limit is not None and len(rows) > page_request.limit:
+            rows = rows[:page_request.limit]
+            next_cursor = encode_cursor(list(rows[-1][len(keys):]))
+
+        items = [dict(zip(keys, row)) for row in rows]
+
+        if page_request is None:
+            return items
+
+        return Page(items, next_cursor)
+
+    def _has_search_index(self, cursor, table_name):
+        """
+        Tells whether the full-text index of the given table exists. It is missing if SQLite does not support FTS5.
+        """
+
+        cursor.execute(
+            'SELECT name FROM sqlite_master WHERE type=\'table\' AND name=? LIMIT 1',
+            (table_name + '_search',))
+
+        return cursor.fetchone() is not None
+
+    def _iterate_listing(self, query_parts, query_parameters, page_request, batch_size=1000):
+        """
+        Executes a listing query built by _build_listing_query and yields its items one by one. The items are retrieved
+        in keyset batches and the read connection is released between the batches, so a slow consumer does not keep a
+        pooled connection (or the replacement of the database) waiting. Each batch is read in its own transaction.
+        """
+
+        batch_request = PageRequest()
+        remaining_count = None
+        if page_request is not None:
+            batch_request.after = page_request.after
+            batch_request.fields = page_request.fields
+            remaining_count = page_request.limit
+
+        while remaining_count is None or remaining_count > 0:
+            batch_request.limit = batch_size if remaining_count is None else min(batch_size, remaining_count)
+            batch_parameters = dict(query_parameters)
+            query, keys = self._build_listing_query(query_parts, batch_parameters, batch_request)
+
+            # Connect to the database.
+            with self._db_context.get_read_connection_provider() as connection:
+                cursor = connection.cursor
+
+                # Fetch the batch and one more row for telling whether there are further items.
+                cursor.execute(query, batch_parameters)
+                rows = cursor.fetchall()
+
+            for row in rows[:batch_request.limit]:
+                yield dict(zip(keys, row))
+
+            if len(rows) <= batch_request.limit:
+                return
+            batch_request.after = list(rows[batch_request.limit - 1][len(keys):])
+            if remaining_count is not None:
+                remaining_count -= batch_request.limit
+
+    def _iterate_paths(self, table_name, where_clause='', query_parameters=None):
+        """
+        Yields the IDs and the paths of the files stored in the given table in batches, see _iterate_listing.
+        """
+
+        query_parts = {
+            'columns' : [('id', 'id'), ('path', 'path')],
+            'sort_columns' : ['id'],
+            'from' : 'FROM ' + table_name + ' ',
+            'where' : where_clause}
+
+        return self._iterate_listing(query_parts, query_parameters or {}, None)
+
+    def _preload_cache(self, queries):
+        """
+        Stores the results of the given queries in the cache in a single read transaction.
+
+        Parameters
+        ----------
+        queries : list of tuple
+            (query, setter) pairs. Each query selects (key, ID) rows and has a parameter for the maximum number of rows,
+            each row is passed to the setter of the corresponding cache.
+
+        Returns
+        -------
+        The number of stored entries.
+        """
+
+        entry_count = 0
+
+        # Connect to the database.
+        with self._db_context.get_read_connection_provider() as connection:
+            cursor = connection.cursor
+
+            # Store the rows in the cache. More rows than the size of the cache would only evict each other.
+            for query, setter in queries:
+                cursor.execute(query, (self._cache.max_size,))
+                for key, value_id in cursor.fetchall():
+                    setter(key, value_id)
+                    entry_count += 1
+
+        return entry_count
 
     def _retrieve_count(self, table_name):
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Build and execute the query.
@@ -60,7 +248,7 @@ class Retriever:
     def _retrieve_single_value_from_db(self, query, value):
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Try to get the corresponding ID from the database.
@@ -71,3 +259,52 @@ class Retriever:
             value_id = row[0]
 
             return value_id
+
+    def _search(self, table_name, keys, column_name, text):
+        """
+        Searches the given table for rows whose text column contains the words of the given text (as words or as
+        prefixes of words) by its full-text index. Falls back to substring matching if there is no index.
+
+        Parameters
+        ----------
+        table_name : str
+            The name of the table to search.
+        keys : list of str
+            The columns to return.
+        column_name : str
+            The name of the searched text column.
+        text : str
+            The search text.
+
+        Returns
+        -------
+        A list of dictionaries containing values by the given keys, the best matches first.
+        """
+
+        columns = ', '.join('t.' + key for key in keys)
+
+        # Connect to the database.
+        with self._db_context.get_read_connection_provider() as connection:
+            cursor = connection.cursor
+
+            if self._has_search_index(cursor, table_name):
+                full_text_query = build_full_text_query(text)
+                if full_text_query is None:
+                    return []
+                cursor.execute(
+                    'SELECT ' + columns + ' '
+                    'FROM (SELECT rowid, rank FROM ' + table_name + '_search '
+                    'WHERE ' + table_name + '_search MATCH ?) AS s, ' + table_name + ' AS t '
+                    'WHERE t.id=s.rowid '
+                    'ORDER BY s.rank',
+                    (full_text_query,))
+            else:
+                cursor.execute(
+                    'SELECT ' + columns + ' FROM ' + table_name + ' AS t '
+                    'WHERE t.' + column_name + ' LIKE ? '
+                    'ORDER BY t.' + column_name,
+                    ('%' + text + '%',))
+
+            result = build_result_dictionary(cursor, keys)
+
+            return result
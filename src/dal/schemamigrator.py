@@ -0,0 +1,79 @@
+class SchemaMigrator:
+    """
+    Upgrades the tables of a media category to the latest schema version in place. The version of each category is
+    stored in the schema_version table, databases created before versioning are considered to be of version 0.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, db_context, schema_name, migrations):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        db_context : DbContext
+            The database context to work with.
+        schema_name : str
+            The name of the category the tables of which are versioned.
+        migrations : list of list of str
+            The SQL statements that upgrade the schema, the ith list upgrades version i to version i + 1. The statements
+            have to be idempotent, because a migration interrupted by a crash is executed again.
+        """
+
+        ### Validate parameters.
+        if db_context is None:
+            raise Exception('db_context cannot be None.')
+        if schema_name is None:
+            raise Exception('schema_name cannot be None.')
+        if migrations is None:
+            raise Exception('migrations cannot be None.')
+
+        ### Attributes from outside.
+        self._db_context = db_context
+        self._schema_name = schema_name
+        self._migrations = migrations
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def latest_version(self):
+        return len(self._migrations)
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def migrate(self):
+        """
+        Executes the migrations that have not been applied to the database yet. Each of them is committed separately,
+        so readers are blocked only while a single index is being built.
+
+        Returns
+        -------
+        The number of executed migrations.
+        """
+
+        with self._db_context.get_connection_provider() as connection:
+            cursor = connection.cursor
+            cursor.execute(
+                'CREATE TABLE IF NOT EXISTS schema_version ('
+                'name VARCHAR(255) PRIMARY KEY,'
+                'version INTEGER)')
+            cursor.execute('SELECT version FROM schema_version WHERE name=? LIMIT 1', (self._schema_name,))
+            row = cursor.fetchone()
+            current_version = row[0] if row is not None else 0
+
+            for version in range(current_version, self.latest_version):
+                for statement in self._migrations[version]:
+                    cursor.execute(statement)
+                cursor.execute(
+                    'INSERT OR REPLACE INTO schema_version (name, version) VALUES (?, ?)',
+                    (self._schema_name, version + 1))
+                connection.commit(True)
+
+        return max(self.latest_version - current_version, 0)
@@ -8,21 +8,23 @@ class VideoDataCache(Cache):
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self):
+    def __init__(self, max_size=None):
+
+        ### Call base class constructor.
+        super(VideoDataCache, self).__init__(max_size)
 
         ### Private attributes.
         # A cache that contains language IDs as language (string) => id (int) pairs.
-        self._language_cache = {}
-        # This lock is used for language cache synchronization.
-        self._language_cache_lock = threading.Lock()
+        self._language_cache = self._create_cache('video languages')
         # A cache that contains qualities as quality (string) => id (int) pairs.
-        self._quality_cache = {}
-        # This lock is used for quality cache synchronization.
-        self._quality_cache_lock = threading.Lock()
-        # A cache that contains titles as title (string) => id (int) pairs.
-        self._title_cache = {}
-        # This lock is used for title cache synchronization.
-        self._title_cache_lock = threading.Lock()
+        self._quality_cache = self._create_cache('video qualities')
+        # A cache that contains titles as (parent id (int), title (string)) => id (int) pairs.
+        self._title_cache = self._create_cache('video titles', self._on_title_evicted)
+        # Indexes the title cache by title as title (string) => parent ids (set of int) pairs, so that a title can be
+        # looked up under any parent without scanning the cache.
+        self._title_index = {}
+        # This lock is used for title index synchronization.
+        self._title_index_lock = threading.Lock()
 
     ####################################################################################################################
     # Public methods.
@@ -30,50 +32,58 @@ class VideoDataCache(Cache):
 
     def clear(self):
 
-        with self._language_cache_lock:
-            self._language_cache = {}
-        with self._quality_cache_lock:
-            self._quality_cache = {}
-        with self._title_cache_lock:
-            self._title_cache = {}
+        super(VideoDataCache, self).clear()
+        with self._title_index_lock:
+            self._title_index = {}
 
     def get_language_id(self, language):
 
-        return self._get_value_from_simple_cache(self._language_cache, self._language_cache_lock, language)
+        return self._language_cache.get(language)
 
     def get_quality_id(self, quality):
 
-        return self._get_value_from_simple_cache(self._quality_cache, self._quality_cache_lock, quality)
+        return self._quality_cache.get(quality)
 
     def get_title_id(self, title, parent_id=0):
 
-        with self._title_cache_lock:
-            if (parent_id in self._title_cache) and (title in self._title_cache[parent_id]):
-                return self._title_cache[parent_id][title]
-
-        return None
+        return self._title_cache.get((parent_id, title))
 
     def get_title_id_from_other_parents(self, title, parent_id):
 
-        with self._title_cache_lock:
-            for parent, titles in self._title_cache.items():
-                if (parent != parent_id) and (title in titles):
-                    return titles[title]
+        with self._title_index_lock:
+            other_parent_ids = [p for p in self._title_index.get(title, []) if p != parent_id]
 
-        return None
+        return self._title_cache.get_first([(other_parent_id, title) for other_parent_id in other_parent_ids])
 
     def set_language_id(self, language, language_id):
 
-        self._store_item_in_simple_cache(self._language_cache, self._language_cache_lock, language, language_id)
+        self._language_cache.set(language, language_id)
 
     def set_quality_id(self, quality, quality_id):
 
-        self._store_item_in_simple_cache(self._quality_cache, self._quality_cache_lock, quality, quality_id)
+        self._quality_cache.set(quality, quality_id)
 
     def set_title_id(self, title, title_id, parent_id=0):
 
-        if title is not None:
-            with self._title_cache_lock:
-                if parent_id not in self._title_cache:
-                    self._title_cache[parent_id] = {}
-                self._title_cache[parent_id][title] = title_id
+        if title is None or title_id is None:
+            return
+
+        # The title is indexed first, so that an index entry exists for each cached title even if another thread
+        # evicts it in the meantime.
+        with self._title_index_lock:
+            self._title_index.setdefault(title, set()).add(parent_id)
+        self._title_cache.set((parent_id, title), title_id)
+
+    ####################################################################################################################
+    # Private methods.
+    ####################################################################################################################
+
+    def _on_title_evicted(self, key, _):
+
+        parent_id, title = key
+        with self._title_index_lock:
+            parent_ids = self._title_index.get(title)
+            if parent_ids is not None:
+                parent_ids.discard(parent_id)
+                if not parent_ids:
+                    del self._title_index[title]
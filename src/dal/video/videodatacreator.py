@@ -1,8 +1,87 @@
 from dal.constants import DAL_UNCATEGORIZED
 from dal.creator import Creator
+from dal.functions import build_search_index_statements
 
 class VideoDataCreator(Creator):
 
+    ####################################################################################################################
+    # Static attributes.
+    ####################################################################################################################
+
+    SCHEMA_MIGRATIONS = [
+        # Version 1: indices for the lookups, listings and deletions.
+        [
+            'CREATE INDEX IF NOT EXISTS video_title_parent_title ON video_title(id_parent, title)',
+            'CREATE INDEX IF NOT EXISTS video_title_title_parent ON video_title(title, id_parent)',
+            'CREATE INDEX IF NOT EXISTS video_file_title_quality ON video_file(id_title, id_quality)',
+            'CREATE INDEX IF NOT EXISTS video_file_language_mapping_file_language '
+            'ON video_file_language_mapping(id_file, id_language)',
+            'CREATE INDEX IF NOT EXISTS video_subtitle_file_language ON video_subtitle(id_file, id_language)',
+            'CREATE INDEX IF NOT EXISTS video_title_language_mapping_title_language '
+            'ON video_title_language_mapping(id_title, id_language)',
+            'CREATE INDEX IF NOT EXISTS video_title_language_mapping_language_title '
+            'ON video_title_language_mapping(id_language, id_title)',
+            'CREATE INDEX IF NOT EXISTS video_title_quality_mapping_title_quality '
+            'ON video_title_quality_mapping(id_title, id_quality)',
+            'CREATE INDEX IF NOT EXISTS video_title_quality_mapping_quality_title '
+            'ON video_title_quality_mapping(id_quality, id_title)',
+            'CREATE INDEX IF NOT EXISTS video_title_subtitle_language_mapping_title_language '
+            'ON video_title_subtitle_language_mapping(id_title, id_language)',
+            'CREATE INDEX IF NOT EXISTS video_title_subtitle_language_mapping_language_title '
+            'ON video_title_subtitle_language_mapping(id_language, id_title)'],
+        # Version 2: each mapping is stored only once.
+        [
+            'DELETE FROM video_file_language_mapping '
+            'WHERE id NOT IN (SELECT MIN(id) FROM video_file_language_mapping GROUP BY id_file, id_language)',
+            'DROP INDEX IF EXISTS video_file_language_mapping_file_language',
+            'CREATE UNIQUE INDEX IF NOT EXISTS video_file_language_mapping_file_language '
+            'ON video_file_language_mapping(id_file, id_language)',
+            'DELETE FROM video_title_language_mapping '
+            'WHERE id NOT IN (SELECT MIN(id) FROM video_title_language_mapping GROUP BY id_title, id_language)',
+            'DROP INDEX IF EXISTS video_title_language_mapping_title_language',
+            'CREATE UNIQUE INDEX IF NOT EXISTS video_title_language_mapping_title_language '
+            'ON video_title_language_mapping(id_title, id_language)',
+            'DELETE FROM video_title_quality_mapping '
+            'WHERE id NOT IN (SELECT MIN(id) FROM video_title_quality_mapping GROUP BY id_title, id_quality)',
+            'DROP INDEX IF EXISTS video_title_quality_mapping_title_quality',
+            'CREATE UNIQUE INDEX IF NOT EXISTS video_title_quality_mapping_title_quality '
+            'ON video_title_quality_mapping(id_title, id_quality)',
+            'DELETE FROM video_title_subtitle_language_mapping '
+            'WHERE id NOT IN ('
+            'SELECT MIN(id) FROM video_title_subtitle_language_mapping GROUP BY id_title, id_language)',
+            'DROP INDEX IF EXISTS video_title_subtitle_language_mapping_title_language',
+            'CREATE UNIQUE INDEX IF NOT EXISTS video_title_subtitle_language_mapping_title_language '
+            'ON video_title_subtitle_language_mapping(id_title, id_language)'],
+        # Version 3: closure table of the title hierarchy (a row for each title and each of its ancestors including
+        # itself), kept up to date by triggers, so that subtrees and ancestor chains can be queried at once.
+        [
+            'CREATE TABLE IF NOT EXISTS video_title_closure ('
+            'id_ancestor INTEGER,'
+            'id_descendant INTEGER,'
+            'depth INTEGER,'
+            'PRIMARY KEY(id_ancestor, id_descendant)) WITHOUT ROWID',
+            'CREATE INDEX IF NOT EXISTS video_title_closure_descendant_depth '
+            'ON video_title_closure(id_descendant, depth)',
+            'CREATE TRIGGER IF NOT EXISTS video_title_closure_insert AFTER INSERT ON video_title BEGIN '
+            'INSERT INTO video_title_closure (id_ancestor, id_descendant, depth) '
+            'SELECT id_ancestor, new.id, depth + 1 FROM video_title_closure WHERE id_descendant=new.id_parent '
+            'UNION ALL SELECT new.id, new.id, 0; '
+            'END',
+            'CREATE TRIGGER IF NOT EXISTS video_title_closure_delete AFTER DELETE ON video_title BEGIN '
+            'DELETE FROM video_title_closure WHERE id_descendant=old.id OR id_ancestor=old.id; '
+            'END',
+            # Adds the titles stored before the table was created.
+            'WITH RECURSIVE c(id_ancestor, id_descendant, depth) AS ('
+            'SELECT id, id, 0 FROM video_title '
+            'UNION ALL '
+            'SELECT c.id_ancestor, t.id, c.depth + 1 FROM c, video_title AS t WHERE t.id_parent=c.id_descendant) '
+            'INSERT OR IGNORE INTO video_title_closure (id_ancestor, id_descendant, depth) '
+            'SELECT id_ancestor, id_descendant, depth FROM c']]
+    SCHEMA_NAME = 'video'
+    SEARCH_SCHEMA_MIGRATIONS = [
+        # Version 1: full-text index of the titles.
+        build_search_index_statements('video_title', 'title')]
+
     ####################################################################################################################
     # Public methods -- create.
     ####################################################################################################################
@@ -79,6 +158,9 @@ class VideoDataCreator(Creator):
                 'FOREIGN KEY(id_title) REFERENCES video_title(id),'
                 'FOREIGN KEY(id_language) REFERENCES video_language(id))')
 
+        # Create indices.
+        self.upgrade_db()
+
         # Fill DB with initial data.
         self._inflate_db()
 
@@ -104,6 +186,13 @@ class VideoDataCreator(Creator):
         The ID of the inserted file.
         """
 
+        # Buffer the file if bulk insert is in progress.
+        if self._bulk_insert_buffer is not None:
+            return self._bulk_insert_buffer.add(
+                'video_file',
+                ('id_title', 'id_quality', 'path'),
+                (title_id, quality_id, path))
+
         # Connect to the database.
         with self._db_context.get_connection_provider() as connection:
             cursor = connection.cursor
@@ -113,6 +202,7 @@ class VideoDataCreator(Creator):
                 'INSERT INTO video_file (id_title, id_quality, path) VALUES (?, ?, ?)',
                 (title_id, quality_id, path))
             path_id = cursor.lastrowid
+            self._count_inserted_rows(cursor.rowcount)
 
             # Commit.
             connection.commit()
@@ -132,18 +222,27 @@ class VideoDataCreator(Creator):
 
         Returns
         -------
-        The ID of the inserted mapping.
+        The ID of the inserted mapping, or None if the mapping is already stored.
         """
 
+        # Buffer the mapping if bulk insert is in progress.
+        if self._bulk_insert_buffer is not None:
+            return self._bulk_insert_buffer.add(
+                'video_file_language_mapping',
+                ('id_file', 'id_language'),
+                (file_id, language_id),
+                True)
+
         # Connect to the database.
         with self._db_context.get_connection_provider() as connection:
             cursor = connection.cursor
 
             # Insert the mapping into the database.
             cursor.execute(
-                'INSERT INTO video_file_language_mapping (id_file, id_language) VALUES (?, ?)',
+                'INSERT OR IGNORE INTO video_file_language_mapping (id_file, id_language) VALUES (?, ?)',
                 (file_id, language_id))
-            mapping_id = cursor.lastrowid
+            mapping_id = cursor.lastrowid if cursor.rowcount > 0 else None
+            self._count_inserted_rows(cursor.rowcount)
 
             # Commit.
             connection.commit()
@@ -240,6 +339,13 @@ class VideoDataCreator(Creator):
         The ID of the inserted subtitle.
         """
 
+        # Buffer the subtitle if bulk insert is in progress.
+        if self._bulk_insert_buffer is not None:
+            return self._bulk_insert_buffer.add(
+                'video_subtitle',
+                ('id_file', 'id_language', 'path'),
+                (file_id, language_id, path))
+
         # Connect to the database.
         with self._db_context.get_connection_provider() as connection:
             cursor = connection.cursor
@@ -249,6 +355,7 @@ class VideoDataCreator(Creator):
                 'INSERT INTO video_subtitle (id_file, id_language, path) VALUES (?, ?, ?)',
                 (file_id, language_id, path))
             subtitle_id = cursor.lastrowid
+            self._count_inserted_rows(cursor.rowcount)
 
             # Commit.
             connection.commit()
@@ -309,18 +416,27 @@ class VideoDataCreator(Creator):
 
         Returns
         -------
-        The ID of the inserted mapping.
+        The ID of the inserted mapping, or None if the mapping is already stored.
         """
 
+        # Buffer the mapping if bulk insert is in progress.
+        if self._bulk_insert_buffer is not None:
+            return self._bulk_insert_buffer.add(
+                'video_title_language_mapping',
+                ('id_title', 'id_language'),
+                (title_id, language_id),
+                True)
+
         # Connect to the database.
         with self._db_context.get_connection_provider() as connection:
             cursor = connection.cursor
 
             # Insert the mapping into the database.
             cursor.execute(
-                'INSERT INTO video_title_language_mapping (id_title, id_language) VALUES (?, ?)',
+                'INSERT OR IGNORE INTO video_title_language_mapping (id_title, id_language) VALUES (?, ?)',
                 (title_id, language_id))
-            mapping_id = cursor.lastrowid
+            mapping_id = cursor.lastrowid if cursor.rowcount > 0 else None
+            self._count_inserted_rows(cursor.rowcount)
 
             # Commit.
             connection.commit()
@@ -340,18 +456,27 @@ class VideoDataCreator(Creator):
 
         Returns
         -------
-        The ID of the inserted mapping.
+        The ID of the inserted mapping, or None if the mapping is already stored.
         """
 
+        # Buffer the mapping if bulk insert is in progress.
+        if self._bulk_insert_buffer is not None:
+            return self._bulk_insert_buffer.add(
+                'video_title_quality_mapping',
+                ('id_title', 'id_quality'),
+                (title_id, quality_id),
+                True)
+
         # Connect to the database.
         with self._db_context.get_connection_provider() as connection:
             cursor = connection.cursor
 
             # Insert the mapping into the database.
             cursor.execute(
-                'INSERT INTO video_title_quality_mapping (id_title, id_quality) VALUES (?, ?)',
+                'INSERT OR IGNORE INTO video_title_quality_mapping (id_title, id_quality) VALUES (?, ?)',
                 (title_id, quality_id))
-            mapping_id = cursor.lastrowid
+            mapping_id = cursor.lastrowid if cursor.rowcount > 0 else None
+            self._count_inserted_rows(cursor.rowcount)
 
             # Commit.
             connection.commit()
@@ -371,18 +496,27 @@ class VideoDataCreator(Creator):
 
         Returns
         -------
-        The ID of the inserted mapping.
+        The ID of the inserted mapping, or None if the mapping is already stored.
         """
 
+        # Buffer the mapping if bulk insert is in progress.
+        if self._bulk_insert_buffer is not None:
+            return self._bulk_insert_buffer.add(
+                'video_title_subtitle_language_mapping',
+                ('id_title', 'id_language'),
+                (title_id, language_id),
+                True)
+
         # Connect to the database.
         with self._db_context.get_connection_provider() as connection:
             cursor = connection.cursor
 
             # Insert the mapping into the database.
             cursor.execute(
-                'INSERT INTO video_title_subtitle_language_mapping (id_title, id_language) VALUES (?, ?)',
+                'INSERT OR IGNORE INTO video_title_subtitle_language_mapping (id_title, id_language) VALUES (?, ?)',
                 (title_id, language_id))
-            mapping_id = cursor.lastrowid
+            mapping_id = cursor.lastrowid if cursor.rowcount > 0 else None
+            self._count_inserted_rows(cursor.rowcount)
 
             # Commit.
             connection.commit()
@@ -1,6 +1,13 @@
+from dal.constants import DAL_UNCATEGORIZED
 from dal.deleter import Deleter
 
 class VideoDataDeleter(Deleter):
+    """
+    Deletes video files and subtitles along with the titles and the mappings that become obsolete. The IDs to delete
+    and the affected titles and mappings are collected in a temporary table, and the title hierarchy is looked up in the
+    video_title_closure table, so the number of executed statements depends neither on the number of deleted files,
+    nor on the depth or the size of the affected subtrees.
+    """
 
     ####################################################################################################################
     # Public methods.
@@ -8,276 +15,176 @@ class VideoDataDeleter(Deleter):
 
     def delete_subtitle_path(self, subtitle_id):
 
-        # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
-            cursor = connection.cursor
-
-            # Get the language and the title for the specified subtitle.
-            cursor.execute(
-                'SELECT s.id_language, f.id_title '
-                'FROM video_subtitle AS s LEFT OUTER JOIN video_file AS f ON f.id=s.id_file '
-                'WHERE s.id=? '
-                'LIMIT 1',
-                (subtitle_id,))
-            row = cursor.fetchone()
-            language_id, title_id = 0, None
-            if row is not None:
-                language_id, title_id = row[0], row[1]
+        self.delete_subtitle_paths([subtitle_id])
 
-            # Delete the subtitle entry.
-            cursor.execute('DELETE FROM video_subtitle WHERE id=?', (subtitle_id,))
+    def delete_subtitle_paths(self, subtitle_ids):
+        """
+        Deletes the given subtitles and the title - subtitle language mappings that become obsolete in a single
+        transaction.
 
-            # If the corresponding file is not deleted from the database yet, then remove the obsolete title - subtitle
-            # language mappings.
-            if title_id is not None:
-                self._delete_sl_mappings_recursively(cursor, title_id, language_id)
+        Parameters
+        ----------
+        subtitle_ids : list of int
+            The IDs of the subtitles.
+        """
 
-            # Commit.
-            connection.commit()
-
-    def delete_video_path(self, video_id):
+        if not subtitle_ids:
+            return
 
         # Connect to the database.
         with self._db_context.get_connection_provider() as connection:
             cursor = connection.cursor
-
-            # Get the title and the quality of the specified file as well as the number of the other children of this
-            # title.
+            self._begin_bulk_delete(cursor)
+
+            # Collect the subtitles, the titles (with their ancestors) of the corresponding files and the languages of
+            # the subtitles.
+            self._insert_deleted_ids(cursor, 'subtitle', subtitle_ids)
+            self._insert_deleted_ids(
+                cursor,
+                'title',
+                query=self._build_ancestor_query(
+                    'SELECT f.id_title '
+                    'FROM video_subtitle AS s, video_file AS f '
+                    'WHERE s.id IN (SELECT id FROM temp.deleted_id WHERE kind=\'subtitle\') AND f.id=s.id_file'),
+                query_parameters=(DAL_UNCATEGORIZED,))
+            self._insert_deleted_ids(
+                cursor,
+                'subtitle_language',
+                query='SELECT id_language AS id FROM video_subtitle '
+                'WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'subtitle\')')
+
+            # Delete the subtitles and the mappings that are not justified by other subtitles.
             cursor.execute(
-                'SELECT v1.id_title, v1.id_quality, COUNT(v2.id_title) '
-                'FROM video_file AS v1, video_file AS v2 '
-                'WHERE v1.id=? AND v2.id_title=v1.id_title '
-                'LIMIT 1',
-                (video_id,))
-            row = cursor.fetchone()
-            if row is None:
-                return
-            title_id, missing_quality, number_of_files = row[0], row[1], row[2]
+                'DELETE FROM video_subtitle WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'subtitle\')')
+            self._delete_obsolete_mappings(cursor)
 
-            # Get the languages to be removed from mappings.
-            missing_languages = []
-            cursor.execute('SELECT id_language FROM video_file_language_mapping WHERE id_file=?', (video_id,))
-            rows = cursor.fetchall()
-            if rows:
-                missing_languages = [row[0] for row in rows]
+            # Commit.
+            self._clear_deleted_ids(cursor)
+            connection.commit()
 
-            # Delete the specified video file and the corresponding language mappings.
-            cursor.execute('DELETE FROM video_file WHERE id=?', (video_id,))
-            cursor.execute('DELETE FROM video_file_language_mapping WHERE id_file=?', (video_id,))
+    def delete_video_path(self, video_id):
 
-            # If this was the only file stored for this title, we have to delete the title too.
-            if number_of_files == 1:
+        self.delete_video_paths([video_id])
 
-                self._delete_title_recursively(cursor, title_id, missing_languages, missing_quality)
+    def delete_video_paths(self, video_ids):
+        """
+        Deletes the given video files, the titles that are left without files and the mappings that become obsolete in
+        a single transaction.
 
-            else:
+        Parameters
+        ----------
+        video_ids : list of int
+            The IDs of the video files.
+        """
 
-                # If the deleted file was the only one from this quality for this title, then remove the mapping.
-                cursor.execute('SELECT id, id_quality FROM video_file WHERE id_title=?', (title_id,))
-                rows = cursor.fetchall()
-                if rows:
-                    available_qualities = [row[1] for row in rows]
-                    missing_quality = self._delete_unavailable_quality(
-                        cursor, title_id, missing_quality, available_qualities)
+        if not video_ids:
+            return
 
-                # If the deleted file was in a language that no other files are available in for this title, then delete
-                # the corresponding mappings.
+        # Connect to the database.
+        with self._db_context.get_connection_provider() as connection:
+            cursor = connection.cursor
+            self._begin_bulk_delete(cursor)
+
+            # Collect the files, their titles with the ancestors, and the languages, qualities and subtitle languages
+            # the mappings of which may become obsolete.
+            self._insert_deleted_ids(cursor, 'file', video_ids)
+            self._insert_deleted_ids(
+                cursor,
+                'title',
+                query=self._build_ancestor_query(
+                    'SELECT id_title FROM video_file WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'file\')'),
+                query_parameters=(DAL_UNCATEGORIZED,))
+            self._insert_deleted_ids(
+                cursor,
+                'language',
+                query='SELECT id_language AS id FROM video_file_language_mapping '
+                'WHERE id_file IN (SELECT id FROM temp.deleted_id WHERE kind=\'file\')')
+            self._insert_deleted_ids(
+                cursor,
+                'quality',
+                query='SELECT id_quality AS id FROM video_file '
+                'WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'file\')')
+            self._insert_deleted_ids(
+                cursor,
+                'subtitle_language',
+                query='SELECT id_language AS id FROM video_subtitle '
+                'WHERE id_file IN (SELECT id FROM temp.deleted_id WHERE kind=\'file\')')
+
+            # Delete the video files and the corresponding language mappings.
+            cursor.execute('DELETE FROM video_file WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'file\')')
+            cursor.execute(
+                'DELETE FROM video_file_language_mapping '
+                'WHERE id_file IN (SELECT id FROM temp.deleted_id WHERE kind=\'file\')')
+
+            # Delete the affected titles that are left without files, along with the titles under them (which are empty
+            # as well) and their mappings. The closure rows are deleted by a trigger.
+            self._insert_deleted_ids(
+                cursor,
+                'empty_title',
+                query='SELECT c.id_descendant AS id '
+                'FROM video_title_closure AS c '
+                'WHERE c.id_ancestor IN ('
+                'SELECT a.id FROM temp.deleted_id AS a WHERE a.kind=\'title\' AND NOT EXISTS ('
+                'SELECT 1 FROM video_title_closure AS d, video_file AS f '
+                'WHERE d.id_ancestor=a.id AND f.id_title=d.id_descendant))')
+            for table_name in [
+                    'video_title_language_mapping',
+                    'video_title_quality_mapping',
+                    'video_title_subtitle_language_mapping']:
                 cursor.execute(
-                    'SELECT id_language FROM video_file_language_mapping WHERE id_file {}'.format(
-                        self._build_in_clause([row[0] for row in rows])))
-                rows = cursor.fetchall()
-                if rows:
-                    available_languages = [row[0] for row in rows]
-                    missing_languages = self._delete_unavailable_languages(
-                        cursor, title_id, missing_languages, available_languages)
+                    'DELETE FROM ' + table_name + ' '
+                    'WHERE id_title IN (SELECT id FROM temp.deleted_id WHERE kind=\'empty_title\')')
+            cursor.execute(
+                'DELETE FROM video_title WHERE id IN (SELECT id FROM temp.deleted_id WHERE kind=\'empty_title\')')
 
-                self._delete_l_q_mappings_recursively(cursor, title_id, missing_languages, missing_quality)
+            # Remove the mappings of the remaining titles that were justified only by the deleted files.
+            self._delete_obsolete_mappings(cursor)
 
             # Commit.
+            self._clear_deleted_ids(cursor)
             connection.commit()
 
     ####################################################################################################################
     # Auxiliary methods.
     ####################################################################################################################
 
-    def _build_in_clause(self, simple_list):
+    def _build_ancestor_query(self, title_query):
+        """
+        Builds a query that selects the titles returned by the given query and their ancestors, except for the root of
+        the uncategorized titles, which is kept even without files. The query has a parameter for the title of the
+        uncategorized root.
+        """
+
+        return (
+            'SELECT c.id_ancestor AS id '
+            'FROM video_title_closure AS c, video_title AS t '
+            'WHERE c.id_descendant IN (' + title_query + ') AND t.id=c.id_ancestor '
+            'AND (t.id_parent IS NOT NULL OR t.title<>?)')
+
+    def _delete_obsolete_mappings(self, cursor):
+        """
+        Deletes the title - language, title - quality and title - subtitle language mappings of the collected titles
+        and values that no file or subtitle under the titles has anymore.
+        """
 
-        return 'IN ({})'.format(','.join([str(i) for i in simple_list]))
-
-    def _check_missing_languages(self, cursor, title_ids, missing_languages):
-
-        cursor.execute(
-            'SELECT id_language FROM video_title_language_mapping WHERE id_title {} AND id_language {} LIMIT 1'.format(
-                self._build_in_clause(title_ids),
-                self._build_in_clause(missing_languages)))
-        rows = cursor.fetchall()
-        if rows:
-            available_languages = [row[0] for row in rows]
-            return self._subtract_lists(missing_languages, available_languages)
-
-        return missing_languages
-
-    def _check_missing_quality(self, cursor, title_ids, missing_quality):
-
-        cursor.execute(
-            'SELECT id_quality FROM video_title_quality_mapping WHERE id_title {} AND id_quality=? LIMIT 1'.format(
-                self._build_in_clause(title_ids)),
-            missing_quality)
-        row = cursor.fetchone()
-        if row is None:
-            return missing_quality
-
-        return None
-
-    def _delete_l_q_mappings_recursively(self, cursor, title_id, missing_languages, missing_quality):
-
-        # If there are no more stuff to delete, return.
-        if missing_quality is None and not missing_languages:
-            return
-
-        # Get the title's parent and siblings.
-        parent_id = self._retrieve_title_parent(cursor, title_id)
-        if parent_id is None:
-            return
-        sibling_ids = self._retrieve_title_children(cursor, parent_id)
-
-        # Check if the parent has the removed quality from another child.
-        if missing_quality is not None:
-            missing_quality = self._check_missing_quality(cursor, sibling_ids, missing_quality)
-            if missing_quality is not None:
-                self._delete_quality_from_mapping(cursor, parent_id, missing_quality)
-
-        # Check if the parent has the removed languages from other children.
-        if missing_languages:
-            missing_languages = self._check_missing_languages(cursor, sibling_ids, missing_languages)
-            if missing_languages:
-                self._delete_languages_from_mapping(cursor, parent_id, missing_languages)
-
-        self._delete_l_q_mappings_recursively(cursor, parent_id, missing_languages, missing_quality)
-
-    def _delete_languages_from_mapping(self, cursor, title_id, language_ids):
-
-        in_clause = self._build_in_clause(language_ids)
         cursor.execute(
-            'DELETE FROM video_title_language_mapping WHERE id_title=? AND id_language {}'.format(in_clause),
-            (title_id,))
-
-    def _delete_title_recursively(self, cursor, title_id, missing_languages, missing_quality):
-
-        # If there are no more stuff to delete, return.
-        if missing_quality is None and not missing_languages:
-            return
-
-        # Get the title's parent first, we may need to delete that too.
-        parent_id = self._retrieve_title_parent(cursor, title_id)
-
-        # Delete the title and the corresponding mappings.
-        cursor.execute('DELETE FROM video_title WHERE id=?', (title_id,))
-        cursor.execute('DELETE FROM video_title_language_mapping WHERE id_title=?', (title_id,))
-        cursor.execute('DELETE FROM video_title_quality_mapping WHERE id_title=?', (title_id,))
-
-        # Check the siblings of the title.
-        if parent_id is None:
-            return
-
-        sibling_ids = self._retrieve_title_children(cursor, parent_id)
-
-        # In case the specified title was the only child of it's parent, then remove the parent.
-        if sibling_ids is None or not sibling_ids:
-
-            self._delete_title_recursively(cursor, parent_id, missing_languages, missing_quality)
-
-        # There are more children here, we should remove obsolete mappings only.
-        else:
-
-            missing_languages = self._check_missing_languages(cursor, sibling_ids, missing_languages)
-            if missing_languages:
-                self._delete_languages_from_mapping(cursor, parent_id, missing_languages)
-
-            missing_quality = self._check_missing_quality(cursor, sibling_ids, missing_quality)
-            if missing_quality is not None:
-                self._delete_quality_from_mapping(cursor, parent_id, missing_quality)
-
-            # We could just call this function in the else branch, but this way it is a bit faster (we do not repeat the
-            # query for the siblings).
-            self._delete_l_q_mappings_recursively(cursor, parent_id, missing_languages, missing_quality)
-
-    def _delete_sl_mappings_recursively(self, cursor, title_id, language_id):
-
-        # Get the title's parent.
-        parent_id = self._retrieve_title_parent(cursor, title_id)
-
-        # Delete the corresponding mapping for this title.
+            'DELETE FROM video_title_language_mapping '
+            'WHERE id_title IN (SELECT id FROM temp.deleted_id WHERE kind=\'title\') '
+            'AND id_language IN (SELECT id FROM temp.deleted_id WHERE kind=\'language\') AND NOT EXISTS ('
+            'SELECT 1 FROM video_title_closure AS c, video_file AS f, video_file_language_mapping AS m '
+            'WHERE c.id_ancestor=video_title_language_mapping.id_title AND f.id_title=c.id_descendant '
+            'AND m.id_file=f.id AND m.id_language=video_title_language_mapping.id_language)')
         cursor.execute(
-            'DELETE FROM video_title_subtitle_language_mapping WHERE id_title=? AND id_language=?',
-            (title_id, language_id))
-
-        # Check the siblings of the title.
-        if parent_id is None:
-            return
-
-        sibling_ids = self._retrieve_title_children(cursor, parent_id)
-
-        # If this title is the only child, go see about it's parents.
-        if sibling_ids is None or not sibling_ids:
-
-            self._delete_sl_mappings_recursively(cursor, parent_id, language_id)
-
-        # If there is any sibling of this title, check them.
-        else:
-
-            # Check if any of the siblings also has this language.
-            in_clause = self._build_in_clause(sibling_ids)
-            cursor.execute(
-                'SELECT id_language FROM video_title_subtitle_language_mapping '
-                'WHERE id_title {} AND id_language=?'.format(in_clause),
-                (language_id,))
-            rows = cursor.fetchall()
-
-            # If no siblings are present with this language, then go to the parent and remove the mappings there too.
-            if rows is None or not rows:
-                self._delete_sl_mappings_recursively(cursor, parent_id, language_id)
-
-    def _delete_quality_from_mapping(self, cursor, title_id, quality_id):
-
+            'DELETE FROM video_title_quality_mapping '
+            'WHERE id_title IN (SELECT id FROM temp.deleted_id WHERE kind=\'title\') '
+            'AND id_quality IN (SELECT id FROM temp.deleted_id WHERE kind=\'quality\') AND NOT EXISTS ('
+            'SELECT 1 FROM video_title_closure AS c, video_file AS f '
+            'WHERE c.id_ancestor=video_title_quality_mapping.id_title AND f.id_title=c.id_descendant '
+            'AND f.id_quality=video_title_quality_mapping.id_quality)')
         cursor.execute(
-            'DELETE FROM video_title_quality_mapping WHERE id_title=? AND id_quality=? LIMIT 1',
-            (title_id, quality_id))
-
-    def _delete_unavailable_languages(self, cursor, title_id, missing_languages, available_languages):
-
-        missing_languages = self._subtract_lists(missing_languages, available_languages)
-        if missing_languages:
-            self._delete_languages_from_mapping(cursor, title_id, missing_languages)
-
-        return missing_languages
-
-    def _delete_unavailable_quality(self, cursor, title_id, missing_quality, available_qualities):
-
-        if missing_quality not in available_qualities:
-            self._delete_quality_from_mapping(cursor, title_id, missing_quality)
-            return missing_quality
-
-        return None
-
-    def _retrieve_title_children(self, cursor, title_id):
-
-        cursor.execute('SELECT id FROM video_title WHERE id_parent=?', (title_id,))
-        rows = cursor.fetchall()
-        if rows is None or not rows:
-            return None
-
-        return [row[0] for row in rows]
-
-    def _retrieve_title_parent(self, cursor, title_id):
-
-        cursor.execute('SELECT id_parent FROM video_title WHERE id=? AND id_parent IS NOT NULL LIMIT 1', (title_id,))
-        row = cursor.fetchone()
-        if row is None:
-            return None
-
-        return row[0]
-
-    def _subtract_lists(self, list_a, list_b):
-
-        return [l for l in list_a if l not in list_b]
+            'DELETE FROM video_title_subtitle_language_mapping '
+            'WHERE id_title IN (SELECT id FROM temp.deleted_id WHERE kind=\'title\') '
+            'AND id_language IN (SELECT id FROM temp.deleted_id WHERE kind=\'subtitle_language\') AND NOT EXISTS ('
+            'SELECT 1 FROM video_title_closure AS c, video_file AS f, video_subtitle AS s '
+            'WHERE c.id_ancestor=video_title_subtitle_language_mapping.id_title AND f.id_title=c.id_descendant '
+            'AND s.id_file=f.id AND s.id_language=video_title_subtitle_language_mapping.id_language)')
@@ -1,56 +1,98 @@
-from dal.functions import build_result_dictionary
+from dal.functions import build_full_text_query, build_result_dictionary
 from dal.retriever import Retriever
 
 class VideoDataRetriever(Retriever):
 
+    ####################################################################################################################
+    # Static attributes.
+    ####################################################################################################################
+
+    # The maximum number of titles queried at once, SQLite limits the number of parameters of a statement.
+    MAX_TITLE_COUNT_PER_QUERY = 500
+
     ####################################################################################################################
     # Public methods.
     ####################################################################################################################
 
+    def preload_cache(self):
+        """
+        Loads the IDs of the languages, the qualities and the top-level titles into the cache.
+
+        Returns
+        -------
+        The number of loaded entries.
+        """
+
+        return self._preload_cache([
+            (
+                'SELECT language, MIN(id) FROM video_language GROUP BY language LIMIT ?',
+                self._cache.set_language_id),
+            (
+                'SELECT quality, MIN(id) FROM video_quality GROUP BY quality LIMIT ?',
+                self._cache.set_quality_id),
+            (
+                'SELECT title, MIN(id) FROM video_title WHERE id_parent IS NULL GROUP BY title LIMIT ?',
+                self._cache.set_title_id)])
+
     def retrieve_details(self, title_id):
 
+        return self.retrieve_details_of_titles([title_id]).get(title_id)
+
+    def retrieve_details_of_titles(self, title_ids):
+        """
+        Retrieves the details of the given titles with a fixed number of queries, regardless of the number of files and
+        subtitles.
+
+        Parameters
+        ----------
+        title_ids : list of int
+            The IDs of the titles.
+
+        Returns
+        -------
+        A dictionary that maps the ID of each title having files to its details.
+        """
+
+        result = {}
+
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
-            # Get table contents.
-            cursor.execute('SELECT id, title FROM video_title WHERE video_title.id=? LIMIT 1', (title_id,))
-            row = cursor.fetchone()
-            if row is None:
-                return None
+            for start_index in range(0, len(title_ids), self.MAX_TITLE_COUNT_PER_QUERY):
+                chunk = list(title_ids[start_index:start_index + self.MAX_TITLE_COUNT_PER_QUERY])
+                self._query_details(cursor, chunk, result)
 
-            result = {
-                'id' : row[0],
-                'title' : row[1],
-                'files' : [],
-                'subtitles' : []}
+        return result
 
-            # Get file details.
-            cursor.execute(
-                'SELECT f.id AS id, q.quality AS quality, l.language AS language '
-                'FROM video_file AS f, video_quality AS q, video_file_language_mapping AS m '
-                'INNER JOIN video_language AS l ON l.id=m.id_language '
-                'WHERE f.id_title=? AND q.id=f.id_quality AND m.id_file=f.id',
-                (title_id,))
-            rows = cursor.fetchall()
-            if not rows:
-                return None
+    def retrieve_episodes(self, title_id):
+        """
+        Retrieves every title under the given title (at any depth) that has files, for example each episode of a
+        series.
 
-            for row in rows:
-                result['files'].append({'id' : row[0], 'language' : row[2], 'quality' : row[1]})
+        Parameters
+        ----------
+        title_id : int
+            The ID of the title.
 
-            # Get subtitles.
-            for video_file in result['files']:
+        Returns
+        -------
+        A list of dictionaries containing the IDs and the titles, ordered by title.
+        """
+
+        # Connect to the database.
+        with self._db_context.get_read_connection_provider() as connection:
+            cursor = connection.cursor
 
-                cursor.execute(
-                    'SELECT s.id, l.language '
-                    'FROM video_subtitle AS s, video_language AS l '
-                    'WHERE s.id_file=? AND l.id=s.id_language',
-                    (video_file['id'],))
-                rows = cursor.fetchall()
-                if rows:
-                    for row in rows:
-                        result['subtitles'].append({'file' : video_file['id'], 'id' : row[0], 'language' : row[1]})
+            # Get the descendants of the title from the closure table.
+            cursor.execute(
+                'SELECT t.id, t.title '
+                'FROM video_title_closure AS c, video_title AS t '
+                'WHERE c.id_ancestor=? AND c.depth>0 AND t.id=c.id_descendant '
+                'AND EXISTS (SELECT 1 FROM video_file AS f WHERE f.id_title=t.id) '
+                'ORDER BY t.title, t.id',
+                (title_id,))
+            result = build_result_dictionary(cursor, ['id', 'title'])
 
             return result
 
@@ -74,7 +116,7 @@ class VideoDataRetriever(Retriever):
         quality_id = self.retrieve_quality_id(quality)
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Get the appropriate file's ID.
@@ -94,7 +136,7 @@ class VideoDataRetriever(Retriever):
     def retrieve_languages(self):
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Get table contents.
@@ -122,7 +164,7 @@ class VideoDataRetriever(Retriever):
             return title_id
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Try to get the corresponding ID from the database.
@@ -142,7 +184,7 @@ class VideoDataRetriever(Retriever):
     def retrieve_qualities(self):
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Get table contents.
@@ -165,7 +207,7 @@ class VideoDataRetriever(Retriever):
     def retrieve_subtitle_path(self, subtitle_id):
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Get table contents.
@@ -179,15 +221,18 @@ class VideoDataRetriever(Retriever):
 
     def retrieve_subtitle_paths(self):
 
-        # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
-            cursor = connection.cursor
+        return list(self.iterate_subtitle_paths())
 
-            # Build and execute the query.
-            cursor.execute('SELECT id, path FROM video_subtitle')
-            result = build_result_dictionary(cursor, ['id', 'path'])
+    def retrieve_title_file_count(self, title_id):
+        """
+        Retrieves the number of files stored for the given title and the titles under it.
+        """
 
-            return result
+        return self._retrieve_single_value_from_db(
+            'SELECT COUNT(*) '
+            'FROM video_title_closure AS c, video_file AS f '
+            'WHERE c.id_ancestor=? AND f.id_title=c.id_descendant',
+            title_id)
 
     def retrieve_title_id(self, title, parent_id=0):
 
@@ -197,7 +242,7 @@ class VideoDataRetriever(Retriever):
             return title_id
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Try to get the corresponding ID from the database.
@@ -215,17 +260,17 @@ class VideoDataRetriever(Retriever):
 
         return title_id
 
-    def retrieve_titles(self, title_filter=None):
+    def retrieve_titles(self, title_filter=None, page_request=None):
 
         # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
+        with self._db_context.get_read_connection_provider() as connection:
             cursor = connection.cursor
 
             # Build and execute the query.
             query_parameters = {}
             where_clause_beginning = self._build_filtering_query_start(title_filter, query_parameters)
-            self._query_titles_by_filter(cursor, title_filter, where_clause_beginning, query_parameters)
-            result = build_result_dictionary(cursor, ['id', 'title'])
+            query_parts = self._build_title_query_parts(title_filter, where_clause_beginning, query_parameters)
+            result = self._execute_page_query(cursor, query_parts, query_parameters, page_request)
 
             return result
 
@@ -235,15 +280,31 @@ class VideoDataRetriever(Retriever):
 
     def retrieve_video_paths(self):
 
-        # Connect to the database.
-        with self._db_context.get_connection_provider() as connection:
-            cursor = connection.cursor
+        return list(self.iterate_video_paths())
 
-            # Build and execute the query.
-            cursor.execute('SELECT id, path FROM video_file')
-            result = build_result_dictionary(cursor, ['id', 'path'])
+    def search_titles(self, text):
 
-            return result
+        return self._search('video_title', ['id', 'title'], 'title', text)
+
+    ####################################################################################################################
+    # Public methods -- iteration.
+    ####################################################################################################################
+
+    def iterate_subtitle_paths(self):
+
+        return self._iterate_paths('video_subtitle')
+
+    def iterate_titles(self, title_filter=None, page_request=None):
+
+        query_parameters = {}
+        where_clause_beginning = self._build_filtering_query_start(title_filter, query_parameters)
+        query_parts = self._build_title_query_parts(title_filter, where_clause_beginning, query_parameters)
+
+        return self._iterate_listing(query_parts, query_parameters, page_request)
+
+    def iterate_video_paths(self):
+
+        return self._iterate_paths('video_file')
 
     ####################################################################################################################
     # Auxiliary methods.
@@ -282,74 +343,125 @@ class VideoDataRetriever(Retriever):
                 query_parameters['subtitle_language_id'] = title_filter.subtitle_language_id
 
             if title_filter.text is not None:
-                where_clause_beginning = self._append_to_where_clause(where_clause_beginning, 'title LIKE :text ')
-                query_parameters['text'] = '%' + title_filter.text + '%'
+                where_clause_beginning = self._append_to_where_clause(
+                    where_clause_beginning,
+                    self._build_text_condition(title_filter.text, query_parameters))
 
         return where_clause_beginning
 
-    def _query_titles_by_filter(self, cursor, title_filter, where_clause_beginning, query_parameters):
+    def _build_text_condition(self, text, query_parameters):
+
+        full_text_query = build_full_text_query(text)
+
+        # Connect to the database.
+        with self._db_context.get_read_connection_provider() as connection:
+            has_search_index = self._has_search_index(connection.cursor, 'video_title')
+
+        if has_search_index and full_text_query is not None:
+            query_parameters['text'] = full_text_query
+            return 't.id IN (SELECT rowid FROM video_title_search WHERE video_title_search MATCH :text) '
+
+        query_parameters['text'] = '%' + text + '%'
+        return 't.title LIKE :text '
+
+    def _build_title_query_parts(self, title_filter, where_clause_beginning, query_parameters):
+
+        query_parts = {
+            'columns' : [('id', 't.id'), ('title', 't.title')],
+            'sort_columns' : ['t.title', 't.id']}
 
         if title_filter is None or (title_filter.language_id is None and title_filter.quality_id is None):
 
-            cursor.execute(
-                'SELECT t.id, t.title FROM video_title AS t ' + where_clause_beginning + 'ORDER BY t.title',
-                query_parameters)
+            query_parts['from'] = 'FROM video_title AS t '
+            query_parts['where'] = where_clause_beginning
 
         elif title_filter.language_id is None:
 
             query_parameters['quality_id'] = title_filter.quality_id
-            self._query_titles_by_q(cursor, where_clause_beginning, query_parameters)
+            self._build_title_query_parts_by_q(query_parts, where_clause_beginning)
 
         elif title_filter.quality_id is None:
 
             query_parameters['language_id'] = title_filter.language_id
-            self._query_titles_by_l(cursor, where_clause_beginning, query_parameters)
+            self._build_title_query_parts_by_l(query_parts, where_clause_beginning)
 
         else:
 
             query_parameters['language_id'] = title_filter.language_id
             query_parameters['quality_id'] = title_filter.quality_id
-            self._query_titles_by_l_q(cursor, where_clause_beginning, query_parameters)
+            self._build_title_query_parts_by_l_q(query_parts, where_clause_beginning)
 
-    def _query_titles_by_l(self, cursor, where_clause_beginning, query_parameters):
+        return query_parts
+
+    def _build_title_query_parts_by_l(self, query_parts, where_clause_beginning):
         """
-        Queries titles by language.
+        Builds the parts of the query of titles by language.
         """
 
-        cursor.execute(
-            'SELECT t.id, t.title '
-            'FROM video_title_language_mapping AS m, video_title AS t '
-            + where_clause_beginning +
-            'AND m.id_language=:language_id AND t.id=m.id_title '
-            'GROUP BY t.title '
-            'ORDER BY t.title',
-            query_parameters)
-
-    def _query_titles_by_l_q(self, cursor, where_clause_beginning, query_parameters):
+        query_parts['from'] = 'FROM video_title_language_mapping AS m, video_title AS t '
+        query_parts['where'] = self._append_to_where_clause(
+            where_clause_beginning,
+            'm.id_language=:language_id AND t.id=m.id_title ')
+
+    def _build_title_query_parts_by_l_q(self, query_parts, where_clause_beginning):
         """
-        Queries titles by language and quality.
+        Builds the parts of the query of titles by language and quality.
         """
 
-        cursor.execute(
-            'SELECT t.id, t.title '
+        query_parts['from'] = \
             'FROM video_title_language_mapping AS m1, video_title_quality_mapping AS m2, video_title AS t '
-            + where_clause_beginning +
-            'AND m1.id_language=:language_id AND m2.id_quality=:quality_id '
-            'AND m1.id_title=m2.id_title AND t.id=m1.id_title '
-            'GROUP BY t.title '
-            'ORDER BY t.title',
-            query_parameters)
-
-    def _query_titles_by_q(self, cursor, where_clause_beginning, query_parameters):
+        query_parts['where'] = self._append_to_where_clause(
+            where_clause_beginning,
+            'm1.id_language=:language_id AND m2.id_quality=:quality_id '
+            'AND m1.id_title=m2.id_title AND t.id=m1.id_title ')
+
+    def _build_title_query_parts_by_q(self, query_parts, where_clause_beginning):
         """
-        Queries titles by quality.
+        Builds the parts of the query of titles by quality.
         """
 
+        query_parts['from'] = 'FROM video_title_quality_mapping AS m, video_title AS t '
+        query_parts['where'] = self._append_to_where_clause(
+            where_clause_beginning,
+            'm.id_quality=:quality_id AND t.id=m.id_title ')
+
+    def _query_details(self, cursor, title_ids, result):
+        """
+        Queries the titles, the files and the subtitles of the given titles and adds the details of the titles having
+        files to the result.
+        """
+
+        placeholders = ','.join('?' * len(title_ids))
+
+        # Get the files of the titles.
+        cursor.execute(
+            'SELECT f.id_title, f.id, q.quality, l.language '
+            'FROM video_file AS f, video_quality AS q, video_file_language_mapping AS m, video_language AS l '
+            'WHERE f.id_title IN (' + placeholders + ') AND q.id=f.id_quality AND m.id_file=f.id '
+            'AND l.id=m.id_language '
+            'ORDER BY f.id, l.language',
+            title_ids)
+        files = {}
+        for title_id, file_id, quality, language in cursor.fetchall():
+            files.setdefault(title_id, []).append({'id' : file_id, 'language' : language, 'quality' : quality})
+
+        # Get the subtitles of the files.
         cursor.execute(
-            'SELECT t.id, t.title '
-            'FROM video_title_quality_mapping AS m, video_title AS t '
-            + where_clause_beginning +
-            'AND m.id_quality=:quality_id AND t.id=m.id_title '
-            'GROUP BY title '
-            'ORDER BY title',
-            query_parameters)
+            'SELECT f.id_title, s.id_file, s.id, l.language '
+            'FROM video_file AS f, video_subtitle AS s, video_language AS l '
+            'WHERE f.id_title IN (' + placeholders + ') AND s.id_file=f.id AND l.id=s.id_language '
+            'ORDER BY s.id',
+            title_ids)
+        subtitles = {}
+        for title_id, file_id, subtitle_id, language in cursor.fetchall():
+            subtitles.setdefault(title_id, []).append({'file' : file_id, 'id' : subtitle_id, 'language' : language})
+
+        # Get the titles. Titles without files are left out.
+        cursor.execute('SELECT id, title FROM video_title WHERE id IN (' + placeholders + ')', title_ids)
+        for title_id, title in cursor.fetchall():
+            if title_id in files:
+                result[title_id] = {
+                    'id' : title_id,
+                    'title' : title,
+                    'files' : files[title_id],
+                    'subtitles' : subtitles.get(title_id, [])}
@@ -1,19 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
 import os
+import queue
+import threading
+import time
 
 from indexing.pathanalyzer import PathAnalyzer
 from indexing.pathanalyzerstore import PathAnalyzerStore
+from indexing.queuedcollector import QueuedCollector
+from indexing.stagetimer import StageTimer
+from indexing.timedcollector import TimedCollector
+from indexing.traversal.scandirtraversalengine import ScandirTraversalEngine
 
 class Indexer:
     """
     Traverses the given directory using the DFS algorithm. Allows registering different rules for handling different
     file types and calls the associated PathAnalyzers and Collectors indirectly for each type.
+
+    If the pool size is greater than one, the directories are traversed concurrently by a pool of worker threads. The
+    batches produced by the workers are processed by the Collectors on the thread that called index(), so Collectors
+    (and the database connections they use) are never accessed from multiple threads. The batches of deferred policies
+    (see IndexerPolicy.is_deferred) are kept until every directory has been traversed and processed after all the other
+    batches, like in serial mode, where the rules of deferred policies are registered last.
+
+    The analyzers are notified of entering a directory only when the first file below it is analyzed, so directories
+    without files (like the unchanged directories, whose files are not returned by a JournalingTraversalEngine) cost
+    nothing but their enumeration.
     """
 
+    ####################################################################################################################
+    # Private constants.
+    ####################################################################################################################
+
+    # The maximum number of batches waiting to be processed in parallel mode.
+    _MAX_QUEUED_BATCHES = 64
+
     ####################################################################################################################
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, max_depth=10):
+    def __init__(
+            self,
+            max_depth=10,
+            traversal_engine=None,
+            pool_size=1,
+            relative_matching=False,
+            progress=None,
+            stage_timer=None):
         """
         Initializes attributes and checks the maximum depth provided.
 
@@ -21,20 +53,47 @@ class Indexer:
         ----------
         max_depth : int
             The maximum depth to look in.
+        traversal_engine : TraversalEngine
+            The engine used to enumerate directories. ScandirTraversalEngine is used if it is not provided.
+        pool_size : int
+            The number of directories to traverse concurrently.
+        relative_matching : bool
+            Indicates whether the patterns should be matched against the paths relative to the directory of the rule.
+            Parts of the directory of the rule can not be matched by patterns in this case, but deep directories do
+            not slow down matching.
+        progress : IndexingProgress
+            Counts the scanned directories and the analyzed files, and tells whether indexing has been cancelled.
+            Optional.
+        stage_timer : StageTimer
+            Records the time spent in listing directories, in filtering and matching paths and in the Collectors. The
+            stages are not timed if it is None.
         """
 
         ### Validate parameters.
         if max_depth < 1:
             raise Exception('max_depth must be greater than or equal to 1.')
+        if pool_size < 1:
+            raise Exception('pool_size must be greater than or equal to 1.')
 
         ### Attributes from outside.
         self._max_depth = max_depth
+        self._traversal_engine = traversal_engine if traversal_engine is not None else ScandirTraversalEngine()
+        self._pool_size = pool_size
+        self._relative_matching = relative_matching
+        self._progress = progress
+        self._stage_timer = stage_timer
 
         ### Private attributes.
         # A collection of analyzers which handle different file types.
         self._analyzers = []
-        # The depth we are currently in.
-        self._current_depth = 0
+        # Batches waiting to be processed in parallel mode.
+        self._batch_queue = queue.Queue(Indexer._MAX_QUEUED_BATCHES)
+        # Batches of deferred policies waiting to be processed after all the others in parallel mode.
+        self._deferred_batches = []
+        # This lock is used for synchronizing the deferred batches.
+        self._deferred_batches_lock = threading.Lock()
+        # Indicates that the workers should stop because the processing of the batches failed.
+        self._is_aborted = threading.Event()
         # The list of directories to index.
         self._rules = {}
 
@@ -54,7 +113,7 @@ class Indexer:
             A policy that applies to this directory.
         """
 
-        analyzer = self._create_analyzer(policy)
+        analyzer = self._create_analyzer(policy, directory)
         analyzer_store = self._create_analyzerstore(directory)
 
         analyzer_store.add_analyzer(policy.extensions, analyzer)
@@ -67,9 +126,14 @@ class Indexer:
         for analyzer in self._analyzers:
             analyzer.init_filters()
 
-        for directory, analyzer_store in self._rules.items():
-            if os.path.exists(directory):
-                self._scan_directory(directory, analyzer_store)
+        rules = [(directory, store) for directory, store in self._rules.items() if os.path.exists(directory)]
+        if self._pool_size > 1:
+            self._index_in_parallel(rules)
+        else:
+            for directory, analyzer_store in rules:
+                analyzers = analyzer_store.analyzers
+                self._scan_directory(directory, analyzer_store, analyzers, 0, [])
+                self._flush(analyzers)
 
         for analyzer in self._analyzers:
             analyzer.clean_filters()
@@ -78,17 +142,32 @@ class Indexer:
     # Auxiliary methods.
     ####################################################################################################################
 
-    def _analyze_file(self, current_path, analyzer_store):
+    def _analyze_file(self, current_path, analyzer_store, analyzers, pending_directories):
+
+        # Enter the directories the file is in, if they have not been entered yet.
+        for directory in pending_directories:
+            self._enter(directory, analyzers)
+        pending_directories.clear()
 
         current_path_without_extension, current_extension = os.path.splitext(current_path)
 
+        if self._progress is not None:
+            self._progress.add_file()
+
         analyzer = analyzer_store.find_analyzer(current_extension)
         if analyzer is not None:
             analyzer.analyze(current_path_without_extension, current_extension)
 
-    def _create_analyzer(self, policy):
+    def _create_analyzer(self, policy, directory):
+
+        collector = policy.collector
+        if self._stage_timer is not None:
+            collector = TimedCollector(collector, self._stage_timer, policy.category)
+        if self._pool_size > 1:
+            collector = QueuedCollector(collector, self._defer_batch if policy.is_deferred else self._enqueue_batch)
+        root = directory if self._relative_matching else None
 
-        analyzer = PathAnalyzer(policy)
+        analyzer = PathAnalyzer(policy, collector, root, self._stage_timer)
         self._analyzers.append(analyzer)
 
         return analyzer
@@ -100,7 +179,7 @@ class Indexer:
 
         return self._rules[directory]
 
-    def _enter(self, directory):
+    def _enter(self, directory, analyzers):
         """
         Indicates for the analyzers that we entered into the given directory.
 
@@ -108,25 +187,43 @@ class Indexer:
         ----------
         directory : str
             The directory we entered.
+        analyzers : list of PathAnalyzer
+            The analyzers to notify.
         """
 
-        for analyzer in self._analyzers:
+        for analyzer in analyzers:
             analyzer.enter(directory)
 
-        self._current_depth = self._current_depth + 1
+    def _flush(self, analyzers):
+
+        for analyzer in analyzers:
+            analyzer.flush()
 
-    def _leave(self):
+    def _leave(self, analyzers):
         """
         Indicates for the analyzers that we are leaving the last directory.
+
+        Parameters
+        ----------
+        analyzers : list of PathAnalyzer
+            The analyzers to notify.
         """
 
-        for analyzer in self._analyzers:
+        for analyzer in analyzers:
             analyzer.leave()
 
-        self._current_depth = self._current_depth - 1
+    def _list_directory(self, path, analyzer_store):
+
+        if self._stage_timer is None:
+            return self._traversal_engine.list_directory(path)
+
+        start_time = time.perf_counter()
+        entries = self._traversal_engine.list_directory(path)
+        self._stage_timer.add(analyzer_store.category, StageTimer.STAGE_LISTING, time.perf_counter() - start_time)
 
+        return entries
 
-    def _scan_directory(self, path, analyzer_store):
+    def _scan_directory(self, path, analyzer_store, analyzers, depth, pending_directories):
         """
         Does the real indexing. Iterates through the directory using DFS, and invokes the registered analyzers to
         analyze and store the data.
@@ -135,20 +232,128 @@ class Indexer:
         ----------
         path : str
             The path to enumerate.
-        analyzers : PathAnalyzerStore
+        analyzer_store : PathAnalyzerStore
             The PathAnalyzerStore to use.
+        analyzers : list of PathAnalyzer
+            The analyzers to notify when entering or leaving a directory.
+        depth : int
+            The depth of the given directory relative to the directory of the rule.
+        pending_directories : list of str
+            The names of the directories that have been entered by the traversal, but not by the analyzers yet, the
+            innermost last.
         """
 
-        for current_file in os.listdir(path):
+        # Nothing is processed below the maximum depth, so do not even enumerate the directory.
+        if depth >= self._max_depth:
+            return
+
+        if self._progress is not None:
+            self._progress.check_cancelled()
+            self._progress.add_directory()
+
+        entries = self._list_directory(path, analyzer_store)
+        for current_file, current_path, is_directory in entries:
+
+            if is_directory:
+                pending_directory_count = len(pending_directories)
+                pending_directories.append(current_file)
+                self._scan_directory(current_path, analyzer_store, analyzers, depth + 1, pending_directories)
+                # The directory is still pending if no file has been analyzed below it, there is nothing to leave then.
+                if len(pending_directories) > pending_directory_count:
+                    pending_directories.pop()
+                else:
+                    self._leave(analyzers)
+            else:
+                self._analyze_file(current_path, analyzer_store, analyzers, pending_directories)
 
-            current_path = os.path.join(path, current_file)
+    ####################################################################################################################
+    # Auxiliary methods -- Parallel indexing.
+    ####################################################################################################################
+
+    def _defer_batch(self, batch):
+        """
+        Keeps a batch of a deferred policy until the other batches have been processed. Called by the worker threads.
 
-            if self._current_depth >= self._max_depth:
+        Parameters
+        ----------
+        batch : tuple
+            A (function, nodes) tuple.
+        """
+
+        with self._deferred_batches_lock:
+            self._deferred_batches.append(batch)
+
+    def _enqueue_batch(self, batch):
+        """
+        Puts a batch into the queue. Called by the worker threads.
+
+        Parameters
+        ----------
+        batch : tuple
+            A (function, nodes) tuple, or None to indicate that a worker has finished.
+        """
+
+        while True:
+            if self._is_aborted.is_set():
+                raise Exception('Indexing has been aborted.')
+            try:
+                self._batch_queue.put(batch, timeout=0.1)
                 return
+            except queue.Full:
+                pass
 
-            if os.path.isdir(current_path):
-                self._enter(current_file)
-                self._scan_directory(current_path, analyzer_store)
-                self._leave()
+    def _index_in_parallel(self, rules):
+        """
+        Traverses the directories using a pool of worker threads and processes the batches they produce on the current
+        thread.
+
+        Parameters
+        ----------
+        rules : list of (str, PathAnalyzerStore)
+            The directories to traverse and the corresponding analyzers.
+        """
+
+        self._is_aborted.clear()
+        self._deferred_batches = []
+
+        with ThreadPoolExecutor(max_workers=self._pool_size) as executor:
+            futures = [executor.submit(self._scan_root_directory, d, s) for d, s in rules]
+            try:
+                self._process_batches(len(futures))
+            except Exception:
+                self._is_aborted.set()
+                raise
+
+        # Propagate the errors of the workers.
+        for future in futures:
+            future.result()
+
+        deferred_batches = self._deferred_batches
+        self._deferred_batches = []
+        for function, nodes in deferred_batches:
+            function(nodes)
+
+    def _process_batches(self, worker_count):
+
+        finished_worker_count = 0
+        while finished_worker_count < worker_count:
+            batch = self._batch_queue.get()
+            if batch is None:
+                finished_worker_count = finished_worker_count + 1
             else:
-                self._analyze_file(current_path, analyzer_store)
+                function, nodes = batch
+                function(nodes)
+
+    def _scan_root_directory(self, directory, analyzer_store):
+        """
+        Traverses a directory of a rule. Executed by the worker threads.
+        """
+
+        try:
+            analyzers = analyzer_store.analyzers
+            self._scan_directory(directory, analyzer_store, analyzers, 0, [])
+            self._flush(analyzers)
+        finally:
+            # Indicate that the worker has finished (unless the processing of the batches has failed).
+            if not self._is_aborted.is_set():
+                self._enqueue_batch(None)
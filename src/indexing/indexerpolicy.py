@@ -1,3 +1,5 @@
+from indexing.pathpatternmatcher import PathPatternMatcher
+
 class IndexerPolicy:
     """
     Represents a set of rules followed during the indexing process. This class knows which Collector has to be invoked
@@ -8,9 +10,10 @@ class IndexerPolicy:
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, collector, collectibles, filter_factory=None):
+    def __init__(self, collector, collectibles, filter_factory=None, category=None, is_deferred=False):
         """
-        Initializes the attributes and stores the Catalogibles in a dictionary for the sake of easy lookups.
+        Initializes the attributes and stores the Catalogibles in a dictionary for the sake of easy lookups. Multiple
+        Catalogibles can be provided for the same extension, their patterns are tried together.
 
         Parameters
         ----------
@@ -20,6 +23,11 @@ class IndexerPolicy:
             The list of Catalogibles to be processed by the given Collector.
         filter_factory : FilterFactory
             Provides the appropriate filters for the PathAnalyzer.
+        category : str
+            The media category of the collected files. Used for reporting only.
+        is_deferred : bool
+            Indicates whether the collected files refer to files collected by other policies (like subtitles to
+            videos), so they have to be processed after those in parallel mode.
         """
 
         ### Validate parameters.
@@ -31,19 +39,30 @@ class IndexerPolicy:
         ### Attributes from outside.
         self._collector = collector
         self._filter_factory = filter_factory
+        self._category = category
+        self._is_deferred = is_deferred
 
         ### Private attributes.
         # The filters to be used during the indexing process.
         self._filters = None
         # The name of the any tag that can match anything in the path. Includes separators.
         self._tag_any = None
-        # A dictionary that stores collectibles by extensions.
+        # A dictionary that stores the list of collectibles by extensions.
         self._collectibles = self._group_collectibles_by_extensions(collectibles)
+        # A dictionary that stores the PathPatternMatchers of the collectibles by extensions. Filled on demand.
+        self._matchers = {}
 
     ####################################################################################################################
     # Properties.
     ####################################################################################################################
 
+    @property
+    def category(self):
+        """
+        Gets the media category of the collected files.
+        """
+        return self._category
+
     @property
     def collector(self):
         """
@@ -58,6 +77,13 @@ class IndexerPolicy:
         """
         return list(self._collectibles.keys())
 
+    @property
+    def is_deferred(self):
+        """
+        Gets whether the collected files have to be processed after the files of the other policies.
+        """
+        return self._is_deferred
+
     @property
     def filters(self):
         """
@@ -96,13 +122,51 @@ class IndexerPolicy:
 
         Returns
         -------
-        A Collectible if there is any for the given extension, otherwise None.
+        The first Collectible for the given extension if there is any, otherwise None.
         """
 
         if extension not in self._collectibles:
             return None
 
-        return self._collectibles[extension]
+        return self._collectibles[extension][0]
+
+    def get_collectibles(self, extension):
+        """
+        Gets the corresponding Catalogibles for the given extension.
+
+        Parameters
+        ----------
+        extension : str
+            The extension.
+
+        Returns
+        -------
+        The list of Collectibles for the given extension in the order they were provided, or None if there is none.
+        """
+
+        return self._collectibles.get(extension, None)
+
+    def get_matcher(self, extension):
+        """
+        Gets a PathPatternMatcher that matches the path patterns of the Collectibles for the given extension in the
+        order returned by get_collectibles.
+
+        Parameters
+        ----------
+        extension : str
+            The extension.
+
+        Returns
+        -------
+        The PathPatternMatcher or None if there is no Collectible for the given extension.
+        """
+
+        matcher = self._matchers.get(extension, None)
+        if matcher is None and extension in self._collectibles:
+            matcher = PathPatternMatcher([c.path_pattern for c in self._collectibles[extension]])
+            self._matchers[extension] = matcher
+
+        return matcher
 
     ####################################################################################################################
     # Private methods.
@@ -122,6 +186,8 @@ class IndexerPolicy:
         collectibles = {}
         for collectible in flat_collectibles:
             for extension in collectible.extensions:
-                collectibles[extension] = collectible
+                if extension not in collectibles:
+                    collectibles[extension] = []
+                collectibles[extension].append(collectible)
 
         return collectibles
@@ -0,0 +1,91 @@
+import threading
+
+class IndexingProgress:
+    """
+    Counts the directories scanned, the files analyzed and the rows written by an indexing process, and lets the
+    process be cancelled. The counters are updated by the worker threads of the Indexer, so they are synchronized.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self):
+
+        ### Private attributes.
+        # The number of directories scanned.
+        self._directory_count = 0
+        # The number of files analyzed.
+        self._file_count = 0
+        # Indicates that the indexing process should stop.
+        self._is_cancelled = threading.Event()
+        # This lock is used for synchronizing the counters.
+        self._lock = threading.Lock()
+        # The number of rows written into the database.
+        self._row_count = 0
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def directory_count(self):
+        """
+        Gets the number of directories scanned.
+        """
+        return self._directory_count
+
+    @property
+    def file_count(self):
+        """
+        Gets the number of files analyzed.
+        """
+        return self._file_count
+
+    @property
+    def is_cancelled(self):
+        """
+        Gets a value indicating whether the indexing process has been cancelled.
+        """
+        return self._is_cancelled.is_set()
+
+    @property
+    def row_count(self):
+        """
+        Gets the number of rows written into the database.
+        """
+        return self._row_count
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def add_directory(self):
+
+        with self._lock:
+            self._directory_count += 1
+
+    def add_file(self):
+
+        with self._lock:
+            self._file_count += 1
+
+    def add_rows(self, row_count):
+
+        with self._lock:
+            self._row_count += row_count
+
+    def cancel(self):
+        """
+        Requests the indexing process to stop. The Indexer stops at the next directory.
+        """
+
+        self._is_cancelled.set()
+
+    def check_cancelled(self):
+        """
+        Raises an exception if the indexing process has been cancelled.
+        """
+
+        if self._is_cancelled.is_set():
+            raise Exception('Indexing has been cancelled.')
@@ -0,0 +1,293 @@
+import bisect
+import os
+import threading
+
+from indexing.journal.directoryrecord import DirectoryRecord
+
+class ChangeJournal:
+    """
+    Remembers the modification time and the files of the enumerated directories, so the directories that did not change
+    since the last indexing process do not have to be enumerated and their files do not have to be analyzed again. Only
+    the modification times are read from the store (if any) when the journal is loaded, in one go, the files are read
+    only for the directories that have changed. The changes are written in one go when the journal is saved.
+
+    While indexing is in progress, the journal also remembers which directories and files have been found unchanged
+    (so they can be told apart from the removed ones, see is_file_unchanged) and which unchanged directories lead to a
+    changed one (see find_changed_subdirectories).
+
+    The journal can be used by multiple threads concurrently.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, store=None):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        store : ChangeJournalStore
+            Persists the records. The journal is kept only in memory if it is not provided.
+        """
+
+        ### Attributes from outside.
+        self._store = store
+
+        ### Private attributes.
+        # The paths of the recorded directories that have been found changed.
+        self._changed_paths = set()
+        # The records that have been created or changed since loading as path (string) => DirectoryRecord pairs.
+        self._changed_records = {}
+        # The names of the subdirectories that have changed or lead to a changed directory as path (string) => names
+        # (set of str) pairs.
+        self._changed_subdirectories = {}
+        # The files of the recorded directories as path (string) => files (list) pairs if there is no store.
+        self._files = {}
+        # This lock is used to synchronize the access of the records.
+        self._lock = threading.Lock()
+        # The modification times known at the beginning of the indexing process as path (string) => mtime (int) pairs.
+        self._mtimes = {}
+        # The paths of the recorded directories in alphabetical order, so the directories of a tree can be looked up
+        # without scanning every record. Created on demand.
+        self._sorted_paths = None
+        # The paths of the files that have been found unchanged in changed directories.
+        self._unchanged_file_paths = set()
+        # The paths of the recorded directories that have been found unchanged.
+        self._unchanged_paths = set()
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def has_changes(self):
+        """
+        Gets whether any directory has been found changed or missing since loading. Only meaningful after the indexing
+        process has finished.
+        """
+
+        with self._lock:
+            return len(self._changed_records) > 0 or len(self._unchanged_paths) != len(self._mtimes)
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def find_changed_subdirectories(self, path):
+        """
+        Looks up the subdirectories of the given unchanged directory that have changed or lead to a changed directory.
+
+        Parameters
+        ----------
+        path : str
+            The path of the directory.
+
+        Returns
+        -------
+        The names of the subdirectories in alphabetical order.
+        """
+
+        with self._lock:
+            return sorted(self._changed_subdirectories.get(path, []))
+
+    def find_directories(self, path):
+        """
+        Looks up the recorded directories in the given directory tree.
+
+        Parameters
+        ----------
+        path : str
+            The path of the root of the directory tree.
+
+        Returns
+        -------
+        A list of (path, mtime) tuples, one for each recorded directory in the tree (including its root), where mtime
+        is the modification time known at the beginning of the indexing process.
+        """
+
+        prefix = os.path.join(path, '')
+
+        with self._lock:
+            if self._sorted_paths is None:
+                self._sorted_paths = sorted(self._mtimes)
+
+            # The paths in the tree directly follow the prefix in alphabetical order.
+            start = bisect.bisect_left(self._sorted_paths, prefix)
+            end = bisect.bisect_left(self._sorted_paths, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+            result = [(directory, self._mtimes[directory]) for directory in self._sorted_paths[start:end]]
+            if path in self._mtimes:
+                result.append((path, self._mtimes[path]))
+
+            return result
+
+    def find_files(self, path):
+        """
+        Looks up the recorded files of the given directory.
+
+        Parameters
+        ----------
+        path : str
+            The path of the directory.
+
+        Returns
+        -------
+        The files of the directory as (name, size, mtime, inode) sequences as they were known at the beginning of the
+        indexing process, or None if the directory has not been recorded.
+        """
+
+        with self._lock:
+            if path not in self._mtimes:
+                return None
+            if self._store is None:
+                return self._files.get(path, [])
+
+        return self._store.load_files(path)
+
+    def is_examined(self, path):
+        """
+        Tells whether the given directory has been found changed or unchanged, or has been recorded since loading.
+        """
+
+        with self._lock:
+            return path in self._unchanged_paths or path in self._changed_paths or path in self._changed_records
+
+    def is_file_unchanged(self, path):
+        """
+        Tells whether the given file has been found unchanged during the indexing process, either because its directory
+        has not changed or because its state has not changed in a changed directory.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+
+        Returns
+        -------
+        True if the file has been found unchanged, else False.
+        """
+
+        directory = os.path.dirname(path)
+
+        with self._lock:
+            return directory in self._unchanged_paths or path in self._unchanged_file_paths
+
+    def is_unchanged(self, path):
+        """
+        Tells whether the given directory has been found unchanged.
+        """
+
+        with self._lock:
+            return path in self._unchanged_paths
+
+    def load(self):
+        """
+        Discards the unsaved changes and loads the stored records (if there is a store). Should be called before
+        indexing starts.
+        """
+
+        with self._lock:
+            if self._store is not None:
+                self._mtimes = self._store.load()
+                self._sorted_paths = None
+            self._changed_paths = set()
+            self._changed_records = {}
+            self._changed_subdirectories = {}
+            self._unchanged_file_paths = set()
+            self._unchanged_paths = set()
+
+    def mark_changed(self, root, paths):
+        """
+        Remembers that the given recorded directories have changed, so they have to be enumerated again.
+
+        Parameters
+        ----------
+        root : str
+            The path of the directory tree the directories are in. It has to be enumerated anyway.
+        paths : list of str
+            The paths of the changed directories.
+        """
+
+        with self._lock:
+            for path in paths:
+                self._changed_paths.add(path)
+
+                # Make the directory reachable through its unchanged parents.
+                current_path = path
+                while len(current_path) > len(root):
+                    parent_path = os.path.dirname(current_path)
+                    self._changed_subdirectories.setdefault(parent_path, set()).add(os.path.basename(current_path))
+                    current_path = parent_path
+
+    def mark_file_unchanged(self, path):
+        """
+        Remembers that the given file of a changed directory has not changed.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+        """
+
+        with self._lock:
+            self._unchanged_file_paths.add(path)
+
+    def mark_unchanged(self, paths):
+        """
+        Remembers that the given recorded directories have not changed, so their records have to be kept.
+
+        Parameters
+        ----------
+        paths : list of str
+            The paths of the unchanged directories.
+        """
+
+        with self._lock:
+            self._unchanged_paths.update(paths)
+
+    def record_directory(self, path, mtime, files):
+        """
+        Records the current state of the given directory.
+
+        Parameters
+        ----------
+        path : str
+            The path of the directory.
+        mtime : int
+            The modification time of the directory in nanoseconds. None if the record should not be trusted later.
+        files : list of tuple
+            The files as (name, size, mtime, inode) tuples.
+        """
+
+        with self._lock:
+            self._changed_records[path] = DirectoryRecord(mtime, files)
+
+    def save(self):
+        """
+        Writes the changes into the store. The records of the directories that have not been visited since loading are
+        dropped. Should be called after indexing has finished successfully.
+        """
+
+        with self._lock:
+            removed_paths = [
+                path for path in self._mtimes
+                if path not in self._unchanged_paths and path not in self._changed_records]
+
+            if self._store is not None:
+                self._store.save(self._changed_records, removed_paths)
+            else:
+                for path in removed_paths:
+                    self._files.pop(path, None)
+                self._files.update({path : record.files for path, record in self._changed_records.items()})
+
+            for path in removed_paths:
+                del self._mtimes[path]
+            self._mtimes.update({path : record.mtime for path, record in self._changed_records.items()})
+            self._sorted_paths = None
+
+            self._changed_paths = set()
+            self._changed_records = {}
+            self._changed_subdirectories = {}
+            self._unchanged_file_paths = set()
+            self._unchanged_paths = set()
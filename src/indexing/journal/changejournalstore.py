@@ -0,0 +1,45 @@
+class ChangeJournalStore:
+    """
+    Interface that describes how the ChangeJournal is persisted between indexing processes.
+    """
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def load(self):
+        """
+        Loads the modification times of the stored directories. The files are loaded only for the directories that have
+        changed (see load_files).
+
+        Returns
+        -------
+        A dictionary that stores path (string) => mtime (int) pairs, where mtime is None if the record of the
+        directory cannot be trusted.
+        """
+
+    def load_files(self, path):
+        """
+        Loads the files of a stored directory.
+
+        Parameters
+        ----------
+        path : str
+            The path of the directory.
+
+        Returns
+        -------
+        The files of the directory as (name, size, mtime, inode) sequences.
+        """
+
+    def save(self, changed_records, removed_paths):
+        """
+        Stores the changes of the journal.
+
+        Parameters
+        ----------
+        changed_records : dict
+            The new or changed records as path (string) => DirectoryRecord pairs. Replace the stored records.
+        removed_paths : list of str
+            The paths of the directories that do not exist anymore (or have not been enumerated this time).
+        """
@@ -0,0 +1,38 @@
+class DirectoryRecord:
+    """
+    Stores what the change journal knows about a directory: its modification time and the state of its files at the
+    time it was enumerated.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, mtime, files):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        mtime : int
+            The modification time of the directory in nanoseconds. None if the record cannot be trusted.
+        files : list of tuple
+            The files as (name, size, mtime, inode) sequences, where the last three are None if the state of the file
+            cannot be trusted.
+        """
+
+        ### Attributes from outside.
+        self._mtime = mtime
+        self._files = files
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def files(self):
+        return self._files
+
+    @property
+    def mtime(self):
+        return self._mtime
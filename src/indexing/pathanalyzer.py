@@ -1,4 +1,7 @@
+import time
+
 from indexing.nodes import CategorizedNode, UncategorizedNode
+from indexing.stagetimer import StageTimer
 
 class PathAnalyzer:
     """
@@ -10,7 +13,7 @@ class PathAnalyzer:
     # Constructor.
     ####################################################################################################################
 
-    def __init__(self, policy):
+    def __init__(self, policy, collector=None, root=None, stage_timer=None):
         """
         Initializes attributes.
 
@@ -18,6 +21,14 @@ class PathAnalyzer:
         ----------
         policy : IndexerPolicy
             The policy to follow.
+        collector : Collector
+            The Collector to forward the batches to. The Collector of the policy is used if it is not provided.
+        root : str
+            The directory the analyzed paths are relative to. If it is provided, the patterns are matched against the
+            part of the paths below this directory (built from the directories entered), so the length of the root
+            does not affect matching. Otherwise the patterns are matched against the whole paths.
+        stage_timer : StageTimer
+            Records the time spent in filtering and matching the paths. The stages are not timed if it is None.
         """
 
         ### Validate parameters.
@@ -26,6 +37,9 @@ class PathAnalyzer:
 
         ### Attributes from outside.
         self._policy = policy
+        self._collector = collector if collector is not None else policy.collector
+        self._root = root
+        self._stage_timer = stage_timer
 
         ### Private attributes.
         # The categorized file data to be committed when fix point is reached.
@@ -37,12 +51,25 @@ class PathAnalyzer:
         self._inflection_point = -1
         # Stores the last node (directory) we iterated through as an uncategorized node.
         self._last_node_as_uncategorized = None
+        # The paths of the directories entered relative to the root (with a trailing separator), the innermost last.
+        self._relative_directories = ['']
         # The format of the any tag that can match anything in the path. Includes separators.
         self._tag_any = None
         # The collection of files which do not match the predefined pattern and should be commited as uncategorized
         # files at the end.
         self._uncategorized_nodes = []
 
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def category(self):
+        """
+        Gets the media category of the analyzed files.
+        """
+        return self._policy.category
+
     ####################################################################################################################
     # Public methods.
     ####################################################################################################################
@@ -65,34 +92,31 @@ class PathAnalyzer:
             return
 
         # No collectible for this extension. Nothing to do here.
-        collectible = self._policy.get_collectible(extension)
-        if collectible is None:
+        collectibles = self._policy.get_collectibles(extension)
+        if collectibles is None:
             return
 
-        # Check if path should be filtered out.
+        # Check if path should be filtered out, and if not, categorize it.
         full_path = path + extension
-        for path_filter in self._policy.filters:
-            if path_filter.apply_filter(full_path):
-                return
-
-        # Decide whether this path is categorized correctly or not and append the file to the appropriate list.
-        node = self._try_match_pattern(collectible.path_pattern, path, extension)
+        if self._stage_timer is None:
+            if not self._is_filtered(full_path):
+                self._categorize(path, extension, collectibles)
+            return
 
-        if node is None:
-            uncategorized_node = UncategorizedNode(full_path, self._last_node_as_uncategorized)
-            uncategorized_node.token = collectible.token
-            self._uncategorized_nodes.append(uncategorized_node)
-        else:
-            node.token = collectible.token
-            self._categorized_nodes.append(node)
+        start_time = time.perf_counter()
+        is_filtered = self._is_filtered(full_path)
+        filtered_time = time.perf_counter()
+        self._stage_timer.add(self._policy.category, StageTimer.STAGE_FILTERING, filtered_time - start_time)
+        if not is_filtered:
+            self._categorize(path, extension, collectibles)
+            self._stage_timer.add(self._policy.category, StageTimer.STAGE_MATCHING, time.perf_counter() - filtered_time)
 
     def clean_filters(self):
         """
         Cleans the registered filters.
         """
 
-        for path_filter in self._policy.filters:
-            path_filter.clean_filter()
+        self._call_filters('clean_filter')
 
     def enter(self, directory):
         """
@@ -111,13 +135,28 @@ class PathAnalyzer:
         self._last_node_as_uncategorized = UncategorizedNode(directory, self._last_node_as_uncategorized)
         self._current_depth = self._current_depth + 1
 
+        if self._root is not None:
+            self._relative_directories.append(self._relative_directories[-1] + directory + '/')
+
+    def flush(self):
+        """
+        Forwards the files collected so far to the Collector. Should be called when the indexing of a directory tree is
+        finished, so the files that were not followed by leaving a directory are processed as well.
+        """
+
+        if self._uncategorized_nodes:
+            self._process_uncategorized_batch()
+
+        if self._categorized_nodes:
+            self._process_batch()
+        self._inflection_point = -1
+
     def init_filters(self):
         """
         Initializes the registered filters.
         """
 
-        for path_filter in self._policy.filters:
-            path_filter.init_filter()
+        self._call_filters('init_filter')
 
     def leave(self):
         """
@@ -131,6 +170,9 @@ class PathAnalyzer:
         if self._last_node_as_uncategorized is not None:
             self._last_node_as_uncategorized = self._last_node_as_uncategorized.parent
 
+        if len(self._relative_directories) > 1:
+            self._relative_directories.pop()
+
         self._current_depth = self._current_depth - 1
 
         if self._current_depth <= 0 and self._uncategorized_nodes:
@@ -145,12 +187,69 @@ class PathAnalyzer:
     # Auxiliary methods.
     ####################################################################################################################
 
+    def _call_filters(self, method_name):
+        """
+        Calls the given method of the registered filters. The calls are timed as filtering if timing is enabled, since
+        filters (like the synchronization filters) may do most of their work when they are initialized or cleaned.
+        """
+
+        for path_filter in self._policy.filters:
+            method = getattr(path_filter, method_name)
+            if self._stage_timer is None:
+                method()
+            else:
+                self._stage_timer.measure(self._policy.category, StageTimer.STAGE_FILTERING, method)
+
+    def _categorize(self, path, extension, collectibles):
+        """
+        Decides whether the given path is categorized correctly or not and appends the file to the appropriate list.
+        The token of the first collectible is used for uncategorized files.
+        """
+
+        index, groups = self._match(path, extension)
+        collectible = collectibles[max(index, 0)]
+        node = self._try_match_pattern(collectible.path_pattern, groups, path, extension)
+
+        if node is None:
+            uncategorized_node = UncategorizedNode(path + extension, self._last_node_as_uncategorized)
+            uncategorized_node.token = collectible.token
+            self._uncategorized_nodes.append(uncategorized_node)
+        else:
+            node.token = collectible.token
+            self._categorized_nodes.append(node)
+
+    def _is_filtered(self, path):
+
+        for path_filter in self._policy.filters:
+            if path_filter.apply_filter(path):
+                return True
+
+        return False
+
+    def _match(self, path, extension):
+        """
+        Matches the given path against the patterns of the collectibles for the given extension.
+
+        Returns
+        -------
+        An (index, groups) tuple as returned by PathPatternMatcher.match.
+        """
+
+        matcher = self._policy.get_matcher(extension)
+        if self._root is None:
+            return matcher.match(path)
+
+        # The analyzed file is in the directory entered last.
+        directory = self._relative_directories[-1]
+
+        return matcher.match(directory + path[path.rfind('/') + 1:], directory)
+
     def _process_batch(self):
         """
         Calls the Collector to process the current batch of categorized files.
         """
 
-        self._policy.collector.collect_categorized(self._categorized_nodes)
+        self._collector.collect_categorized(self._categorized_nodes)
         self._categorized_nodes = []
 
     def _process_uncategorized_batch(self):
@@ -158,17 +257,19 @@ class PathAnalyzer:
         Calls the Collector to process the current batch of uncategorized files.
         """
 
-        self._policy.collector.collect_uncategorized(self._uncategorized_nodes)
+        self._collector.collect_uncategorized(self._uncategorized_nodes)
         self._uncategorized_nodes = []
 
-    def _try_match_pattern(self, path_pattern, path, extension):
+    def _try_match_pattern(self, path_pattern, groups, path, extension):
         """
-        Tries to match the given pattern to the given path and decides whether the given path is categorized or not.
+        Decides whether the given path is categorized or not based on the result of the pattern matching.
 
         Parameters
         ----------
         path_pattern : PathPattern
-            The pattern the path should match.
+            The pattern the path matched, or the pattern it should have matched.
+        groups : tuple of str
+            The groups of the match or None if the path does not match any of the patterns.
         path : str
             The path to analyze.
         extensions : str
@@ -180,16 +281,15 @@ class PathAnalyzer:
         """
 
         depth = 0
-        matches = path_pattern.path_pattern_regexp.search(path)
         node = None
 
-        if matches is not None:
+        if groups is not None:
 
             depth = path_pattern.length_without_any_tags
             node = CategorizedNode(path + extension)
             i = 0
 
-            for match in matches.groups():
+            for match in groups:
                 if match not in (None, ''):
                     if path_pattern.group_tag_mapping[i] == self._policy.tag_any:
                         depth = depth + 1
@@ -13,6 +13,33 @@ class PathAnalyzerStore:
         # This dictionary stores the corresponding analyzer for each extension.
         self._analyzers_by_extensions = {}
 
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def analyzers(self):
+        """
+        Gets the distinct analyzers registered in the store.
+        """
+
+        analyzers = []
+        for analyzer in self._analyzers_by_extensions.values():
+            if analyzer not in analyzers:
+                analyzers.append(analyzer)
+
+        return analyzers
+
+    @property
+    def category(self):
+        """
+        Gets the media category of the analyzers, or None if they belong to different categories.
+        """
+
+        categories = {analyzer.category for analyzer in self._analyzers_by_extensions.values()}
+
+        return categories.pop() if len(categories) == 1 else None
+
     ####################################################################################################################
     # Public methods.
     ####################################################################################################################
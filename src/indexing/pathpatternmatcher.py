@@ -0,0 +1,178 @@
+import re
+
+class PathPatternMatcher:
+    """
+    Matches a path against multiple PathPatterns in a single pass. The fixed parts of the patterns (the text outside the
+    groups, such as "/Content/") are checked first with plain substring searches, then the regular expressions of the
+    remaining candidates are combined into one alternation, so the path is scanned by the regular expression engine
+    only once regardless of the number of patterns.
+
+    If multiple patterns match, the one whose match starts first in the path (that is, the one that describes the
+    longest part of the path) wins. If these matches start at the same position, the pattern added first wins.
+    """
+
+    ####################################################################################################################
+    # Private constants.
+    ####################################################################################################################
+
+    # The characters that have special meaning in regular expressions outside groups.
+    _SPECIAL_CHARACTERS = '.^$*+?{}[]\\|()'
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, path_patterns):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        path_patterns : list of PathPattern
+            The patterns to match.
+        """
+
+        ### Validate parameters.
+        if not path_patterns:
+            raise Exception('path_patterns cannot be None or empty.')
+
+        ### Attributes from outside.
+        self._path_patterns = path_patterns
+
+        ### Private attributes.
+        # The last directory passed to match and the fixed parts of each pattern that are not present in it as a
+        # tuple, so it can be replaced atomically if the matcher is used by multiple threads.
+        self._directory_cache = (None, None)
+        # The combined regular expressions by the tuple of the indices of the candidate patterns. Each pattern is
+        # wrapped into a group that encloses its own groups, and the indices of the pattern and of the range of its
+        # groups are stored by the index of the enclosing group.
+        self._combined_regexps = {}
+        # The fixed parts of each pattern, that have to be present in a path for the pattern to match.
+        self._literals = [self._find_literals(p.path_pattern_regexp.pattern) for p in path_patterns]
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def match(self, path, directory=None):
+        """
+        Matches the given path against the patterns.
+
+        Parameters
+        ----------
+        path : str
+            The path to match.
+        directory : str
+            The directory part of the path (a prefix of it). If it is provided, the search for the fixed parts of the
+            patterns in the directory is done only once for consecutive paths in the same directory.
+
+        Returns
+        -------
+        An (index, groups) tuple, where index is the index of the winning pattern and groups are the groups of its
+        match, or (-1, None) if none of the patterns match.
+        """
+
+        if directory is None:
+            candidates = tuple(
+                i for i, literals in enumerate(self._literals) if all(literal in path for literal in literals))
+        else:
+            cached_directory, missing_literals = self._directory_cache
+            if directory != cached_directory:
+                missing_literals = self._find_missing_literals(directory)
+                self._directory_cache = (directory, missing_literals)
+            candidates = tuple(
+                i for i, literals in enumerate(missing_literals) if all(literal in path for literal in literals))
+
+        if not candidates:
+            return -1, None
+
+        # A single candidate does not need the combined regular expression.
+        if len(candidates) == 1:
+            matches = self._path_patterns[candidates[0]].path_pattern_regexp.search(path)
+            if matches is None:
+                return -1, None
+            return candidates[0], matches.groups()
+
+        regexp, patterns_by_group_index = self._get_combined_regexp(candidates)
+        matches = regexp.search(path)
+        if matches is None:
+            return -1, None
+
+        index, first_group, end_group = patterns_by_group_index[matches.lastindex]
+
+        return index, tuple(matches.group(i) for i in range(first_group, end_group))
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _find_literals(self, pattern):
+        """
+        Collects the parts of the given regular expression that match only themselves and are not in a group.
+
+        Returns
+        -------
+        The list of the fixed parts. Empty if the pattern contains an alternation outside groups.
+        """
+
+        literals = []
+        current_literal = ''
+        depth = 0
+        is_in_character_class = False
+        is_escaped = False
+
+        for char in pattern:
+            if is_escaped:
+                is_escaped = False
+            elif char == '\\':
+                is_escaped = True
+            elif is_in_character_class:
+                is_in_character_class = char != ']'
+            elif char == '[':
+                is_in_character_class = True
+            elif char == '(':
+                depth = depth + 1
+            elif char == ')':
+                depth = depth - 1
+            elif depth == 0 and char == '|':
+                return []
+            elif depth == 0 and char not in PathPatternMatcher._SPECIAL_CHARACTERS:
+                current_literal = current_literal + char
+                continue
+
+            # The current literal ends here. Characters followed by a quantifier are optional, so the last character is
+            # dropped for safety.
+            if depth == 0 and char in '*+?{':
+                current_literal = current_literal[:-1]
+            literals.append(current_literal)
+            current_literal = ''
+
+        literals.append(current_literal)
+
+        # Single characters (typically separators) are present in almost every path, checking them is not worth it.
+        return [literal for literal in literals if len(literal) > 1]
+
+    def _find_missing_literals(self, directory):
+        """
+        Collects the fixed parts of the patterns that are not present in the given directory, only these have to be
+        searched for in the paths of the directory.
+        """
+
+        return [[literal for literal in literals if literal not in directory] for literals in self._literals]
+
+    def _get_combined_regexp(self, candidates):
+
+        if candidates not in self._combined_regexps:
+            alternatives = []
+            group_index = 1
+            patterns_by_group_index = {}
+
+            for index in candidates:
+                regexp = self._path_patterns[index].path_pattern_regexp
+                alternatives.append('(' + regexp.pattern + ')')
+                patterns_by_group_index[group_index] = (index, group_index + 1, group_index + regexp.groups + 1)
+                group_index = group_index + regexp.groups + 1
+
+            self._combined_regexps[candidates] = (re.compile('|'.join(alternatives)), patterns_by_group_index)
+
+        return self._combined_regexps[candidates]
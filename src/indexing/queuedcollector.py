@@ -0,0 +1,46 @@
+from indexing.collector import Collector
+
+class QueuedCollector(Collector):
+    """
+    Collector that does not process the nodes itself, but hands them over (together with the Collector that should
+    process them) to a callable. Used by the Indexer in parallel mode to forward the batches of the worker threads to
+    the thread that owns the database connection.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, collector, enqueue):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        collector : Collector
+            The Collector that processes the nodes eventually.
+        enqueue : callable
+            Receives a (function, nodes) tuple for each batch, where the function has to be called with the nodes.
+        """
+
+        ### Validate parameters.
+        if collector is None:
+            raise Exception('collector cannot be None.')
+        if enqueue is None:
+            raise Exception('enqueue cannot be None.')
+
+        ### Attributes from outside.
+        self._collector = collector
+        self._enqueue = enqueue
+
+    ####################################################################################################################
+    # Collector implementation.
+    ####################################################################################################################
+
+    def collect_categorized(self, categorized_nodes):
+
+        self._enqueue((self._collector.collect_categorized, categorized_nodes))
+
+    def collect_uncategorized(self, uncategorized_nodes):
+
+        self._enqueue((self._collector.collect_uncategorized, uncategorized_nodes))
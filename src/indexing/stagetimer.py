@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+
+from indexing.stagetiming import StageTiming
+
+class StageTimer:
+    """
+    Records the cumulative time spent in the stages of an indexing process (listing directories, filtering and matching
+    paths, collecting nodes and committing transactions) and the number of times each stage has been executed, per
+    media category. The timings are recorded from multiple threads, so they are synchronized.
+
+    A timer can be activated on a thread, so code that does not receive it explicitly (like a commit callback of the
+    database connections) can record its stages through get_active() and add_to_current_category(). The category of
+    such stages is the category of the stage measured by measure() on the same thread, if any. Stages may nest: the time
+    of committing is part of the time of the collecting or filtering stage that commits.
+
+    Components accept a StageTimer as an optional parameter and do not measure anything without it, so disabled timing
+    costs a comparison per measured operation.
+    """
+
+    ####################################################################################################################
+    # Public constants.
+    ####################################################################################################################
+
+    # The category of the stages that belong to no or multiple categories.
+    CATEGORY_ALL = 'all'
+
+    STAGE_COLLECTING = 'collecting'
+    STAGE_COMMITTING = 'committing'
+    STAGE_FILTERING = 'filtering'
+    STAGE_LISTING = 'listing'
+    STAGE_MATCHING = 'matching'
+
+    ####################################################################################################################
+    # Private constants.
+    ####################################################################################################################
+
+    # Stores the active timer and the category of the current stage of each thread.
+    _THREAD_STATE = threading.local()
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self):
+
+        ### Private attributes.
+        # This lock is used for synchronizing the timings.
+        self._lock = threading.Lock()
+        # The timings as (category, stage) => [count, total time] pairs.
+        self._timings = {}
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def timings(self):
+        """
+        Gets a snapshot of the timings as category (str) => stage (str) => timing (StageTiming) dictionaries.
+        """
+        result = {}
+        with self._lock:
+            for (category, stage), (count, total_time) in self._timings.items():
+                result.setdefault(category, {})[stage] = StageTiming(count, total_time)
+        return result
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def activate(self):
+        """
+        Makes the timer the active timer of the current thread.
+        """
+
+        StageTimer._THREAD_STATE.timer = self
+        StageTimer._THREAD_STATE.category = None
+
+    def add(self, category, stage, elapsed_time):
+        """
+        Records an execution of a stage.
+
+        Parameters
+        ----------
+        category : str
+            The media category, CATEGORY_ALL if None.
+        stage : str
+            The stage, one of the STAGE_* constants.
+        elapsed_time : float
+            The number of seconds the execution took.
+        """
+
+        key = (category if category is not None else StageTimer.CATEGORY_ALL, stage)
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                self._timings[key] = [1, elapsed_time]
+            else:
+                timing[0] += 1
+                timing[1] += elapsed_time
+
+    def add_to_current_category(self, stage, elapsed_time):
+        """
+        Records an execution of a stage in the category of the stage measured by measure() on the current thread.
+        """
+
+        self.add(getattr(StageTimer._THREAD_STATE, 'category', None), stage, elapsed_time)
+
+    def deactivate(self):
+        """
+        Removes the timer from the current thread if it is the active one.
+        """
+
+        if StageTimer.get_active() is self:
+            StageTimer._THREAD_STATE.timer = None
+            StageTimer._THREAD_STATE.category = None
+
+    @staticmethod
+    def get_active():
+        """
+        Gets the timer activated on the current thread.
+
+        Returns
+        -------
+        The StageTimer or None if timing is disabled on the current thread.
+        """
+
+        return getattr(StageTimer._THREAD_STATE, 'timer', None)
+
+    def log(self, title):
+        """
+        Logs the timings, the most expensive stages first.
+
+        Parameters
+        ----------
+        title : str
+            The name of the timed process.
+        """
+
+        rows = []
+        for category, stages in self.timings.items():
+            for stage, timing in stages.items():
+                rows.append((timing.total_time, category, stage, timing.count))
+
+        lines = ['{} {}: {:.3f} s in {} executions'.format(c, s, t, n) for t, c, s, n in sorted(rows, reverse=True)]
+        logging.info('Stage timings of %s:\n%s', title, '\n'.join(lines))
+
+    def measure(self, category, stage, function, *args):
+        """
+        Calls the given function and records the time of the call as an execution of a stage. The stages recorded
+        through add_to_current_category() during the call are assigned to the given category.
+
+        Returns
+        -------
+        The result of the function.
+        """
+
+        previous_category = getattr(StageTimer._THREAD_STATE, 'category', None)
+        StageTimer._THREAD_STATE.category = category
+        start_time = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.add(category, stage, time.perf_counter() - start_time)
+            StageTimer._THREAD_STATE.category = previous_category
@@ -0,0 +1,41 @@
+class StageTiming:
+    """
+    Stores a snapshot of the time spent in a stage of the indexing process.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, count, total_time):
+
+        ### Attributes from outside.
+        self._count = count
+        self._total_time = total_time
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def average_time(self):
+        """
+        Gets the average number of seconds an execution of the stage took, or None if it has not been executed.
+        """
+        if self._count == 0:
+            return None
+        return self._total_time / self._count
+
+    @property
+    def count(self):
+        """
+        Gets the number of times the stage has been executed.
+        """
+        return self._count
+
+    @property
+    def total_time(self):
+        """
+        Gets the cumulative number of seconds spent in the stage.
+        """
+        return self._total_time
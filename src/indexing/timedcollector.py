@@ -0,0 +1,57 @@
+from indexing.collector import Collector
+from indexing.stagetimer import StageTimer
+
+class TimedCollector(Collector):
+    """
+    Collector that forwards the nodes to another Collector and records the time of processing them as the collecting
+    stage of a media category. Used by the Indexer if timing is enabled.
+    """
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, collector, stage_timer, category=None):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        collector : Collector
+            The Collector that processes the nodes.
+        stage_timer : StageTimer
+            The timer to record the time of processing in.
+        category : str
+            The media category of the Collector.
+        """
+
+        ### Validate parameters.
+        if collector is None:
+            raise Exception('collector cannot be None.')
+        if stage_timer is None:
+            raise Exception('stage_timer cannot be None.')
+
+        ### Attributes from outside.
+        self._collector = collector
+        self._stage_timer = stage_timer
+        self._category = category
+
+    ####################################################################################################################
+    # Collector implementation.
+    ####################################################################################################################
+
+    def collect_categorized(self, categorized_nodes):
+
+        self._stage_timer.measure(
+            self._category,
+            StageTimer.STAGE_COLLECTING,
+            self._collector.collect_categorized,
+            categorized_nodes)
+
+    def collect_uncategorized(self, uncategorized_nodes):
+
+        self._stage_timer.measure(
+            self._category,
+            StageTimer.STAGE_COLLECTING,
+            self._collector.collect_uncategorized,
+            uncategorized_nodes)
@@ -0,0 +1,173 @@
+import os
+import time
+
+from indexing.traversal.traversalengine import TraversalEngine
+
+class JournalingTraversalEngine(TraversalEngine):
+    """
+    Wraps another TraversalEngine and records the enumerated directories in a ChangeJournal. Only the entries that may
+    need to be analyzed again are returned:
+
+    - When a directory tree is listed first, the modification time of every recorded directory in it is compared with
+      the recorded one in a single pass (a stat call for each directory).
+    - For an unchanged directory only the subdirectories that have changed or lead to a changed directory are returned
+      (from the journal, without enumerating the directory again). Its files are not returned at all, so an unchanged
+      subtree is not even entered by the Indexer.
+    - A changed directory is enumerated, and the state (size, modification time and inode) of its files is compared with
+      the recorded one. Only the new and the changed files are returned.
+
+    The files that are not returned are marked unchanged in the journal. The modification time of a directory changes
+    only if entries are added to, removed from or renamed in the directory itself, so files modified in place are
+    detected only if the files of the unchanged directories are verified as well (see verify_files).
+    """
+
+    ####################################################################################################################
+    # Private constants.
+    ####################################################################################################################
+
+    # Directories and files modified within this many nanoseconds before they were enumerated are not trusted later,
+    # because a change in the same timestamp granularity could go unnoticed.
+    _RACY_INTERVAL = 2 * 1000 * 1000 * 1000
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, traversal_engine, change_journal, verify_files=False):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        traversal_engine : TraversalEngine
+            The engine used to enumerate the directories that have changed.
+        change_journal : ChangeJournal
+            The journal to use.
+        verify_files : bool
+            Indicates whether the state of the files of the unchanged directories should be compared with the recorded
+            one as well. A directory is enumerated again if any of its files has changed. Costs a stat call for every
+            file.
+        """
+
+        ### Validate parameters.
+        if traversal_engine is None:
+            raise Exception('traversal_engine cannot be None.')
+        if change_journal is None:
+            raise Exception('change_journal cannot be None.')
+
+        ### Attributes from outside.
+        self._traversal_engine = traversal_engine
+        self._change_journal = change_journal
+        self._verify_files = verify_files
+
+    ####################################################################################################################
+    # TraversalEngine implementation.
+    ####################################################################################################################
+
+    def list_directory(self, path):
+
+        # The journal stores the paths without trailing separators, like os.path.dirname returns them.
+        directory = path.rstrip(os.sep) or path
+
+        # Examine the whole tree when the directory of a rule is listed first.
+        if not self._change_journal.is_examined(directory) \
+           and not self._change_journal.is_examined(os.path.dirname(directory)):
+            self._examine_directory_tree(directory)
+
+        if self._change_journal.is_unchanged(directory):
+            return [
+                (name, os.path.join(path, name), True)
+                for name in self._change_journal.find_changed_subdirectories(directory)]
+
+        mtime = os.stat(path).st_mtime_ns
+        listed_entries = list(self._traversal_engine.list_directory(path))
+
+        files = [
+            self._create_file_record(name, entry_path)
+            for name, entry_path, is_directory in listed_entries if not is_directory]
+        recorded_files = self._change_journal.find_files(directory)
+
+        self._change_journal.record_directory(directory, self._get_trusted_mtime(mtime), files)
+
+        if recorded_files is None:
+            return listed_entries
+
+        return self._filter_unchanged_files(listed_entries, files, recorded_files)
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _create_file_record(self, name, path):
+
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            # The file has been removed since the directory was enumerated.
+            return (name, None, None, None)
+
+        if self._get_trusted_mtime(stat_result.st_mtime_ns) is None:
+            return (name, None, None, None)
+
+        return (name, stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino)
+
+    def _examine_directory_tree(self, path):
+        """
+        Compares the modification time of the recorded directories in the given tree with the current one and marks
+        them changed or unchanged in the journal. The directories that do not exist anymore are not marked at all.
+        """
+
+        changed_paths = []
+        unchanged_paths = []
+
+        for directory, mtime in self._change_journal.find_directories(path):
+            try:
+                current_mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+
+            if mtime == current_mtime and (not self._verify_files or self._verify_directory(directory)):
+                unchanged_paths.append(directory)
+            else:
+                changed_paths.append(directory)
+
+        self._change_journal.mark_unchanged(unchanged_paths)
+        self._change_journal.mark_changed(path, changed_paths)
+
+    def _filter_unchanged_files(self, listed_entries, files, recorded_files):
+        """
+        Removes the files whose state is the same as the recorded one from the listed entries and marks them unchanged.
+        """
+
+        recorded_states = {recorded_file[0] : tuple(recorded_file[1:]) for recorded_file in recorded_files}
+        unchanged_names = {
+            file_record[0] for file_record in files
+            if file_record[1] is not None and recorded_states.get(file_record[0], None) == file_record[1:]}
+
+        result = []
+        for entry in listed_entries:
+            if entry[0] in unchanged_names and not entry[2]:
+                self._change_journal.mark_file_unchanged(entry[1])
+            else:
+                result.append(entry)
+
+        return result
+
+    def _get_trusted_mtime(self, mtime):
+
+        if mtime > int(time.time() * 1000 * 1000 * 1000) - JournalingTraversalEngine._RACY_INTERVAL:
+            return None
+
+        return mtime
+
+    def _verify_directory(self, path):
+        """
+        Tells whether the state of every recorded file of the given directory is the same as the recorded one.
+        """
+
+        for recorded_file in self._change_journal.find_files(path):
+            file_record = self._create_file_record(recorded_file[0], os.path.join(path, recorded_file[0]))
+            if file_record[1] is None or tuple(recorded_file[1:]) != file_record[1:]:
+                return False
+
+        return True
@@ -0,0 +1,19 @@
+import os
+
+from indexing.traversal.traversalengine import TraversalEngine
+
+class ListdirTraversalEngine(TraversalEngine):
+    """
+    Enumerates directories with os.listdir. The type of each entry is determined by an additional stat call, so prefer
+    ScandirTraversalEngine if it is available.
+    """
+
+    ####################################################################################################################
+    # TraversalEngine implementation.
+    ####################################################################################################################
+
+    def list_directory(self, path):
+
+        for name in os.listdir(path):
+            current_path = os.path.join(path, name)
+            yield name, current_path, os.path.isdir(current_path)
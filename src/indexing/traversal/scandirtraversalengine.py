@@ -0,0 +1,21 @@
+import os
+
+from indexing.traversal.traversalengine import TraversalEngine
+
+class ScandirTraversalEngine(TraversalEngine):
+    """
+    Enumerates directories with os.scandir. The type of the entries is read from the directory itself on most
+    platforms, so no additional stat call is needed for files and directories (only for symbolic links).
+    """
+
+    ####################################################################################################################
+    # TraversalEngine implementation.
+    ####################################################################################################################
+
+    def list_directory(self, path):
+
+        # Read the whole directory before returning anything so the handle is not kept open during the recursion.
+        with os.scandir(path) as iterator:
+            entries = list(iterator)
+
+        return [(entry.name, entry.path, entry.is_dir()) for entry in entries]
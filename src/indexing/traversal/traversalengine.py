@@ -0,0 +1,23 @@
+class TraversalEngine:
+    """
+    Interface that describes how the Indexer enumerates the content of a directory. Different implementations can use
+    different system calls, but they have to report the entries in the order the operating system returns them.
+    """
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def list_directory(self, path):
+        """
+        Enumerates the entries of the given directory.
+
+        Parameters
+        ----------
+        path : str
+            The path of the directory to enumerate.
+
+        Returns
+        -------
+        An iterable of (name, path, is_directory) tuples, one for each entry in the directory.
+        """
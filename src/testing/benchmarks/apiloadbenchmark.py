@@ -0,0 +1,370 @@
+"""
+Measures the latency and the throughput of the web API under load. Starts the server against a synthetic catalog (see
+SyntheticLibrary), then replays a deterministic mix of requests at a fixed concurrency and reports the p50, p95 and
+p99 latency and the throughput of each kind of request. The results are saved as JSON, and can be compared with the
+results of a previous run (e.g. of another commit).
+
+The request kinds:
+- titles: a page of the top level video titles.
+- filtered_titles: a page of the video titles filtered by parent, language, quality, subtitle language or text.
+- details: the details of a video title.
+- details_batch: the details of ten video titles.
+- search: a search for a word of the synthetic names.
+- tracks: the tracks of an audio album.
+- status: the status of the service.
+
+Must be run from the directory of main.py. The server is started by ServerManager through pipenv, so the packages of
+the Pipfile have to be available in its environment. The client runs in the same Python process for every concurrent
+user, so its overhead is part of the measured latency; it is constant between commits.
+
+Usage: python -m testing.benchmarks.apiloadbenchmark [--files 100000] [--concurrency 8] [--requests 5000]
+    [--warmup 200] [--mix titles=20,filtered_titles=20,...] [--port 8097] [--seed 0] [--output <json file>]
+    [--compare <json file>]
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import queue
+import random
+import shutil
+import tempfile
+import threading
+import time
+import urllib.parse
+
+import requests
+
+from bll.mediacatalog.catalogizer import Catalogizer
+from bll.mediacatalog.catalogizercontext import CatalogizerContext
+from dal.configuration.config import Config
+from dal.configuration.configmanager import ConfigManager
+from dal.media import MediaDataHandlerFactory
+from dal.video.videotitlefilter import VideoTitleFilter
+from testing.benchmarks.catalogbenchmark import get_commit
+from testing.communicationhelper import get_json
+from testing.servermanager import ServerManager
+from testing.syntheticlibrary import SyntheticLibrary
+
+# The weights of the request kinds if no mix is given.
+DEFAULT_MIX = 'titles=20,filtered_titles=20,details=20,details_batch=5,search=15,tracks=15,status=5'
+
+# The percentiles of the latency that are reported.
+PERCENTILES = [50, 95, 99]
+
+# The words of the synthetic names used for searching and filtering by text.
+SEARCH_WORDS = ['Title', 'Episode', 'Artist', 'Album', 'Track', 'Photo', 'Season']
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Web API load benchmark.')
+    parser.add_argument('--files', type=int, default=100000, help='the number of files in the synthetic library')
+    parser.add_argument('--concurrency', type=int, default=8, help='the number of concurrent clients')
+    parser.add_argument('--requests', type=int, default=5000, help='the number of measured requests')
+    parser.add_argument('--warmup', type=int, default=200, help='the number of requests sent before measuring')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='comma separated <kind>=<weight> pairs')
+    parser.add_argument('--port', type=int, default=8097, help='the port of the server')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the library and of the requests')
+    parser.add_argument('--startup-timeout', type=int, default=60, help='the seconds to wait for the server')
+    parser.add_argument('--output', default=None, help='the JSON file to save the results to')
+    parser.add_argument('--compare', default=None, help='a JSON file of a previous run to compare the results with')
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    mix = parse_mix(arguments.mix)
+    root_path = tempfile.mkdtemp(prefix='piepy-load-')
+    server_manager = None
+
+    try:
+        print('Creating a catalog of {} files...'.format(arguments.files))
+        config_path, targets = create_catalog(root_path, arguments.files, arguments.seed, arguments.port)
+
+        base_url = 'http://localhost:{}/'.format(arguments.port)
+        server_manager = ServerManager('main.py', config_path)
+        server_manager.start()
+        if not server_manager.wait_for_initialization(base_url, arguments.startup_timeout):
+            raise Exception('The service is unavailable.')
+        wait_for_idle_catalog(base_url, arguments.startup_timeout)
+
+        request_random = random.Random(arguments.seed)
+        run_load(base_url, build_requests(mix, targets, arguments.warmup, request_random), arguments.concurrency)
+        samples, elapsed = run_load(
+            base_url,
+            build_requests(mix, targets, arguments.requests, request_random),
+            arguments.concurrency)
+    finally:
+        if server_manager is not None:
+            server_manager.stop()
+        shutil.rmtree(root_path)
+
+    results = {
+        'commit' : get_commit(),
+        'date' : datetime.datetime.now().isoformat(),
+        'platform' : platform.platform(),
+        'python' : platform.python_version(),
+        'parameters' : {
+            'concurrency' : arguments.concurrency,
+            'files' : arguments.files,
+            'mix' : mix,
+            'requests' : arguments.requests,
+            'seed' : arguments.seed,
+            'warmup' : arguments.warmup},
+        'elapsed_seconds' : elapsed,
+        'kinds' : summarize(samples, elapsed)}
+
+    print_summary(results['kinds'])
+
+    if arguments.output is not None:
+        with open(arguments.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+        print('Results saved to {}.'.format(arguments.output))
+
+    if arguments.compare is not None:
+        with open(arguments.compare, 'r') as previous_file:
+            compare_results(json.load(previous_file), results)
+
+def build_requests(mix, targets, count, request_random):
+    """
+    Builds the given number of (kind, relative URL) pairs, choosing the kinds by the weights of the mix.
+    """
+
+    kinds = sorted(mix)
+    weights = [mix[kind] for kind in kinds]
+
+    return [(kind, build_url(kind, targets, request_random))
+            for kind in request_random.choices(kinds, weights=weights, k=count)]
+
+def build_url(kind, targets, request_random):
+
+    if kind == 'titles':
+        return 'video/titles?limit=50'
+
+    if kind == 'filtered_titles':
+        filter_key, target_key = request_random.choice([
+            ('language', 'language_ids'),
+            ('parent', 'parent_ids'),
+            ('quality', 'quality_ids'),
+            ('subtitle', 'language_ids'),
+            ('text', 'words')])
+        value = request_random.choice(targets[target_key])
+        return 'video/titles?limit=50&{}={}'.format(filter_key, urllib.parse.quote(str(value)))
+
+    if kind == 'details':
+        return 'video/details/{}'.format(request_random.choice(targets['title_ids']))
+
+    if kind == 'details_batch':
+        title_ids = request_random.sample(targets['title_ids'], min(10, len(targets['title_ids'])))
+        return 'video/details?ids={}'.format(','.join(str(title_id) for title_id in title_ids))
+
+    if kind == 'search':
+        return 'search/{}'.format(urllib.parse.quote(request_random.choice(targets['words'])))
+
+    if kind == 'tracks':
+        return 'audio/tracks?album={}'.format(request_random.choice(targets['album_ids']))
+
+    if kind == 'status':
+        return 'status'
+
+    raise Exception('Unknown request kind: {}.'.format(kind))
+
+def compare_results(previous_results, results):
+    """
+    Prints the ratio of the current and the previous latency percentiles and throughput of each request kind. A ratio
+    above 1 means the current commit is slower (or, for the throughput, faster).
+    """
+
+    print('Compared with {} ({}):'.format(previous_results.get('commit'), previous_results.get('date')))
+    if previous_results['parameters'] != results['parameters']:
+        print('Warning: the parameters differ: {} and {}.'.format(
+            previous_results['parameters'],
+            results['parameters']))
+    print('{:>16} {:>9} {:>9} {:>9} {:>11}'.format('kind', 'p50', 'p95', 'p99', 'throughput'))
+
+    for kind, summary in results['kinds'].items():
+        previous_summary = previous_results['kinds'].get(kind)
+        if previous_summary is None:
+            continue
+        keys = ['p{}_ms'.format(p) for p in PERCENTILES] + ['requests_per_second']
+        ratios = [summary[k] / previous_summary[k] if previous_summary[k] else float('nan') for k in keys]
+        print('{:>16} {:8.2f}x {:8.2f}x {:8.2f}x {:10.2f}x'.format(kind, *ratios))
+
+def create_catalog(root_path, file_count, seed, port):
+    """
+    Creates a synthetic library, builds its catalog and saves the configuration of the server.
+
+    Returns
+    -------
+    The path of the configuration and the IDs and words the requests refer to.
+    """
+
+    library = SyntheticLibrary(os.path.join(root_path, 'media'), file_count, seed)
+    library.create()
+
+    config = Config()
+    config.create_default()
+    config.database.path_media = os.path.join(root_path, 'media.db')
+    config.database.path_playlist = os.path.join(root_path, 'playlist.db')
+    config.logging.enabled = False
+    config.web.port = port
+    library.configure(config)
+
+    context = CatalogizerContext()
+    context.database_config = config.database
+    context.indexing_config = config.indexing
+    context.media_dal = MediaDataHandlerFactory.create(config.database.path_media)
+    if Catalogizer(context).rebuild_database() != Catalogizer.STATUS_COMPLETED:
+        raise Exception('The catalog cannot be built.')
+
+    config_path = os.path.join(root_path, 'config.json')
+    ConfigManager.save(config_path, config)
+
+    return config_path, get_targets(context.media_dal)
+
+def get_percentile(sorted_values, percentile):
+    """
+    Gets the given percentile of the sorted values by the nearest-rank method.
+    """
+
+    index = max(0, -(-len(sorted_values) * percentile // 100) - 1)
+
+    return sorted_values[index]
+
+def get_targets(media_dal):
+    """
+    Gets the IDs the requests refer to, as lists by target kind.
+    """
+
+    video_retriever = media_dal.video_data_handler.retriever
+    title_filter = VideoTitleFilter()
+    title_filter.any_parent = True
+
+    targets = {
+        'album_ids' : [album['id'] for album in media_dal.audio_data_handler.retriever.retrieve_albums()],
+        'language_ids' : [language['id'] for language in video_retriever.retrieve_languages()],
+        'parent_ids' : [title['id'] for title in video_retriever.retrieve_titles()],
+        'quality_ids' : [quality['id'] for quality in video_retriever.retrieve_qualities()],
+        'title_ids' : [title['id'] for title in video_retriever.retrieve_titles(title_filter)],
+        'words' : SEARCH_WORDS}
+
+    for key, values in targets.items():
+        if not values:
+            raise Exception('The catalog contains no {}, the library is too small.'.format(key))
+
+    return targets
+
+def parse_mix(mix_string):
+
+    mix = {}
+    for item in mix_string.split(','):
+        kind, weight = item.split('=')
+        mix[kind.strip()] = float(weight)
+
+    return mix
+
+def print_summary(summaries):
+
+    print('{:>16} {:>8} {:>8} {:>10} {:>10} {:>10} {:>12}'.format(
+        'kind', 'requests', 'errors', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'requests/s'))
+    for kind, summary in summaries.items():
+        print('{:>16} {:8} {:8} {:10.1f} {:10.1f} {:10.1f} {:12.1f}'.format(
+            kind,
+            summary['count'],
+            summary['error_count'],
+            summary['p50_ms'],
+            summary['p95_ms'],
+            summary['p99_ms'],
+            summary['requests_per_second']))
+
+def run_load(base_url, request_list, concurrency):
+    """
+    Sends the requests from the given number of threads, each request as soon as a thread is free.
+
+    Returns
+    -------
+    The (kind, latency in seconds, is successful) samples and the elapsed seconds.
+    """
+
+    request_queue = queue.Queue()
+    for request in request_list:
+        request_queue.put(request)
+
+    samples = []
+    samples_lock = threading.Lock()
+
+    def send_requests():
+        session = requests.Session()
+        thread_samples = []
+        while True:
+            try:
+                kind, url = request_queue.get_nowait()
+            except queue.Empty:
+                break
+            start_time = time.perf_counter()
+            try:
+                is_successful = session.get(base_url + url).status_code == 200
+            except requests.exceptions.RequestException:
+                is_successful = False
+            thread_samples.append((kind, time.perf_counter() - start_time, is_successful))
+        session.close()
+        with samples_lock:
+            samples.extend(thread_samples)
+
+    threads = [threading.Thread(target=send_requests) for _ in range(concurrency)]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return samples, time.perf_counter() - start_time
+
+def summarize(samples, elapsed):
+    """
+    Computes the number of requests and errors, the latency percentiles and the throughput of each request kind and of
+    all the requests ('all').
+    """
+
+    latencies = {'all' : []}
+    error_counts = {'all' : 0}
+    for kind, latency, is_successful in samples:
+        for key in ['all', kind]:
+            latencies.setdefault(key, []).append(latency)
+            error_counts[key] = error_counts.get(key, 0) + (0 if is_successful else 1)
+
+    summaries = {}
+    for kind in sorted(latencies):
+        sorted_latencies = sorted(latencies[kind])
+        if not sorted_latencies:
+            continue
+        summary = {
+            'count' : len(sorted_latencies),
+            'error_count' : error_counts[kind],
+            'mean_ms' : sum(sorted_latencies) / len(sorted_latencies) * 1000,
+            'requests_per_second' : len(sorted_latencies) / elapsed}
+        for percentile in PERCENTILES:
+            summary['p{}_ms'.format(percentile)] = get_percentile(sorted_latencies, percentile) * 1000
+        summaries[kind] = summary
+
+    return summaries
+
+def wait_for_idle_catalog(base_url, timeout):
+    """
+    Waits until the jobs queued at startup (the upgrade of the catalog) are finished, so they do not distort the
+    results.
+    """
+
+    for _ in range(0, timeout):
+        jobs = get_json(base_url + 'jobs')['jobs']
+        if all(job['state'] not in ['queued', 'in progress'] for job in jobs):
+            return
+        time.sleep(1)
+
+    raise Exception('The catalog is still being synchronized.')
+
+if __name__ == '__main__':
+
+    main()
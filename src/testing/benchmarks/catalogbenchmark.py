@@ -0,0 +1,193 @@
+"""
+Measures how rebuilding and synchronizing the media catalog scale with the size of the library, on deterministic
+synthetic libraries that follow the default indexing patterns. The results are saved as JSON, and can be compared
+with the results of a previous run (e.g. of another commit).
+
+Usage: python -m testing.benchmarks.catalogbenchmark [--sizes 1000,10000,100000] [--churn <percent>]
+    [--seed <seed>] [--pool-size <threads>] [--timing] [--output <json file>] [--compare <json file>]
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+
+from bll.mediacatalog.catalogizer import Catalogizer
+from bll.mediacatalog.catalogizercontext import CatalogizerContext
+from dal.configuration.config import Config
+from dal.media import MediaDataHandlerFactory
+from testing.syntheticlibrary import SyntheticLibrary
+
+# The measured operations in the order of execution.
+SCENARIOS = ['rebuild', 'noop_sync', 'churn_sync']
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Media catalog benchmark.')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='comma separated numbers of files (up to 1000000)')
+    parser.add_argument('--churn', type=float, default=1.0, help='the percent of files replaced before the last sync')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the synthetic libraries')
+    parser.add_argument('--pool-size', type=int, default=None, help='the number of indexing threads')
+    parser.add_argument('--timing', action='store_true', help='record the time of the indexing stages')
+    parser.add_argument('--output', default=None, help='the JSON file to save the results to')
+    parser.add_argument('--compare', default=None, help='a JSON file of a previous run to compare the results with')
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    results = {
+        'commit' : get_commit(),
+        'date' : datetime.datetime.now().isoformat(),
+        'platform' : platform.platform(),
+        'python' : platform.python_version(),
+        'sqlite' : sqlite3.sqlite_version,
+        'parameters' : {
+            'churn' : arguments.churn,
+            'pool_size' : arguments.pool_size,
+            'seed' : arguments.seed,
+            'timing' : arguments.timing},
+        'runs' : []}
+
+    print('{:>10} {:>12} {:>12} {:>12} {:>16}'.format(
+        'files', 'rebuild (s)', 'no-op (s)', 'churn (s)', 'rebuild files/s'))
+    for size in [int(s) for s in arguments.sizes.split(',')]:
+        run = run_benchmark(size, arguments.churn / 100, arguments.seed, arguments.pool_size, arguments.timing)
+        results['runs'].append(run)
+        print('{:10} {:12.3f} {:12.3f} {:12.3f} {:16.0f}'.format(
+            size,
+            run['rebuild']['seconds'],
+            run['noop_sync']['seconds'],
+            run['churn_sync']['seconds'],
+            run['rebuild']['files_per_second']))
+
+    if arguments.output is not None:
+        with open(arguments.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+        print('Results saved to {}.'.format(arguments.output))
+
+    if arguments.compare is not None:
+        with open(arguments.compare, 'r') as previous_file:
+            compare_results(json.load(previous_file), results)
+
+def compare_results(previous_results, results):
+    """
+    Prints the ratio of the current and the previous time of the scenarios that have been measured on libraries of the
+    same size. A ratio above 1 means the current commit is slower.
+    """
+
+    print('Compared with {} ({}):'.format(previous_results.get('commit'), previous_results.get('date')))
+    if previous_results['parameters'] != results['parameters']:
+        print('Warning: the parameters differ: {} and {}.'.format(
+            previous_results['parameters'],
+            results['parameters']))
+    print('{:>10} {:>12} {:>12} {:>12}'.format('files', 'rebuild', 'no-op', 'churn'))
+
+    previous_runs = {run['file_count'] : run for run in previous_results['runs']}
+    for run in results['runs']:
+        previous_run = previous_runs.get(run['file_count'])
+        if previous_run is None:
+            continue
+        ratios = [run[s]['seconds'] / previous_run[s]['seconds'] if previous_run[s]['seconds'] > 0 else float('nan')
+                  for s in SCENARIOS]
+        print('{:10} {:11.2f}x {:11.2f}x {:11.2f}x'.format(run['file_count'], *ratios))
+
+def get_commit():
+    """
+    Gets the current git commit, or None if it cannot be determined.
+    """
+
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def get_row_counts(media_dal):
+
+    video_retriever = media_dal.video_data_handler.retriever
+
+    return {
+        'audio' : media_dal.audio_data_handler.retriever.retrieve_file_count(),
+        'image' : media_dal.image_data_handler.retriever.retrieve_file_count(),
+        'subtitle' : len(video_retriever.retrieve_subtitle_paths()),
+        'video' : video_retriever.retrieve_file_count()}
+
+def get_stage_timings_dictionary(catalogizer):
+
+    stage_timings = catalogizer.stage_timings
+    if stage_timings is None:
+        return None
+
+    return {
+        category : {stage : {'count' : t.count, 'seconds' : t.total_time} for stage, t in stages.items()}
+        for category, stages in stage_timings.items()}
+
+def measure(catalogizer, function, library, media_dal):
+    """
+    Runs a rebuild or a synchronization and checks that the catalog contains exactly the files of the library.
+    """
+
+    start_time = time.perf_counter()
+    status = function()
+    elapsed = time.perf_counter() - start_time
+
+    if status != Catalogizer.STATUS_COMPLETED:
+        raise Exception('The indexing process has failed with status {}.'.format(status))
+    row_counts = get_row_counts(media_dal)
+    if row_counts != library.file_counts:
+        raise Exception('The catalog contains {} files instead of {}.'.format(row_counts, library.file_counts))
+
+    return {
+        'seconds' : elapsed,
+        'files_per_second' : library.file_count / elapsed if elapsed > 0 else None,
+        'stages' : get_stage_timings_dictionary(catalogizer)}
+
+def run_benchmark(size, churn_ratio, seed, pool_size, timing):
+    """
+    Creates a synthetic library of the given size, then measures a rebuild, a synchronization without changes and a
+    synchronization after replacing the given ratio of the files.
+    """
+
+    root_path = tempfile.mkdtemp(prefix='piepy-catalog-')
+
+    try:
+        library = SyntheticLibrary(os.path.join(root_path, 'media'), size, seed)
+        start_time = time.perf_counter()
+        library.create()
+        generation_time = time.perf_counter() - start_time
+
+        config = Config()
+        config.database.path_media = os.path.join(root_path, 'media.db')
+        config.indexing.timing = timing
+        if pool_size is not None:
+            config.indexing.pool_size = pool_size
+        library.configure(config)
+
+        context = CatalogizerContext()
+        context.database_config = config.database
+        context.indexing_config = config.indexing
+        context.media_dal = MediaDataHandlerFactory.create(config.database.path_media)
+        catalogizer = Catalogizer(context)
+
+        run = {'file_count' : size, 'file_counts' : library.file_counts, 'generation_seconds' : generation_time}
+        run['rebuild'] = measure(catalogizer, catalogizer.rebuild_database, library, context.media_dal)
+        run['noop_sync'] = measure(catalogizer, catalogizer.synchronize_database, library, context.media_dal)
+        run['churned_file_count'] = library.churn(churn_ratio)
+        run['churn_sync'] = measure(catalogizer, catalogizer.synchronize_database, library, context.media_dal)
+
+        return run
+    finally:
+        shutil.rmtree(root_path)
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,106 @@
+"""
+Compares the traversal engines of the Indexer on a synthetic directory tree.
+
+Usage: python -m testing.benchmarks.indexerbenchmark [<number of titles>]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from indexing.collectible import Collectible
+from indexing.collector import Collector
+from indexing.indexer import Indexer
+from indexing.indexerpolicy import IndexerPolicy
+from indexing.pathpatternanalyzer import PathPatternAnalyzer
+from indexing.tagconfig import TagConfig
+from indexing.traversal.listdirtraversalengine import ListdirTraversalEngine
+from indexing.traversal.scandirtraversalengine import ScandirTraversalEngine
+
+def main():
+
+    title_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    root_path = tempfile.mkdtemp(prefix='piepy-indexer-')
+
+    try:
+        file_count = create_tree(root_path, title_count)
+        print('Synthetic tree: {} titles, {} files.'.format(title_count, file_count))
+
+        for name, engine in [('listdir', ListdirTraversalEngine()), ('scandir', ScandirTraversalEngine())]:
+            elapsed, stat_calls, collected = run_indexer(root_path, engine)
+            print('{:8} {:8.3f} s {:10} stat calls {:10} files collected'.format(name, elapsed, stat_calls, collected))
+    finally:
+        shutil.rmtree(root_path)
+
+def create_tree(root_path, title_count):
+    """
+    Creates a video library with titles that have two qualities, two languages and ten episodes each.
+    """
+
+    file_count = 0
+
+    for title_index in range(0, title_count):
+        for quality in ['HD', 'SD']:
+            for languages in ['English', 'Hungarian']:
+                directory = os.path.join(root_path, 'Title {}'.format(title_index), 'Content', quality, languages)
+                os.makedirs(directory)
+                for episode_index in range(0, 10):
+                    with open(os.path.join(directory, 'Episode {}.mkv'.format(episode_index)), 'w'):
+                        file_count = file_count + 1
+
+    return file_count
+
+def run_indexer(root_path, traversal_engine):
+
+    tag_patterns = {
+        'episode_title' : '([^/]+)',
+        'languages' : '([^/]+)',
+        'quality' : '([^/]+)',
+        'title' : '([^/]+)'}
+    tag_config = TagConfig('%', '%', ('any', '[^/]+'), tag_patterns)
+    path_pattern = PathPatternAnalyzer().parse(
+        tag_config,
+        '%title%/Content/%quality%/%languages%/%any%/%episode_title%')
+    collector = CountingCollector()
+    policy = IndexerPolicy(collector, [Collectible(['.mkv'], path_pattern)])
+    policy.tag_any = 'any'
+
+    indexer = Indexer(traversal_engine=traversal_engine)
+    indexer.add_rule(root_path, policy)
+
+    original_stat = os.stat
+    stat_counter = [0]
+
+    def counting_stat(*args, **kwargs):
+        stat_counter[0] = stat_counter[0] + 1
+        return original_stat(*args, **kwargs)
+
+    os.stat = counting_stat
+    try:
+        start_time = time.perf_counter()
+        indexer.index()
+        elapsed = time.perf_counter() - start_time
+    finally:
+        os.stat = original_stat
+
+    return elapsed, stat_counter[0], collector.count
+
+class CountingCollector(Collector):
+
+    def __init__(self):
+
+        self.count = 0
+
+    def collect_categorized(self, categorized_nodes):
+
+        self.count = self.count + len(categorized_nodes)
+
+    def collect_uncategorized(self, uncategorized_nodes):
+
+        self.count = self.count + len(uncategorized_nodes)
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,83 @@
+"""
+Compares matching paths against multiple path patterns one by one and with a PathPatternMatcher.
+
+Usage: python -m testing.benchmarks.pathmatcherbenchmark [<number of patterns> ...]
+"""
+
+import sys
+import time
+
+from indexing.pathpatternanalyzer import PathPatternAnalyzer
+from indexing.pathpatternmatcher import PathPatternMatcher
+from indexing.tagconfig import TagConfig
+
+# The number of paths to match with each pattern set.
+PATH_COUNT = 20000
+
+def main():
+
+    pattern_counts = [int(a) for a in sys.argv[1:]] if len(sys.argv) > 1 else [1, 2, 4, 8, 16]
+
+    print('{:>10} {:>18} {:>18} {:>10}'.format('patterns', 'per pattern (s)', 'combined (s)', 'speedup'))
+    for pattern_count in pattern_counts:
+        path_patterns = create_path_patterns(pattern_count)
+        paths = create_paths(pattern_count)
+        per_pattern_time = measure_per_pattern_search(path_patterns, paths)
+        combined_time = measure_combined_search(path_patterns, paths)
+        print('{:10} {:18.3f} {:18.3f} {:10.2f}'.format(
+            pattern_count, per_pattern_time, combined_time, per_pattern_time / combined_time))
+
+def create_path_patterns(pattern_count):
+    """
+    Creates video-like patterns that differ in a fixed directory name.
+    """
+
+    tag_patterns = {
+        'episode_title' : '([^/]+)',
+        'languages' : '([^/]+)',
+        'quality' : '([^/]+)',
+        'title' : '([^/]+)'}
+    tag_config = TagConfig('%', '%', ('any', '[^/]+'), tag_patterns)
+    path_pattern_analyzer = PathPatternAnalyzer()
+
+    return [
+        path_pattern_analyzer.parse(
+            tag_config,
+            '%title%/Content{}/%quality%/%languages%/%any%/%episode_title%'.format(i))
+        for i in range(0, pattern_count)]
+
+def create_paths(pattern_count):
+    """
+    Creates paths that match the patterns evenly, and some that do not match any of them.
+    """
+
+    paths = []
+    for i in range(0, PATH_COUNT):
+        content = 'Content{}'.format(i % (pattern_count + 1)) if i % (pattern_count + 1) < pattern_count else 'Extras'
+        paths.append('/mnt/hdd/Video/Title {}/{}/HD (720p)/en/Season 1/Episode {:02}'.format(i // 50, content, i % 50))
+
+    return paths
+
+def measure_per_pattern_search(path_patterns, paths):
+
+    start_time = time.perf_counter()
+    for path in paths:
+        for path_pattern in path_patterns:
+            if path_pattern.path_pattern_regexp.search(path) is not None:
+                break
+
+    return time.perf_counter() - start_time
+
+def measure_combined_search(path_patterns, paths):
+
+    matcher = PathPatternMatcher(path_patterns)
+
+    start_time = time.perf_counter()
+    for path in paths:
+        matcher.match(path)
+
+    return time.perf_counter() - start_time
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,209 @@
+"""
+Captures the query plans and timings of the typical media database queries on a synthetic database without the
+indices (like databases created by earlier versions), then upgrades the database in place and captures them again.
+
+Usage: python -m testing.benchmarks.queryplanbenchmark [<number of video titles>]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from dal.media import MediaDataHandlerFactory
+
+# The number of times each query is executed.
+REPETITIONS = 20
+
+# The queries issued by the retrievers and the deleters, with typical parameters.
+QUERIES = [
+    (
+        'video title lookup',
+        'SELECT id FROM video_title WHERE id_parent=? AND title=? LIMIT 1',
+        (2, 'Title 500')),
+    (
+        'video lower title lookup',
+        'SELECT id, id_parent FROM video_title WHERE title=? AND id_parent IS NOT NULL LIMIT 1',
+        ('Title 500 - Episode 5',)),
+    (
+        'video titles',
+        'SELECT t.id, t.title FROM video_title AS t WHERE t.id_parent IS NULL ORDER BY t.title',
+        ()),
+    (
+        'video titles by language',
+        'SELECT t.id, t.title '
+        'FROM video_title_language_mapping AS m, video_title AS t '
+        'WHERE t.id_parent IS NULL AND m.id_language=? AND t.id=m.id_title '
+        'GROUP BY t.title '
+        'ORDER BY t.title',
+        (2,)),
+    (
+        'video details',
+        'SELECT f.id AS id, q.quality AS quality, l.language AS language '
+        'FROM video_file AS f, video_quality AS q, video_file_language_mapping AS m '
+        'INNER JOIN video_language AS l ON l.id=m.id_language '
+        'WHERE f.id_title=? AND q.id=f.id_quality AND m.id_file=f.id',
+        (1000,)),
+    (
+        'video subtitles of file',
+        'SELECT s.id, l.language '
+        'FROM video_subtitle AS s, video_language AS l '
+        'WHERE s.id_file=? AND l.id=s.id_language',
+        (1000,)),
+    (
+        'video file id',
+        'SELECT f.id '
+        'FROM video_file AS f, video_file_language_mapping AS m '
+        'WHERE f.id_title=? AND f.id_quality=? AND m.id_language=? AND f.id=m.id_file '
+        'LIMIT 1',
+        (1000, 2, 2)),
+    (
+        'video files of title (deleter)',
+        'SELECT id, id_quality FROM video_file WHERE id_title=?',
+        (1000,)),
+    (
+        'audio album lookup',
+        'SELECT id FROM audio_album WHERE album=? LIMIT 1',
+        ('Album 500',)),
+    (
+        'audio albums of artist',
+        'SELECT id, album FROM audio_album WHERE id_artist=? ORDER BY album',
+        (50,)),
+    (
+        'audio files of album',
+        'SELECT id, number, title FROM audio_file WHERE id_album=? ORDER BY id_album, number',
+        (500,)),
+    (
+        'image files of album',
+        'SELECT id, path FROM image_file WHERE id_album=?',
+        (50,))]
+
+def main():
+
+    title_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    root_path = tempfile.mkdtemp(prefix='piepy-queryplan-')
+
+    try:
+        media_dal = MediaDataHandlerFactory.create(os.path.join(root_path, 'media.db'))
+        data_handlers = [media_dal.audio_data_handler, media_dal.image_data_handler, media_dal.video_data_handler]
+        for data_handler in data_handlers:
+            data_handler.creator.create_db()
+        db_context = media_dal.video_data_handler.db_context
+        fill_database(db_context, title_count)
+        drop_indices(db_context)
+
+        results_before = measure_queries(db_context)
+        start_time = time.perf_counter()
+        for data_handler in data_handlers:
+            data_handler.creator.upgrade_db()
+        upgrade_time = time.perf_counter() - start_time
+        # Cached statements would not be prepared again for explaining them.
+        db_context.close_connections()
+        results_after = measure_queries(db_context)
+
+        print('Upgrading the database with {} video titles took {:.3f} s.'.format(title_count, upgrade_time))
+        print()
+        for (name, _, _), before, after in zip(QUERIES, results_before, results_after):
+            print('{}: {:.3f} ms -> {:.3f} ms'.format(name, before[1] * 1000, after[1] * 1000))
+            print('    before: {}'.format(before[0]))
+            print('    after:  {}'.format(after[0]))
+
+        db_context.close_connections()
+    finally:
+        shutil.rmtree(root_path)
+
+def drop_indices(db_context):
+    """
+    Turns the database into one created before schema versioning.
+    """
+
+    with db_context.get_connection_provider() as connection:
+        cursor = connection.cursor
+        cursor.execute('SELECT name FROM sqlite_master WHERE type=\'index\' AND sql IS NOT NULL')
+        for row in cursor.fetchall():
+            cursor.execute('DROP INDEX ' + row[0])
+        cursor.execute('DROP TABLE schema_version')
+        connection.commit()
+
+def fill_database(db_context, title_count):
+    """
+    Inserts titles with ten episodes, two qualities and two languages each, and an audio and an image library of
+    similar size.
+    """
+
+    with db_context.get_connection_provider() as connection:
+        cursor = connection.cursor
+        cursor.executemany('INSERT INTO video_language (language) VALUES (?)', [('English',), ('Hungarian',)])
+        cursor.executemany('INSERT INTO video_quality (quality) VALUES (?)', [('HD',), ('SD',)])
+
+        video_files = []
+        for title_index in range(0, title_count):
+            cursor.execute(
+                'INSERT INTO video_title (id_parent, title) VALUES (?, ?)',
+                (2, 'Title {}'.format(title_index)))
+            title_id = cursor.lastrowid
+            for language_id in [2, 3]:
+                cursor.execute(
+                    'INSERT INTO video_title_language_mapping (id_title, id_language) VALUES (?, ?)',
+                    (title_id, language_id))
+            for quality_id in [2, 3]:
+                cursor.execute(
+                    'INSERT INTO video_title_quality_mapping (id_title, id_quality) VALUES (?, ?)',
+                    (title_id, quality_id))
+            for episode_index in range(0, 10):
+                cursor.execute(
+                    'INSERT INTO video_title (id_parent, title) VALUES (?, ?)',
+                    (title_id, 'Title {} - Episode {}'.format(title_index, episode_index)))
+                episode_id = cursor.lastrowid
+                for quality_id in [2, 3]:
+                    video_files.append((episode_id, quality_id, '/Video/{}/{}/{}.mkv'.format(
+                        title_index, quality_id, episode_index)))
+        cursor.executemany('INSERT INTO video_file (id_title, id_quality, path) VALUES (?, ?, ?)', video_files)
+        cursor.execute('INSERT INTO video_file_language_mapping (id_file, id_language) SELECT id, 2 FROM video_file')
+        cursor.execute('INSERT INTO video_subtitle (id_file, id_language, path) SELECT id, 3, path FROM video_file')
+
+        cursor.executemany(
+            'INSERT INTO audio_artist (artist) VALUES (?)',
+            [('Artist {}'.format(i),) for i in range(0, title_count // 10)])
+        cursor.executemany(
+            'INSERT INTO audio_album (id_artist, album) VALUES (?, ?)',
+            [(i // 10 + 2, 'Album {}'.format(i)) for i in range(0, title_count)])
+        cursor.executemany(
+            'INSERT INTO audio_file (id_album, number, title, path) VALUES (?, ?, ?, ?)',
+            [(i // 10 + 2, i % 10, 'Track {}'.format(i), '/Audio/{}.mp3'.format(i))
+             for i in range(0, title_count * 10)])
+
+        cursor.executemany(
+            'INSERT INTO image_album (album) VALUES (?)',
+            [('Album {}'.format(i),) for i in range(0, title_count // 10)])
+        cursor.executemany(
+            'INSERT INTO image_file (id_album, path) VALUES (?, ?)',
+            [(i // 100 + 2, '/Image/{}.jpg'.format(i)) for i in range(0, title_count * 10)])
+
+        connection.commit()
+
+def measure_queries(db_context):
+    """
+    Returns the query plan and the average execution time of each query.
+    """
+
+    results = []
+
+    with db_context.get_read_connection_provider() as connection:
+        cursor = connection.cursor
+        for _, query, parameters in QUERIES:
+            start_time = time.perf_counter()
+            for _ in range(0, REPETITIONS):
+                cursor.execute(query, parameters)
+                cursor.fetchall()
+            elapsed = (time.perf_counter() - start_time) / REPETITIONS
+            cursor.execute('EXPLAIN QUERY PLAN ' + query, parameters)
+            query_plan = '; '.join(row[-1] for row in cursor.fetchall())
+            results.append((query_plan, elapsed))
+
+    return results
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,116 @@
+"""
+Measures the latency of listing video titles (what /video/titles does) while a synchronization-like write transaction
+runs in another thread, with the former default rollback journal and with the write-ahead log.
+
+Usage: python -m testing.benchmarks.readconcurrencybenchmark [<number of stored titles>]
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from dal.context.dbcontext import DbContext
+from dal.context.dbsettings import DbSettings
+from dal.video.videodatahandler import VideoDataHandler
+
+# The number of seconds the writer keeps writing.
+WRITE_DURATION = 5.0
+# The number of files the writer inserts in a single transaction.
+WRITE_BATCH_SIZE = 2000
+
+def main():
+
+    title_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    print('{:>10} {:>10} {:>10} {:>12} {:>12} {:>12} {:>12}'.format(
+        'journal', 'reads', 'failed', 'p50 (ms)', 'p99 (ms)', 'max (ms)', 'written'))
+    for name, db_settings in [('DELETE', create_legacy_settings()), ('WAL', DbSettings())]:
+        root_path = tempfile.mkdtemp(prefix='piepy-readconcurrency-')
+        try:
+            latencies, failed_count, written_count = measure(
+                os.path.join(root_path, 'media.db'),
+                db_settings,
+                title_count)
+            latencies.sort()
+            print('{:>10} {:10} {:10} {:12.2f} {:12.2f} {:12.2f} {:12}'.format(
+                name,
+                len(latencies),
+                failed_count,
+                latencies[len(latencies) // 2] * 1000,
+                latencies[int(len(latencies) * 0.99)] * 1000,
+                latencies[-1] * 1000,
+                written_count))
+        finally:
+            shutil.rmtree(root_path)
+
+def create_legacy_settings():
+    """
+    Creates settings that mimic a plain sqlite3.connect call.
+    """
+
+    db_settings = DbSettings()
+    db_settings.cache_size = -2000
+    db_settings.journal_mode = 'DELETE'
+    db_settings.mmap_size = 0
+    db_settings.synchronous = 'FULL'
+    db_settings.temp_store = 'DEFAULT'
+
+    return db_settings
+
+def measure(database_path, db_settings, title_count):
+
+    db_context = DbContext(database_path, db_settings)
+    video_dal = VideoDataHandler(db_context)
+    video_dal.creator.create_db()
+    with db_context.get_connection_provider() as connection:
+        connection.cursor.executemany(
+            'INSERT INTO video_title (title) VALUES (?)',
+            [('Title {}'.format(i),) for i in range(0, title_count)])
+        connection.commit()
+
+    is_writing = threading.Event()
+    is_writing.set()
+    written_counts = []
+    writer_thread = threading.Thread(target=write, args=(db_context, is_writing, written_counts))
+    writer_thread.start()
+
+    latencies = []
+    failed_count = 0
+    while is_writing.is_set():
+        start_time = time.perf_counter()
+        try:
+            video_dal.retriever.retrieve_titles()
+        except sqlite3.OperationalError:
+            failed_count = failed_count + 1
+        latencies.append(time.perf_counter() - start_time)
+
+    writer_thread.join()
+    db_context.close_connections()
+
+    return latencies, failed_count, sum(written_counts)
+
+def write(db_context, is_writing, written_counts):
+    """
+    Inserts batches of files in a single transaction, like a synchronization does.
+    """
+
+    end_time = time.perf_counter() + WRITE_DURATION
+    batch_index = 0
+    with db_context.get_connection_provider() as connection:
+        while time.perf_counter() < end_time:
+            connection.cursor.executemany(
+                'INSERT INTO video_file (id_title, id_quality, path) VALUES (?, ?, ?)',
+                [(1, 1, '/mnt/hdd/Video/Batch {}/Episode {}.mkv'.format(batch_index, i))
+                 for i in range(0, WRITE_BATCH_SIZE)])
+            connection.commit()
+            written_counts.append(WRITE_BATCH_SIZE)
+            batch_index = batch_index + 1
+    is_writing.clear()
+
+if __name__ == '__main__':
+
+    main()
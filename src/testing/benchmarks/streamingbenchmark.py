@@ -0,0 +1,98 @@
+"""
+Measures the peak memory usage (RSS) of serializing a full listing into JSON, the way the routes did it before (the
+whole result set as a list, serialized at once) and by streaming (rows fetched in batches and serialized in chunks).
+Each way is measured in a separate process, because the peak RSS of a process never decreases.
+
+Usage: python -m testing.benchmarks.streamingbenchmark [<number of rows>]
+"""
+
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from dal.context.dbcontext import DbContext
+from dal.video.videodatahandler import VideoDataHandler
+from web.util.jsonstream import iterate_json_chunks
+
+# The number of files inserted in a single statement.
+INSERT_BATCH_SIZE = 10000
+
+def main():
+
+    if len(sys.argv) > 2:
+        measure(sys.argv[1], sys.argv[2])
+        return
+
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    root_path = tempfile.mkdtemp(prefix='piepy-streaming-')
+
+    try:
+        database_path = os.path.join(root_path, 'media.db')
+        fill_database(database_path, row_count)
+
+        print('{:>10} {:>16} {:>16} {:>12} {:>14}'.format(
+            'mode', 'peak RSS (MiB)', 'growth (MiB)', 'time (s)', 'output (MiB)'))
+        for mode in ['full', 'streaming']:
+            output = subprocess.check_output(
+                [sys.executable, '-m', 'testing.benchmarks.streamingbenchmark', mode, database_path])
+            print(output.decode('utf-8').rstrip())
+    finally:
+        shutil.rmtree(root_path)
+
+def fill_database(database_path, row_count):
+
+    db_context = DbContext(database_path)
+    VideoDataHandler(db_context).creator.create_db()
+    with db_context.get_connection_provider() as connection:
+        for start_index in range(0, row_count, INSERT_BATCH_SIZE):
+            connection.cursor.executemany(
+                'INSERT INTO video_file (id_title, id_quality, path) VALUES (1, 1, ?)',
+                [('/mnt/hdd/Video/Series {}/Season 1/Episode {}.mkv'.format(i // 100, i),)
+                 for i in range(start_index, min(start_index + INSERT_BATCH_SIZE, row_count))])
+        connection.commit()
+    db_context.close_connections()
+
+def get_peak_rss():
+    """
+    Returns the peak resident set size of the process in MiB (ru_maxrss is in KiB on Linux).
+    """
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def measure(mode, database_path):
+    """
+    Serializes every video path into a JSON object and writes it into a null device, like a route sends it.
+    """
+
+    retriever = VideoDataHandler(DbContext(database_path)).retriever
+    initial_rss = get_peak_rss()
+    output_size = 0
+    start_time = time.perf_counter()
+
+    with open(os.devnull, 'w') as output_file:
+        if mode == 'full':
+            output = json.dumps({'paths' : retriever.retrieve_video_paths()})
+            output_size = len(output)
+            output_file.write(output)
+        else:
+            for chunk in iterate_json_chunks('paths', retriever.iterate_video_paths()):
+                output_size = output_size + len(chunk)
+                output_file.write(chunk)
+
+    elapsed = time.perf_counter() - start_time
+    peak_rss = get_peak_rss()
+    print('{:>10} {:16.1f} {:16.1f} {:12.3f} {:14.1f}'.format(
+        mode,
+        peak_rss,
+        peak_rss - initial_rss,
+        elapsed,
+        output_size / 1024 / 1024))
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,105 @@
+"""
+Measures how the synchronization filters scale with the number of paths stored in the database.
+
+Usage: python -m testing.benchmarks.syncfilterbenchmark [<number of stored paths> ...]
+"""
+
+import random
+import sys
+import time
+
+from bll.mediacatalog.audiosyncfilter import AudioSyncFilter
+
+# The number of lookups used to estimate the cost of the former list based implementation.
+LIST_SCAN_SAMPLE_SIZE = 200
+
+def main():
+
+    path_counts = [int(a) for a in sys.argv[1:]] if len(sys.argv) > 1 else [10000, 100000, 500000]
+
+    print('{:>10} {:>12} {:>12} {:>12} {:>16}'.format('paths', 'init (s)', 'filter (s)', 'clean (s)', 'list scan (s)'))
+    for path_count in path_counts:
+        stored_paths = [{'id' : i, 'path' : '/media/Audio/Artist/Album {}/{:02} Track.mp3'.format(i // 20, i % 20)}
+                        for i in range(0, path_count)]
+        init_time, filter_time, clean_time = measure_filter(stored_paths)
+        list_scan_time = estimate_list_scan(stored_paths)
+        print('{:10} {:12.3f} {:12.3f} {:12.3f} {:16.3f}'.format(
+            path_count, init_time, filter_time, clean_time, list_scan_time))
+
+def measure_filter(stored_paths):
+    """
+    Runs a synchronization where 1% of the stored files have been removed.
+    """
+
+    audio_dal = FakeAudioDal(stored_paths)
+    sync_filter = AudioSyncFilter(audio_dal)
+    existing_paths = [item['path'] for item in stored_paths if item['id'] % 100 != 0]
+    random.shuffle(existing_paths)
+
+    start_time = time.perf_counter()
+    sync_filter.init_filter()
+    init_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for path in existing_paths:
+        sync_filter.apply_filter(path)
+    filter_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    sync_filter.clean_filter()
+    clean_time = time.perf_counter() - start_time
+
+    if audio_dal.deleter.deleted_count != len(stored_paths) - len(existing_paths):
+        raise Exception('Unexpected number of deleted files.')
+
+    return init_time, filter_time, clean_time
+
+def estimate_list_scan(stored_paths):
+    """
+    Estimates the time the former implementation (a linear scan and a removal from a list for each file) would need
+    for the same synchronization, by timing a sample of the lookups.
+    """
+
+    path_list = list(stored_paths)
+    sample = random.sample(path_list, min(LIST_SCAN_SAMPLE_SIZE, len(path_list)))
+
+    start_time = time.perf_counter()
+    for item in sample:
+        for i in range(0, len(path_list)):
+            if item['path'] == path_list[i]['path']:
+                del path_list[i]
+                break
+    elapsed = time.perf_counter() - start_time
+
+    return elapsed / len(sample) * len(stored_paths)
+
+class FakeAudioDal:
+
+    def __init__(self, stored_paths):
+
+        self.deleter = FakeDeleter()
+        self.retriever = FakeRetriever(stored_paths)
+
+class FakeDeleter:
+
+    def __init__(self):
+
+        self.deleted_count = 0
+
+    def delete_paths(self, file_ids):
+
+        self.deleted_count = self.deleted_count + len(file_ids)
+
+class FakeRetriever:
+
+    def __init__(self, stored_paths):
+
+        self._stored_paths = stored_paths
+
+    def iterate_paths(self):
+
+        return iter(self._stored_paths)
+
+if __name__ == '__main__':
+
+    main()
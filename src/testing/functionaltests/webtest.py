@@ -4,11 +4,13 @@ Web unit tests
 
 # pylint: disable=too-many-public-methods
 
+import json
 import time
 import unittest
 
 import requests
 
+from dal.functions import encode_cursor
 from testing.communicationhelper import get_json, put_json
 from testing.functions import are_expected_items_in_list, are_expected_kv_pairs_in_list, \
                               get_item_from_embedded_dictionary
@@ -66,7 +68,7 @@ class WebTest(unittest.TestCase):
         status_url = WebTest._helper.build_url('status')
 
         # Act.
-        requests.get(rebuild_url)
+        rebuild_data = get_json(rebuild_url)
 
         # Wait until database is building. Poll status in every 2 seconds.
         number_of_retries = 0
@@ -80,6 +82,8 @@ class WebTest(unittest.TestCase):
             time.sleep(2)
 
         # Assert.
+        self.assertIn(rebuild_data['rebuild'], ['started', 'in progress'], 'Wrong status of the rebuild.')
+        self.assertEqual('rebuild', rebuild_data['job']['kind'], 'Wrong kind of job.')
         self.assertEqual(result, 'not running', 'Rebuild failed.')
 
     def test_2_categories(self):
@@ -390,6 +394,54 @@ class WebTest(unittest.TestCase):
         are_expected_items_in_list(self, data, 'titles')
         are_expected_kv_pairs_in_list(self, data['titles'], 'title', expected_titles)
 
+    def test_5_15_video_titles_page_bad_cursor(self):
+        """
+        Query a page of video titles after a cursor that does not belong to the listing.
+        """
+
+        # Arrange.
+        url = WebTest._helper.build_url('video/titles?after={}&limit=3'.format(encode_cursor([1])))
+
+        # Act.
+        response = requests.get(url)
+
+        # Assert.
+        self.assertEqual(400, response.status_code, 'A cursor of another listing should be rejected.')
+
+    def test_5_16_video_titles_stream(self):
+        """
+        Query all video titles, which are streamed, and parse the whole response.
+        """
+
+        # Arrange.
+        page_url = WebTest._helper.build_url('video/titles?limit=1000')
+        stream_url = WebTest._helper.build_url('video/titles')
+
+        # Act.
+        page_data = get_json(page_url)
+        response = requests.get(stream_url, stream=True)
+        stream_data = json.loads(b''.join(response.iter_content(chunk_size=16)).decode())
+
+        # Assert.
+        self.assertEqual(200, response.status_code, 'The listing should be streamed.')
+        self.assertEqual(['titles'], list(stream_data.keys()), 'The streamed object should contain only the titles.')
+        self.assertEqual(page_data['titles'], stream_data['titles'], 'The streamed titles should match the page.')
+
+    def test_5_17_video_titles_stream_bad_cursor(self):
+        """
+        Query all video titles after a cursor that does not belong to the listing.
+        """
+
+        # Arrange.
+        url = WebTest._helper.build_url('video/titles?after={}'.format(encode_cursor(['Title', 'id'])))
+
+        # Act.
+        response = requests.get(url)
+
+        # Assert.
+        self.assertEqual(400, response.status_code, 'A cursor of another listing should be rejected.')
+        self.assertNotIn(b'titles', response.content, 'The streaming should not be started.')
+
     def test_6_search(self):
 
         # Arrange.
@@ -400,7 +452,7 @@ class WebTest(unittest.TestCase):
 
         # Assert.
         expected_titles = ['Family', 'Family [01] Intro']
-        are_expected_items_in_list(self, data, 'videos')
+        are_expected_items_in_list(self, data, 'audio albums', 'audio tracks', 'image albums', 'videos')
         are_expected_kv_pairs_in_list(self, data['videos'], 'title', expected_titles)
 
     def test_7_details(self):
@@ -38,9 +38,9 @@ class ServerManager:
             self._current_process.wait()
             self._current_process = None
 
-    def wait_for_initialization(self, base_url):
+    def wait_for_initialization(self, base_url, timeout=10):
 
-        for _ in range(0, 10):
+        for _ in range(0, timeout):
             time.sleep(1)
             try:
                 response = requests.get(base_url)
@@ -0,0 +1,263 @@
+import os
+import random
+
+from dal.configuration.config import Config
+
+class SyntheticLibrary:
+    """
+    Generates a deterministic media library of a given size for benchmarks. The files are empty, and their paths
+    follow the patterns of the default configuration (see Config.create_default), so every file is categorized:
+
+    - Video/<title>/Content/<quality>/<languages>/Season <n>/<episode title>.mkv
+    - Video/<title>/Subtitle/<quality>/<languages>/<language>/Season <n>/<episode title>.srt
+    - Audio/<artist>/<album>/<number> <title>.mp3
+    - Image/<album>/<title>.jpg
+
+    The same size and seed always produce the same paths, and churn() removes and adds the same files.
+    """
+
+    ####################################################################################################################
+    # Private constants.
+    ####################################################################################################################
+
+    # The ratio of the video files (including subtitles), the audio files and the images.
+    _CATEGORY_RATIOS = (0.6, 0.3, 0.1)
+    # The modification time of the generated directories, so directories changed by churn() are always noticed.
+    _DIRECTORY_MTIME = 1000000000
+    _LANGUAGES = ['English', 'German', 'Greek', 'Hungarian']
+    _QUALITIES = ['HD (1080p)', 'HD (720p)', 'LQ']
+
+    ####################################################################################################################
+    # Constructor.
+    ####################################################################################################################
+
+    def __init__(self, root_path, file_count, seed=0):
+        """
+        Initializes attributes.
+
+        Parameters
+        ----------
+        root_path : str
+            The directory to create the library in.
+        file_count : int
+            The number of files to create.
+        seed : int
+            The seed of the generated names and of the churn.
+        """
+
+        ### Validate parameters.
+        if root_path is None:
+            raise Exception('root_path cannot be None.')
+        if file_count < 1:
+            raise Exception('file_count must be greater than or equal to 1.')
+
+        ### Attributes from outside.
+        self._root_path = root_path
+        self._file_count = file_count
+
+        ### Private attributes.
+        # The relative paths of the existing files by category ('audio', 'image', 'subtitle', 'video').
+        self._paths = {'audio' : [], 'image' : [], 'subtitle' : [], 'video' : []}
+        # The number of files added by churn() so far, used for naming the new files.
+        self._added_count = 0
+        # Generates the names and selects the files to churn.
+        self._random = random.Random(seed)
+
+    ####################################################################################################################
+    # Properties.
+    ####################################################################################################################
+
+    @property
+    def audio_path(self):
+        """
+        Gets the directory of the audio files.
+        """
+        return os.path.join(self._root_path, 'Audio')
+
+    @property
+    def file_count(self):
+        """
+        Gets the number of existing files.
+        """
+        return sum(len(paths) for paths in self._paths.values())
+
+    @property
+    def file_counts(self):
+        """
+        Gets the number of existing files by category ('audio', 'image', 'subtitle', 'video').
+        """
+        return {category : len(paths) for category, paths in self._paths.items()}
+
+    @property
+    def image_path(self):
+        """
+        Gets the directory of the images.
+        """
+        return os.path.join(self._root_path, 'Image')
+
+    @property
+    def video_path(self):
+        """
+        Gets the directory of the video files and subtitles.
+        """
+        return os.path.join(self._root_path, 'Video')
+
+    ####################################################################################################################
+    # Public methods.
+    ####################################################################################################################
+
+    def churn(self, ratio):
+        """
+        Removes the given ratio of the files and adds the same number of new files, about half of them in existing and
+        half of them in new directories, as if some episodes, tracks and photos had been replaced.
+
+        Parameters
+        ----------
+        ratio : float
+            The ratio of the files to replace, between 0 and 1.
+
+        Returns
+        -------
+        The number of removed (and added) files.
+        """
+
+        churn_count = int(self.file_count * ratio)
+
+        for _ in range(churn_count):
+            category = self._random.choice([c for c, paths in self._paths.items() if paths])
+            paths = self._paths[category]
+            path = paths.pop(self._random.randrange(len(paths)))
+            os.unlink(os.path.join(self._root_path, path))
+
+            self._added_count += 1
+            directory_names = os.path.dirname(path).split('/')
+            if category == 'subtitle':
+                # Subtitles are indexed only for existing episodes, so the subtitle of the same episode is added in a
+                # new language.
+                directory_names[5] += ' {}'.format(self._added_count)
+                name = os.path.basename(path)
+            else:
+                if self._added_count % 2 == 0:
+                    # A new title, artist or album.
+                    directory_names[1] += ' New {}'.format(self._added_count)
+                name = '{} Added {}{}'.format(
+                    self._get_name_prefix(category),
+                    self._added_count,
+                    os.path.splitext(path)[1])
+            self._create_file(category, '/'.join(directory_names + [name]))
+
+        return churn_count
+
+    def configure(self, config):
+        """
+        Sets the default indexing rules in the given configuration and points them to the directories of the library.
+
+        Parameters
+        ----------
+        config : Config
+            The configuration to modify.
+        """
+
+        default_config = Config()
+        default_config.create_default()
+
+        config.indexing.audio.rules = default_config.indexing.audio.rules
+        config.indexing.image.rules = default_config.indexing.image.rules
+        config.indexing.video.subtitle_rules = default_config.indexing.video.subtitle_rules
+        config.indexing.video.video_rules = default_config.indexing.video.video_rules
+
+        for rule in config.indexing.audio.rules:
+            rule.directory = self.audio_path
+        for rule in config.indexing.image.rules:
+            rule.directory = self.image_path
+        for rule in config.indexing.video.subtitle_rules + config.indexing.video.video_rules:
+            rule.directory = self.video_path
+
+    def create(self):
+        """
+        Creates the files of the library.
+        """
+
+        video_ratio, audio_ratio, _ = SyntheticLibrary._CATEGORY_RATIOS
+        video_count = int(self._file_count * video_ratio)
+        audio_count = int(self._file_count * audio_ratio)
+        image_count = self._file_count - video_count - audio_count
+
+        self._create_videos(video_count)
+        self._create_audio_files(audio_count)
+        self._create_images(image_count)
+
+        for directory, _, _ in os.walk(self._root_path):
+            os.utime(directory, (SyntheticLibrary._DIRECTORY_MTIME, SyntheticLibrary._DIRECTORY_MTIME))
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _create_audio_files(self, count):
+
+        artist_index = 0
+        while count > 0:
+            artist_index += 1
+            for album_index in range(1, self._random.randint(1, 4) + 1):
+                track_count = min(count, self._random.randint(8, 14))
+                for number in range(1, track_count + 1):
+                    self._create_file('audio', 'Audio/Artist {0}/Album {0}-{1}/{2:02} Track {2}.mp3'.format(
+                        artist_index, album_index, number))
+                count -= track_count
+                if count == 0:
+                    break
+
+    def _create_file(self, category, path):
+
+        full_path = os.path.join(self._root_path, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w'):
+            pass
+
+        self._paths[category].append(path)
+
+    def _create_images(self, count):
+
+        album_index = 0
+        while count > 0:
+            album_index += 1
+            photo_count = min(count, self._random.randint(20, 60))
+            for photo_index in range(1, photo_count + 1):
+                self._create_file('image', 'Image/Album {}/Photo {}.jpg'.format(album_index, photo_index))
+            count -= photo_count
+
+    def _create_videos(self, count):
+        """
+        Creates titles with one or more seasons of episodes. Half of the episodes have a subtitle in another language.
+        """
+
+        title_index = 0
+        while count > 0:
+            title_index += 1
+            quality = self._random.choice(SyntheticLibrary._QUALITIES)
+            language = self._random.choice(SyntheticLibrary._LANGUAGES)
+            title = 'Video/Title {}'.format(title_index)
+
+            for season in range(1, self._random.randint(1, 3) + 1):
+                for episode in range(1, self._random.randint(4, 12) + 1):
+                    episode_title = 'Title {} [{}x{:02}] Episode {}'.format(title_index, season, episode, episode)
+                    self._create_file('video', '{}/Content/{}/{}/Season {}/{}.mkv'.format(
+                        title, quality, language, season, episode_title))
+                    count -= 1
+                    if count > 0 and episode % 2 == 0:
+                        subtitle_language = self._random.choice(SyntheticLibrary._LANGUAGES)
+                        self._create_file('subtitle', '{}/Subtitle/{}/{}/{}/Season {}/{}.srt'.format(
+                            title, quality, language, subtitle_language, season, episode_title))
+                        count -= 1
+                    if count <= 0:
+                        return
+
+    def _get_name_prefix(self, category):
+
+        if category == 'audio':
+            return '99'
+        if category == 'image':
+            return 'Photo'
+
+        return 'Episode'
@@ -0,0 +1,79 @@
+"""
+Bounded cache unit tests
+"""
+
+import unittest
+
+from dal.lrucache import LruCache
+from dal.video.videodatacache import VideoDataCache
+
+class CacheTest(unittest.TestCase):
+
+    ####################################################################################################################
+    # Test methods.
+    ####################################################################################################################
+
+    def test_1_least_recently_used_item_is_evicted(self):
+
+        # Arrange.
+        evicted_items = []
+        cache = LruCache(2, lambda key, value: evicted_items.append((key, value)))
+
+        # Act.
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        values = [cache.get('a'), cache.get('b'), cache.get('c')]
+        metrics = cache.metrics
+
+        # Assert.
+        self.assertEqual(values, [1, None, 3])
+        self.assertEqual(evicted_items, [('b', 2)])
+        self.assertEqual(metrics.size, 2)
+        self.assertEqual(metrics.hit_count, 3)
+        self.assertEqual(metrics.miss_count, 1)
+        self.assertEqual(metrics.eviction_count, 1)
+        self.assertEqual(metrics.hit_rate, 0.75)
+
+    def test_2_none_values_are_not_stored(self):
+
+        # Arrange.
+        cache = LruCache(2)
+
+        # Act.
+        cache.set('a', None)
+        cache.set(None, 1)
+
+        # Assert.
+        self.assertEqual(cache.metrics.size, 0)
+        self.assertIsNone(cache.metrics.hit_rate)
+
+    def test_3_title_lookup_from_other_parents(self):
+
+        # Arrange.
+        cache = VideoDataCache(2)
+
+        # Act.
+        cache.set_title_id('Episode 1', 10, 1)
+        id_from_other_parents_1 = cache.get_title_id_from_other_parents('Episode 1', 0)
+        id_from_same_parent = cache.get_title_id_from_other_parents('Episode 1', 1)
+        cache.set_title_id('Episode 2', 11, 1)
+        cache.set_title_id('Episode 3', 12, 1)
+        id_from_other_parents_2 = cache.get_title_id_from_other_parents('Episode 1', 0)
+        cache.set_title_id('Episode 1', 13, 2)
+        id_from_other_parents_3 = cache.get_title_id_from_other_parents('Episode 1', 1)
+        cache.clear()
+        id_from_other_parents_4 = cache.get_title_id_from_other_parents('Episode 1', 0)
+
+        # Assert.
+        self.assertEqual(id_from_other_parents_1, 10)
+        self.assertIsNone(id_from_same_parent)
+        self.assertIsNone(id_from_other_parents_2)
+        self.assertEqual(id_from_other_parents_3, 13)
+        self.assertIsNone(id_from_other_parents_4)
+        self.assertEqual(cache.metrics['video titles'].eviction_count, 2)
+
+if __name__ == '__main__':
+
+    unittest.main()
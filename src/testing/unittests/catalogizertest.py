@@ -0,0 +1,168 @@
+"""
+Catalogizer unit tests.
+"""
+
+import os
+import unittest
+
+from bll.mediacatalog.catalogizer import Catalogizer
+from bll.mediacatalog.catalogizercontext import CatalogizerContext
+from bll.mediacatalog.functions import build_path_index
+from dal.configuration.config import Config
+from dal.media import MediaDataHandlerFactory
+from testing.testhelper import TestHelper
+from testing.videotestenvironment import VideoTestEnvironment
+
+class CatalogizerTest(unittest.TestCase):
+
+    ####################################################################################################################
+    # Initialization and cleanup.
+    ####################################################################################################################
+
+    def setUp(self):
+
+        # Create TestHelper.
+        self._helper = TestHelper()
+        self._helper.add_environment(VideoTestEnvironment())
+
+        # Create test files.
+        self._helper.create_files()
+        self._audio_path = os.path.join(self._helper.root_path, 'audio')
+        self._image_path = os.path.join(self._helper.root_path, 'image')
+        for path in [
+                os.path.join(self._audio_path, 'Artist/Album/01 First.mp3'),
+                os.path.join(self._audio_path, 'Artist/Album/02 Second.mp3'),
+                os.path.join(self._image_path, 'Album/First.jpg'),
+                os.path.join(self._image_path, 'Album/Second.jpg')]:
+            self._create_file(path)
+
+        # The journal does not trust the directories modified right before they are enumerated.
+        self._set_mtimes(self._helper.root_path, 1000000000)
+
+        # Create Catalogizer.
+        config = Config()
+        config.create_default()
+        config.database.path_media = self._helper.media_database_path
+        config.indexing.audio.rules[0].directory = self._audio_path
+        config.indexing.image.rules[0].directory = self._image_path
+        config.indexing.video.subtitle_rules[0].directory = self._helper.files_path
+        config.indexing.video.video_rules[0].directory = self._helper.files_path
+        self._media_dal = MediaDataHandlerFactory.create(self._helper.media_database_path)
+        context = CatalogizerContext()
+        context.database_config = config.database
+        context.indexing_config = config.indexing
+        context.media_dal = self._media_dal
+        self._catalogizer = Catalogizer(context)
+
+    def tearDown(self):
+
+        self._media_dal.video_data_handler.db_context.close_connections()
+        self._helper.clean()
+
+    ####################################################################################################################
+    # Test methods.
+    ####################################################################################################################
+
+    def test_1_sync_keeps_unchanged_files(self):
+
+        # Arrange.
+        self._catalogizer.rebuild_database()
+        rebuilt_paths = self._retrieve_paths()
+
+        # Act.
+        status = self._catalogizer.synchronize_database()
+        synchronized_paths = self._retrieve_paths()
+
+        # Assert.
+        self.assertEqual(Catalogizer.STATUS_COMPLETED, status, 'The synchronization should complete.')
+        self.assertTrue(all(len(paths) > 0 for paths in rebuilt_paths.values()), 'Every category should be stored.')
+        self.assertEqual(rebuilt_paths, synchronized_paths, 'Unchanged files should be kept with the same IDs.')
+
+    def test_2_sync_removes_stale_files(self):
+
+        # Arrange.
+        self._catalogizer.rebuild_database()
+        rebuilt_paths = self._retrieve_paths()
+        removed_paths = {
+            'audio' : os.path.join(self._audio_path, 'Artist/Album/02 Second.mp3'),
+            'image' : os.path.join(self._image_path, 'Album/Second.jpg'),
+            'subtitle' : os.path.join(
+                self._helper.files_path,
+                'Movie/Battle of Impact/Subtitle/HD (1080p)/Greek/German/Battle of Impact (1990).srt'),
+            'video' : os.path.join(
+                self._helper.files_path,
+                'Movie/Battle of Impact/Content/HD (1080p)/German/Battle of Impact (1990).avi')}
+
+        # Act.
+        for path in removed_paths.values():
+            os.unlink(path)
+        self._catalogizer.synchronize_database()
+        synchronized_paths = self._retrieve_paths()
+
+        # Assert.
+        for category, removed_path in removed_paths.items():
+            self.assertIn(removed_path, rebuilt_paths[category], 'The file should be stored by the rebuild.')
+            expected_paths = dict(rebuilt_paths[category])
+            del expected_paths[removed_path]
+            self.assertEqual(
+                expected_paths,
+                synchronized_paths[category],
+                'Only the removed file should be deleted from the {} files.'.format(category))
+
+    def test_3_sync_adds_new_files(self):
+
+        # Arrange.
+        self._catalogizer.rebuild_database()
+        rebuilt_paths = self._retrieve_paths()
+        new_paths = {
+            'audio' : os.path.join(self._audio_path, 'Artist/Album/03 Third.mp3'),
+            'image' : os.path.join(self._image_path, 'Album/Third.jpg'),
+            'subtitle' : os.path.join(
+                self._helper.files_path,
+                'Movie/Battle of Impact/Subtitle/HD (1080p)/Greek/Hungarian/Battle of Impact (1990).srt'),
+            'video' : os.path.join(
+                self._helper.files_path,
+                'Movie/Battle of Impact/Content/HD (1080p)/Finnish/Battle of Impact (1990).avi')}
+
+        # Act.
+        for path in new_paths.values():
+            self._create_file(path)
+        self._catalogizer.synchronize_database()
+        synchronized_paths = self._retrieve_paths()
+
+        # Assert.
+        for category, new_path in new_paths.items():
+            self.assertIn(new_path, synchronized_paths[category], 'The new file should be stored.')
+            kept_paths = dict(synchronized_paths[category])
+            del kept_paths[new_path]
+            self.assertEqual(
+                rebuilt_paths[category],
+                kept_paths,
+                'The stored {} files should be kept with the same IDs.'.format(category))
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _create_file(self, path):
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w'):
+            pass
+
+    def _retrieve_paths(self):
+
+        video_retriever = self._media_dal.video_data_handler.retriever
+
+        return {
+            'audio' : build_path_index(self._media_dal.audio_data_handler.retriever.iterate_paths()),
+            'image' : build_path_index(self._media_dal.image_data_handler.retriever.iterate_paths()),
+            'subtitle' : build_path_index(video_retriever.iterate_subtitle_paths()),
+            'video' : build_path_index(video_retriever.iterate_video_paths())}
+
+    def _set_mtimes(self, directory, mtime):
+
+        for current_directory, _, files in os.walk(directory):
+            for file in files:
+                os.utime(os.path.join(current_directory, file), (mtime, mtime))
+            os.utime(current_directory, (mtime, mtime))
@@ -0,0 +1,176 @@
+"""
+Catalog Job Scheduler unit tests.
+"""
+
+import threading
+import unittest
+
+from bll.mediacatalog.catalogizer import Catalogizer
+from bll.mediacatalog.catalogjob import CatalogJob
+from bll.mediacatalog.catalogjobscheduler import CatalogJobScheduler
+
+class CatalogJobSchedulerTest(unittest.TestCase):
+
+    ####################################################################################################################
+    # Test methods.
+    ####################################################################################################################
+
+    def test_1_coalesce_jobs(self):
+
+        # Arrange.
+        scheduler = CatalogJobScheduler(TestCatalogizer())
+
+        # Act.
+        sync_job = scheduler.submit(CatalogJob.KIND_SYNC)
+        coalesced_sync_job = scheduler.submit(CatalogJob.KIND_SYNC)
+        coalesced_upgrade_job = scheduler.submit(CatalogJob.KIND_UPGRADE)
+        rebuild_job = scheduler.submit(CatalogJob.KIND_REBUILD)
+        coalesced_rebuild_job = scheduler.submit(CatalogJob.KIND_REBUILD)
+
+        # Assert.
+        self.assertIs(sync_job, coalesced_sync_job, 'The synchronizations should be coalesced.')
+        self.assertIs(sync_job, coalesced_upgrade_job, 'The upgrade should be coalesced into the synchronization.')
+        self.assertIsNot(sync_job, rebuild_job, 'A synchronization does not cover a rebuild.')
+        self.assertIs(rebuild_job, coalesced_rebuild_job, 'The rebuilds should be coalesced.')
+        self.assertEqual([sync_job, rebuild_job], scheduler.jobs, 'Wrong queued jobs.')
+        self.assertEqual(CatalogJob.STATE_QUEUED, sync_job.state, 'The job should be queued.')
+        self.assertTrue(scheduler.is_busy, 'Queued jobs should keep the scheduler busy.')
+
+    def test_2_execute_jobs(self):
+
+        # Arrange.
+        catalogizer = TestCatalogizer(file_count=40)
+        finished_jobs = []
+        scheduler = CatalogJobScheduler(catalogizer, on_job_finished=finished_jobs.append)
+
+        # Act.
+        first_job = scheduler.submit(CatalogJob.KIND_SYNC)
+        scheduler.start()
+        catalogizer.wait_for_calls(1, 5)
+        second_job = scheduler.submit(CatalogJob.KIND_SYNC)
+        catalogizer.wait_for_calls(2, 5)
+        scheduler.stop()
+
+        # Assert.
+        self.assertEqual([first_job, second_job], finished_jobs, 'Both jobs should be finished.')
+        self.assertEqual(CatalogJob.STATE_COMPLETED, first_job.state, 'The job should be completed.')
+        self.assertEqual(2, first_job.progress.directory_count, 'Wrong number of scanned directories.')
+        self.assertEqual(40, first_job.progress.file_count, 'Wrong number of analyzed files.')
+        self.assertEqual(10, first_job.progress.row_count, 'Wrong number of written rows.')
+        self.assertIsNotNone(first_job.finish_time, 'The finish time should be set.')
+        self.assertIsNone(first_job.expected_file_count, 'The first job has nothing to be compared with.')
+        self.assertEqual(40, second_job.expected_file_count, 'The previous job should be expected to be repeated.')
+        self.assertIsNone(scheduler.current_job, 'No job should be running.')
+        self.assertFalse(scheduler.is_busy, 'No job should be running or queued.')
+        self.assertIs(second_job, scheduler.get_job(second_job.job_id), 'The finished job should be found.')
+
+    def test_3_cancel_jobs(self):
+
+        # Arrange.
+        catalogizer = TestCatalogizer(is_blocking=True)
+        scheduler = CatalogJobScheduler(catalogizer)
+        running_job = scheduler.submit(CatalogJob.KIND_REBUILD)
+        scheduler.start()
+        catalogizer.wait_for_running_job(5)
+        queued_job = scheduler.submit(CatalogJob.KIND_SYNC)
+
+        # Act.
+        is_queued_job_cancelled = scheduler.cancel(queued_job.job_id)
+        is_running_job_cancelled = scheduler.cancel(running_job.job_id)
+        catalogizer.wait_for_calls(1, 5)
+        scheduler.stop()
+
+        # Assert.
+        self.assertTrue(is_queued_job_cancelled, 'The queued job should be found.')
+        self.assertTrue(is_running_job_cancelled, 'The running job should be found.')
+        self.assertFalse(scheduler.cancel(running_job.job_id), 'A finished job cannot be cancelled.')
+        self.assertEqual(CatalogJob.STATE_CANCELLED, queued_job.state, 'The queued job should be cancelled.')
+        self.assertEqual(CatalogJob.STATE_CANCELLED, running_job.state, 'The running job should be cancelled.')
+        self.assertEqual([CatalogJob.KIND_REBUILD], catalogizer.executed_kinds, 'Only the rebuild should run.')
+
+    def test_4_rebuild_periodically(self):
+
+        # Arrange.
+        catalogizer = TestCatalogizer(database_age=10)
+        scheduler = CatalogJobScheduler(catalogizer, lifetime=5)
+
+        # Act.
+        scheduler.start()
+        is_rebuilt = catalogizer.wait_for_calls(1, 5)
+        scheduler.stop()
+
+        # Assert.
+        self.assertTrue(is_rebuilt, 'The expired database should be rebuilt.')
+        self.assertEqual([CatalogJob.KIND_REBUILD], catalogizer.executed_kinds, 'Only one rebuild should run.')
+        self.assertTrue(scheduler.jobs[0].is_periodic, 'The rebuild should be periodic.')
+
+########################################################################################################################
+# Test classes.
+########################################################################################################################
+
+class TestCatalogizer:
+
+    def __init__(self, file_count=0, is_blocking=False, database_age=None):
+
+        self.database_age = database_age
+        self.executed_kinds = []
+        self._condition = threading.Condition()
+        self._file_count = file_count
+        self._is_blocking = is_blocking
+        self._is_running = False
+
+    def rebuild_database(self, progress=None):
+
+        return self._execute(CatalogJob.KIND_REBUILD, progress)
+
+    def synchronize_database(self, progress=None):
+
+        return self._execute(CatalogJob.KIND_SYNC, progress)
+
+    def upgrade_database(self):
+
+        return self._execute(CatalogJob.KIND_UPGRADE, None)
+
+    def wait_for_calls(self, count, timeout):
+
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self.executed_kinds) >= count, timeout)
+
+    def wait_for_running_job(self, timeout):
+
+        with self._condition:
+            return self._condition.wait_for(lambda: self._is_running, timeout)
+
+    def _execute(self, kind, progress):
+
+        with self._condition:
+            self._is_running = True
+            self._condition.notify_all()
+
+        status = Catalogizer.STATUS_COMPLETED
+        if self._is_blocking:
+            while not progress.is_cancelled:
+                with self._condition:
+                    self._condition.wait(0.01)
+            status = Catalogizer.STATUS_CANCELLED
+        elif progress is not None:
+            for _ in range(2):
+                progress.add_directory()
+            for _ in range(self._file_count):
+                progress.add_file()
+            progress.add_rows(10)
+
+        with self._condition:
+            self._is_running = False
+            self.executed_kinds.append(kind)
+            self._condition.notify_all()
+
+        return status
+
+########################################################################################################################
+# Main.
+########################################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
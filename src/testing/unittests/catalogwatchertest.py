@@ -0,0 +1,196 @@
+"""
+Catalog Watcher unit tests.
+"""
+
+import os
+import queue
+import threading
+import time
+import unittest
+
+from bll.mediacatalog.catalogwatcher import CatalogWatcher
+from bll.mediacatalog.fileeventsource import FileEventSource
+from testing.testhelper import TestHelper
+from testing.videotestenvironment import VideoTestEnvironment
+
+class CatalogWatcherTest(unittest.TestCase):
+
+    ####################################################################################################################
+    # Initialization and cleanup.
+    ####################################################################################################################
+
+    @classmethod
+    def setUpClass(cls):
+
+        # Create TestHelper.
+        cls._helper = TestHelper()
+        cls._helper.add_environment(VideoTestEnvironment())
+
+        # Create test files.
+        cls._helper.create_files()
+
+    @classmethod
+    def tearDownClass(cls):
+
+        cls._helper.clean()
+
+    ####################################################################################################################
+    # Test methods.
+    ####################################################################################################################
+
+    def test_1_watch_directories(self):
+
+        # Arrange.
+        event_source = TestEventSource()
+        watcher = CatalogWatcher(TestCatalogizer().synchronize_database, event_source, [self._helper.files_path], 0.1)
+
+        # Act.
+        watcher.start()
+        watcher.stop()
+
+        # Assert.
+        expected_paths = [directory for directory, _, _ in os.walk(self._helper.files_path)]
+        self.assertEqual(sorted(expected_paths), sorted(event_source.watched_paths), 'Not all directories are watched.')
+        self.assertFalse(watcher.is_fallback_active, 'The watcher should not fall back to periodic synchronization.')
+        self.assertTrue(event_source.is_closed, 'The event source should be closed.')
+
+    def test_2_coalesce_events(self):
+
+        # Arrange.
+        catalogizer = TestCatalogizer()
+        event_source = TestEventSource()
+        watcher = CatalogWatcher(catalogizer.synchronize_database, event_source, [self._helper.files_path], 0.2)
+        movie_path = os.path.join(self._helper.files_path, 'Movie')
+
+        # Act.
+        watcher.start()
+        event_source.add_events([(os.path.join(movie_path, 'a.avi'), False)])
+        event_source.add_events([(os.path.join(movie_path, 'b.avi'), False), (None, False)])
+        is_synchronized = catalogizer.wait_for_synchronizations(1, 5)
+        time.sleep(0.4)
+        watcher.stop()
+
+        # Assert.
+        self.assertTrue(is_synchronized, 'The database should be synchronized.')
+        self.assertEqual(1, catalogizer.synchronization_count, 'The events should be coalesced.')
+
+    def test_3_watch_new_directory(self):
+
+        # Arrange.
+        catalogizer = TestCatalogizer()
+        event_source = TestEventSource()
+        watcher = CatalogWatcher(catalogizer.synchronize_database, event_source, [self._helper.files_path], 0.1)
+        new_directory_path = os.path.join(self._helper.files_path, 'New')
+        os.makedirs(os.path.join(new_directory_path, 'Subdirectory'))
+
+        # Act.
+        try:
+            watcher.start()
+            event_source.add_events([(new_directory_path, True)])
+            is_synchronized = catalogizer.wait_for_synchronizations(1, 5)
+            watcher.stop()
+        finally:
+            os.rmdir(os.path.join(new_directory_path, 'Subdirectory'))
+            os.rmdir(new_directory_path)
+
+        # Assert.
+        self.assertTrue(is_synchronized, 'The database should be synchronized.')
+        self.assertTrue(new_directory_path in event_source.watched_paths, 'The new directory is not watched.')
+        self.assertTrue(
+            os.path.join(new_directory_path, 'Subdirectory') in event_source.watched_paths,
+            'The subdirectory of the new directory is not watched.')
+
+    def test_4_fallback_watch_limit(self):
+
+        # Arrange.
+        catalogizer = TestCatalogizer()
+        event_source = TestEventSource(watch_limit=2)
+        watcher = CatalogWatcher(catalogizer.synchronize_database, event_source, [self._helper.files_path], 0.1, 0.05)
+
+        # Act.
+        watcher.start()
+        is_synchronized = catalogizer.wait_for_synchronizations(3, 5)
+        watcher.stop()
+
+        # Assert.
+        self.assertTrue(watcher.is_fallback_active, 'The watcher should fall back to periodic synchronization.')
+        self.assertTrue(is_synchronized, 'The database should be synchronized periodically.')
+        self.assertTrue(event_source.is_closed, 'The event source should be closed.')
+
+    def test_5_fallback_no_event_source(self):
+
+        # Arrange.
+        catalogizer = TestCatalogizer()
+        watcher = CatalogWatcher(catalogizer.synchronize_database, None, [self._helper.files_path], 0.1, 0.05)
+
+        # Act.
+        watcher.start()
+        is_synchronized = catalogizer.wait_for_synchronizations(2, 5)
+        watcher.stop()
+
+        # Assert.
+        self.assertTrue(watcher.is_fallback_active, 'The watcher should fall back to periodic synchronization.')
+        self.assertTrue(is_synchronized, 'The database should be synchronized periodically.')
+
+########################################################################################################################
+# Mocked classes.
+########################################################################################################################
+
+class TestCatalogizer:
+
+    def __init__(self):
+
+        self.synchronization_count = 0
+        self._condition = threading.Condition()
+
+    def synchronize_database(self):
+
+        with self._condition:
+            self.synchronization_count = self.synchronization_count + 1
+            self._condition.notify_all()
+
+    def wait_for_synchronizations(self, count, timeout):
+
+        with self._condition:
+            return self._condition.wait_for(lambda: self.synchronization_count >= count, timeout)
+
+class TestEventSource(FileEventSource):
+
+    def __init__(self, watch_limit=None):
+
+        self.is_closed = False
+        self.watched_paths = []
+        self._events = queue.Queue()
+        self._watch_limit = watch_limit
+
+    def add_events(self, events):
+
+        self._events.put(events)
+
+    def close(self):
+
+        self.is_closed = True
+
+    def read_events(self, timeout):
+
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return []
+
+    def watch(self, path):
+
+        if self._watch_limit is not None and len(self.watched_paths) >= self._watch_limit:
+            return False
+
+        self.watched_paths.append(path)
+
+        return True
+
+########################################################################################################################
+# Main.
+########################################################################################################################
+
+if __name__ == '__main__':
+
+    unittest.main()
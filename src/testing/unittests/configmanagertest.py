@@ -61,16 +61,34 @@ class ConfigManagerTest(unittest.TestCase):
 
     def _check_if_configs_are_equal(self, config1, config2):
 
-        return config1.database.lifetime == config2.database.lifetime \
+        return config1.database.batch_size == config2.database.batch_size \
+            and config1.database.lifetime == config2.database.lifetime \
             and config1.database.path_media == config2.database.path_media \
             and config1.database.path_playlist == config2.database.path_playlist \
+            and config1.database.preload_caches == config2.database.preload_caches \
+            and config1.database.tuning.busy_timeout == config2.database.tuning.busy_timeout \
+            and config1.database.tuning.cache_size == config2.database.tuning.cache_size \
+            and config1.database.tuning.journal_mode == config2.database.tuning.journal_mode \
+            and config1.database.tuning.mmap_size == config2.database.tuning.mmap_size \
+            and config1.database.tuning.pool_idle_timeout == config2.database.tuning.pool_idle_timeout \
+            and config1.database.tuning.pool_timeout == config2.database.tuning.pool_timeout \
+            and config1.database.tuning.read_pool_size == config2.database.tuning.read_pool_size \
+            and config1.database.tuning.synchronous == config2.database.tuning.synchronous \
+            and config1.database.tuning.temp_store == config2.database.tuning.temp_store \
+            and config1.database.tuning.write_pool_size == config2.database.tuning.write_pool_size \
             and self._check_if_rules_are_equal(config1.indexing.audio.rules, config2.indexing.audio.rules) \
             and self._check_if_rules_are_equal(config1.indexing.image.rules, config2.indexing.image.rules) \
+            and config1.indexing.pool_size == config2.indexing.pool_size \
+            and config1.indexing.relative_matching == config2.indexing.relative_matching \
+            and config1.indexing.timing == config2.indexing.timing \
             and config1.indexing.video.ignore_revisions == config2.indexing.video.ignore_revisions \
             and self._check_if_rules_are_equal(
                 config1.indexing.video.subtitle_rules,
                 config2.indexing.video.subtitle_rules) \
             and self._check_if_rules_are_equal(config1.indexing.video.video_rules, config2.indexing.video.video_rules) \
+            and config1.indexing.watcher.debounce_delay == config2.indexing.watcher.debounce_delay \
+            and config1.indexing.watcher.enabled == config2.indexing.watcher.enabled \
+            and config1.indexing.watcher.fallback_interval == config2.indexing.watcher.fallback_interval \
             and config1.logging.enabled == config2.logging.enabled \
             and config1.logging.level == config2.logging.level \
             and config1.logging.max_size_bytes == config2.logging.max_size_bytes \
@@ -111,15 +129,29 @@ class ConfigManagerTest(unittest.TestCase):
 
         config = DatabaseConfig()
 
+        config.batch_size = 256
         config.lifetime = 4096
         config.path_media = 'test.db'
         config.path_playlist = 'test2.db'
+        config.tuning.busy_timeout = 1000
+        config.tuning.cache_size = 2000
+        config.tuning.journal_mode = 'DELETE'
+        config.tuning.mmap_size = 0
+        config.tuning.pool_idle_timeout = 10
+        config.tuning.pool_timeout = 5
+        config.tuning.read_pool_size = 2
+        config.tuning.synchronous = 'FULL'
+        config.tuning.temp_store = 'FILE'
+        config.tuning.write_pool_size = 3
 
         return config
 
     def _create_test_indexing_config(self):
 
         config = IndexingConfig()
+        config.pool_size = 4
+        config.relative_matching = True
+        config.timing = True
 
         audio_indexing_rules = IndexerRuleConfig()
         audio_indexing_rules.directory = '/audio'
@@ -145,6 +177,10 @@ class ConfigManagerTest(unittest.TestCase):
         subtitle_indexing_rules.pattern = 'subtitle_pattern'
         config.video.subtitle_rules = [subtitle_indexing_rules]
 
+        config.watcher.debounce_delay = 2
+        config.watcher.enabled = True
+        config.watcher.fallback_interval = 60
+
         return config
 
     def _create_test_logging_config(self):
@@ -0,0 +1,308 @@
+"""
+Database context unit tests
+"""
+
+import os
+import threading
+import time
+import unittest
+
+from dal.context.dbconnection import DbConnection
+from dal.context.dbcontext import DbContext
+from dal.context.dbsettings import DbSettings
+from testing.testhelper import TestHelper
+
+class DbContextTest(unittest.TestCase):
+
+    ####################################################################################################################
+    # Initialization and cleanup.
+    ####################################################################################################################
+
+    def setUp(self):
+
+        self._helper = TestHelper()
+        self._helper.create_root_path()
+        self._db_context = DbContext(self._helper.media_database_path)
+        with self._db_context.get_connection_provider(False) as connection:
+            connection.cursor.execute('CREATE TABLE item(id INTEGER PRIMARY KEY, name TEXT)')
+            connection.cursor.execute('INSERT INTO item (name) VALUES (?)', ('first',))
+            connection.commit()
+
+    def tearDown(self):
+
+        self._db_context.close_connections()
+        self._helper.clean()
+
+    ####################################################################################################################
+    # Test methods.
+    ####################################################################################################################
+
+    def test_1_read_during_write_transaction(self):
+
+        # Arrange.
+        counts = []
+
+        # Act.
+        with self._db_context.get_connection_provider() as connection:
+            connection.cursor.execute('INSERT INTO item (name) VALUES (?)', ('second',))
+            connection.commit()
+            counts.append(self._count_items())
+            reader_thread = threading.Thread(target=lambda: counts.append(self._count_items()))
+            reader_thread.start()
+            reader_thread.join(5)
+        counts.append(self._count_items())
+
+        # Assert.
+        self.assertEqual([2, 1, 2], counts, 'Reads are not isolated from the writer properly.')
+
+    def test_2_read_connection_is_read_only(self):
+
+        # Arrange.
+        is_write_rejected = False
+
+        # Act.
+        with self._db_context.get_read_connection_provider() as connection:
+            try:
+                connection.cursor.execute('INSERT INTO item (name) VALUES (?)', ('second',))
+            except Exception:
+                is_write_rejected = True
+
+        # Assert.
+        self.assertTrue(is_write_rejected, 'A read connection was able to write.')
+
+    def test_3_invalid_pragma_value(self):
+
+        # Arrange.
+        db_settings = DbSettings()
+        db_settings.journal_mode = 'WAL; DROP TABLE item'
+
+        # Act and assert.
+        with self.assertRaises(Exception):
+            db_settings.create_pragmas()
+
+    def test_4_pool_reuses_connections_of_finished_threads(self):
+
+        # Arrange.
+        threads = [threading.Thread(target=self._insert_item) for _ in range(0, 20)]
+
+        # Act.
+        for thread in threads:
+            thread.start()
+            thread.join(5)
+        metrics = self._db_context.write_pool_metrics
+
+        # Assert.
+        self.assertEqual(1, metrics.open_count, 'Connections of finished threads are not reused.')
+        self.assertEqual(0, metrics.in_use_count, 'A connection has not been returned to the pool.')
+        self.assertEqual(21, self._count_items(), 'Some of the items have not been inserted.')
+
+    def test_5_pool_is_bounded(self):
+
+        # Arrange.
+        db_settings = DbSettings()
+        db_settings.write_pool_size = 1
+        db_context = DbContext(self._helper.media_database_path, db_settings)
+        is_connected = threading.Event()
+
+        # Act.
+        def hold_connection():
+            with db_context.get_connection_provider():
+                is_connected.set()
+                time.sleep(0.2)
+        holder_thread = threading.Thread(target=hold_connection)
+        holder_thread.start()
+        is_connected.wait(5)
+        with db_context.get_connection_provider():
+            metrics = db_context.write_pool_metrics
+        holder_thread.join(5)
+        db_context.close_connections()
+
+        # Assert.
+        self.assertEqual(1, metrics.open_count, 'The pool has exceeded its maximum size.')
+        self.assertEqual(1, metrics.wait_count, 'The second thread has not waited for the connection.')
+        self.assertGreater(metrics.max_wait_time, 0.1, 'The wait time has not been measured.')
+
+    def test_6_pool_reaps_idle_connections(self):
+
+        # Arrange.
+        db_settings = DbSettings()
+        db_settings.pool_idle_timeout = 0
+        db_context = DbContext(self._helper.media_database_path, db_settings)
+
+        # Act.
+        with db_context.get_read_connection_provider():
+            pass
+        time.sleep(0.01)
+        metrics = db_context.read_pool_metrics
+
+        # Assert.
+        self.assertEqual(0, metrics.open_count, 'The idle connection has not been closed.')
+
+    def test_7_pool_reopens_connections_to_replaced_database(self):
+
+        # Arrange.
+        db_settings = DbSettings()
+        db_settings.pool_check_interval = 0
+        self._db_context.close_connections()
+        self._db_context = DbContext(self._helper.media_database_path, db_settings)
+        self._count_items()
+        for suffix in ['', '-shm', '-wal']:
+            if os.path.exists(self._helper.media_database_path + suffix):
+                os.unlink(self._helper.media_database_path + suffix)
+        with self._db_context.get_connection_provider(False) as connection:
+            connection.cursor.execute('CREATE TABLE item(id INTEGER PRIMARY KEY, name TEXT)')
+            connection.commit()
+
+        # Act.
+        count = self._count_items()
+
+        # Assert.
+        self.assertEqual(0, count, 'A connection to the deleted database has been used.')
+
+    def test_8_replace_database(self):
+
+        # Arrange.
+        source_path = self._helper.media_database_path + '.new'
+        source_context = DbContext(source_path)
+        with source_context.get_connection_provider(False) as connection:
+            connection.cursor.execute('CREATE TABLE item(id INTEGER PRIMARY KEY, name TEXT)')
+            connection.cursor.executemany('INSERT INTO item (name) VALUES (?)', [('first',), ('second',)])
+            connection.commit()
+        is_reading = threading.Event()
+        counts = []
+
+        # Act.
+        def read_items():
+            with self._db_context.get_read_connection_provider():
+                is_reading.set()
+                time.sleep(0.2)
+                counts.append(self._count_items())
+        reader_thread = threading.Thread(target=read_items)
+        reader_thread.start()
+        is_reading.wait(5)
+        with source_context.get_read_connection_provider():
+            with self.assertRaises(Exception):
+                self._db_context.replace_database(source_path)
+        source_context.close_connections()
+        self._db_context.replace_database(source_path)
+        reader_thread.join(5)
+        counts.append(self._count_items())
+
+        # Assert.
+        self.assertEqual([1, 2], counts, 'The database has been replaced during a read.')
+        self.assertFalse(os.path.exists(source_path), 'The new database has not been moved.')
+
+    def test_9_commits_are_timed(self):
+
+        # Arrange.
+        commit_times = []
+
+        def delete_nothing():
+            with self._db_context.get_connection_provider() as connection:
+                connection.cursor.execute('DELETE FROM item WHERE id < 0')
+                connection.commit()
+
+        # Act.
+        DbConnection.set_commit_callback(commit_times.append)
+        try:
+            delete_nothing()
+            delete_nothing()
+        finally:
+            DbConnection.set_commit_callback(None)
+        delete_nothing()
+
+        # Assert.
+        self.assertEqual(2, len(commit_times), 'Commits should be reported only while the callback is set.')
+        self.assertTrue(all(commit_time >= 0 for commit_time in commit_times), 'Invalid commit time.')
+
+    def test_10_unfinished_transactions_are_rolled_back(self):
+
+        # Arrange.
+        def insert_and_fail():
+            with self._db_context.get_connection_provider() as connection:
+                connection.cursor.execute('INSERT INTO item (name) VALUES (?)', ('failed',))
+                connection.commit()
+                raise Exception('Failure.')
+
+        # Act.
+        with self.assertRaises(Exception):
+            insert_and_fail()
+        with self._db_context.get_connection_provider() as connection:
+            connection.cursor.execute('INSERT INTO item (name) VALUES (?)', ('uncommitted',))
+        with self._db_context.get_connection_provider() as connection:
+            connection.cursor.execute('INSERT INTO item (name) VALUES (?)', ('second',))
+            connection.commit()
+        metrics = self._db_context.write_pool_metrics
+
+        # Assert.
+        self.assertEqual(1, metrics.open_count, 'The pooled writer should be reused.')
+        self.assertEqual(2, self._count_items(), 'The changes of unfinished transactions have been committed.')
+
+    def test_11_recently_used_connections_are_not_checked(self):
+
+        # Arrange.
+        self._count_items()
+        check_count = [0]
+        original_check_health = DbConnection.check_health
+
+        def counting_check_health(connection):
+            check_count[0] = check_count[0] + 1
+            return original_check_health(connection)
+
+        # Act.
+        DbConnection.check_health = counting_check_health
+        try:
+            for _ in range(0, 10):
+                self._count_items()
+        finally:
+            DbConnection.check_health = original_check_health
+
+        # Assert.
+        self.assertEqual(0, check_count[0], 'Connections released within the check interval should not be checked.')
+
+    def test_12_replace_database_waits_longer_than_pool_timeout(self):
+
+        # Arrange.
+        db_settings = DbSettings()
+        db_settings.pool_timeout = 0.05
+        self._db_context.close_connections()
+        self._db_context = DbContext(self._helper.media_database_path, db_settings)
+        source_path = self._helper.media_database_path + '.new'
+        source_context = DbContext(source_path)
+        with source_context.get_connection_provider(False) as connection:
+            connection.cursor.execute('CREATE TABLE item(id INTEGER PRIMARY KEY, name TEXT)')
+            connection.commit()
+        source_context.close_connections()
+        is_reading = threading.Event()
+
+        # Act.
+        def hold_reader():
+            with self._db_context.get_read_connection_provider():
+                is_reading.set()
+                time.sleep(0.2)
+        reader_thread = threading.Thread(target=hold_reader)
+        reader_thread.start()
+        is_reading.wait(5)
+        self._db_context.replace_database(source_path)
+        reader_thread.join(5)
+
+        # Assert.
+        self.assertFalse(os.path.exists(source_path), 'The new database has not been moved.')
+        self.assertEqual(0, self._count_items(), 'The database has not been replaced.')
+
+    ####################################################################################################################
+    # Auxiliary methods.
+    ####################################################################################################################
+
+    def _count_items(self):
+
+        with self._db_context.get_read_connection_provider() as connection:
+            cursor = connection.cursor
+            cursor.execute('SELECT COUNT(*) FROM item')
+            return cursor.fetchone()[0]
+
+    def _insert_item(self):
+
+        with self._db_context.get_connection_provider() as connection:
+            connection.cursor.execute('INSERT INTO item (name) VALUES (?)', (threading.current_thread().name,))
+            connection.commit()
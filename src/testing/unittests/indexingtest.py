@@ -4,20 +4,32 @@ Indexing unit tests.
 
 # pylint: disable=too-many-public-methods
 
+import os
+import shutil
+import time
 import unittest
 
 from indexing.collectible import Collectible
 from indexing.collector import Collector
 from indexing.filters.directoryfilter import DirectoryFilter
+from indexing.filters.pathfilter import PathFilter
 from indexing.filters.pathfilterfactory import PathFilterFactory
 from indexing.indexer import Indexer
 from indexing.indexerpolicy import IndexerPolicy
+from indexing.indexingprogress import IndexingProgress
+from indexing.journal.changejournal import ChangeJournal
 from indexing.nodes import CategorizedNode, UncategorizedNode
 from indexing.pathanalyzer import PathAnalyzer
 from indexing.pathpattern import PathPattern
+from indexing.pathpatternmatcher import PathPatternMatcher
 from indexing.pathpatternanalyzer import PathPatternAnalyzer
 from indexing.pathpatternpreprocessor import PathPatternPreprocessor
+from indexing.stagetimer import StageTimer
 from indexing.tagconfig import TagConfig
+from indexing.traversal.journalingtraversalengine import JournalingTraversalEngine
+from indexing.traversal.listdirtraversalengine import ListdirTraversalEngine
+from indexing.traversal.scandirtraversalengine import ScandirTraversalEngine
+from indexing.traversal.traversalengine import TraversalEngine
 from testing.testhelper import TestHelper
 from testing.videotestenvironment import VideoTestEnvironment
 
@@ -383,6 +395,492 @@ class IndexingTest(unittest.TestCase):
             self._helper.root_path,
             indexer_policy)
 
+    def test_15_indexer_traversal_engines(self):
+
+        # Arrange.
+        listdir_collector = TestCollector()
+        listdir_indexer = Indexer(traversal_engine=ListdirTraversalEngine())
+        listdir_indexer.add_rule(self._helper.root_path, self._create_video_policy(listdir_collector))
+
+        scandir_collector = TestCollector()
+        scandir_indexer = Indexer(traversal_engine=ScandirTraversalEngine())
+        scandir_indexer.add_rule(self._helper.root_path, self._create_video_policy(scandir_collector))
+
+        # Act.
+        listdir_indexer.index()
+        scandir_indexer.index()
+
+        # Assert.
+        self._compare_lists(
+            listdir_collector.collected_categorized_paths,
+            scandir_collector.collected_categorized_paths)
+        self._compare_lists(
+            listdir_collector.collected_uncategorized_paths,
+            scandir_collector.collected_uncategorized_paths)
+
+    def test_16_indexer_parallel(self):
+
+        # Arrange.
+        directories = [os.path.join(self._helper.files_path, d) for d in ['Effects', 'Fun', 'Movie', 'Series']]
+
+        serial_collector = TestCollector()
+        serial_indexer = Indexer()
+        for directory in directories:
+            serial_indexer.add_rule(directory, self._create_video_policy(serial_collector))
+
+        parallel_collector = TestCollector()
+        parallel_indexer = Indexer(pool_size=3)
+        for directory in directories:
+            parallel_indexer.add_rule(directory, self._create_video_policy(parallel_collector))
+
+        # Act.
+        serial_indexer.index()
+        parallel_indexer.index()
+
+        # Assert.
+        self._compare_unordered_lists(
+            serial_collector.collected_categorized_paths,
+            parallel_collector.collected_categorized_paths)
+        self._compare_unordered_lists(
+            serial_collector.collected_uncategorized_paths,
+            parallel_collector.collected_uncategorized_paths)
+        self._compare_path_lists(
+            self._environment.fake_uncategorized_files,
+            parallel_collector.collected_uncategorized_paths,
+            len(self._helper.files_path) + 1,
+            'uncategorized')
+
+    def test_17_indexer_change_journal(self):
+
+        # Arrange.
+        directory = os.path.join(self._helper.files_path, 'Movie')
+        self._set_mtimes(directory, 1000000000)
+
+        change_journal = ChangeJournal()
+        counting_engine = TestCountingTraversalEngine()
+        traversal_engine = JournalingTraversalEngine(counting_engine, change_journal)
+
+        # Act.
+        full_collector = TestCollector()
+        full_indexer = Indexer(traversal_engine=traversal_engine)
+        full_indexer.add_rule(directory, self._create_video_policy(full_collector))
+        change_journal.load()
+        full_indexer.index()
+        change_journal.save()
+        full_listing_count = counting_engine.listing_count
+
+        journal_collector = TestCollector()
+        journal_filter_factory = TestCountingFilterFactory()
+        journal_indexer = Indexer(traversal_engine=traversal_engine)
+        journal_indexer.add_rule(
+            directory,
+            self._create_video_policy(journal_collector, filter_factory=journal_filter_factory))
+        change_journal.load()
+        journal_indexer.index()
+        is_file_unchanged = change_journal.is_file_unchanged(full_collector.collected_categorized_paths[0])
+        change_journal.save()
+
+        # Assert.
+        self.assertTrue(full_listing_count > 0, 'The directories should be enumerated for the first time.')
+        self.assertEqual(
+            full_listing_count,
+            counting_engine.listing_count,
+            'Unchanged directories should not be enumerated again.')
+        self.assertEqual(0, journal_filter_factory.call_count, 'Unchanged directories should not be analyzed.')
+        self.assertEqual(
+            0,
+            len(journal_collector.collected_categorized_paths) + len(journal_collector.collected_uncategorized_paths),
+            'The files of unchanged directories should not be collected.')
+        self.assertTrue(is_file_unchanged, 'The files of unchanged directories should be marked unchanged.')
+
+        # Act.
+        new_file_path = os.path.join(directory, 'New.avi')
+        with open(new_file_path, 'w'):
+            pass
+        try:
+            changed_collector = TestCollector()
+            changed_indexer = Indexer(traversal_engine=traversal_engine)
+            changed_indexer.add_rule(directory, self._create_video_policy(changed_collector))
+            change_journal.load()
+            changed_indexer.index()
+            change_journal.save()
+        finally:
+            os.unlink(new_file_path)
+
+        # Assert.
+        self.assertEqual(
+            full_listing_count + 1,
+            counting_engine.listing_count,
+            'Only the changed directory should be enumerated again.')
+        self.assertEqual([], changed_collector.collected_categorized_paths, 'Only the new file should be analyzed.')
+        self.assertEqual(
+            [new_file_path],
+            changed_collector.collected_uncategorized_paths,
+            'Only the new file should be analyzed.')
+
+    def test_18_path_pattern_matcher(self):
+
+        # Arrange.
+        tag_config = TagConfig('%', '%', ('any', '[^/]+'), {'a' : '([^/]+)', 'b' : '([^/]+)', 'c' : '([^/]+)'})
+        path_pattern_analyzer = PathPatternAnalyzer()
+        path_patterns = [
+            path_pattern_analyzer.parse(tag_config, '%a%/Fix/%b%'),
+            path_pattern_analyzer.parse(tag_config, '%a%/Other/%b%/%c%'),
+            path_pattern_analyzer.parse(tag_config, '%c%/Sub/%a%/Fix/%b%'),
+            path_pattern_analyzer.parse(tag_config, '%a%/Fix/%any%/%b%')]
+
+        # Act.
+        single_matcher = PathPatternMatcher(path_patterns[:1])
+        matcher = PathPatternMatcher(path_patterns)
+
+        # Assert.
+        self.assertEqual((0, ('Foo', 'Bar')), single_matcher.match('/root/Foo/Fix/Bar'), 'Invalid single match.')
+        self.assertEqual((-1, None), single_matcher.match('/root/Foo/Other/Bar'), 'The path should not match.')
+        self.assertEqual(
+            (0, ('Foo', 'Bar')),
+            matcher.match('/root/Foo/Fix/Bar'),
+            'The pattern added first should win.')
+        self.assertEqual(
+            (1, ('Foo', 'Bar', 'Baz')),
+            matcher.match('/root/Foo/Other/Bar/Baz'),
+            'The second pattern should win.')
+        self.assertEqual(
+            (2, ('root', 'Foo', 'Bar')),
+            matcher.match('/root/Sub/Foo/Fix/Bar'),
+            'The pattern describing the longest part of the path should win.')
+        self.assertEqual(
+            (3, ('Foo', 'Bar/', 'Baz')),
+            matcher.match('/root/Foo/Fix/Bar/Baz'),
+            'The last pattern should win.')
+        self.assertEqual((-1, None), matcher.match('/root/Foo/Bar'), 'The path should not match.')
+
+    def test_19_path_analyzer_multiple_patterns(self):
+
+        # Arrange.
+        tag_config = TagConfig('%', '%', None, {'a' : '([^/]+)', 'b' : '([^/]+)'})
+        path_pattern_analyzer = PathPatternAnalyzer()
+        collectible_1 = Collectible(['.hey'], path_pattern_analyzer.parse(tag_config, '%a%/Fix/%b%'), 'fix')
+        collectible_2 = Collectible(['.hey'], path_pattern_analyzer.parse(tag_config, '%a%/Other/%b%'), 'other')
+        collector = TestCollector()
+        policy = IndexerPolicy(collector, [collectible_1, collectible_2])
+
+        # Act.
+        path_analyzer = PathAnalyzer(policy)
+        path_analyzer.enter('Foo')
+        path_analyzer.enter('Fix')
+        path_analyzer.analyze('Foo/Fix/Bar', '.hey')
+        path_analyzer.leave()
+        path_analyzer.enter('Other')
+        path_analyzer.analyze('Foo/Other/Baz', '.hey')
+        path_analyzer.leave()
+        path_analyzer.leave()
+
+        # Assert.
+        self._compare_lists(['Foo/Fix/Bar.hey', 'Foo/Other/Baz.hey'], collector.collected_categorized_paths)
+        self._compare_lists(['fix', 'other'], collector.collected_categorized_tokens)
+
+    def test_20_indexer_relative_matching(self):
+
+        # Arrange.
+        directories = [os.path.join(self._helper.files_path, d) for d in ['Movie', 'Series']]
+
+        absolute_collector = TestCollector()
+        absolute_indexer = Indexer()
+        for directory in directories:
+            absolute_indexer.add_rule(directory, self._create_video_policy(absolute_collector))
+
+        relative_collector = TestCollector()
+        relative_indexer = Indexer(relative_matching=True)
+        for directory in directories:
+            relative_indexer.add_rule(directory, self._create_video_policy(relative_collector))
+
+        # Act.
+        absolute_indexer.index()
+        relative_indexer.index()
+
+        # Assert.
+        self._compare_lists(
+            absolute_collector.collected_categorized_paths,
+            relative_collector.collected_categorized_paths)
+        self._compare_lists(
+            absolute_collector.collected_categorized_tokens,
+            relative_collector.collected_categorized_tokens)
+        self._compare_lists(
+            absolute_collector.collected_uncategorized_paths,
+            relative_collector.collected_uncategorized_paths)
+
+    def test_21_path_analyzer_relative_matching(self):
+
+        # Arrange.
+        tag_config = TagConfig('%', '%', None, {'a' : '([^/]+)', 'b' : '([^/]+)'})
+        path_pattern = PathPatternAnalyzer().parse(tag_config, '%a%/Fix/%b%')
+        collector = TestCollector()
+        policy = IndexerPolicy(collector, [Collectible(['.hey'], path_pattern)])
+
+        # Act.
+        path_analyzer = PathAnalyzer(policy, root='/media/Foo/Fix')
+        path_analyzer.analyze('/media/Foo/Fix/Bar', '.hey')
+        path_analyzer.enter('Baz')
+        path_analyzer.enter('Fix')
+        path_analyzer.analyze('/media/Foo/Fix/Baz/Fix/Bar', '.hey')
+        path_analyzer.leave()
+        path_analyzer.leave()
+
+        # Assert.
+        self._compare_lists(['/media/Foo/Fix/Baz/Fix/Bar.hey'], collector.collected_categorized_paths)
+        self._compare_lists(['/media/Foo/Fix/Bar.hey'], collector.collected_uncategorized_paths)
+
+    def test_22_indexer_progress(self):
+
+        # Arrange.
+        expected_directory_count = 0
+        expected_file_count = 0
+        for _, _, file_names in os.walk(self._helper.root_path):
+            expected_directory_count += 1
+            expected_file_count += len(file_names)
+
+        progress = IndexingProgress()
+        indexer = Indexer(pool_size=2, progress=progress)
+        indexer.add_rule(self._helper.root_path, self._create_video_policy(TestCollector()))
+
+        cancelled_progress = IndexingProgress()
+        cancelled_progress.cancel()
+        cancelled_collector = TestCollector()
+        cancelled_indexer = Indexer(progress=cancelled_progress)
+        cancelled_indexer.add_rule(self._helper.root_path, self._create_video_policy(cancelled_collector))
+
+        # Act.
+        indexer.index()
+
+        # Assert.
+        self.assertEqual(expected_directory_count, progress.directory_count, 'Wrong number of scanned directories.')
+        self.assertEqual(expected_file_count, progress.file_count, 'Wrong number of analyzed files.')
+        self._assert_raises_with_message(
+            Exception,
+            'Exception should be raised indicating that indexing has been cancelled.',
+            cancelled_indexer.index)
+        self.assertEqual(0, cancelled_progress.file_count, 'No file should be analyzed after cancellation.')
+        self._compare_lists([], cancelled_collector.collected_uncategorized_paths)
+
+    def test_23_indexer_stage_timer(self):
+
+        # Arrange.
+        expected_directory_count = sum(1 for _ in os.walk(self._helper.root_path))
+        collector = TestCollector()
+        stage_timer = StageTimer()
+        indexer = Indexer(pool_size=2, stage_timer=stage_timer)
+        indexer.add_rule(self._helper.root_path, self._create_video_policy(collector, 'video'))
+
+        # Act.
+        indexer.index()
+        timings = stage_timer.timings
+
+        # Assert.
+        self._compare_unordered_lists(['video'], list(timings.keys()))
+        self._compare_unordered_lists(
+            [
+                StageTimer.STAGE_COLLECTING,
+                StageTimer.STAGE_FILTERING,
+                StageTimer.STAGE_LISTING,
+                StageTimer.STAGE_MATCHING],
+            list(timings['video'].keys()))
+        self.assertEqual(
+            expected_directory_count,
+            timings['video'][StageTimer.STAGE_LISTING].count,
+            'Every directory should be listed once.')
+        self.assertEqual(
+            len(collector.collected_categorized_paths) + len(collector.collected_uncategorized_paths),
+            timings['video'][StageTimer.STAGE_MATCHING].count,
+            'Every collected file should be matched once.')
+
+    def test_24_indexer_parallel_deferred_policy(self):
+
+        # Arrange.
+        episode_titles = ['Episode {}'.format(i) for i in range(1, 4)]
+        root_path = os.path.join(self._helper.root_path, 'separated')
+        video_directory = os.path.join(root_path, 'Video')
+        subtitle_directory = os.path.join(root_path, 'Subtitle')
+        for episode_title in episode_titles:
+            for path in [
+                    os.path.join(video_directory, 'Title/Content/LQ/English/Season 1', episode_title + '.avi'),
+                    os.path.join(
+                        subtitle_directory,
+                        'Title/Subtitle/LQ/English/Greek/Season 1',
+                        episode_title + '.srt')]:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w'):
+                    pass
+
+        serial_collector = TestSubtitleCollector()
+        serial_indexer = Indexer()
+        serial_indexer.add_rule(video_directory, self._create_video_policy(serial_collector))
+        serial_indexer.add_rule(subtitle_directory, self._create_video_policy(serial_collector, is_deferred=True))
+
+        # The videos are traversed slowly, so the subtitles are found first.
+        parallel_collector = TestSubtitleCollector()
+        parallel_indexer = Indexer(pool_size=2, traversal_engine=TestDelayingTraversalEngine(video_directory))
+        parallel_indexer.add_rule(video_directory, self._create_video_policy(parallel_collector))
+        parallel_indexer.add_rule(subtitle_directory, self._create_video_policy(parallel_collector, is_deferred=True))
+
+        # Act.
+        try:
+            serial_indexer.index()
+            parallel_indexer.index()
+        finally:
+            shutil.rmtree(root_path)
+
+        # Assert.
+        self.assertEqual(3, len(serial_collector.collected_subtitle_paths), 'Wrong number of subtitles.')
+        self._compare_unordered_lists(
+            serial_collector.collected_subtitle_paths,
+            parallel_collector.collected_subtitle_paths)
+        self._compare_unordered_lists(
+            serial_collector.collected_categorized_paths,
+            parallel_collector.collected_categorized_paths)
+
+    def test_25_indexer_change_journal_files(self):
+
+        # Arrange.
+        directory = os.path.join(self._helper.root_path, 'journal')
+        season_directory = os.path.join(directory, 'Title/Content/LQ/English/Season 1')
+        episode_paths = [os.path.join(season_directory, 'Episode {}.avi'.format(i)) for i in range(1, 4)]
+        os.makedirs(season_directory)
+        for episode_path in episode_paths:
+            with open(episode_path, 'w'):
+                pass
+        self._set_mtimes(directory, 1000000000)
+
+        change_journal = ChangeJournal()
+        traversal_engine = JournalingTraversalEngine(ScandirTraversalEngine(), change_journal)
+        verifying_traversal_engine = JournalingTraversalEngine(ScandirTraversalEngine(), change_journal, True)
+
+        # Act.
+        try:
+            full_collector = self._index_with_change_journal(directory, traversal_engine, change_journal)
+
+            # Modify a file in place, which does not change the modification time of its directory.
+            with open(episode_paths[0], 'w') as episode_file:
+                episode_file.write('modified')
+            os.utime(episode_paths[0], (1500000000, 1500000000))
+            unverified_collector = self._index_with_change_journal(directory, traversal_engine, change_journal)
+            verified_collector = self._index_with_change_journal(directory, verifying_traversal_engine, change_journal)
+            unchanged_collector = self._index_with_change_journal(
+                directory, verifying_traversal_engine, change_journal)
+        finally:
+            shutil.rmtree(directory)
+
+        # Assert.
+        self._compare_unordered_lists(episode_paths, full_collector.collected_categorized_paths)
+        self.assertEqual(
+            [],
+            unverified_collector.collected_categorized_paths,
+            'Files modified in place should not be detected without verification.')
+        self.assertEqual(
+            [episode_paths[0]],
+            verified_collector.collected_categorized_paths,
+            'Only the modified file should be analyzed.')
+        self.assertEqual(
+            [],
+            unchanged_collector.collected_categorized_paths,
+            'The modified file should be analyzed only once.')
+
+    def test_26_indexer_change_journal_unchanged_subtree(self):
+
+        # Arrange.
+        directory = os.path.join(self._helper.root_path, 'journal')
+        changed_directory = os.path.join(directory, 'Changed/Content/LQ/English/Season 1')
+        unchanged_directory = os.path.join(directory, 'Unchanged')
+        for season_directory in [changed_directory, os.path.join(unchanged_directory, 'Content/LQ/English/Season 1')]:
+            os.makedirs(season_directory)
+            with open(os.path.join(season_directory, 'Episode 1.avi'), 'w'):
+                pass
+        self._set_mtimes(directory, 1000000000)
+
+        change_journal = ChangeJournal()
+        counting_engine = TestCountingTraversalEngine()
+        traversal_engine = JournalingTraversalEngine(counting_engine, change_journal)
+        filter_factory = TestCountingFilterFactory()
+
+        # Act.
+        try:
+            self._index_with_change_journal(directory, traversal_engine, change_journal)
+
+            new_file_path = os.path.join(changed_directory, 'Episode 2.avi')
+            with open(new_file_path, 'w'):
+                pass
+            os.utime(new_file_path, (1000000000, 1000000000))
+            os.utime(changed_directory, (1500000000, 1500000000))
+            counting_engine.listed_paths = []
+
+            collector = TestCollector()
+            indexer = Indexer(traversal_engine=traversal_engine)
+            indexer.add_rule(directory, self._create_video_policy(collector, filter_factory=filter_factory))
+            change_journal.load()
+            indexer.index()
+            change_journal.save()
+        finally:
+            shutil.rmtree(directory)
+
+        # Assert.
+        self.assertEqual(
+            [new_file_path],
+            collector.collected_categorized_paths,
+            'Only the new file should be analyzed.')
+        self.assertEqual(
+            [changed_directory],
+            counting_engine.listed_paths,
+            'Only the changed directory should be enumerated.')
+        self.assertEqual(
+            [new_file_path],
+            filter_factory.applied_paths,
+            'Only the new file should be filtered.')
+
+    def test_27_indexer_serial_rule_analyzers(self):
+
+        # Arrange.
+        directory = os.path.join(self._helper.root_path, 'rules')
+        first_directory = os.path.join(directory, 'First')
+        second_directory = os.path.join(directory, 'Second')
+        for rule_directory in [first_directory, second_directory]:
+            season_directory = os.path.join(rule_directory, 'Title/Content/LQ/English/Season 1')
+            os.makedirs(season_directory)
+            with open(os.path.join(season_directory, 'Episode 1.avi'), 'w'):
+                pass
+
+        first_filter_factory = TestCountingFilterFactory()
+        second_filter_factory = TestCountingFilterFactory()
+        single_filter_factory = TestCountingFilterFactory()
+
+        # Act.
+        try:
+            indexer = Indexer()
+            indexer.add_rule(
+                first_directory,
+                self._create_video_policy(TestCollector(), 'first', False, first_filter_factory))
+            indexer.add_rule(
+                second_directory,
+                self._create_video_policy(TestCollector(), 'second', False, second_filter_factory))
+            indexer.index()
+
+            single_indexer = Indexer()
+            single_indexer.add_rule(
+                second_directory,
+                self._create_video_policy(TestCollector(), 'second', False, single_filter_factory))
+            single_indexer.index()
+        finally:
+            shutil.rmtree(directory)
+
+        # Assert.
+        self.assertTrue(single_filter_factory.call_count > 0, 'The filters should be notified.')
+        self.assertEqual(
+            single_filter_factory.call_count,
+            second_filter_factory.call_count,
+            'The analyzers of a rule should not be notified of the directories of other rules.')
+        self.assertEqual(
+            single_filter_factory.call_count,
+            first_filter_factory.call_count,
+            'The analyzers of a rule should not be notified of the directories of other rules.')
+
     ####################################################################################################################
     # Auxiliary methods.
     ####################################################################################################################
@@ -399,6 +897,35 @@ class IndexingTest(unittest.TestCase):
 
         self.assertTrue(does_exception_type_match, msg)
 
+    def _create_video_policy(self, collector, category=None, is_deferred=False, filter_factory=None):
+
+        tag_patterns = {
+            'episode_title' : '([^/]+)',
+            'language' : '([^/]+)',
+            'languages' : '([^/]+)',
+            'quality' : '([^/]+)',
+            'title' : '([^/]+)'}
+        tag_config = TagConfig('%', '%', ('any', '[^/]+'), tag_patterns)
+        path_pattern_analyzer = PathPatternAnalyzer()
+        video_pattern = path_pattern_analyzer.parse(
+            tag_config,
+            '%title%/Content/%quality%/%languages%/%any%/%episode_title%')
+        subtitle_pattern = path_pattern_analyzer.parse(
+            tag_config,
+            '%title%/Subtitle/%quality%/%languages%/%language%/%any%/%episode_title%')
+
+        collectibles = [
+            Collectible(['.avi', '.mp4'], video_pattern, 'video'),
+            Collectible(['.srt'], subtitle_pattern, 'subtitle')]
+
+        if filter_factory is None:
+            filter_factory = TestFilterFactory()
+
+        indexer_policy = IndexerPolicy(collector, collectibles, filter_factory, category, is_deferred)
+        indexer_policy.tag_any = 'any'
+
+        return indexer_policy
+
     def _compare_dictionaries(self, expected_dict, actual_dict):
 
         if expected_dict is None:
@@ -475,6 +1002,25 @@ class IndexingTest(unittest.TestCase):
             if actual not in expected_list:
                 self.fail('Actual list contains an unexpected item: {}.'.format(actual))
 
+    def _index_with_change_journal(self, directory, traversal_engine, change_journal):
+
+        collector = TestCollector()
+        indexer = Indexer(traversal_engine=traversal_engine)
+        indexer.add_rule(directory, self._create_video_policy(collector))
+
+        change_journal.load()
+        indexer.index()
+        change_journal.save()
+
+        return collector
+
+    def _set_mtimes(self, directory, mtime):
+
+        for current_directory, _, files in os.walk(directory):
+            for file in files:
+                os.utime(os.path.join(current_directory, file), (mtime, mtime))
+            os.utime(current_directory, (mtime, mtime))
+
 ########################################################################################################################
 # Mocked classes.
 ########################################################################################################################
@@ -484,24 +1030,115 @@ class TestCollector(Collector):
     def __init__(self):
 
         self.collected_categorized_paths = []
+        self.collected_categorized_tokens = []
         self.collected_uncategorized_paths = []
 
     def collect_categorized(self, categorized_nodes):
 
         for item in categorized_nodes:
             self.collected_categorized_paths.append(item.path)
+            self.collected_categorized_tokens.append(item.token)
 
     def collect_uncategorized(self, uncategorized_nodes):
 
         for item in uncategorized_nodes:
             self.collected_uncategorized_paths.append(item.path)
 
+class TestCountingTraversalEngine(TraversalEngine):
+
+    def __init__(self):
+
+        self.listed_paths = []
+        self.listing_count = 0
+        self._traversal_engine = ScandirTraversalEngine()
+
+    def list_directory(self, path):
+
+        self.listed_paths.append(path)
+        self.listing_count = self.listing_count + 1
+
+        return self._traversal_engine.list_directory(path)
+
+class TestCountingFilterFactory(PathFilterFactory):
+    """
+    Creates a filter that counts how many times it has been applied or notified of entering or leaving a directory.
+    """
+
+    def __init__(self):
+
+        self.applied_paths = []
+        self.call_count = 0
+
+    def create_filters(self):
+
+        return [TestCountingFilter(self)]
+
+class TestCountingFilter(PathFilter):
+
+    def __init__(self, factory):
+
+        self._factory = factory
+
+    def apply_filter(self, path):
+
+        self._factory.applied_paths.append(path)
+        self._factory.call_count = self._factory.call_count + 1
+
+        return False
+
+    def clean_filter(self):
+
+        pass
+
+    def init_filter(self):
+
+        pass
+
+    def leave_scope(self):
+
+        self._factory.call_count = self._factory.call_count + 1
+
+class TestDelayingTraversalEngine(TraversalEngine):
+
+    def __init__(self, delayed_directory):
+
+        self._delayed_directory = delayed_directory
+        self._traversal_engine = ScandirTraversalEngine()
+
+    def list_directory(self, path):
+
+        if path.startswith(self._delayed_directory):
+            time.sleep(0.05)
+
+        return self._traversal_engine.list_directory(path)
+
 class TestFilterFactory(PathFilterFactory):
 
     def create_filters(self):
 
         return [DirectoryFilter('^[0-9]{8} [0-9]{6}$')]
 
+class TestSubtitleCollector(TestCollector):
+    """
+    Collects subtitles only for the videos collected before, like the VideoCollector.
+    """
+
+    def __init__(self):
+
+        super().__init__()
+        self.collected_subtitle_paths = []
+        self._episode_titles = set()
+
+    def collect_categorized(self, categorized_nodes):
+
+        for item in categorized_nodes:
+            if item.token == 'video':
+                self._episode_titles.add(item.meta['episode_title'])
+            elif item.meta['episode_title'] in self._episode_titles:
+                self.collected_subtitle_paths.append(item.path)
+
+        super().collect_categorized(categorized_nodes)
+
 ########################################################################################################################
 # Main.
 ########################################################################################################################
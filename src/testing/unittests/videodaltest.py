@@ -7,8 +7,11 @@ Video Data Access Layer unit tests
 import unittest
 
 from dal.context.dbcontext import DbContext
+from dal.functions import decode_cursor
+from dal.pagerequest import PageRequest
 from dal.video.videodatacache import VideoDataCache
 from dal.video.videodatahandler import VideoDataHandler
+from dal.video.videotitlefilter import VideoTitleFilter
 from testing.testhelper import TestHelper
 from testing.videotestenvironment import VideoTestEnvironment
 
@@ -180,10 +183,364 @@ class VideoDalTest(unittest.TestCase):
         self.assertEqual(id_banana_3, None)
         self.assertEqual(id_banana_4, 4)
 
+    def test_7_bulk_insert(self):
+
+        # Arrange.
+        creator = self._video_data_handler.creator
+        retriever = self._video_data_handler.retriever
+        title_id = creator.insert_title('Cherry')
+        quality_id = creator.insert_quality('HQ')
+        path_count = len(retriever.retrieve_video_paths())
+
+        # Act.
+        creator.begin_bulk_insert(3)
+        file_id_1 = creator.insert_file(title_id, quality_id, '/Cherry/1.mkv')
+        file_id_2 = creator.insert_file(title_id, quality_id, '/Cherry/2.mkv')
+        path_count_buffered = len(retriever.retrieve_video_paths())
+        file_id_3 = creator.insert_file(title_id, quality_id, '/Cherry/3.mkv')
+        path_count_flushed = len(retriever.retrieve_video_paths())
+        file_id_4 = creator.insert_file(title_id, quality_id, '/Cherry/4.mkv')
+        creator.end_bulk_insert()
+        paths = retriever.retrieve_video_paths()
+
+        # Assert.
+        self.assertEqual(path_count_buffered, path_count)
+        self.assertEqual(path_count_flushed, path_count + 3)
+        self.assertEqual(len(paths), path_count + 4)
+        self.assertEqual([file_id_2, file_id_3, file_id_4], [file_id_1 + 1, file_id_1 + 2, file_id_1 + 3])
+        self.assertEqual(retriever.retrieve_video_path(file_id_4), '/Cherry/4.mkv')
+
+    def test_8_upgrade_db(self):
+
+        # Arrange.
+        creator = self._video_data_handler.creator
+        db_context = self._video_data_handler.db_context
+        with db_context.get_connection_provider() as connection:
+            cursor = connection.cursor
+            cursor.execute('SELECT name FROM sqlite_master WHERE type=\'index\' AND tbl_name LIKE \'video_%\'')
+            index_names = [row[0] for row in cursor.fetchall() if not row[0].startswith('sqlite_')]
+            for index_name in index_names:
+                cursor.execute('DROP INDEX ' + index_name)
+            cursor.execute('DELETE FROM schema_version WHERE name=?', ('video',))
+            cursor.executemany(
+                'INSERT INTO video_title_language_mapping (id_title, id_language) VALUES (?, ?)',
+                [(1, 1), (1, 1), (1, 1)])
+            connection.commit()
+
+        # Act.
+        migration_count = creator.upgrade_db()
+        repeated_migration_count = creator.upgrade_db()
+        query_plan = self._explain_query_plan('SELECT id FROM video_file WHERE id_title=1 AND id_quality=1')
+        mapping_count = self._count_rows('video_title_language_mapping WHERE id_title=1 AND id_language=1')
+        mapping_id = creator.insert_title_language_mapping(1, 1)
+
+        # Assert.
+        self.assertGreater(len(index_names), 0)
+        self.assertEqual(migration_count, len(creator.SCHEMA_MIGRATIONS))
+        self.assertEqual(repeated_migration_count, 0)
+        self.assertIn('USING COVERING INDEX video_file_title_quality', query_plan)
+        self.assertEqual(mapping_count, 1)
+        self.assertIsNone(mapping_id)
+
+    def test_9_1_bulk_insert_duplicate_mappings(self):
+
+        # Arrange.
+        creator = self._video_data_handler.creator
+        title_id = creator.insert_title('Durian')
+        language_id = creator.insert_language('Thai')
+
+        # Act.
+        creator.begin_bulk_insert(2)
+        mapping_id_1 = creator.insert_title_language_mapping(title_id, language_id)
+        mapping_id_2 = creator.insert_title_language_mapping(title_id, language_id)
+        creator.end_bulk_insert()
+        creator.begin_bulk_insert(2)
+        creator.insert_title_language_mapping(title_id, language_id)
+        creator.end_bulk_insert()
+        mapping_count = self._count_rows(
+            'video_title_language_mapping WHERE id_title={} AND id_language={}'.format(title_id, language_id))
+
+        # Assert.
+        self.assertIsNotNone(mapping_id_1)
+        self.assertIsNone(mapping_id_2)
+        self.assertEqual(mapping_count, 1)
+
+    def test_9_2_details_retrieval(self):
+
+        # Arrange.
+        creator = self._video_data_handler.creator
+        retriever = self._video_data_handler.retriever
+        title_id_1 = creator.insert_title('Elderberry')
+        title_id_2 = creator.insert_title('Fig')
+        title_id_3 = creator.insert_title('Grape')
+        quality_id = creator.insert_quality('FHD')
+        language_id_1 = creator.insert_language('Dutch')
+        language_id_2 = creator.insert_language('Welsh')
+        file_id_1 = creator.insert_file(title_id_1, quality_id, '/Elderberry/1.mkv')
+        file_id_2 = creator.insert_file(title_id_1, quality_id, '/Elderberry/2.mkv')
+        file_id_3 = creator.insert_file(title_id_2, quality_id, '/Fig/1.mkv')
+        for file_id in [file_id_1, file_id_2, file_id_3]:
+            creator.insert_file_language_mapping(file_id, language_id_1)
+        subtitle_id_1 = creator.insert_subtitle(file_id_1, language_id_1, '/Elderberry/1.dut.srt')
+        subtitle_id_2 = creator.insert_subtitle(file_id_1, language_id_2, '/Elderberry/1.wel.srt')
+
+        # Act.
+        details = retriever.retrieve_details(title_id_1)
+        details_of_titles = retriever.retrieve_details_of_titles([title_id_2, title_id_3, title_id_1])
+
+        # Assert.
+        self.assertEqual(details['title'], 'Elderberry')
+        self.assertEqual([video_file['id'] for video_file in details['files']], [file_id_1, file_id_2])
+        self.assertEqual(
+            details['subtitles'],
+            [
+                {'file' : file_id_1, 'id' : subtitle_id_1, 'language' : 'Dutch'},
+                {'file' : file_id_1, 'id' : subtitle_id_2, 'language' : 'Welsh'}])
+        self.assertEqual(sorted(details_of_titles.keys()), sorted([title_id_1, title_id_2]))
+        self.assertEqual(details_of_titles[title_id_1], details)
+        self.assertEqual(
+            details_of_titles[title_id_2]['files'],
+            [{'id' : file_id_3, 'language' : 'Dutch', 'quality' : 'FHD'}])
+        self.assertEqual(details_of_titles[title_id_2]['subtitles'], [])
+        self.assertIsNone(retriever.retrieve_details(title_id_3))
+
+    def test_9_3_title_pagination(self):
+
+        # Arrange.
+        creator = self._video_data_handler.creator
+        retriever = self._video_data_handler.retriever
+        for title in ['Huckleberry', 'Jackfruit', 'Huckleberry', 'Kiwi']:
+            creator.insert_title(title)
+        page_request = PageRequest()
+        page_request.fields = ['title']
+        page_request.limit = 2
+        titles = []
+        page_count = 0
+
+        # Act.
+        expected_titles = [item['title'] for item in retriever.retrieve_titles()]
+        while True:
+            page = retriever.retrieve_titles(None, page_request)
+            page_count += 1
+            titles.extend(page.items)
+            if page.next_cursor is None:
+                break
+            page_request.after = decode_cursor(page.next_cursor)
+
+        # Assert.
+        self.assertEqual([item['title'] for item in titles], expected_titles)
+        self.assertEqual(page_count, (len(expected_titles) + 1) // 2)
+        self.assertTrue(all(list(item.keys()) == ['title'] for item in titles))
+
+    def test_9_4_title_iteration(self):
+
+        # Arrange.
+        retriever = self._video_data_handler.retriever
+        page_request = PageRequest()
+        page_request.fields = ['id']
+
+        limited_page_request = PageRequest()
+        limited_page_request.limit = 2
+
+        # Act.
+        titles = retriever.retrieve_titles()
+        iterated_titles = retriever.iterate_titles()
+        first_title = next(iterated_titles)
+        in_use_count = self._video_data_handler.db_context.read_pool_metrics.in_use_count
+        remaining_titles = list(iterated_titles)
+        title_ids = list(retriever.iterate_titles(None, page_request))
+        limited_titles = list(retriever.iterate_titles(None, limited_page_request))
+
+        # Assert.
+        self.assertEqual([first_title] + remaining_titles, titles)
+        self.assertEqual(0, in_use_count, 'The read connection should not be held between the batches.')
+        self.assertEqual(title_ids, [{'id' : item['id']} for item in titles])
+        self.assertEqual(limited_titles, titles[:2])
+
+    def test_9_5_title_search(self):
+
+        # Arrange.
+        creator = self._video_data_handler.creator
+        retriever = self._video_data_handler.retriever
+        title_id_1 = creator.insert_title('Lime Pie')
+        title_id_2 = creator.insert_title('Lime')
+        title_id_3 = creator.insert_title('Sublime')
+        title_filter = VideoTitleFilter()
+        title_filter.text = 'pi li'
+
+        # Act.
+        found_titles = retriever.search_titles('lim')
+        filtered_titles = retriever.retrieve_titles(title_filter)
+        with self._video_data_handler.db_context.get_connection_provider() as connection:
+            connection.cursor.execute('DELETE FROM video_title WHERE id=?', (title_id_2,))
+            connection.commit()
+        found_titles_after_delete = retriever.search_titles('lime')
+
+        # Assert.
+        self.assertEqual(sorted(item['id'] for item in found_titles), sorted([title_id_1, title_id_2]))
+        self.assertNotIn(title_id_3, [item['id'] for item in found_titles])
+        self.assertEqual([item['id'] for item in filtered_titles], [title_id_1])
+        self.assertEqual([item['id'] for item in found_titles_after_delete], [title_id_1])
+        self.assertEqual(retriever.search_titles('?!'), [])
+
+    def test_9_6_title_hierarchy(self):
+
+        # Arrange.
+        creator = self._video_data_handler.creator
+        deleter = self._video_data_handler.deleter
+        retriever = self._video_data_handler.retriever
+        quality_id_1 = creator.insert_quality('UHD')
+        quality_id_2 = creator.insert_quality('VHS')
+        series_id = creator.insert_title('Mango')
+        season_id = creator.insert_title('Mango - Season 1', series_id)
+        episode_id_1 = creator.insert_title('Mango - Season 1 - Episode 1', season_id)
+        episode_id_2 = creator.insert_title('Mango - Season 1 - Episode 2', season_id)
+        file_id_1 = creator.insert_file(episode_id_1, quality_id_1, '/Mango/1/1.mkv')
+        file_id_2 = creator.insert_file(episode_id_2, quality_id_2, '/Mango/1/2.mkv')
+        for title_id in [series_id, season_id]:
+            creator.insert_title_quality_mapping(title_id, quality_id_1)
+            creator.insert_title_quality_mapping(title_id, quality_id_2)
+
+        # Act.
+        file_count = retriever.retrieve_title_file_count(series_id)
+        episodes = retriever.retrieve_episodes(series_id)
+        deleter.delete_video_path(file_id_2)
+        file_count_after_delete = retriever.retrieve_title_file_count(series_id)
+        quality_mapping_count = self._count_rows(
+            'video_title_quality_mapping WHERE id_title={} AND id_quality={}'.format(series_id, quality_id_2))
+        episode_count = self._count_rows('video_title WHERE id={}'.format(episode_id_2))
+        deleter.delete_video_path(file_id_1)
+        title_count = self._count_rows(
+            'video_title WHERE id IN ({}, {}, {})'.format(series_id, season_id, episode_id_1))
+        closure_count = self._count_rows(
+            'video_title_closure WHERE id_ancestor={0} OR id_descendant={0}'.format(series_id))
+        mapping_count = self._count_rows(
+            'video_title_quality_mapping WHERE id_title IN ({}, {})'.format(series_id, season_id))
+
+        # Assert.
+        self.assertEqual(file_count, 2)
+        self.assertEqual([item['id'] for item in episodes], [episode_id_1, episode_id_2])
+        self.assertEqual(file_count_after_delete, 1)
+        self.assertEqual(quality_mapping_count, 0)
+        self.assertEqual(episode_count, 0)
+        self.assertEqual(title_count, 0)
+        self.assertEqual(closure_count, 0)
+        self.assertEqual(mapping_count, 0)
+
+    def test_9_7_bulk_delete(self):
+
+        # Arrange.
+        deleter = self._video_data_handler.deleter
+        series_1 = self._insert_series('Nectarine')
+        series_2 = self._insert_series('Orange')
+
+        # Act.
+        for file_id in series_1['file_ids'][:3]:
+            deleter.delete_video_path(file_id)
+        deleter.delete_subtitle_path(series_1['subtitle_ids'][0])
+        deleter.delete_video_paths(series_2['file_ids'][:3])
+        deleter.delete_subtitle_paths(series_2['subtitle_ids'][:1])
+        deleter.delete_video_paths([])
+        state_1 = self._retrieve_series_state(series_1['series_id'])
+        state_2 = self._retrieve_series_state(series_2['series_id'])
+
+        # Assert.
+        self.assertEqual(state_1, state_2)
+        self.assertEqual(state_2['titles'], [(1, 'Season 2'), (2, 'Season 2 - Episode 1')])
+        self.assertEqual(state_2['language_mappings'], [('Season 2', 'Italian'), ('Series', 'Italian')])
+        self.assertEqual(state_2['quality_mappings'], [('Season 2', 'SDR'), ('Series', 'SDR')])
+        self.assertEqual(state_2['subtitle_language_mappings'], [])
+
+    def test_9_7_1_bulk_delete_ignores_leftover_ids(self):
+
+        # Arrange.
+        deleter = self._video_data_handler.deleter
+        retriever = self._video_data_handler.retriever
+        series_1 = self._insert_series('Peach')
+        series_2 = self._insert_series('Quince')
+        file_count = retriever.retrieve_title_file_count(series_1['series_id'])
+        # Leave IDs behind in the temporary table of the pooled writer connection, like an unfinished bulk delete.
+        with self._video_data_handler.db_context.get_connection_provider() as connection:
+            connection.cursor.execute(
+                'CREATE TEMP TABLE IF NOT EXISTS deleted_id (kind VARCHAR(32), id INTEGER, PRIMARY KEY(kind, id)) '
+                'WITHOUT ROWID')
+            connection.cursor.execute(
+                'INSERT INTO temp.deleted_id (kind, id) VALUES (\'file\', ?)',
+                (series_1['file_ids'][0],))
+            connection.commit()
+
+        # Act.
+        deleter.delete_video_paths(series_2['file_ids'][:1])
+
+        # Assert.
+        self.assertEqual(retriever.retrieve_title_file_count(series_1['series_id']), file_count)
+
+    def test_9_8_cache_preload(self):
+
+        # Arrange.
+        retriever = self._video_data_handler.retriever
+        self._video_data_handler.clear_cache()
+        language_count = len(retriever.retrieve_languages())
+        quality_count = len(retriever.retrieve_qualities())
+        title_count = self._count_rows('video_title WHERE id_parent IS NULL')
+
+        # Act.
+        entry_count = self._video_data_handler.preload_cache()
+        metrics_before = self._video_data_handler.cache_metrics
+        language_id = retriever.retrieve_language_id('Hungarian')
+        quality_id = retriever.retrieve_quality_id('HQ')
+        title_id = retriever.retrieve_title_id('Apple')
+        metrics_after = self._video_data_handler.cache_metrics
+
+        # Assert.
+        self.assertEqual(entry_count, language_count + quality_count + title_count)
+        self.assertEqual([language_id, quality_id, title_id], [4, 3, 2])
+        for name in ['video languages', 'video qualities', 'video titles']:
+            self.assertEqual(metrics_after[name].hit_count, metrics_before[name].hit_count + 1)
+            self.assertEqual(metrics_after[name].miss_count, metrics_before[name].miss_count)
+
+    def test_9_9_insert_callback(self):
+
+        # Arrange.
+        creator = self._video_data_handler.creator
+        title_id = creator.insert_title('Kiwano')
+        language_id = creator.insert_language('Zulu')
+        inserted_row_counts = []
+
+        # Act.
+        creator.set_insert_callback(inserted_row_counts.append)
+        try:
+            creator.insert_title_language_mapping(title_id, language_id)
+            creator.insert_title_language_mapping(title_id, language_id)
+            creator.insert_file(title_id, 1, '/Kiwano.avi')
+        finally:
+            creator.set_insert_callback(None)
+        creator.insert_file(title_id, 1, '/Kiwano 2.avi')
+
+        # Assert.
+        self.assertEqual(
+            [1, 1],
+            inserted_row_counts,
+            'Only the rows inserted while the callback is set should be counted, without the ignored duplicates.')
+
     ####################################################################################################################
     # Auxiliary methods.
     ####################################################################################################################
 
+    def _count_rows(self, table_and_condition):
+
+        with self._video_data_handler.db_context.get_read_connection_provider() as connection:
+            cursor = connection.cursor
+            cursor.execute('SELECT COUNT(*) FROM ' + table_and_condition)
+            return cursor.fetchone()[0]
+
+    def _explain_query_plan(self, query):
+
+        with self._video_data_handler.db_context.get_connection_provider() as connection:
+            cursor = connection.cursor
+            cursor.execute('EXPLAIN QUERY PLAN ' + query)
+            return ' '.join(row[-1] for row in cursor.fetchall())
+
     def _insert_languages_into_cache(self, cache):
 
         cache.set_language_id('English', 1)
@@ -207,6 +564,82 @@ class VideoDalTest(unittest.TestCase):
         cache.set_title_id('Fruits - Banana', 5, 3)
         cache.set_title_id('Fruits - Cherry', 6, 3)
 
+    def _insert_series(self, series_title):
+        """
+        Inserts a series with two seasons, four files and two subtitles, and the mappings of the series and the seasons.
+        """
+
+        creator = self._video_data_handler.creator
+        language_id_1 = creator.insert_language('Spanish')
+        language_id_2 = creator.insert_language('Italian')
+        subtitle_language_id = creator.insert_language('Basque')
+        quality_id_1 = creator.insert_quality('HDR')
+        quality_id_2 = creator.insert_quality('SDR')
+        series_id = creator.insert_title(series_title)
+        season_id_1 = creator.insert_title(series_title + ' - Season 1', series_id)
+        season_id_2 = creator.insert_title(series_title + ' - Season 2', series_id)
+        episode_ids = [
+            creator.insert_title(series_title + ' - Season 1 - Episode 1', season_id_1),
+            creator.insert_title(series_title + ' - Season 1 - Episode 2', season_id_1),
+            creator.insert_title(series_title + ' - Season 2 - Episode 1', season_id_2)]
+        file_ids = []
+        for i, (episode_id, quality_id, language_id) in enumerate([
+                (episode_ids[0], quality_id_1, language_id_1),
+                (episode_ids[1], quality_id_1, language_id_1),
+                (episode_ids[2], quality_id_1, language_id_1),
+                (episode_ids[2], quality_id_2, language_id_2)]):
+            file_id = creator.insert_file(episode_id, quality_id, '/{}/{}.mkv'.format(series_title, i))
+            creator.insert_file_language_mapping(file_id, language_id)
+            file_ids.append(file_id)
+        subtitle_ids = [
+            creator.insert_subtitle(file_ids[3], subtitle_language_id, '/{}/3.srt'.format(series_title)),
+            creator.insert_subtitle(file_ids[0], subtitle_language_id, '/{}/0.srt'.format(series_title))]
+        for title_id in [series_id, season_id_1, season_id_2]:
+            creator.insert_title_language_mapping(title_id, language_id_1)
+            creator.insert_title_quality_mapping(title_id, quality_id_1)
+            creator.insert_title_sl_mapping(title_id, subtitle_language_id)
+        for title_id in [series_id, season_id_2]:
+            creator.insert_title_language_mapping(title_id, language_id_2)
+            creator.insert_title_quality_mapping(title_id, quality_id_2)
+
+        return {'series_id' : series_id, 'file_ids' : file_ids, 'subtitle_ids' : subtitle_ids}
+
+    def _retrieve_series_state(self, series_id):
+        """
+        Retrieves the titles and the mappings under the given series without the title of the series, so that the
+        states of series inserted by _insert_series can be compared.
+        """
+
+        state = {}
+
+        with self._video_data_handler.db_context.get_read_connection_provider() as connection:
+            cursor = connection.cursor
+            cursor.execute(
+                'SELECT c.depth, t.title '
+                'FROM video_title_closure AS c, video_title AS t '
+                'WHERE c.id_ancestor=? AND c.depth>0 AND t.id=c.id_descendant '
+                'ORDER BY t.title',
+                (series_id,))
+            state['titles'] = [(row[0], row[1].split(' - ', 1)[1]) for row in cursor.fetchall()]
+            for key, table_name, value_table_name, value_column_name in [
+                    ('language_mappings', 'video_title_language_mapping', 'video_language', 'language'),
+                    ('quality_mappings', 'video_title_quality_mapping', 'video_quality', 'quality'),
+                    (
+                        'subtitle_language_mappings',
+                        'video_title_subtitle_language_mapping',
+                        'video_language',
+                        'language')]:
+                cursor.execute(
+                    'SELECT t.title, v.{2} '
+                    'FROM video_title_closure AS c, video_title AS t, {0} AS m, {1} AS v '
+                    'WHERE c.id_ancestor=? AND t.id=c.id_descendant AND m.id_title=t.id AND v.id=m.id_{2} '
+                    'ORDER BY t.title, v.{2}'.format(table_name, value_table_name, value_column_name),
+                    (series_id,))
+                state[key] = sorted(
+                    (row[0].split(' - ', 1)[1] if ' - ' in row[0] else 'Series', row[1]) for row in cursor.fetchall())
+
+        return state
+
 ########################################################################################################################
 # Main.
 ########################################################################################################################
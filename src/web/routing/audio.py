@@ -3,6 +3,8 @@ from flask import Blueprint
 from flask import jsonify
 from flask import request
 
+from web.util.functions import build_page_dictionary, stream_json_response, to_page_request
+
 ########################################################################################################################
 # Initialization.
 ########################################################################################################################
@@ -20,15 +22,23 @@ audio_player_adapter = None # pylint: disable=invalid-name
 @audio.route('/audio/albums')
 def route_audio_albums():
     """
-    Lists the albums.
+    Lists the albums, optionally a page of them. Whole listings are streamed.
     """
 
     artist_id = None
     if (request.args is not None) and ('artist' in request.args):
         artist_id = request.args['artist']
 
-    result = audio_dal_retriever.retrieve_albums(artist_id)
-    return jsonify({'albums' : result})
+    try:
+        page_request = to_page_request(request.args, ['album', 'id'], [(str, type(None)), (int,)])
+    except Exception:
+        abort(400)
+
+    if page_request is None or page_request.limit is None:
+        return stream_json_response('albums', audio_dal_retriever.iterate_albums(artist_id, page_request))
+
+    result = audio_dal_retriever.retrieve_albums(artist_id, page_request)
+    return jsonify(build_page_dictionary('albums', result, page_request))
 
 @audio.route('/audio/artists')
 def route_audio_artists():
@@ -50,13 +60,24 @@ def route_audio_player_play():
 @audio.route('/audio/tracks')
 def route_audio_tracks():
     """
-    Lists all available tracks.
+    Lists all available tracks, optionally a page of them. Whole listings are streamed.
     """
 
     if request.args is None or 'album' not in request.args:
         abort(400)
 
+    try:
+        page_request = to_page_request(
+            request.args,
+            ['id', 'number', 'title'],
+            [(int, type(None)), (int, type(None)), (int,)])
+    except Exception:
+        abort(400)
+
     album_id = request.args['album']
-    result = audio_dal_retriever.retrieve_tracks(album_id)
+    if page_request is None or page_request.limit is None:
+        return stream_json_response('tracks', audio_dal_retriever.iterate_tracks(album_id, page_request))
+
+    result = audio_dal_retriever.retrieve_tracks(album_id, page_request)
 
-    return jsonify({'tracks' : result})
+    return jsonify(build_page_dictionary('tracks', result, page_request))
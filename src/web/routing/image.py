@@ -1,7 +1,11 @@
 from os import path
 
+from flask import abort
 from flask import Blueprint
 from flask import jsonify
+from flask import request
+
+from web.util.functions import build_page_dictionary, stream_json_response, to_page_request
 
 ########################################################################################################################
 # Initialization.
@@ -20,11 +24,19 @@ image_viewer = None # pylint: disable=invalid-name
 @image.route('/image/albums')
 def route_image_albums():
     """
-    Displays image albums
+    Displays image albums, optionally a page of them. Whole listings are streamed.
     """
 
-    result = image_dal.retriever.retrieve_albums()
-    return jsonify({'albums' : result})
+    try:
+        page_request = to_page_request(request.args, ['album', 'id'], [(str, type(None)), (int,)])
+    except Exception:
+        abort(400)
+
+    if page_request is None or page_request.limit is None:
+        return stream_json_response('albums', image_dal.retriever.iterate_albums(page_request))
+
+    result = image_dal.retriever.retrieve_albums(page_request)
+    return jsonify(build_page_dictionary('albums', result, page_request))
 
 @image.route('/image/viewer/next')
 def route_image_next():
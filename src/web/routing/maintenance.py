@@ -2,23 +2,26 @@ import datetime
 from flask import Blueprint
 from flask import jsonify
 
-from bll.mediacatalog.catalogizer import Catalogizer
+from bll.mediacatalog.catalogjob import CatalogJob
 from dal.configuration.configmanager import ConfigManager
-from dal.video.videotitlefilter import VideoTitleFilter
 from web.util.deltatemplate import strfdelta
 
 ########################################################################################################################
 # Initialization.
 ########################################################################################################################
 
+audio_dal_retriever = None # pylint: disable=invalid-name
+
+catalog_job_scheduler = None # pylint: disable=invalid-name
+
 catalogizer = None # pylint: disable=invalid-name
 
+image_dal_retriever = None # pylint: disable=invalid-name
+
 maintenance = Blueprint('maintenance', __name__) # pylint: disable=invalid-name
 
 status_info = None # pylint: disable=invalid-name
 
-status_info_tmp = {} # pylint: disable=invalid-name
-
 video_dal_retriever = None # pylint: disable=invalid-name
 
 ########################################################################################################################
@@ -49,25 +52,73 @@ def route_categories():
 
     return jsonify({'categories' : ConfigManager.categories})
 
+@maintenance.route('/job/<int:job_id>', methods=['GET'])
+def route_job(job_id):
+    """
+    Returns the state and the progress of a recently finished, a running or a queued job.
+
+    Parameters
+    ----------
+    job_id : int
+        The identifier of the job.
+
+    Returns
+    -------
+    A JSON string describing the job or None if the job is not found.
+    """
+
+    return jsonify({'job' : _get_job_dictionary(catalog_job_scheduler.get_job(job_id))})
+
+@maintenance.route('/job/<int:job_id>', methods=['DELETE'])
+def route_job_cancel(job_id):
+    """
+    Cancels a queued or a running job. A running job stops at the next directory it would scan.
+
+    Parameters
+    ----------
+    job_id : int
+        The identifier of the job.
+
+    Returns
+    -------
+    A JSON string that tells whether the job has been found.
+    """
+
+    return jsonify({'cancel' : catalog_job_scheduler.cancel(job_id)})
+
+@maintenance.route('/jobs', methods=['GET'])
+def route_jobs():
+    """
+    Lists the recently finished, the running and the queued jobs.
+
+    Returns
+    -------
+    A JSON string that contains the list of the jobs.
+    """
+
+    return jsonify({'jobs' : [_get_job_dictionary(job) for job in catalog_job_scheduler.jobs]})
+
 @maintenance.route('/rebuild')
 def route_rebuild():
     """
-    Rebuilds media database.
+    Queues a rebuild of the media database, unless a queued job covers it already.
 
     Returns
     -------
-    A JSON string describing the status of the rebuilding process.
+    A JSON string describing the status of the rebuilding process ('started', or 'in progress' if another job was
+    queued or running already) and its job.
     """
 
-    status_info_tmp['last_sync_start'] = datetime.datetime.now()
-    result = _get_status_string(catalogizer.rebuild_database_async(_on_synchronization_finished))
+    status = _get_submission_status_string()
+    job = catalog_job_scheduler.submit(CatalogJob.KIND_REBUILD)
 
-    return jsonify({'rebuild' : result})
+    return jsonify({'rebuild' : status, 'job' : _get_job_dictionary(job)})
 
 @maintenance.route('/search/<string:search_string>', methods=['GET'])
 def route_search(search_string):
     """
-    Searches through titles.
+    Searches through the video titles, the audio albums and tracks and the image albums. Items containing each word of
+    the search string (as a word or as the prefix of a word) are found, the best matches first.
 
     Parameters
     ----------
@@ -76,12 +127,16 @@ def route_search(search_string):
 
     Returns
     -------
-    A JSON string that contains a list of the found titles grouped by categories.
+    A JSON string that contains a list of the found items grouped by categories.
     """
 
-    result = _search_video_titles(search_string)
+    result = {
+        'audio albums' : audio_dal_retriever.search_albums(search_string),
+        'audio tracks' : audio_dal_retriever.search_tracks(search_string),
+        'image albums' : image_dal_retriever.search_albums(search_string),
+        'videos' : video_dal_retriever.search_titles(search_string)}
 
-    return jsonify({'videos' : result})
+    return jsonify(result)
 
 @maintenance.route('/status')
 def route_status():
@@ -94,6 +149,7 @@ def route_status():
     """
 
     status_info.refresh()
+    current_job = catalog_job_scheduler.current_job
 
     last_sync_duration = '0'
     if status_info.last_sync_duration is not None:
@@ -106,60 +162,146 @@ def route_status():
         'number of audio files': status_info.audio_count,
         'number of image files': status_info.image_count,
         'number of video files': status_info.video_count,
-        'synchronization' : _get_status_string(catalogizer.status),
+        # Queued jobs count as well, so a job requested right before is not reported as finished.
+        'synchronization' : 'in progress' if catalog_job_scheduler.is_busy else 'not running',
+        'job' : _get_job_dictionary(current_job),
         'duration of last synchronization' : last_sync_duration,
         'time of last synchronization' : last_sync_time,
-        'uptime' : strfdelta(status_info.uptime, '%D days %H hours %M minutes %S seconds')}
+        'uptime' : strfdelta(status_info.uptime, '%D days %H hours %M minutes %S seconds'),
+        'read connections' : _get_pool_metrics_dictionary(status_info.read_pool_metrics),
+        'write connections' : _get_pool_metrics_dictionary(status_info.write_pool_metrics),
+        'caches' : {
+            name : _get_cache_metrics_dictionary(metrics) for name, metrics in status_info.cache_metrics.items()},
+        'indexing stages' : _get_stage_timings_dictionary(catalogizer.stage_timings)}
 
     return jsonify({'status' : result})
 
 @maintenance.route('/sync')
 def route_sync():
     """
-    Synchronizes database (looks for the changes only).
+    Queues a synchronization of the database (looks for the changes only), unless a queued job covers it already.
 
     Returns
     -------
-    A JSON string describing the status of the synchronization process.
+    A JSON string describing the status of the synchronization process ('started', or 'in progress' if another job
+    was queued or running already) and its job.
     """
 
-    status_info_tmp['last_sync_start'] = datetime.datetime.now()
-    result = _get_status_string(catalogizer.synchronize_database_async(_on_synchronization_finished))
+    status = _get_submission_status_string()
+    job = catalog_job_scheduler.submit(CatalogJob.KIND_SYNC)
+
+    return jsonify({'sync' : status, 'job' : _get_job_dictionary(job)})
+
+########################################################################################################################
+# Callbacks.
+########################################################################################################################
 
-    return jsonify({'sync' : result})
+def on_job_finished(job):
+    """
+    Records the time and the duration of the completed rebuilds and synchronizations. Called by the
+    CatalogJobScheduler.
+    """
+
+    if job.state == CatalogJob.STATE_COMPLETED and job.kind != CatalogJob.KIND_UPGRADE:
+        status_info.last_sync_time = job.finish_time
+        status_info.last_sync_duration = job.finish_time - job.start_time
 
 ########################################################################################################################
 # Private methods.
 ########################################################################################################################
 
-def _get_status_string(status):
+def _get_cache_metrics_dictionary(metrics):
+
+    return {
+        'size' : metrics.size,
+        'max size' : metrics.max_size,
+        'hits' : metrics.hit_count,
+        'misses' : metrics.miss_count,
+        'evictions' : metrics.eviction_count,
+        'hit rate' : round(metrics.hit_rate, 3) if metrics.hit_rate is not None else None}
+
+def _get_eta_string(eta):
 
-    if status == Catalogizer.STATUS_COMPLETED:
+    if eta is None:
+        return None
+
+    return strfdelta(datetime.timedelta(seconds=int(eta)), '%H hours %M minutes %S seconds')
+
+def _get_job_dictionary(job):
+
+    if job is None:
+        return None
+
+    progress = job.progress
+    throughput = job.throughput
+    eta = job.eta
+
+    return {
+        'id' : job.job_id,
+        'kind' : _get_job_kind_string(job.kind),
+        'state' : _get_job_state_string(job.state),
+        'periodic' : job.is_periodic,
+        'submitted' : str(job.submit_time),
+        'started' : str(job.start_time) if job.start_time is not None else None,
+        'finished' : str(job.finish_time) if job.finish_time is not None else None,
+        'directories scanned' : progress.directory_count,
+        'files analyzed' : progress.file_count,
+        'rows written' : progress.row_count,
+        'files per second' : round(throughput, 1) if throughput is not None else None,
+        'eta' : _get_eta_string(eta)}
+
+def _get_job_kind_string(kind):
+
+    if kind == CatalogJob.KIND_REBUILD:
+        return "rebuild"
+    if kind == CatalogJob.KIND_SYNC:
+        return "sync"
+    if kind == CatalogJob.KIND_UPGRADE:
+        return "upgrade"
+
+    return "unknown"
+
+def _get_job_state_string(state):
+
+    if state == CatalogJob.STATE_CANCELLED:
+        return "cancelled"
+    if state == CatalogJob.STATE_COMPLETED:
         return "completed"
-    if status == Catalogizer.STATUS_IN_PROGRESS:
+    if state == CatalogJob.STATE_FAILED:
+        return "failed"
+    if state == CatalogJob.STATE_QUEUED:
+        return "queued"
+    if state == CatalogJob.STATE_RUNNING:
         return "in progress"
-    if status == Catalogizer.STATUS_NOT_RUNNING:
-        return "not running"
-    if status == Catalogizer.STATUS_STARTED:
-        return "started"
 
     return "unknown"
 
-def _on_synchronization_finished(status):
+def _get_pool_metrics_dictionary(metrics):
+
+    return {
+        'open' : metrics.open_count,
+        'in use' : metrics.in_use_count,
+        'waits' : metrics.wait_count,
+        'total wait time' : round(metrics.total_wait_time, 3),
+        'max wait time' : round(metrics.max_wait_time, 3)}
 
-    if status == Catalogizer.STATUS_COMPLETED:
+def _get_stage_timings_dictionary(timings):
 
-        now = datetime.datetime.now()
-        status_info.last_sync_time = now
+    if timings is None:
+        return None
 
-        last_sync_start = status_info_tmp['last_sync_start']
-        if last_sync_start is not None:
-            status_info.last_sync_duration = now - last_sync_start
+    return {
+        category : {
+            stage : {
+                'count' : timing.count,
+                'total time' : round(timing.total_time, 3),
+                'average time' : round(timing.average_time, 6) if timing.average_time is not None else None}
+            for stage, timing in stages.items()}
+        for category, stages in timings.items()}
 
-def _search_video_titles(search_string):
+def _get_submission_status_string():
 
-    video_title_filter = VideoTitleFilter()
-    video_title_filter.any_parent = True
-    video_title_filter.text = search_string
+    if catalog_job_scheduler.is_busy:
+        return "in progress"
 
-    return video_dal_retriever.retrieve_titles(video_title_filter)
+    return "started"
@@ -1,8 +1,10 @@
+from flask import abort
 from flask import Blueprint
 from flask import jsonify
 from flask import request
 
 from dal.video.videotitlefilter import VideoTitleFilter
+from web.util.functions import build_page_dictionary, stream_json_response, to_page_request
 
 ########################################################################################################################
 # Initialization.
@@ -27,6 +29,24 @@ def route_video_details(id_title):
     result = video_dal_retriever.retrieve_details(id_title)
     return jsonify({'details' : result})
 
+@video.route('/video/details')
+def route_video_details_of_titles():
+    """
+    Lists details for each of the titles given by a comma-separated list of IDs, in the order of the IDs.
+    """
+
+    if request.args is None or 'ids' not in request.args:
+        abort(400)
+
+    try:
+        title_ids = [int(title_id) for title_id in request.args['ids'].split(',')]
+    except ValueError:
+        abort(400)
+
+    details = video_dal_retriever.retrieve_details_of_titles(title_ids)
+    result = [details[title_id] for title_id in title_ids if title_id in details]
+    return jsonify({'details' : result})
+
 @video.route('/video/languages')
 def route_video_languages():
     """
@@ -56,20 +76,29 @@ def route_video_qualities():
 @video.route('/video/titles')
 def route_video_titles():
     """
-    Lists all available titles.
+    Lists all available titles, optionally a page of them. Whole listings are streamed.
     """
 
-    result = _retrieve_titles(request.args)
-    return jsonify({'titles' : result})
+    try:
+        page_request = to_page_request(request.args, ['id', 'title'], [(str, type(None)), (int,)])
+    except Exception:
+        abort(400)
+
+    video_title_filter = _to_video_title_filter(request.args)
+    if page_request is None or page_request.limit is None:
+        return stream_json_response('titles', video_dal_retriever.iterate_titles(video_title_filter, page_request))
+
+    result = video_dal_retriever.retrieve_titles(video_title_filter, page_request)
+    return jsonify(build_page_dictionary('titles', result, page_request))
 
 ########################################################################################################################
 # Private methods.
 ########################################################################################################################
 
-def _retrieve_titles(filters):
+def _to_video_title_filter(filters):
 
     if not filters:
-        return video_dal_retriever.retrieve_titles()
+        return None
 
     video_title_filter = VideoTitleFilter()
 
@@ -84,4 +113,4 @@ def _retrieve_titles(filters):
     if 'text' in filters:
         video_title_filter.text = filters['text']
 
-    return video_dal_retriever.retrieve_titles(video_title_filter)
+    return video_title_filter
@@ -47,6 +47,16 @@ class StatusInfo:
         """
         return self._status[StatusInfo.AUDIO_COUNT]
 
+    @property
+    def cache_metrics(self):
+        """
+        Gets the usage statistics of the caches of the data handlers.
+        """
+        result = {}
+        for data_handler in [self._audio_dal, self._image_dal, self._video_dal]:
+            result.update(data_handler.cache_metrics)
+        return result
+
     @property
     def image_count(self):
         """
@@ -82,6 +92,13 @@ class StatusInfo:
         """
         self._status[StatusInfo.LAST_SYNC_TIME] = value
 
+    @property
+    def read_pool_metrics(self):
+        """
+        Gets the usage statistics of the read-only connections of the media database.
+        """
+        return self._video_dal.db_context.read_pool_metrics
+
     @property
     def uptime(self):
         """
@@ -96,6 +113,13 @@ class StatusInfo:
         """
         return self._status[StatusInfo.VIDEO_COUNT]
 
+    @property
+    def write_pool_metrics(self):
+        """
+        Gets the usage statistics of the writer connections of the media database.
+        """
+        return self._video_dal.db_context.write_pool_metrics
+
     ####################################################################################################################
     # Public methods.
     ####################################################################################################################
@@ -1,5 +1,40 @@
+from flask import Response
+
+from dal.functions import decode_cursor
+from dal.pagerequest import PageRequest
+from web.util.jsonstream import iterate_json_chunks
 from multimedia.constants import AUDIO_OUTPUT_ANALOG, AUDIO_OUTPUT_DIGITAL
 
+def build_page_dictionary(key, result, page_request):
+    """
+    Builds the response of a listing, which also contains the cursor of the next page if a page was requested.
+    """
+
+    if page_request is None:
+        return {key : result}
+
+    return {key : result.items, 'next' : result.next_cursor}
+
+def stream_json_response(key, items):
+    """
+    Creates a response that serializes the given items into a JSON object like {key : [items]} while they are being
+    iterated, so the listing is sent in chunks and never held in memory as a whole. The first batch of the items is
+    retrieved before the response is created, so a failing retrieval raises an error instead of a truncated response.
+
+    Parameters
+    ----------
+    key : str
+        The key of the list in the JSON object.
+    items : iterable of dict
+        The items of the list, typically a generator of a retriever.
+
+    Returns
+    -------
+    The response.
+    """
+
+    return Response(iterate_json_chunks(key, items), mimetype='application/json')
+
 def to_audio_output_multimedia(json_object):
 
     audio_output = AUDIO_OUTPUT_DIGITAL
@@ -15,3 +50,47 @@ def to_audio_output_string(audio_output):
         return 'analog'
 
     return 'digital'
+
+def to_page_request(arguments, field_keys, sort_key_types):
+    """
+    Builds a page request from the 'after', 'fields' and 'limit' arguments of a listing.
+
+    Parameters
+    ----------
+    arguments : dict
+        The arguments of the request.
+    field_keys : list of str
+        The keys of the fields of the listed items.
+    sort_key_types : list of tuple
+        The accepted types of the values of the keys the listing is sorted by, in order. A cursor has to contain a value
+        of the accepted types for each key.
+
+    Returns
+    -------
+    The page request or None if neither of the arguments is given.
+    """
+
+    if arguments is None or not any(key in arguments for key in ['after', 'fields', 'limit']):
+        return None
+
+    page_request = PageRequest()
+
+    if 'after' in arguments:
+        page_request.after = decode_cursor(arguments['after'])
+        if len(page_request.after) != len(sort_key_types):
+            raise Exception('The cursor does not belong to this listing.')
+        for value, value_types in zip(page_request.after, sort_key_types):
+            # JSON booleans are decoded as bool, which is a subclass of int.
+            if isinstance(value, bool) or not isinstance(value, value_types):
+                raise Exception('The cursor does not belong to this listing.')
+    if 'fields' in arguments:
+        page_request.fields = arguments['fields'].split(',')
+        for key in page_request.fields:
+            if key not in field_keys:
+                raise Exception('Unknown field: ' + key + '.')
+    if 'limit' in arguments:
+        page_request.limit = int(arguments['limit'])
+        if page_request.limit < 1:
+            raise Exception('limit has to be positive.')
+
+    return page_request
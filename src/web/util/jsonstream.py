@@ -0,0 +1,46 @@
+import itertools
+import json
+
+def iterate_json_chunks(key, items, batch_size=500):
+    """
+    Serializes the given items into a JSON object like {key : [items]} chunk by chunk, while the items are being
+    iterated. The first item is retrieved before this function returns, so an error of the retrieval (like a failing
+    query) is raised here, before any of the response is sent, instead of truncating the response.
+
+    Parameters
+    ----------
+    key : str
+        The key of the list in the JSON object.
+    items : iterable of dict
+        The items of the list.
+    batch_size : int
+        The number of items in a chunk.
+
+    Returns
+    -------
+    A generator of strings, the concatenation of which is the JSON object.
+    """
+
+    iterator = iter(items)
+    first_items = list(itertools.islice(iterator, 1))
+
+    return _generate_json_chunks(key, items, itertools.chain(first_items, iterator), batch_size)
+
+def _generate_json_chunks(key, items, iterator, batch_size):
+
+    try:
+        yield '{' + json.dumps(key) + ':['
+        chunk = []
+        separator = ''
+        for item in iterator:
+            chunk.append(item)
+            if len(chunk) == batch_size:
+                # The brackets of the serialized list are cut off.
+                yield separator + json.dumps(chunk)[1:-1]
+                chunk = []
+                separator = ','
+        yield (separator + json.dumps(chunk)[1:-1] if chunk else '') + ']}'
+    finally:
+        # Stops a retriever generator if the client disconnects.
+        if hasattr(items, 'close'):
+            items.close()